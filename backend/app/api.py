@@ -1,7 +1,22 @@
-from flask import Blueprint, Flask, jsonify, request
+import base64
+import hmac
+import json
+import os
+import time
+from datetime import date
+
+from flask import Blueprint, Flask, Response, g, jsonify, request, send_file, stream_with_context
 from flask_cors import CORS
+from log_config import configurar_logging, iniciar_request, obtener_logger, terminar_request
+from metrics import METRICS_TOKEN
+from paginacion import normalizar_limite, parsear_campos, proyectar
+from scheduler import SCHEDULER_ENABLED
 from sistema import SistemaAlquiler
 
+# Nivel y formato por entorno (ALQUILERES_LOG_LEVEL, ALQUILERES_LOG_FORMAT); DEBUG apagado por defecto
+configurar_logging()
+logger = obtener_logger('api')
+
 app = Flask(__name__)
 
 # Development CORS configuration - whitelist usual dev origins (local and devtunnels)
@@ -18,9 +33,44 @@ DEV_ALLOWED_ORIGINS = [
 CORS(app, resources={r"/api/*": {"origins": DEV_ALLOWED_ORIGINS}}, supports_credentials=True)
 
 sistema = SistemaAlquiler()
+# Los catálogos se leen una sola vez al arrancar y se sirven desde memoria
+sistema.db_manager.catalogos.precargar()
+# Reservas que empiezan, alquileres vencidos y services del día pasan de estado solos
+if SCHEDULER_ENABLED:
+    sistema.planificador.iniciar()
 
 api = Blueprint('api', __name__)
 
+# El header user-id (sin token) era la identificación anterior a las sesiones:
+# cualquiera podía mandar el id de otro. Solo para clientes viejos, y a propósito.
+LEGACY_USER_ID_HEADER = os.environ.get('ALQUILERES_LEGACY_USER_ID_HEADER', '0') == '1'
+
+
+# Id de correlación: el que manda el cliente en X-Request-ID o uno nuevo.
+# Queda en cada línea de log del request y vuelve en la respuesta.
+@app.before_request
+def asignar_id_request():
+    g.id_request = iniciar_request(request.headers.get('X-Request-ID'))
+    g.inicio_request = time.perf_counter()
+
+@app.after_request
+def devolver_id_request(respuesta):
+    if 'id_request' in g:
+        respuesta.headers['X-Request-ID'] = g.id_request
+    if 'inicio_request' in g:
+        # Por regla de ruta (no por URL) para que las etiquetas no crezcan con cada id
+        ruta = request.url_rule.rule if request.url_rule else 'sin_ruta'
+        metricas = sistema.db_manager.metricas
+        metricas.observar('alquileres_http_request_duration_seconds', time.perf_counter() - g.inicio_request,
+                          metodo=request.method, ruta=ruta)
+        metricas.sumar('alquileres_http_requests_total', metodo=request.method, ruta=ruta,
+                       estado=respuesta.status_code)
+    return respuesta
+
+@app.teardown_request
+def liberar_id_request(_error=None):
+    terminar_request()
+
 # ---------------------------------------------------------
 # RUTAS (ENDPOINTS)
 # ---------------------------------------------------------
@@ -30,65 +80,97 @@ def index():
     """Ruta de prueba para ver si el servidor vive."""
     return jsonify({"status": "API de Alquileres funcionando 🚀"})
 
+@api.route('/_metrics', methods=['GET'])
+def exportar_metricas():
+    """Métricas en formato de texto de Prometheus. Para Admin o con X-Metrics-Token."""
+    token = request.headers.get('X-Metrics-Token')
+    if not (METRICS_TOKEN and token and hmac.compare_digest(token, METRICS_TOKEN)):
+        usuario = obtener_usuario_actual()
+        if not usuario:
+            return jsonify({"error": "No autorizado"}), 401
+        if not sistema.check_permission("Admin", usuario):
+            return jsonify({"error": "Permisos insuficientes"}), 403
+    return Response(sistema.db_manager.metricas.exportar(), mimetype='text/plain; version=0.0.4')
+
 
 #---------------------------------------------------------
 # GET LISTAS DE CATÁLOGOS
 #--------------------------------------------------------
 
 
+def responder_catalogo(tabla, armar_lista):
+    """Respuesta de catálogo con ETag fuerte: si el cliente ya lo tiene, 304 sin cuerpo."""
+    etag = sistema.db_manager.catalogos.etag(tabla)
+    if etag and etag in request.if_none_match:
+        respuesta = Response(status=304)
+    else:
+        respuesta = jsonify(armar_lista())
+    if etag:
+        respuesta.set_etag(etag)
+    # El navegador guarda la respuesta pero revalida siempre con If-None-Match
+    respuesta.headers['Cache-Control'] = 'no-cache'
+    return respuesta
+
 @api.route('/tipos-documento', methods=['GET'])
 def obtener_tipos_documento():
     try:
-        lista = sistema.listar_tipos_documento()
-        return jsonify([{"id_tipo": x.id_tipo, "descripcion": x.descripcion} for x in lista]), 200
+        return responder_catalogo('Documento', lambda: [
+            {"id_tipo": x.id_tipo, "descripcion": x.descripcion} for x in sistema.listar_tipos_documento()
+        ])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @api.route('/marcas', methods=['GET'])
 def obtener_marcas():
     try:
-        lista = sistema.listar_marcas()
-        return jsonify([{"id_marca": x.id_marca, "descripcion": x.descripcion} for x in lista]), 200
+        return responder_catalogo('Marca', lambda: [
+            {"id_marca": x.id_marca, "descripcion": x.descripcion} for x in sistema.listar_marcas()
+        ])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @api.route('/colores', methods=['GET'])
 def obtener_colores():
     try:
-        lista = sistema.listar_colores()
-        return jsonify([{"id_color": x.id_color, "descripcion": x.descripcion} for x in lista]), 200
+        return responder_catalogo('Color', lambda: [
+            {"id_color": x.id_color, "descripcion": x.descripcion} for x in sistema.listar_colores()
+        ])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @api.route('/estados-auto', methods=['GET'])
 def obtener_estados_auto():
     try:
-        lista = sistema.listar_estados_auto()
-        return jsonify([{"id_estado": x.id_estado, "descripcion": x.descripcion} for x in lista]), 200
+        return responder_catalogo('EstadoAuto', lambda: [
+            {"id_estado": x.id_estado, "descripcion": x.descripcion} for x in sistema.listar_estados_auto()
+        ])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @api.route('/estados-alquiler', methods=['GET'])
 def obtener_estados_alquiler():
     try:
-        lista = sistema.listar_estados_alquiler()
-        return jsonify([{"id_estado": x.id_estado, "descripcion": x.descripcion} for x in lista]), 200
+        return responder_catalogo('EstadoAlquiler', lambda: [
+            {"id_estado": x.id_estado, "descripcion": x.descripcion} for x in sistema.listar_estados_alquiler()
+        ])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @api.route('/estados-mantenimiento', methods=['GET'])
 def obtener_estados_mantenimiento():
     try:
-        lista = sistema.listar_estados_mantenimiento()
-        return jsonify([{"id_estado": x.id_estado, "descripcion": x.descripcion} for x in lista]), 200
+        return responder_catalogo('EstadoMantenimiento', lambda: [
+            {"id_estado": x.id_estado, "descripcion": x.descripcion} for x in sistema.listar_estados_mantenimiento()
+        ])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @api.route('/permisos', methods=['GET'])
 def obtener_permisos():
     try:
-        lista = sistema.listar_permisos()
-        return jsonify([{"id_permiso": x.id_permiso, "descripcion": x.descripcion} for x in lista]), 200
+        return responder_catalogo('Permiso', lambda: [
+            {"id_permiso": x.id_permiso, "descripcion": x.descripcion} for x in sistema.listar_permisos()
+        ])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
@@ -98,19 +180,146 @@ def obtener_permisos():
 #--------------------------------------------------------
 
 def obtener_usuario_actual():
-    user_id = request.headers.get('user-id')
-    
-    if not user_id:
-        return None
-    
-    return sistema.db_manager.get_full_usuario_by_id(user_id)
+    # Se resuelve una sola vez por request
+    if 'usuario_actual' in g:
+        return g.usuario_actual
+
+    # Token de sesión (Authorization: Bearer <token>); el header user-id solo si se habilitó
+    user_id = None
+    auth = request.headers.get('Authorization', '')
+    if auth.startswith('Bearer '):
+        user_id = sistema.sesiones.resolver(auth[len('Bearer '):].strip())
+    if user_id is None and LEGACY_USER_ID_HEADER:
+        user_id = request.headers.get('user-id')
+
+    g.usuario_actual = sistema.db_manager.get_usuario_cacheado(user_id) if user_id else None
+    return g.usuario_actual
+
+
+#---------------------------------------------------------
+# PAGINACIÓN Y PROYECCIÓN DE LISTADOS
+#--------------------------------------------------------
+# Sin ninguno de estos parámetros los listados devuelven la lista completa,
+# como siempre. Con alguno, devuelven {"items": [...], "next_cursor": ...}
+# y la página siguiente se pide con ?after=<next_cursor>.
+PARAMETROS_PAGINA = ('after', 'limit', 'estado', 'desde', 'hasta', 'patente')
+
+CAMPOS_VEHICULO = {'patente', 'modelo', 'anio', 'precio_flota', 'asientos', 'puertas',
+                   'caja_manual', 'estado', 'marca', 'color'}
+CAMPOS_CLIENTE = {'id_cliente', 'id_persona', 'nombre', 'apellido', 'mail', 'telefono', 'nro_documento',
+                  'fecha_nacimiento', 'fecha_alta', 'tipo_documento', 'id_tipo_documento'}
+CAMPOS_EMPLEADO = {'id_empleado', 'id_persona', 'nombre', 'apellido', 'mail', 'telefono', 'nro_documento',
+                   'fecha_nacimiento', 'fecha_alta', 'sueldo', 'tipo_documento', 'id_tipo_documento', 'horario'}
+CAMPOS_ALQUILER = {'id_alquiler', 'patente', 'id_cliente', 'id_empleado', 'fecha_inicio', 'fecha_fin',
+                   'dias', 'id_estado', 'modelo', 'marca', 'precio_flota', 'estado_desc', 'nombre_cliente',
+                   'apellido_cliente', 'telefono_cliente', 'mail_cliente', 'nro_documento',
+                   'tipo_documento', 'id_persona_cliente'}
+CAMPOS_MANTENIMIENTO = {'id_mantenimiento', 'patente', 'id_empleado', 'fecha_inicio', 'fecha_fin',
+                        'detalle', 'id_estado', 'modelo', 'estado_desc'}
+
+
+def pide_pagina():
+    return any(p in request.args for p in PARAMETROS_PAGINA)
+
+
+def leer_filtros(*filtros):
+    """Los `filtros` aceptados por el listado (estado, desde, hasta, patente)."""
+    parametros = {}
+    for filtro in filtros:
+        valor = request.args.get(filtro)
+        if not valor:
+            continue
+        if filtro == 'estado':
+            try:
+                parametros['id_estado'] = int(valor)
+            except ValueError:
+                raise ValueError("El parámetro 'estado' debe ser un entero")
+        else:
+            parametros[filtro] = valor
+    return parametros
+
+
+def leer_pagina(*filtros):
+    """after, limit y los `filtros` aceptados por el listado. ValueError si alguno es inválido."""
+    parametros = {
+        'after': request.args.get('after') or None,
+        'limit': normalizar_limite(request.args.get('limit')),
+    }
+    parametros.update(leer_filtros(*filtros))
+    return parametros
+
+
+def leer_campos(permitidos):
+    return parsear_campos(request.args.get('fields'), permitidos)
+
+
+def responder_pagina(pagina, campos, armar_item=None, contexto="registros"):
+    if pagina is None:
+        return jsonify({"error": f"Error al listar {contexto}"}), 500
+    items = pagina['items']
+    if armar_item:
+        items = [armar_item(item) for item in items]
+    cuerpo = {"items": proyectar(items, campos), "next_cursor": pagina['next_cursor']}
+    if 'aproximado' in pagina:
+        cuerpo['aproximado'] = pagina['aproximado']
+    return jsonify(cuerpo), 200
+
+
+#---------------------------------------------------------
+# RESPUESTAS EN STREAMING (exportaciones y reportes grandes)
+#--------------------------------------------------------
+# Las filas se serializan a medida que se leen de la base (de a lotes),
+# así que la memoria no crece con el tamaño del resultado.
+FORMATOS_STREAM = {'json': 'application/json', 'ndjson': 'application/x-ndjson'}
+# Texto acumulado antes de escribir un trozo de la respuesta
+TAMANIO_TROZO = 64 * 1024
+
+
+def leer_formato():
+    formato = request.args.get('formato', 'json')
+    if formato not in FORMATOS_STREAM:
+        raise ValueError("El parámetro 'formato' debe ser 'json' o 'ndjson'")
+    return formato
+
+
+def responder_stream(filas, formato='json', campos=None):
+    """`filas` como array JSON o NDJSON (una fila por línea), escrito de a trozos."""
+    def generar():
+        partes, tamanio, primero = [], 0, True
+        if formato == 'json':
+            partes.append('[')
+        try:
+            for fila in filas:
+                if campos:
+                    fila = {c: fila.get(c) for c in campos}
+                texto = json.dumps(fila, default=str)
+                if formato == 'ndjson':
+                    texto += '\n'
+                elif not primero:
+                    texto = ',' + texto
+                primero = False
+                partes.append(texto)
+                tamanio += len(texto)
+                if tamanio >= TAMANIO_TROZO:
+                    yield ''.join(partes)
+                    partes, tamanio = [], 0
+        finally:
+            # Si el cliente corta la descarga, se libera la conexión enseguida
+            if hasattr(filas, 'close'):
+                filas.close()
+        if formato == 'json':
+            partes.append(']')
+        if partes:
+            yield ''.join(partes)
+
+    return Response(stream_with_context(generar()), mimetype=FORMATOS_STREAM[formato])
 
 @api.route('/usuarios/<id_usuario>', methods=['DELETE'])
 def eliminar_usuario_sistema(id_usuario):
     try:
         usuario_solicitante = obtener_usuario_actual()
         if not usuario_solicitante:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         exito = sistema.eliminar_usuario(id_usuario, usuario_solicitante)
         
@@ -188,10 +397,20 @@ def login():
             "mensaje": "Exito", 
             "user_id": usuario.id_usuario,
             "nombre": usuario.user_name,
-            "rol": usuario.permiso.descripcion
+            "rol": usuario.permiso.descripcion,
+            "token": sistema.sesiones.crear(usuario.id_usuario)
         }), 200
     return jsonify({"error": "Credenciales invalidas"}), 401
 
+
+@api.route('/logout', methods=['POST'])
+def logout():
+    auth = request.headers.get('Authorization', '')
+    if not auth.startswith('Bearer '):
+        return jsonify({"error": "Falta el token de sesión"}), 400
+    sistema.sesiones.revocar(auth[len('Bearer '):].strip())
+    return jsonify({"mensaje": "Sesión cerrada"}), 200
+
     
 @api.route('/registro', methods=['POST'])
 def registrar_usuario_unificado():
@@ -244,7 +463,7 @@ def crear_vehiculo():
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         data = request.get_json()
         patente_creada = sistema.crear_vehiculo(data, usuario)
@@ -261,7 +480,7 @@ def actualizar_vehiculo(patente):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         data = request.get_json()
         exito = sistema.actualizar_vehiculo(patente, data, usuario)
@@ -278,7 +497,7 @@ def eliminar_vehiculo(patente):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         exito = sistema.eliminar_vehiculo(patente, usuario)
         
@@ -327,33 +546,101 @@ def listar_vehiculos_libres():
         # Obtener vehículos libres
         vehiculos = sistema.db_manager.get_vehiculos_libres(fecha_inicio, fecha_fin)
 
-        # Debug: Imprimir la cantidad de vehículos encontrados
-        print(f"Vehículos libres encontrados: {len(vehiculos)}")
-        if vehiculos and len(vehiculos) > 0:
-            print("Primer vehículo:", vehiculos[0])
+        logger.debug("Vehículos libres encontrados: %d", len(vehiculos))
 
         return jsonify(vehiculos), 200
 
     except Exception as e:
-        print(f"Error en listar_vehiculos_libres: {str(e)}")
+        logger.error("Error en listar_vehiculos_libres: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+# Calendario de días libres de toda la flota. Cada vehículo se devuelve como
+# un bitmap en base64: el bit d (byte d // 8, bit d % 8, LSB primero) vale 1
+# si el auto está libre el día desde + d.
+@api.route('/vehiculos/calendario', methods=['GET'])
+def calendario_vehiculos():
+    try:
+        dias = request.args.get('dias', default=365, type=int)
+        if dias is None or not 1 <= dias <= 730:
+            return jsonify({"error": "dias debe estar entre 1 y 730"}), 400
+
+        desde_txt = request.args.get('desde')
+        try:
+            desde = date.fromisoformat(desde_txt) if desde_txt else date.today()
+        except ValueError:
+            return jsonify({"error": "desde debe tener formato YYYY-MM-DD"}), 400
+
+        libres = sistema.db_manager.get_calendario_disponibilidad(desde, dias)
+        if libres is None:
+            return jsonify({"error": "Error al armar el calendario"}), 500
+
+        largo = (dias + 7) // 8
+        vehiculos = {
+            patente: base64.b64encode(mascara.to_bytes(largo, 'little')).decode('ascii')
+            for patente, mascara in libres.items()
+        }
+        return jsonify({"desde": desde.isoformat(), "dias": dias, "vehiculos": vehiculos}), 200
+
+    except Exception as e:
+        logger.error("Error en calendario_vehiculos: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+MAX_VENTANAS_DISPONIBILIDAD = 200
+
+# Disponibilidad para varias ventanas de fechas en una sola llamada
+@api.route('/vehiculos/libres/bulk', methods=['POST'])
+def listar_vehiculos_libres_bulk():
+    try:
+        data = request.get_json(silent=True) or {}
+        ventanas = data.get('ventanas')
+
+        if not isinstance(ventanas, list) or not ventanas:
+            return jsonify({"error": "Se requiere 'ventanas': lista de {fecha_inicio, fecha_fin}"}), 400
+        if len(ventanas) > MAX_VENTANAS_DISPONIBILIDAD:
+            return jsonify({"error": f"Máximo {MAX_VENTANAS_DISPONIBILIDAD} ventanas por consulta"}), 400
+
+        try:
+            rangos = [(v['fecha_inicio'], v['fecha_fin']) for v in ventanas]
+        except (KeyError, TypeError):
+            return jsonify({"error": "Cada ventana requiere fecha_inicio y fecha_fin"}), 400
+
+        try:
+            resultado = sistema.db_manager.get_vehiculos_libres_multi(
+                rangos,
+                id_marca=data.get('id_marca'),
+                asientos=data.get('asientos'),
+                caja_manual=data.get('caja_manual'),
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        if resultado is None:
+            return jsonify({"error": "Error al consultar disponibilidad"}), 500
+        return jsonify(resultado), 200
+
+    except Exception as e:
+        logger.error("Error en listar_vehiculos_libres_bulk: %s", e)
         return jsonify({"error": str(e)}), 500
 
 #cambio
 @api.route('/vehiculos', methods=['GET'])
 def listar_vehiculos():
     try:
+        campos = leer_campos(CAMPOS_VEHICULO)
+        if pide_pagina():
+            pagina = sistema.db_manager.get_vehiculos_pagina(**leer_pagina('estado'))
+            return responder_pagina(pagina, campos, contexto="vehículos")
+
         # Obtener todos los vehículos con sus relaciones
         vehiculos = sistema.db_manager.get_all_vehiculos()
 
-        # Debug: Imprimir el primer vehículo para ver su estructura
-        if vehiculos and len(vehiculos) > 0:
-            print("Estructura del primer vehículo:", vehiculos[0])
-
         # Devolver directamente los vehículos ya que ya están en formato diccionario
-        return jsonify(vehiculos), 200
+        return jsonify(proyectar(vehiculos, campos)), 200
 
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        print(f"Error al listar vehículos: {str(e)}")
+        logger.error("Error al listar vehículos: %s", e)
         return jsonify({"error": f"Error al listar vehículos: {str(e)}"}), 500
     
 # --- Endpoints ABMC Clientes ---
@@ -363,7 +650,7 @@ def crear_cliente():
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         data = request.get_json()
         id_creado = sistema.crear_cliente_mostrador(data, usuario)
@@ -375,33 +662,60 @@ def crear_cliente():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def cliente_a_dict(c):
+    return {
+        "id_cliente": c.id_cliente,
+        "id_persona": c.id_persona,
+        "nombre": c.nombre,
+        "apellido": c.apellido,
+        "mail": c.mail,
+        "telefono": c.telefono,
+        "nro_documento": c.nro_documento,
+        "fecha_nacimiento": str(c.fecha_nacimiento),
+        "fecha_alta": str(c.fecha_alta),
+        "tipo_documento": c.tipo_documento.descripcion if c.tipo_documento else None,
+        "id_tipo_documento": c.tipo_documento.id_tipo if c.tipo_documento else None
+    }
+
 @api.route('/clientes', methods=['GET'])
 def listar_clientes():
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
+
+        campos = leer_campos(CAMPOS_CLIENTE)
+        if pide_pagina():
+            pagina = sistema.listar_clientes_pagina(usuario, **leer_pagina())
+            return responder_pagina(pagina, campos, cliente_a_dict, contexto="clientes")
 
         lista = sistema.listar_todos_los_clientes(usuario)
-        respuesta = []
-        
-        for c in lista:
-            respuesta.append({
-                "id_cliente": c.id_cliente,
-                "id_persona": c.id_persona,
-                "nombre": c.nombre,
-                "apellido": c.apellido,
-                "mail": c.mail,
-                "telefono": c.telefono,
-                "nro_documento": c.nro_documento,
-                "fecha_nacimiento": str(c.fecha_nacimiento),
-                "fecha_alta": str(c.fecha_alta),
-                "tipo_documento": c.tipo_documento.descripcion if c.tipo_documento else None,
-                "id_tipo_documento": c.tipo_documento.id_tipo if c.tipo_documento else None
-            })
+        respuesta = [cliente_a_dict(c) for c in lista]
             
-        return jsonify(respuesta), 200
+        return jsonify(proyectar(respuesta, campos)), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Búsqueda mientras se tipea: nombre, apellido, mail, teléfono o documento, por relevancia y paginada.
+# Cada palabra busca por prefijo ('gonz' encuentra 'González'). El orden por relevancia es
+# exacto hasta ALQUILERES_SEARCH_CANDIDATES coincidencias (1000); con más, se ordenan solo
+# esas, puede faltar alguna mejor y la respuesta trae "aproximado": true (hay que afinar).
+@api.route('/clientes/search', methods=['GET'])
+def buscar_clientes():
+    try:
+        usuario = obtener_usuario_actual()
+        if not usuario:
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
+
+        campos = leer_campos(CAMPOS_CLIENTE)
+        pagina = sistema.buscar_clientes(usuario, request.args.get('q', ''), **leer_pagina())
+        return responder_pagina(pagina, campos, cliente_a_dict, contexto="clientes")
 
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -410,7 +724,7 @@ def obtener_cliente_por_id(id_cliente):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         c = sistema.buscar_cliente_por_id(id_cliente, usuario)
         
@@ -440,7 +754,7 @@ def buscar_cliente_por_documento():
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         tipo = request.args.get('tipo')
         nro = request.args.get('nro')
@@ -475,7 +789,7 @@ def actualizar_cliente(id_cliente):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         data = request.get_json()
         exito = sistema.actualizar_datos_cliente(id_cliente, data, usuario)
@@ -492,7 +806,7 @@ def eliminar_cliente(id_cliente):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         exito = sistema.eliminar_cliente(id_cliente, usuario)
         
@@ -513,12 +827,9 @@ def crear_empleado():
         usuario = obtener_usuario_actual()
 
         data = request.get_json()
-        print("### JSON RECIBIDO DEL FRONT ###")
-        print(data)
-
 
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         data = request.get_json()
         id_creado = sistema.crear_empleado_mostrador(data, usuario)
@@ -535,36 +846,60 @@ def crear_empleado():
         return jsonify({"error": str(e)}), 500
 
 
+def empleado_a_dict(e):
+    return {
+        "id_empleado": e["id_empleado"],
+        "id_persona": e["id_persona"],
+        "nombre": e["nombre"],
+        "apellido": e["apellido"],
+        "mail": e["mail"],
+        "telefono": e["telefono"],
+        "nro_documento": e["nro_documento"],
+        "fecha_nacimiento": e["fecha_nacimiento"],
+        "fecha_alta": e["fecha_alta"],
+        "sueldo": e["sueldo"],
+        "tipo_documento": e["tipo_documento"],
+        "id_tipo_documento": None,  # Si no tienes esa info
+        "horario": e["horario"]
+    }
+
 @api.route('/empleados', methods=['GET'])
 def listar_empleados():
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
+
+        campos = leer_campos(CAMPOS_EMPLEADO)
+        if pide_pagina():
+            pagina = sistema.listar_empleados_pagina(usuario, **leer_pagina())
+            return responder_pagina(pagina, campos, empleado_a_dict, contexto="empleados")
 
         lista = sistema.listar_todos_los_empleados(usuario)
-        respuesta = []
+        respuesta = [empleado_a_dict(e) for e in lista]
 
-        for e in lista:
-            respuesta.append({
-                "id_empleado": e["id_empleado"],
-                "id_persona": e["id_persona"],
-                "nombre": e["nombre"],
-                "apellido": e["apellido"],
-                "mail": e["mail"],
-                "telefono": e["telefono"],
-                "nro_documento": e["nro_documento"],
-                "fecha_nacimiento": e["fecha_nacimiento"],
-                "fecha_alta": e["fecha_alta"],
-                "sueldo": e["sueldo"],
-                "tipo_documento": e["tipo_documento"],
-                "id_tipo_documento": None,  # Si no tienes esa info
-                "horario": e["horario"]
-            })
+        return jsonify(proyectar(respuesta, campos)), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
 
-        return jsonify(respuesta), 200
+# Como /clientes/search (mismo tope y marca "aproximado"), sobre los empleados
+@api.route('/empleados/search', methods=['GET'])
+def buscar_empleados():
+    try:
+        usuario = obtener_usuario_actual()
+        if not usuario:
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
+        campos = leer_campos(CAMPOS_EMPLEADO)
+        pagina = sistema.buscar_empleados(usuario, request.args.get('q', ''), **leer_pagina())
+        return responder_pagina(pagina, campos, empleado_a_dict, contexto="empleados")
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -574,7 +909,7 @@ def obtener_empleado_por_id(id_empleado):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         e = sistema.buscar_empleado_por_id(id_empleado, usuario)
 
@@ -606,7 +941,7 @@ def buscar_empleado_por_documento():
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         tipo = request.args.get('tipo')
         nro = request.args.get('nro')
@@ -643,7 +978,7 @@ def actualizar_empleado(id_empleado):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         data = request.get_json()
         exito = sistema.actualizar_datos_empleado(id_empleado, data, usuario)
@@ -662,7 +997,7 @@ def eliminar_empleado(id_empleado):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         exito = sistema.eliminar_empleado(id_empleado, usuario)
 
@@ -681,14 +1016,12 @@ def crear_alquiler():
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         data = request.get_json()
-        print(data)
         # Si viene userId, buscar el id_cliente correspondiente
         id_cliente = data.get('id_cliente')
         if not id_cliente and data.get('userId'):
-            print("Hola")
             id_cliente = sistema.get_cliente_por_usuario(data.get('userId'))
             if not id_cliente:
                 return jsonify({"error": "No se encontró el cliente asociado al usuario"}), 400
@@ -714,12 +1047,58 @@ def crear_alquiler():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+MAX_ALQUILERES_BULK = 200
+
+# Reservas de flota: varios alquileres en una sola transacción, con resultado por ítem
+@api.route('/alquileres/bulk', methods=['POST'])
+def crear_alquileres_bulk():
+    try:
+        usuario = obtener_usuario_actual()
+        if not usuario:
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
+
+        data = request.get_json(silent=True) or {}
+        alquileres = data.get('alquileres')
+
+        if not isinstance(alquileres, list) or not alquileres:
+            return jsonify({"error": "Se requiere 'alquileres': lista de {patente, fecha_inicio, fecha_fin}"}), 400
+        if len(alquileres) > MAX_ALQUILERES_BULK:
+            return jsonify({"error": f"Máximo {MAX_ALQUILERES_BULK} alquileres por pedido"}), 400
+        if not all(isinstance(item, dict) for item in alquileres):
+            return jsonify({"error": "Cada alquiler debe ser un objeto"}), 400
+
+        # id_cliente / id_empleado del cuerpo valen para todos los ítems que no traigan el propio
+        id_cliente = data.get('id_cliente')
+        if not id_cliente and data.get('userId'):
+            id_cliente = sistema.get_cliente_por_usuario(data.get('userId'))
+            if not id_cliente:
+                return jsonify({"error": "No se encontró el cliente asociado al usuario"}), 400
+        items = [{**item,
+                  'id_cliente': item.get('id_cliente') or id_cliente,
+                  'id_empleado': item.get('id_empleado') or data.get('id_empleado')}
+                 for item in alquileres]
+
+        resultados = sistema.crear_alquileres_bulk(items, usuario)
+        if resultados is None:
+            return jsonify({"error": "No se pudieron crear los alquileres"}), 500
+
+        creados = sum(1 for r in resultados if r['ok'])
+        cuerpo = {"creados": creados, "fallidos": len(resultados) - creados, "resultados": resultados}
+        if creados == len(resultados):
+            return jsonify(cuerpo), 201
+        # 207: algunos se crearon y otros no; el detalle está en cada resultado
+        return jsonify(cuerpo), 207 if creados else 400
+
+    except Exception as e:
+        logger.error("Error en crear_alquileres_bulk: %s", e)
+        return jsonify({"error": str(e)}), 500
+
 @api.route('/alquileres/<id_alquiler>/comenzar', methods=['POST'])
 def comenzar_alquiler(id_alquiler):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         exito = sistema.comenzar_alquiler(id_alquiler, usuario)
         
@@ -735,7 +1114,7 @@ def cancelar_alquiler(id_alquiler):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         try:
             exito = sistema.cancelar_alquiler(id_alquiler, usuario)
@@ -754,7 +1133,7 @@ def finalizar_alquiler(id_alquiler):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         exito = sistema.finalizar_alquiler(id_alquiler, usuario)
         
@@ -770,7 +1149,7 @@ def marcar_alquiler_atrasado(id_alquiler):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         exito = sistema.marcar_alquiler_como_atrasado(id_alquiler, usuario)
         
@@ -786,12 +1165,39 @@ def listar_alquileres():
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
+
+        campos = leer_campos(CAMPOS_ALQUILER)
+        if pide_pagina():
+            filtros = leer_pagina('estado', 'desde', 'hasta', 'patente')
+            pagina = sistema.consultar_alquileres_pagina(usuario, **filtros)
+            return responder_pagina(pagina, campos, contexto="alquileres")
 
         # Usar el nuevo método que filtra según el rol
         lista = sistema.consultar_alquileres_usuario(usuario)
-        return jsonify(lista), 200
+        return jsonify(proyectar(lista, campos)), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/alquileres/export', methods=['GET'])
+def exportar_alquileres():
+    try:
+        usuario = obtener_usuario_actual()
+        if not usuario:
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
+
+        campos = leer_campos(CAMPOS_ALQUILER)
+        formato = leer_formato()
+        filas = sistema.exportar_alquileres(usuario, **leer_filtros('estado', 'desde', 'hasta', 'patente'))
+        if filas is None:
+            return jsonify({"error": "Permisos insuficientes"}), 403
+        return responder_stream(filas, formato, campos)
 
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -800,7 +1206,7 @@ def obtener_alquiler_por_id(id_alquiler):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         alquiler = sistema.consultar_alquiler_por_id(id_alquiler, usuario)
         
@@ -818,7 +1224,7 @@ def eliminar_alquiler(id_alquiler):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         exito = sistema.eliminar_alquiler(id_alquiler, usuario)
         
@@ -836,10 +1242,9 @@ def crear_danio(id_alquiler):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         data = request.get_json()
-        print(data)
         costo = data.get('costo')
         detalle = data.get('detalle')
 
@@ -860,7 +1265,7 @@ def eliminar_danio(id_danio):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         exito = sistema.eliminar_danio(id_danio, usuario)
         
@@ -876,7 +1281,7 @@ def listar_danios_alquiler(id_alquiler):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         lista = sistema.consultar_danios_alquiler(id_alquiler, usuario)
         return jsonify(lista), 200
@@ -891,7 +1296,7 @@ def crear_multa(id_alquiler):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         data = request.get_json()
         costo = data.get('costo')
@@ -915,7 +1320,7 @@ def eliminar_multa(id_multa):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         exito = sistema.eliminar_multa(id_multa, usuario)
         
@@ -931,7 +1336,7 @@ def listar_multas_alquiler(id_alquiler):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         lista = sistema.consultar_multas_alquiler(id_alquiler, usuario)
         return jsonify(lista), 200
@@ -944,10 +1349,37 @@ def listar_mantenimientos():
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
+
+        campos = leer_campos(CAMPOS_MANTENIMIENTO)
+        if pide_pagina():
+            filtros = leer_pagina('estado', 'desde', 'hasta', 'patente')
+            pagina = sistema.listar_mantenimientos_pagina(usuario, **filtros)
+            return responder_pagina(pagina, campos, contexto="mantenimientos")
 
         lista = sistema.listar_todos_mantenimientos(usuario)
-        return jsonify(lista), 200
+        return jsonify(proyectar(lista, campos)), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/mantenimientos/export', methods=['GET'])
+def exportar_mantenimientos():
+    try:
+        usuario = obtener_usuario_actual()
+        if not usuario:
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
+
+        campos = leer_campos(CAMPOS_MANTENIMIENTO)
+        formato = leer_formato()
+        filas = sistema.exportar_mantenimientos(usuario, **leer_filtros('estado', 'desde', 'hasta', 'patente'))
+        if filas is None:
+            return jsonify({"error": "Permisos insuficientes"}), 403
+        return responder_stream(filas, formato, campos)
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -956,7 +1388,7 @@ def obtener_mantenimiento(id_mantenimiento):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         mant = sistema.consultar_mantenimiento_por_id(id_mantenimiento, usuario)
         if mant:
@@ -970,7 +1402,7 @@ def programar_mantenimiento():
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         data = request.get_json()
         patente = data.get('patente')
@@ -992,7 +1424,7 @@ def iniciar_mantenimiento(id_mantenimiento):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         if sistema.iniciar_mantenimiento(id_mantenimiento, usuario):
             return jsonify({"mensaje": "Mantenimiento iniciado"}), 200
@@ -1005,7 +1437,7 @@ def finalizar_mantenimiento(id_mantenimiento):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         if sistema.finalizar_mantenimiento(id_mantenimiento, usuario):
             return jsonify({"mensaje": "Mantenimiento finalizado"}), 200
@@ -1018,7 +1450,7 @@ def cancelar_mantenimiento(id_mantenimiento):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         if sistema.cancelar_mantenimiento(id_mantenimiento, usuario):
             return jsonify({"mensaje": "Mantenimiento cancelado"}), 200
@@ -1031,7 +1463,7 @@ def eliminar_mantenimiento(id_mantenimiento):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         if sistema.eliminar_mantenimiento(id_mantenimiento, usuario):
             return jsonify({"mensaje": "Mantenimiento eliminado"}), 200
@@ -1048,8 +1480,13 @@ def reporte_cliente(id_cliente):
         if not usuario:
             return jsonify({"error": "No autorizado"}), 401
 
-        data = sistema.reporte_alquileres_cliente(id_cliente, usuario)
-        return jsonify(data), 200
+        formato = leer_formato()
+        filas = sistema.exportar_reporte_alquileres_cliente(id_cliente, usuario)
+        if filas is None:
+            return jsonify([]), 200
+        return responder_stream(filas, formato)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -1093,12 +1530,17 @@ def reporte_facturacion():
         f_desde = request.args.get('fecha_desde', '2000-01-01')
         f_hasta = request.args.get('fecha_hasta', '2100-01-01')
 
-        data = sistema.reporte_facturacion_mensual(f_desde, f_hasta, usuario)
+        # mensual (por defecto), trimestral o anual
+        agrupacion = request.args.get('agrupacion', 'mensual')
+
+        data = sistema.reporte_facturacion_mensual(f_desde, f_hasta, usuario, agrupacion)
         
         if data is None:
             return jsonify({"error": "Permisos insuficientes"}), 403
             
         return jsonify(data), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
@@ -1165,14 +1607,18 @@ def generar_pdf_facturacion_mensual():
         fecha_desde = request.args.get('fecha_desde', '2000-01-01')
         fecha_hasta = request.args.get('fecha_hasta', '2100-01-01')
 
+        agrupacion = request.args.get('agrupacion', 'mensual')
+
         # Reutilizamos la función existente
-        data = sistema.reporte_facturacion_mensual(fecha_desde, fecha_hasta, usuario)
+        data = sistema.reporte_facturacion_mensual(fecha_desde, fecha_hasta, usuario, agrupacion)
         
         if data is None:
             return jsonify({"error": "Permisos insuficientes"}), 403
             
         return jsonify(data), 200
 
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -1187,10 +1633,76 @@ def generar_pdf_detalle_clientes_completo():
         fecha_desde = request.args.get('fecha_desde', '2000-01-01')
         fecha_hasta = request.args.get('fecha_hasta', '2100-01-01')
 
-        # Esta función debería devolver los datos estructurados con alquileres individuales
-        data = sistema.reporte_detalle_clientes_completo_pdf(fecha_desde, fecha_hasta, usuario)
-        return jsonify(data), 200
+        # Un cliente por vez, con sus alquileres individuales
+        formato = leer_formato()
+        filas = sistema.exportar_reporte_detalle_clientes_completo(fecha_desde, fecha_hasta, usuario)
+        if filas is None:
+            return jsonify([]), 200
+        return responder_stream(filas, formato)
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# --- PDFs generados en el servidor (trabajos en segundo plano) ---
+
+def respuesta_trabajo_pdf(trabajo):
+    trabajo = dict(trabajo, url=f"/api/reportes/jobs/{trabajo['id']}/pdf")
+    return jsonify(trabajo)
+
+@api.route('/reportes/jobs', methods=['POST'])
+def crear_trabajo_pdf():
+    try:
+        usuario = obtener_usuario_actual()
+        if not usuario:
+            return jsonify({"error": "No autorizado"}), 401
+
+        data = request.get_json(silent=True) or {}
+        trabajo = sistema.solicitar_reporte_pdf(data.get('reporte'), data.get('parametros'), usuario)
+        if trabajo is None:
+            return jsonify({"error": "Permisos insuficientes"}), 403
+
+        # 200 si el PDF ya estaba generado con los mismos datos, 202 si quedó en cola
+        return respuesta_trabajo_pdf(trabajo), 200 if trabajo['estado'] == 'listo' else 202
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/reportes/jobs/<id_trabajo>', methods=['GET'])
+def consultar_trabajo_pdf(id_trabajo):
+    try:
+        usuario = obtener_usuario_actual()
+        if not usuario:
+            return jsonify({"error": "No autorizado"}), 401
+
+        trabajo = sistema.consultar_reporte_pdf(id_trabajo, usuario)
+        if trabajo is None:
+            return jsonify({"error": "Trabajo no encontrado"}), 404
+        return respuesta_trabajo_pdf(trabajo), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/reportes/jobs/<id_trabajo>/pdf', methods=['GET'])
+def descargar_trabajo_pdf(id_trabajo):
+    try:
+        usuario = obtener_usuario_actual()
+        if not usuario:
+            return jsonify({"error": "No autorizado"}), 401
+
+        trabajo = sistema.consultar_reporte_pdf(id_trabajo, usuario)
+        if trabajo is None:
+            return jsonify({"error": "Trabajo no encontrado"}), 404
+
+        ruta = sistema.trabajos_pdf.ruta(id_trabajo)
+        if ruta is None:
+            return jsonify({"error": "El PDF todavía no está listo", "estado": trabajo['estado'],
+                            "detalle": trabajo['error']}), 409
 
+        # send_file lo manda de a bloques desde el disco
+        return send_file(ruta, mimetype='application/pdf', as_attachment=True,
+                         download_name=f"{trabajo['reporte']}.pdf", max_age=0)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -1201,7 +1713,7 @@ def obtener_estadisticas_dashboard():
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         estadisticas = sistema.obtener_estadisticas_dashboard(usuario)
         return jsonify(estadisticas), 200
@@ -1214,7 +1726,7 @@ def obtener_ultimo_alquiler():
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         # Solo disponible para clientes
         if not sistema.check_permission("Cliente", usuario):
@@ -1234,7 +1746,7 @@ def verificar_vehiculo_disponible(patente):
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         disponible = sistema.verificar_disponibilidad_vehiculo(patente)
         return jsonify({"disponible": disponible}), 200
@@ -1275,7 +1787,7 @@ def obtener_mi_perfil():
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         # Obtener los datos de la persona asociada al usuario
         persona_data = sistema.obtener_persona_por_usuario(usuario.id_usuario)
@@ -1293,7 +1805,7 @@ def actualizar_mi_perfil():
     try:
         usuario = obtener_usuario_actual()
         if not usuario:
-            return jsonify({"error": "No autorizado. Falta header user-id"}), 401
+            return jsonify({"error": "No autorizado. Falta el token de sesión"}), 401
 
         data = request.get_json()
         
@@ -1321,5 +1833,5 @@ def actualizar_mi_perfil():
 app.register_blueprint(api, url_prefix='/api')
 
 if __name__ == '__main__':
-    print("Iniciando servidor Flask en http://localhost:5000")
+    logger.info("Iniciando servidor Flask en http://localhost:5000")
     app.run(debug=True, port=5000)
\ No newline at end of file
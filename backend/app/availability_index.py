@@ -0,0 +1,249 @@
+import threading
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+from fechas import normalizar_fecha
+from log_config import obtener_logger
+
+logger = obtener_logger('availability_index')
+
+# Estados que ocupan un vehículo en el calendario
+ESTADOS_ALQUILER_BLOQUEANTES = (1, 2, 3)        # Reservado, Activo, Atrasado
+ESTADOS_MANTENIMIENTO_BLOQUEANTES = (1, 3)      # Realizando, Pendiente
+
+# Predicado canónico de superposición entre [fecha_inicio, fecha_fin) y el
+# rango pedido [:inicio, :fin). Intervalos semiabiertos: un alquiler que
+# termina justo cuando empieza otro NO se superpone.
+SQL_SUPERPOSICION = "(fecha_inicio < :fin AND fecha_fin > :inicio)"
+
+# Patentes anotadas por los triggers de la migración 010 después de `seq`
+SQL_CAMBIOS = "SELECT seq, patente FROM CambioOcupacion WHERE seq > ? ORDER BY seq"
+# Con más patentes cambiadas que esto conviene recargar todo de una vez
+MAX_RECARGAS_PARCIALES = 200
+
+
+def se_superponen(inicio_a, fin_a, inicio_b, fin_b):
+    """Misma regla que SQL_SUPERPOSICION, para usar en Python."""
+    return inicio_a < fin_b and fin_a > inicio_b
+
+
+class _IntervalosPatente:
+    """
+    Intervalos ocupados de un vehículo, ordenados por inicio.
+
+    `_max_fin[i]` es el mayor fin entre los intervalos 0..i. Para saber si
+    [inicio, fin) choca con algo alcanza con una búsqueda binaria: entre los
+    intervalos que empiezan antes de `fin`, ¿alguno termina después de `inicio`?
+    """
+
+    __slots__ = ('_items', '_inicios', '_max_fin')
+
+    def __init__(self):
+        self._items = []        # (inicio, fin, clave)
+        self._inicios = []
+        self._max_fin = []
+
+    def __len__(self):
+        return len(self._items)
+
+    def _reindexar(self):
+        self._inicios = [i[0] for i in self._items]
+        self._max_fin = []
+        maximo = None
+        for _, fin, _ in self._items:
+            if maximo is None or fin > maximo:
+                maximo = fin
+            self._max_fin.append(maximo)
+
+    def cargar(self, items):
+        self._items = sorted(items)
+        self._reindexar()
+
+    def ocupado(self, inicio, fin):
+        pos = bisect_left(self._inicios, fin)
+        return pos > 0 and self._max_fin[pos - 1] > inicio
+
+    def intervalos(self):
+        return [(i[0], i[1]) for i in self._items]
+
+
+class AvailabilityIndex:
+    """
+    Índice en memoria de ocupación por patente (alquileres y mantenimientos
+    en estados bloqueantes). Responde "¿qué patentes están ocupadas en
+    [inicio, fin)?" con una búsqueda binaria por vehículo, sin recorrer
+    todos los alquileres.
+
+    Es un cache de la base: antes de responder, `sincronizar` aplica los
+    cambios que cualquier conexión (otro proceso, el planificador, un
+    sqlite3 suelto) anotó en CambioOcupacion.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._por_patente = {}
+        # Calendarios ya calculados: patente -> (desde, dias, máscara de ocupación)
+        self._mascaras = {}
+        self.cargado = False
+        # Última anotación de CambioOcupacion ya aplicada
+        self.secuencia = 0
+
+    @staticmethod
+    def _sql_patente(filtro):
+        estados_a = ', '.join(str(e) for e in ESTADOS_ALQUILER_BLOQUEANTES)
+        estados_m = ', '.join(str(e) for e in ESTADOS_MANTENIMIENTO_BLOQUEANTES)
+        return f"""
+            SELECT 'A' AS tipo, id_alquiler AS id, patente, fecha_inicio, fecha_fin
+            FROM Alquiler WHERE id_estado IN ({estados_a}) {filtro}
+            UNION ALL
+            SELECT 'M' AS tipo, id_mantenimiento AS id, patente, fecha_inicio, fecha_fin
+            FROM Mantenimiento WHERE id_estado IN ({estados_m}) {filtro}
+        """
+
+    @staticmethod
+    def _armar(rows):
+        items = {}
+        for row in rows:
+            try:
+                inicio = normalizar_fecha(row['fecha_inicio'])
+                fin = normalizar_fecha(row['fecha_fin'])
+            except (TypeError, ValueError):
+                logger.warning("Fecha inválida en %s%s, se ignora en el índice.", row['tipo'], row['id'])
+                continue
+            items.setdefault(row['patente'], []).append((inicio, fin, (row['tipo'], row['id'])))
+
+        por_patente = {}
+        for patente, lista in items.items():
+            por_patente[patente] = _IntervalosPatente()
+            por_patente[patente].cargar(lista)
+        return por_patente
+
+    def cargar(self, conn):
+        """Reconstruye el índice completo desde la base."""
+        # Se lee con el lock tomado: un recargar_patente concurrente espera
+        # y se aplica sobre esta carga, nunca antes de ella
+        with self._lock:
+            # La secuencia se lee antes: lo que cambie durante la carga se vuelve a aplicar
+            secuencia = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM CambioOcupacion").fetchone()[0]
+            rows = conn.execute(self._sql_patente('')).fetchall()
+            self._por_patente = self._armar(rows)
+            self._mascaras = {}
+            self.secuencia = secuencia
+            self.cargado = True
+
+    def sincronizar(self, conn):
+        """
+        Carga el índice o aplica los cambios anotados desde la última lectura,
+        releyendo solo las patentes tocadas. Si faltan anotaciones (ya se
+        descartaron) o son demasiadas, recarga todo.
+        """
+        with self._lock:
+            if not self.cargado:
+                self.cargar(conn)
+                return
+            if conn.in_transaction:
+                # Cambios propios sin confirmar: se aplican después del commit
+                return
+            cambios = conn.execute(SQL_CAMBIOS, (self.secuencia,)).fetchall()
+            if not cambios:
+                return
+            patentes = {cambio[1] for cambio in cambios}
+            if cambios[0][0] > self.secuencia + 1 or len(patentes) > MAX_RECARGAS_PARCIALES:
+                self.cargar(conn)
+                return
+            for patente in patentes:
+                self.recargar_patente(conn, patente)
+            self.secuencia = cambios[-1][0]
+
+    def recargar_patente(self, conn, patente):
+        """Vuelve a leer los intervalos de un vehículo (tras un cambio de estado)."""
+        with self._lock:
+            if not self.cargado:
+                return
+            rows = conn.execute(
+                self._sql_patente('AND patente = :patente'), {'patente': patente}
+            ).fetchall()
+            self._mascaras.pop(patente, None)
+            nuevos = self._armar(rows).get(patente)
+            if nuevos:
+                self._por_patente[patente] = nuevos
+            else:
+                self._por_patente.pop(patente, None)
+
+    def invalidar(self):
+        with self._lock:
+            self._por_patente = {}
+            self._mascaras = {}
+            self.cargado = False
+
+    def esta_libre(self, patente, inicio, fin):
+        inicio, fin = normalizar_fecha(inicio), normalizar_fecha(fin)
+        with self._lock:
+            intervalos = self._por_patente.get(patente)
+            return intervalos is None or not intervalos.ocupado(inicio, fin)
+
+    def patentes_ocupadas(self, inicio, fin):
+        inicio, fin = normalizar_fecha(inicio), normalizar_fecha(fin)
+        with self._lock:
+            return {
+                patente for patente, intervalos in self._por_patente.items()
+                if intervalos.ocupado(inicio, fin)
+            }
+
+    def patentes_ocupadas_multi(self, ventanas):
+        """
+        Igual que patentes_ocupadas pero para varias ventanas [(inicio, fin), ...]
+        en una sola pasada por los vehículos. Devuelve un set por ventana.
+        """
+        normalizadas = [(normalizar_fecha(i), normalizar_fecha(f)) for i, f in ventanas]
+        resultado = [set() for _ in normalizadas]
+        with self._lock:
+            for patente, intervalos in self._por_patente.items():
+                for pos, (inicio, fin) in enumerate(normalizadas):
+                    if intervalos.ocupado(inicio, fin):
+                        resultado[pos].add(patente)
+        return resultado
+
+    @staticmethod
+    def _mascara_ocupacion(intervalos, desde, dias):
+        # Bit d encendido = el vehículo está ocupado en algún momento del día desde + d
+        inicio_ventana = datetime(desde.year, desde.month, desde.day)
+        fin_ventana = normalizar_fecha(inicio_ventana + timedelta(days=dias))
+        inicio_txt = normalizar_fecha(inicio_ventana)
+
+        mascara = 0
+        for inicio, fin in intervalos.intervalos():
+            if inicio >= fin_ventana:
+                break
+            if fin <= inicio_txt:
+                continue
+            primer_dia = max((datetime.fromisoformat(inicio) - inicio_ventana).days, 0)
+            # fin es exclusivo: un alquiler que termina a las 00:00 no ocupa ese día
+            fin_dt = datetime.fromisoformat(fin) - inicio_ventana
+            ultimo_dia = min(fin_dt.days + (1 if fin_dt.seconds or fin_dt.microseconds else 0), dias)
+            if ultimo_dia > primer_dia:
+                mascara |= ((1 << (ultimo_dia - primer_dia)) - 1) << primer_dia
+        return mascara
+
+    def calendario(self, patentes, desde, dias):
+        """
+        Máscara de días ocupados por patente para [desde, desde + dias).
+        Se cachea por vehículo y se descarta cuando cambian sus intervalos.
+        """
+        resultado = {}
+        with self._lock:
+            for patente in patentes:
+                cacheado = self._mascaras.get(patente)
+                if cacheado and cacheado[0] == desde and cacheado[1] == dias:
+                    resultado[patente] = cacheado[2]
+                    continue
+                intervalos = self._por_patente.get(patente)
+                mascara = self._mascara_ocupacion(intervalos, desde, dias) if intervalos else 0
+                self._mascaras[patente] = (desde, dias, mascara)
+                resultado[patente] = mascara
+        return resultado
+
+    def intervalos(self, patente):
+        with self._lock:
+            intervalos = self._por_patente.get(patente)
+            return intervalos.intervalos() if intervalos else []
@@ -0,0 +1,73 @@
+import hashlib
+import json
+import threading
+
+
+class CatalogCache:
+    """
+    Cache en memoria de las tablas de catálogo (Marca, Color, estados,
+    Permiso, Documento). Son chicas y casi estáticas: se leen una vez y se
+    sirven desde memoria hasta que alguien llame a invalidate().
+
+    - `tablas`: {tabla: columna_id}
+    - `cargar(tabla)`: devuelve la lista de filas (dicts) o None si falló;
+      en ese caso no se cachea y se reintenta en la próxima consulta.
+    """
+
+    def __init__(self, cargar, tablas):
+        self._cargar = cargar
+        self.tablas = dict(tablas)
+        self._lock = threading.Lock()
+        self._filas = {}        # tabla -> lista de dicts
+        self._por_id = {}       # tabla -> {id: dict}
+        self._etags = {}        # tabla -> hash del contenido
+        self.version = 0
+
+    def _asegurar(self, tabla):
+        """(filas, por_id, etag) de la tabla, leídos juntos bajo el lock; None si no se pudo cargar."""
+        with self._lock:
+            if tabla in self._filas:
+                return self._filas[tabla], self._por_id[tabla], self._etags[tabla]
+            version = self.version
+        filas = self._cargar(tabla)
+        if filas is None:
+            return None
+        columna_id = self.tablas[tabla]
+        contenido = json.dumps(filas, sort_keys=True, default=str).encode('utf-8')
+        cargado = (filas, {fila[columna_id]: fila for fila in filas}, hashlib.sha1(contenido).hexdigest())
+        with self._lock:
+            # Si hubo un invalidate() durante la carga, lo leído puede ser viejo: se usa pero no se guarda
+            if self.version == version:
+                self._filas[tabla], self._por_id[tabla], self._etags[tabla] = cargado
+        return cargado
+
+    def precargar(self):
+        for tabla in self.tablas:
+            self._asegurar(tabla)
+
+    def all(self, tabla):
+        cargado = self._asegurar(tabla)
+        return cargado[0] if cargado else None
+
+    def get(self, tabla, valor):
+        cargado = self._asegurar(tabla)
+        if not cargado:
+            return None
+        try:
+            valor = int(valor)
+        except (TypeError, ValueError):
+            return None
+        return cargado[1].get(valor)
+
+    def etag(self, tabla):
+        """ETag fuerte: cambia solo si cambia el contenido de la tabla."""
+        cargado = self._asegurar(tabla)
+        return cargado[2] if cargado else None
+
+    def invalidate(self, tabla=None):
+        with self._lock:
+            for t in ([tabla] if tabla else list(self._filas)):
+                self._filas.pop(t, None)
+                self._por_id.pop(t, None)
+                self._etags.pop(t, None)
+            self.version += 1
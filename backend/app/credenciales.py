@@ -0,0 +1,159 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+# ============================================================
+# HASH Y VERIFICACIÓN DE CONTRASEÑAS
+# ============================================================
+# En Usuario.password se guarda '<algoritmo>$<costo>$<sal>$<hash>' (sal y
+# hash en base64). Cada algoritmo es una función de derivación con sal y costo
+# configurable; el costo viaja con el hash, así que subirlo no rompe los
+# hashes viejos: se verifican con su costo y se rehashean en el próximo login.
+# Las filas anteriores tienen SHA-256 hex sin sal: se aceptan y se pasan al
+# algoritmo actual en el login. Las de texto plano las reescribe una migración.
+
+# ALQUILERES_KDF: 'pbkdf2_sha256' (por defecto) o 'scrypt'.
+# ALQUILERES_KDF_COST: iteraciones de PBKDF2 o log2(N) de scrypt.
+KDF = os.environ.get('ALQUILERES_KDF', 'pbkdf2_sha256')
+COSTOS_DEFAULT = {'pbkdf2_sha256': 600_000, 'scrypt': 15}
+KDF_COST = int(os.environ.get('ALQUILERES_KDF_COST', COSTOS_DEFAULT.get(KDF, 0)))
+
+# Logins verificados que se recuerdan (segundos; 0 lo apaga) y cuántos como máximo
+LOGIN_CACHE_TTL = float(os.environ.get('ALQUILERES_LOGIN_CACHE_TTL', 300))
+LOGIN_CACHE_SIZE = int(os.environ.get('ALQUILERES_LOGIN_CACHE_SIZE', 10000))
+
+LARGO_SAL = 16
+SCRYPT_R, SCRYPT_P = 8, 1
+
+
+def _pbkdf2_sha256(password, sal, costo):
+    return hashlib.pbkdf2_hmac('sha256', password, sal, costo)
+
+
+def _scrypt(password, sal, costo):
+    n = 2 ** costo
+    return hashlib.scrypt(password, salt=sal, n=n, r=SCRYPT_R, p=SCRYPT_P,
+                          maxmem=256 * n * SCRYPT_R + 1024 * 1024, dklen=32)
+
+
+# Nombre -> derivación(password: bytes, sal: bytes, costo: int) -> bytes
+ALGORITMOS = {
+    'pbkdf2_sha256': _pbkdf2_sha256,
+    'scrypt': _scrypt,
+}
+
+if KDF not in ALGORITMOS:
+    raise ValueError(f"ALQUILERES_KDF inválido: {KDF}. Use uno de: {', '.join(ALGORITMOS)}")
+
+
+def _b64(datos):
+    return base64.b64encode(datos).decode('ascii').rstrip('=')
+
+
+def _desde_b64(texto):
+    return base64.b64decode(texto + '=' * (-len(texto) % 4))
+
+
+def hashear(password, algoritmo=None, costo=None, sal=None):
+    """Hash con sal nueva, listo para guardar en Usuario.password. (`sal` fija: solo para datos generados.)"""
+    algoritmo = algoritmo or KDF
+    costo = costo or (KDF_COST if algoritmo == KDF else COSTOS_DEFAULT[algoritmo])
+    sal = sal or secrets.token_bytes(LARGO_SAL)
+    derivado = ALGORITMOS[algoritmo](password.encode('utf-8'), sal, costo)
+    return f"{algoritmo}${costo}${_b64(sal)}${_b64(derivado)}"
+
+
+def verificar(password, guardado):
+    """
+    Compara `password` con lo guardado. Devuelve (ok, rehashear): rehashear es
+    True si el hash es de un formato o costo viejo y conviene reemplazarlo.
+    """
+    if not guardado or password is None:
+        return False, False
+    partes = guardado.split('$')
+    if len(partes) == 4 and partes[0] in ALGORITMOS:
+        algoritmo, costo, sal, esperado = partes
+        try:
+            derivado = ALGORITMOS[algoritmo](password.encode('utf-8'), _desde_b64(sal), int(costo))
+            ok = hmac.compare_digest(derivado, _desde_b64(esperado))
+        except (ValueError, TypeError):
+            return False, False
+        return ok, ok and (algoritmo != KDF or int(costo) != KDF_COST)
+    # Formato viejo: SHA-256 hex sin sal. Se compara solo como hash; cualquier
+    # otra cosa no es un formato conocido y no deja entrar.
+    if not _es_sha256_hex(guardado):
+        return False, False
+    sha = hashlib.sha256(password.encode('utf-8')).hexdigest()
+    ok = hmac.compare_digest(sha, guardado.lower())
+    return ok, ok
+
+
+def es_hash(guardado):
+    """True si `guardado` tiene un formato que verificar() reconoce."""
+    if not guardado:
+        return False
+    partes = guardado.split('$')
+    return (len(partes) == 4 and partes[0] in ALGORITMOS) or _es_sha256_hex(guardado)
+
+
+def _es_sha256_hex(texto):
+    return len(texto) == 64 and all(c in '0123456789abcdefABCDEF' for c in texto)
+
+
+class CacheVerificaciones:
+    """
+    Recuerda por un rato los logins que ya pasaron la derivación, para que
+    el mismo usuario con la misma contraseña no la pague en cada login.
+
+    No guarda contraseñas: la clave es un HMAC con un secreto del proceso
+    sobre (usuario, hash guardado, contraseña), así que cambiar la contraseña
+    deja afuera lo recordado sin invalidar nada. Es un atajo para el camino
+    feliz: los intentos fallidos siempre pagan la derivación completa.
+    """
+
+    def __init__(self, max_size=LOGIN_CACHE_SIZE, ttl=LOGIN_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._secreto = secrets.token_bytes(32)
+        self._lock = threading.Lock()
+        self._items = OrderedDict()     # clave -> vence
+        self.hits = 0
+        self.misses = 0
+
+    def _clave(self, id_usuario, guardado, password):
+        mensaje = f"{id_usuario}\0{guardado}\0{password}".encode('utf-8')
+        return hmac.new(self._secreto, mensaje, hashlib.sha256).digest()
+
+    def contiene(self, id_usuario, guardado, password):
+        if self.ttl <= 0:
+            return False
+        clave = self._clave(id_usuario, guardado, password)
+        with self._lock:
+            vence = self._items.get(clave)
+            if vence is None or vence < time.monotonic():
+                if vence is not None:
+                    del self._items[clave]
+                self.misses += 1
+                return False
+            self._items.move_to_end(clave)
+            self.hits += 1
+            return True
+
+    def agregar(self, id_usuario, guardado, password):
+        if self.ttl <= 0:
+            return
+        clave = self._clave(id_usuario, guardado, password)
+        with self._lock:
+            self._items[clave] = time.monotonic() + self.ttl
+            self._items.move_to_end(clave)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._items), "hits": self.hits, "misses": self.misses}
@@ -1,6 +1,10 @@
 from datetime import date, datetime, timedelta
+import json
+import random
+import re
 import sqlite3
 import os
+import time
 from models.cliente import Cliente
 from models.vehiculo import Vehiculo
 from models.documento import Documento
@@ -18,7 +22,22 @@ from models.alquiler import Alquiler
 from models.danio import Danio
 from models.multa import Multa
 from models.mantenimiento import Mantenimiento
+from db_pool import ConnectionPool, apply_storage_profile, base_ocupada
+import metrics
+from migrations import ERROR_ALQUILER_SUPERPUESTO, aplicar_migraciones
+from session_cache import UserCache
+from catalog_cache import CatalogCache
+from paginacion import LIMITE_DEFAULT, codificar_cursor, decodificar_cursor
+from report_cache import ReportCache, cacheado
+from availability_index import (
+    AvailabilityIndex, SQL_SUPERPOSICION,
+    ESTADOS_ALQUILER_BLOQUEANTES, ESTADOS_MANTENIMIENTO_BLOQUEANTES,
+)
+from fechas import normalizar_fecha, parsear_fecha
+import report_engine
+from log_config import obtener_logger
 
+logger = obtener_logger('db_manager')
 
 
 
@@ -27,6 +46,90 @@ APP_DIR = os.path.dirname(os.path.abspath(__file__))
 BACKEND_DIR = os.path.dirname(APP_DIR)
 DB_PATH = os.path.join(BACKEND_DIR, 'db', 'alquileres.db')
 
+# Filas por fetchmany en los listados en streaming
+TAMANIO_LOTE = 500
+
+# Pool de conexiones (configurable por entorno)
+POOL_SIZE = int(os.environ.get('ALQUILERES_DB_POOL_SIZE', 5))
+POOL_TIMEOUT = float(os.environ.get('ALQUILERES_DB_POOL_TIMEOUT', 10))
+# Reintentos de una escritura si otro proceso tiene la base tomada más allá del
+# timeout (espera inicial en ms; se duplica en cada intento)
+BUSY_RETRIES = int(os.environ.get('ALQUILERES_DB_BUSY_RETRIES', 3))
+BUSY_BACKOFF_MS = float(os.environ.get('ALQUILERES_DB_BUSY_BACKOFF_MS', 50))
+# Perfil de almacenamiento (ver db_pool.STORAGE_PROFILES)
+STORAGE_PROFILE = os.environ.get('ALQUILERES_DB_PROFILE', 'wal')
+# Cache de usuarios autenticados (segundos de vida / cantidad máxima)
+USER_CACHE_TTL = float(os.environ.get('ALQUILERES_USER_CACHE_TTL', 300))
+USER_CACHE_SIZE = int(os.environ.get('ALQUILERES_USER_CACHE_SIZE', 1000))
+# Cache de resultados de reportes (cantidad máxima de combinaciones reporte/parámetros)
+REPORT_CACHE_SIZE = int(os.environ.get('ALQUILERES_REPORT_CACHE_SIZE', 200))
+
+# Búsqueda de personas (PersonaFTS): pesos de bm25 por columna (nombre, apellido,
+# mail, telefono, nro_documento) y palabras que se toman de lo tipeado
+PESOS_BUSQUEDA = (8.0, 10.0, 4.0, 2.0, 4.0)
+MAX_PALABRAS_BUSQUEDA = 8
+# Coincidencias que se puntúan por búsqueda. bm25 cuesta por fila: con 'ma' sobre un
+# millón de personas se puntuarían cientos de miles (más de 400 ms). Con hasta este
+# número de coincidencias el orden es exacto; con más, se ordenan las primeras que
+# encuentra el índice (por id), puede faltar alguna mejor y la página lo indica con
+# 'aproximado': hace falta tipear más para afinar.
+CANDIDATOS_BUSQUEDA = int(os.environ.get('ALQUILERES_SEARCH_CANDIDATES', 1000))
+
+
+def consulta_busqueda(texto):
+    """
+    Lo que tipea el usuario -> consulta FTS5: cada palabra (letras y números,
+    como las separa el índice) como prefijo y todas obligatorias. Entre
+    comillas, así ningún carácter se interpreta como sintaxis de FTS5.
+    ValueError si no queda nada para buscar.
+    """
+    palabras = re.findall(r'[^\W_]+', texto or '')[:MAX_PALABRAS_BUSQUEDA]
+    if sum(len(p) for p in palabras) < 2:
+        raise ValueError("La búsqueda necesita al menos 2 letras o números")
+    return ' '.join(f'"{palabra}"*' for palabra in palabras)
+
+
+# Campos obligatorios de cada alquiler de un alta en bloque
+CAMPOS_ALQUILER = ('patente', 'id_cliente', 'id_empleado', 'fecha_inicio', 'fecha_fin')
+
+
+def validar_campos_alquiler(data):
+    """
+    Chequea que el alquiler traiga cada campo con un tipo usable y devuelve
+    (fecha_inicio, fecha_fin) como datetime. ValueError nombrando el campo.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Cada alquiler debe ser un objeto.")
+    faltan = [campo for campo in CAMPOS_ALQUILER if data.get(campo) in (None, '')]
+    if faltan:
+        raise ValueError(f"Falta{'n' if len(faltan) > 1 else ''} {', '.join(faltan)}.")
+    if not isinstance(data['patente'], str):
+        raise ValueError("patente debe ser texto.")
+    for campo in ('id_cliente', 'id_empleado'):
+        valor = data[campo]
+        if not (isinstance(valor, int) and not isinstance(valor, bool)
+                or isinstance(valor, str) and valor.isdigit()):
+            raise ValueError(f"{campo} debe ser un número entero.")
+    fechas = []
+    for campo in ('fecha_inicio', 'fecha_fin'):
+        try:
+            fechas.append(parsear_fecha(data[campo]))
+        except (TypeError, ValueError):
+            raise ValueError(f"{campo} no es una fecha válida.")
+    return tuple(fechas)
+
+
+# Tablas de catálogo y su columna id
+CATALOGOS = {
+    'Documento': 'id_tipo',
+    'EstadoAlquiler': 'id_estado',
+    'EstadoAuto': 'id_estado',
+    'EstadoMantenimiento': 'id_estado',
+    'Permiso': 'id_permiso',
+    'Color': 'id_color',
+    'Marca': 'id_marca',
+}
+
 class DBManager:
     _instance = None
 
@@ -35,280 +138,272 @@ class DBManager:
             cls._instance = super(DBManager, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self, db_path=DB_PATH):
+    def __init__(self, db_path=DB_PATH, pool_size=POOL_SIZE, pool_timeout=POOL_TIMEOUT,
+                 storage_profile=STORAGE_PROFILE):
         if not hasattr(self, 'initialized'):
             self.db_path = db_path
+            self.storage_profile = storage_profile
+            # Las conexiones se reciclan: conn.close() las devuelve al pool.
+            # Un único escritor serializa las modificaciones; los get_* usan
+            # conexiones de solo lectura que escalan entre hilos (con WAL).
+            self.write_pool = ConnectionPool(
+                db_path, max_size=1, timeout=pool_timeout,
+                setup=lambda conn: apply_storage_profile(conn, storage_profile), name='escritura'
+            )
+            self.read_pool = ConnectionPool(
+                db_path, max_size=pool_size, timeout=pool_timeout,
+                setup=lambda conn: apply_storage_profile(conn, storage_profile, readonly=True), name='lectura'
+            )
+            # Ocupación por vehículo en memoria; se carga en la primera consulta
+            self.disponibilidad = AvailabilityIndex()
+            self.user_cache = UserCache(max_size=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+            self.catalogos = CatalogCache(self._cargar_catalogo, CATALOGOS)
+            self.reportes = ReportCache(max_size=REPORT_CACHE_SIZE)
+            # Latencias de SQL y requests (ver metrics); pools y caches se leen al exportar
+            self.metricas = metrics.REGISTRO
+            self.metricas.registrar_colector('db_manager', self._muestras_metricas)
             self.initialized = True
+            self._aplicar_migraciones()
+
+    def _aplicar_migraciones(self):
+        conn = None
+        try:
+            conn = self._get_connection()
+            if conn is None: return
+            aplicar_migraciones(conn)
+        except sqlite3.Error as e:
+            logger.error("Error al aplicar migraciones: %s", e)
+        finally:
+            if conn: conn.close()
 
-    def _get_connection(self):
+    def _get_connection(self, readonly=False):
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row 
-            conn.execute("PRAGMA foreign_keys = ON;")
-            return conn
+            # Si el hilo está dentro de una escritura, lee con esa misma
+            # conexión para ver sus propios cambios aún no confirmados
+            if readonly and not self.write_pool.held_by_current_thread():
+                return self.read_pool.acquire()
+            return self.write_pool.acquire()
         except sqlite3.Error as e:
-            print(f"Error al conectar con la base de datos: {e}")
+            logger.error("Error al conectar con la base de datos: %s", e)
             return None
 
-    # --- LECTURA DOCUMENTO ---
+    def _get_disponibilidad(self, conn):
+        # Trae los cambios de otras conexiones o procesos antes de responder
+        self.disponibilidad.sincronizar(conn)
+        return self.disponibilidad
 
-    def get_documento_by_id(self, id_tipo: int):
-        conn = None
+    def _refrescar_disponibilidad(self, conn, patente):
+        # Se llama después del commit, con la misma conexión de escritura:
+        # aplica el cambio propio (y cualquier otro anotado) sin esperar a la próxima lectura
         try:
-            conn = self._get_connection()
-            if conn is None: return None
-            row = conn.cursor().execute(
-                "SELECT * FROM Documento WHERE id_tipo = ?", (id_tipo,)
-            ).fetchone()
-            if row:
-                return Documento(id_tipo=row['id_tipo'], descripcion=row['descripcion'])
+            if self.disponibilidad.cargado:
+                self.disponibilidad.sincronizar(conn)
         except sqlite3.Error as e:
-            print(f"Error al obtener Documento: {e}")
-        finally:
-            if conn:
-                conn.close()
-        return None
+            logger.error("Error al refrescar disponibilidad de %s: %s", patente, e)
+            self.disponibilidad.invalidar()
+
+    def get_pool_stats(self):
+        return {
+            "lectura": self.read_pool.stats(),
+            "escritura": self.write_pool.stats(),
+        }
+
+    def get_cache_stats(self):
+        return {
+            "usuarios": self.user_cache.stats(),
+            "reportes": self.reportes.stats(),
+        }
+
+    def _muestras_metricas(self):
+        pools = self.get_pool_stats()
+        caches = self.get_cache_stats()
+        return [
+            ('alquileres_db_pool_connections', 'gauge', 'Conexiones abiertas por pool y estado',
+             [({'pool': pool, 'estado': estado}, stats[clave]) for pool, stats in pools.items()
+              for estado, clave in (('en_uso', 'in_use'), ('libre', 'idle'))]),
+            ('alquileres_db_pool_waits_total', 'counter', 'Pedidos que tuvieron que esperar una conexión',
+             [({'pool': pool}, stats['waits']) for pool, stats in pools.items()]),
+            ('alquileres_db_pool_timeouts_total', 'counter', 'Pedidos que agotaron la espera de una conexión',
+             [({'pool': pool}, stats['timeouts']) for pool, stats in pools.items()]),
+            ('alquileres_cache_hits_total', 'counter', 'Aciertos por cache',
+             [({'cache': cache}, stats['hits']) for cache, stats in caches.items()]),
+            ('alquileres_cache_misses_total', 'counter', 'Fallos por cache',
+             [({'cache': cache}, stats['misses']) for cache, stats in caches.items()]),
+            ('alquileres_cache_entries', 'gauge', 'Entradas guardadas por cache',
+             [({'cache': cache}, stats['size']) for cache, stats in caches.items()]),
+        ]
+
+    def _consultar_pagina(self, select, condiciones, params, orden, after=None,
+                          limit=LIMITE_DEFAULT, descendente=False, convertir=dict, contexto="registros"):
+        """
+        Una página de `select` ordenada por `orden` = [(expresión SQL, clave en la fila)],
+        cuyo último elemento debe ser único. `after` es el cursor devuelto por la página
+        anterior (ValueError si es inválido). Devuelve {'items', 'next_cursor'} o None.
+        """
+        condiciones = list(condiciones)
+        params = list(params)
+        expresiones = [expr for expr, _ in orden]
+        if after:
+            valores = decodificar_cursor(after, len(orden))
+            operador = '<' if descendente else '>'
+            condiciones.append(f"({', '.join(expresiones)}) {operador} ({', '.join('?' * len(orden))})")
+            params.extend(valores)
+
+        sql = select
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        direccion = " DESC" if descendente else ""
+        sql += " ORDER BY " + ", ".join(expr + direccion for expr in expresiones) + " LIMIT ?"
+        params.append(limit + 1)
 
-    def get_all_documentos(self):
         conn = None
-        lista = []
         try:
-            conn = self._get_connection()
-            if conn is None: return lista
-            rows = conn.cursor().execute("SELECT * FROM Documento").fetchall()
-            for row in rows:
-                lista.append(
-                    Documento(id_tipo=row['id_tipo'], descripcion=row['descripcion'])
-                )
+            conn = self._get_connection(readonly=True)
+            if conn is None: return None
+            rows = conn.cursor().execute(sql, params).fetchall()
+            # Se pide una fila de más para saber si hay otra página
+            hay_mas = len(rows) > limit
+            rows = rows[:limit]
+            next_cursor = None
+            if hay_mas:
+                next_cursor = codificar_cursor([rows[-1][clave] for _, clave in orden])
+            return {"items": [convertir(row) for row in rows], "next_cursor": next_cursor}
         except sqlite3.Error as e:
-            print(f"Error al obtener Documentos: {e}")
+            logger.error("Error al paginar %s: %s", contexto, e)
+            return None
         finally:
-            if conn:
+            if conn: conn.close()
+
+    def _iterar(self, sql, params=(), convertir=dict, contexto="registros"):
+        """
+        Generador sobre el resultado de `sql`, leído de a TAMANIO_LOTE filas con
+        fetchmany: la memoria usada no depende de cuántas filas devuelva.
+        La conexión se toma en la primera iteración y queda tomada hasta agotar
+        (o cerrar) el generador. Los parámetros ya vienen validados por quien llama.
+        """
+        def filas():
+            conn = self._get_connection(readonly=True)
+            if conn is None:
+                raise sqlite3.OperationalError(f"Sin conexión para listar {contexto}")
+            try:
+                cursor = conn.cursor()
+                cursor.execute(sql, list(params))
+                while True:
+                    lote = cursor.fetchmany(TAMANIO_LOTE)
+                    if not lote:
+                        break
+                    for row in lote:
+                        yield convertir(row)
+            except sqlite3.Error as e:
+                # A mitad de una respuesta ya no se puede cambiar el status:
+                # se corta el stream para que el cliente no reciba datos truncados como válidos
+                logger.error("Error al recorrer %s: %s", contexto, e)
+                raise
+            finally:
                 conn.close()
-        return lista
+        return filas()
 
-    # --- LECTURA ESTADO ALQUILER ---
+    # --- CATÁLOGOS (servidos desde CatalogCache) ---
 
-    def get_estado_alquiler_by_id(self, id_estado: int):
+    def _cargar_catalogo(self, tabla):
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return None
-            row = conn.cursor().execute(
-                "SELECT * FROM EstadoAlquiler WHERE id_estado = ?", (id_estado,)
-            ).fetchone()
-            if row:
-                return EstadoAlquiler(id_estado=row['id_estado'], descripcion=row['descripcion'])
+            columna = CATALOGOS[tabla]
+            rows = conn.cursor().execute(f"SELECT * FROM {tabla} ORDER BY {columna}").fetchall()
+            return [dict(row) for row in rows]
         except sqlite3.Error as e:
-            print(f"Error al obtener EstadoAlquiler: {e}")
+            logger.error("Error al obtener catálogo %s: %s", tabla, e)
+            return None
         finally:
             if conn:
                 conn.close()
+
+    # --- LECTURA DOCUMENTO ---
+
+    def get_documento_by_id(self, id_tipo: int):
+        row = self.catalogos.get('Documento', id_tipo)
+        if row:
+            return Documento(id_tipo=row['id_tipo'], descripcion=row['descripcion'])
         return None
-    
+
+    def get_all_documentos(self):
+        rows = self.catalogos.all('Documento') or []
+        return [Documento(id_tipo=row['id_tipo'], descripcion=row['descripcion']) for row in rows]
+
+    # --- LECTURA ESTADO ALQUILER ---
+
+    def get_estado_alquiler_by_id(self, id_estado: int):
+        row = self.catalogos.get('EstadoAlquiler', id_estado)
+        if row:
+            return EstadoAlquiler(id_estado=row['id_estado'], descripcion=row['descripcion'])
+        return None
+
     def get_all_estados_alquiler(self):
-        conn = None
-        lista = []
-        try:
-            conn = self._get_connection()
-            if conn is None: return lista
-            rows = conn.cursor().execute("SELECT * FROM EstadoAlquiler").fetchall()
-            for row in rows:
-                lista.append(
-                    EstadoAlquiler(id_estado=row['id_estado'], descripcion=row['descripcion'])
-                )
-        except sqlite3.Error as e:
-            print(f"Error al obtener Estados de Alquiler: {e}")
-        finally:
-            if conn:
-                conn.close()
-        return lista
+        rows = self.catalogos.all('EstadoAlquiler') or []
+        return [EstadoAlquiler(id_estado=row['id_estado'], descripcion=row['descripcion']) for row in rows]
 
     # --- LECTURA ESTADO AUTO ---
 
     def get_estado_auto_by_id(self, id_estado: int):
-        conn = None
-        try:
-            conn = self._get_connection()
-            if conn is None: return None
-            row = conn.cursor().execute(
-                "SELECT * FROM EstadoAuto WHERE id_estado = ?", (id_estado,)
-            ).fetchone()
-            if row:
-                return EstadoAuto(id_estado=row['id_estado'], descripcion=row['descripcion'])
-        except sqlite3.Error as e:
-            print(f"Error al obtener EstadoAuto: {e}")
-        finally:
-            if conn:
-                conn.close()
+        row = self.catalogos.get('EstadoAuto', id_estado)
+        if row:
+            return EstadoAuto(id_estado=row['id_estado'], descripcion=row['descripcion'])
         return None
 
     def get_all_estados_auto(self):
-        conn = None
-        lista = []
-        try:
-            conn = self._get_connection()
-            if conn is None: return lista
-            rows = conn.cursor().execute("SELECT * FROM EstadoAuto").fetchall()
-            for row in rows:
-                lista.append(
-                    EstadoAuto(id_estado=row['id_estado'], descripcion=row['descripcion'])
-                )
-        except sqlite3.Error as e:
-            print(f"Error al obtener Estados de Auto: {e}")
-        finally:
-            if conn:
-                conn.close()
-        return lista
+        rows = self.catalogos.all('EstadoAuto') or []
+        return [EstadoAuto(id_estado=row['id_estado'], descripcion=row['descripcion']) for row in rows]
 
     # --- LECTURA ESTADO MANTENIMIENTO ---
 
     def get_estado_mantenimiento_by_id(self, id_estado: int):
-        conn = None
-        try:
-            conn = self._get_connection()
-            if conn is None: return None
-            row = conn.cursor().execute(
-                "SELECT * FROM EstadoMantenimiento WHERE id_estado = ?", (id_estado,)
-            ).fetchone()
-            if row:
-                return EstadoMantenimiento(id_estado=row['id_estado'], descripcion=row['descripcion'])
-        except sqlite3.Error as e:
-            print(f"Error al obtener EstadoMantenimiento: {e}")
-        finally:
-            if conn:
-                conn.close()
+        row = self.catalogos.get('EstadoMantenimiento', id_estado)
+        if row:
+            return EstadoMantenimiento(id_estado=row['id_estado'], descripcion=row['descripcion'])
         return None
-    
+
     def get_all_estados_mantenimiento(self):
-        conn = None
-        lista = []
-        try:
-            conn = self._get_connection()
-            if conn is None: return lista
-            rows = conn.cursor().execute("SELECT * FROM EstadoMantenimiento").fetchall()
-            for row in rows:
-                lista.append(
-                    EstadoMantenimiento(id_estado=row['id_estado'], descripcion=row['descripcion'])
-                )
-        except sqlite3.Error as e:
-            print(f"Error al obtener Estados de Mantenimiento: {e}")
-        finally:
-            if conn:
-                conn.close()
-        return lista
+        rows = self.catalogos.all('EstadoMantenimiento') or []
+        return [EstadoMantenimiento(id_estado=row['id_estado'], descripcion=row['descripcion']) for row in rows]
 
     # --- LECTURA PERMISO ---
 
     def get_permiso_by_id(self, id_permiso: int):
-        conn = None
-        try:
-            conn = self._get_connection()
-            if conn is None: return None
-            row = conn.cursor().execute(
-                "SELECT * FROM Permiso WHERE id_permiso = ?", (id_permiso,)
-            ).fetchone()
-            if row:
-                return Permiso(id_permiso=row['id_permiso'], descripcion=row['descripcion'])
-        except sqlite3.Error as e:
-            print(f"Error al obtener Permiso: {e}")
-        finally:
-            if conn:
-                conn.close()
+        row = self.catalogos.get('Permiso', id_permiso)
+        if row:
+            return Permiso(id_permiso=row['id_permiso'], descripcion=row['descripcion'])
         return None
-    
+
     def get_all_permisos(self):
-        conn = None
-        lista = []
-        try:
-            conn = self._get_connection()
-            if conn is None: return lista
-            rows = conn.cursor().execute("SELECT * FROM Permiso").fetchall()
-            for row in rows:
-                lista.append(
-                    Permiso(id_permiso=row['id_permiso'], descripcion=row['descripcion'])
-                )
-        except sqlite3.Error as e:
-            print(f"Error al obtener Permisos: {e}")
-        finally:
-            if conn:
-                conn.close()
-        return lista
-    
+        rows = self.catalogos.all('Permiso') or []
+        return [Permiso(id_permiso=row['id_permiso'], descripcion=row['descripcion']) for row in rows]
+
     # --- LECTURA COLOR ---
 
     def get_color_by_id(self, id_color: int):
-        conn = None
-        try:
-            conn = self._get_connection()
-            if conn is None: return None
-            row = conn.cursor().execute(
-                "SELECT * FROM Color WHERE id_color = ?", (id_color,)
-            ).fetchone()
-            if row:
-                return Color(id_color=row['id_color'], descripcion=row['descripcion'])
-        except sqlite3.Error as e:
-            print(f"Error al obtener Color: {e}")
-        finally:
-            if conn:
-                conn.close()
+        row = self.catalogos.get('Color', id_color)
+        if row:
+            return Color(id_color=row['id_color'], descripcion=row['descripcion'])
         return None
 
     def get_all_colores(self):
-        conn = None
-        lista = []
-        try:
-            conn = self._get_connection()
-            if conn is None: return lista
-            rows = conn.cursor().execute("SELECT * FROM Color").fetchall()
-            for row in rows:
-                lista.append(
-                    Color(id_color=row['id_color'], descripcion=row['descripcion'])
-                )
-        except sqlite3.Error as e:
-            print(f"Error al obtener Colores: {e}")
-        finally:
-            if conn:
-                conn.close()
-        return lista
+        rows = self.catalogos.all('Color') or []
+        return [Color(id_color=row['id_color'], descripcion=row['descripcion']) for row in rows]
 
     # --- LECTURA MARCA ---
 
     def get_marca_by_id(self, id_marca: int):
-        conn = None
-        try:
-            conn = self._get_connection()
-            if conn is None: return None
-            row = conn.cursor().execute(
-                "SELECT * FROM Marca WHERE id_marca = ?", (id_marca,)
-            ).fetchone()
-            if row:
-                return Marca(id_marca=row['id_marca'], descripcion=row['descripcion'])
-        except sqlite3.Error as e:
-            print(f"Error al obtener Marca: {e}")
-        finally:
-            if conn:
-                conn.close()
+        row = self.catalogos.get('Marca', id_marca)
+        if row:
+            return Marca(id_marca=row['id_marca'], descripcion=row['descripcion'])
         return None
 
     def get_all_marcas(self):
-        conn = None
-        lista = []
-        try:
-            conn = self._get_connection()
-            if conn is None: return lista
-            rows = conn.cursor().execute("SELECT * FROM Marca").fetchall()
-            for row in rows:
-                lista.append(
-                    Marca(id_marca=row['id_marca'], descripcion=row['descripcion'])
-                )
-        except sqlite3.Error as e:
-            print(f"Error al obtener Marcas: {e}")
-        finally:
-            if conn:
-                conn.close()
-        return lista
-    
+        rows = self.catalogos.all('Marca') or []
+        return [Marca(id_marca=row['id_marca'], descripcion=row['descripcion']) for row in rows]
+
     # --- ABMC DE USUARIO ---
     def create_full_user(self, persona_data, usuario_data, 
                          role_data, role_type):
@@ -316,7 +411,7 @@ class DBManager:
         try:
             # Verificar si el mail ya existe
             if self.get_user_data_for_login_by_mail(persona_data['mail']):
-                print(f"Error: el mail {persona_data['mail']} ya está registrado.")
+                logger.error("Error: el mail %s ya está registrado.", persona_data['mail'])
                 return None
 
             conn = self._get_connection()
@@ -400,7 +495,7 @@ class DBManager:
             return id_persona
 
         except (sqlite3.Error, ValueError) as e:
-            print(f"Error durante el registro, revirtiendo cambios: {e}")
+            logger.error("Error durante el registro, revirtiendo cambios: %s", e)
             if conn:
                 conn.rollback()
             return None
@@ -418,7 +513,7 @@ class DBManager:
         """
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return None
             
             row = conn.cursor().execute(sql, (mail,)).fetchone()
@@ -426,14 +521,13 @@ class DBManager:
             if row:
                 return dict(row)
         except sqlite3.Error as e:
-            print(f"Error al buscar datos de login: {e}")
+            logger.error("Error al buscar datos de login: %s", e)
         finally:
             if conn:
                 conn.close()
         return None
 
-    def get_full_usuario_by_id(self, id_usuario):
-        sql = """
+    SQL_USUARIO_COMPLETO = """
             SELECT 
                 u.id_usuario, u.user_name, u.password,
                 p.id_persona, p.nombre, p.apellido, p.mail, p.telefono, 
@@ -444,40 +538,80 @@ class DBManager:
             JOIN Persona p ON u.id_persona = p.id_persona
             JOIN Permiso perm ON u.id_permiso = perm.id_permiso
             JOIN Documento doc ON p.tipo_documento = doc.id_tipo
-            WHERE u.id_usuario = ?
-        """
+    """
+
+    @staticmethod
+    def _armar_usuario(row):
+        perm_obj = Permiso(
+            id_permiso=row['id_permiso'],
+            descripcion=row['permiso_desc']
+        )
+
+        usuario_obj = Usuario(
+            id_usuario=row['id_usuario'],
+            user_name=row['user_name'],
+            password=row['password'],
+            permiso=perm_obj)
+
+        # Attach id_persona so callers can perform identity checks
+        # (this attribute is used e.g. in sistema.cancelar_alquiler)
+        setattr(usuario_obj, 'id_persona', row['id_persona'])
+        return usuario_obj
+
+    def _buscar_usuario(self, condicion, parametros):
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return None
-            
-            row = conn.cursor().execute(sql, (id_usuario,)).fetchone()
-            
-            if row:
-                perm_obj = Permiso(
-                    id_permiso=row['id_permiso'],
-                    descripcion=row['permiso_desc']
-                )
-                
-                usuario_obj = Usuario(
-                    id_usuario=row['id_usuario'],
-                    user_name=row['user_name'],
-                    password=row['password'],
-                    permiso=perm_obj)
-                
-                
 
-                # Attach id_persona so callers can perform identity checks
-                # (this attribute is used e.g. in sistema.cancelar_alquiler)
-                setattr(usuario_obj, 'id_persona', row['id_persona'])
+            row = conn.cursor().execute(f"{self.SQL_USUARIO_COMPLETO} WHERE {condicion}", parametros).fetchone()
 
-                return usuario_obj
+            if row:
+                return self._armar_usuario(row)
         except sqlite3.Error as e:
-            print(f"Error al buscar usuario completo: {e}")
+            logger.error("Error al buscar usuario completo: %s", e)
         finally:
             if conn:
                 conn.close()
         return None
+
+    def get_full_usuario_by_id(self, id_usuario):
+        return self._buscar_usuario("u.id_usuario = ?", (id_usuario,))
+
+    def get_usuario_para_login(self, mail):
+        """Usuario completo (con el hash de su contraseña) por mail, en una sola consulta."""
+        return self._buscar_usuario("p.mail = ?", (mail,))
+
+    def actualizar_hash_password(self, id_usuario, anterior, nuevo):
+        """
+        Reemplaza el hash de la contraseña solo si sigue siendo `anterior`: si
+        otro request la cambió entre la verificación y ahora, no se pisa.
+        """
+        conn = None
+        try:
+            conn = self._get_connection()
+            if conn is None: return False
+            cursor = conn.cursor()
+            cursor.execute("UPDATE Usuario SET password = ? WHERE id_usuario = ? AND password = ?",
+                           (nuevo, id_usuario, anterior))
+            conn.commit()
+            self.user_cache.invalidate(id_usuario)
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            logger.error("Error al actualizar hash de contraseña: %s", e)
+            if conn: conn.rollback()
+            return False
+        finally:
+            if conn: conn.close()
+
+    def get_usuario_cacheado(self, id_usuario):
+        """Como get_full_usuario_by_id, pero resuelto desde memoria si es posible."""
+        usuario = self.user_cache.get(id_usuario)
+        if usuario is None:
+            usuario = self.get_full_usuario_by_id(id_usuario)
+            if usuario is not None:
+                self.user_cache.put(id_usuario, usuario)
+        return usuario
     
     def delete_user_full(self, id_usuario):
         conn = None
@@ -504,14 +638,16 @@ class DBManager:
             cursor.execute("DELETE FROM Persona WHERE id_persona = ?", (id_persona,))
             
             conn.commit()
+            self.reportes.invalidar()
+            self.user_cache.invalidate_persona(id_persona)
             return True
 
         except sqlite3.IntegrityError:
-            print(f"Error: No se puede eliminar el usuario {id_usuario}. Tiene registros asociados (Alquileres, Mantenimientos, etc).")
+            logger.error("Error: No se puede eliminar el usuario %s. Tiene registros asociados (Alquileres, Mantenimientos, etc).", id_usuario)
             if conn: conn.rollback()
             return False
         except sqlite3.Error as e:
-            print(f"Error al eliminar usuario: {e}")
+            logger.error("Error al eliminar usuario: %s", e)
             if conn: conn.rollback()
             return False
         finally:
@@ -550,11 +686,12 @@ class DBManager:
             
             cursor.execute(query, values)
             conn.commit()
+            self.user_cache.invalidate(user_id)
             
             return cursor.rowcount > 0
             
         except sqlite3.Error as e:
-            print(f"Error al actualizar usuario en la base de datos: {e}")
+            logger.error("Error al actualizar usuario en la base de datos: %s", e)
             if conn:
                 conn.rollback()
             return False
@@ -574,7 +711,7 @@ class DBManager:
 
         conn = self._get_connection()
         if conn is None:
-            print("Error: no se pudo abrir conexión a la BD.")
+            logger.error("Error: no se pudo abrir conexión a la BD.")
            
             raise sqlite3.Error("No se pudo conectar a la base de datos")
         
@@ -614,7 +751,7 @@ class DBManager:
             return cursor.lastrowid
 
         except Exception as e:
-            print("Error insertando cliente:", e)
+            logger.error("Error insertando cliente: %s", e)
             conn.rollback()
             return None
 
@@ -658,7 +795,7 @@ class DBManager:
             return id_cliente
 
         except (sqlite3.Error, ValueError) as e:
-            print(f"Error durante la creación del cliente, revirtiendo cambios: {e}")
+            logger.error("Error durante la creación del cliente, revirtiendo cambios: %s", e)
             if conn:
                 conn.rollback()
             return None
@@ -681,7 +818,7 @@ class DBManager:
         """
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return None
             
             row = conn.cursor().execute(sql, (id_cliente,)).fetchone()
@@ -707,7 +844,7 @@ class DBManager:
                 )
                 return cliente_obj
         except sqlite3.Error as e:
-            print(f"Error al buscar cliente por ID: {e}")
+            logger.error("Error al buscar cliente por ID: %s", e)
         finally:
             if conn:
                 conn.close()
@@ -728,7 +865,7 @@ class DBManager:
         """
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return None
             
             row = conn.cursor().execute(sql, (tipo_documento_id, nro_documento)).fetchone()
@@ -754,15 +891,13 @@ class DBManager:
                 )
                 return cliente_obj
         except sqlite3.Error as e:
-            print(f"Error al buscar cliente por documento: {e}")
+            logger.error("Error al buscar cliente por documento: %s", e)
         finally:
             if conn:
                 conn.close()
         return None
 
-    def get_all_clients(self):
-        # AJUSTE: Se selecciona 'p.fecha_nac'
-        sql = """
+    SQL_CLIENTES = """
             SELECT 
                 c.id_cliente, c.fecha_alta,
                 p.id_persona, p.nombre, p.apellido, p.mail, p.telefono, 
@@ -771,42 +906,119 @@ class DBManager:
             FROM Cliente c
             JOIN Persona p ON c.id_persona = p.id_persona
             JOIN Documento doc ON p.tipo_documento = doc.id_tipo
-            ORDER BY p.apellido, p.nombre
         """
+
+    @staticmethod
+    def _fila_a_cliente(row):
+        doc_obj = Documento(
+            id_tipo=row['id_tipo'], 
+            descripcion=row['doc_desc']
+        )
+        return Cliente(
+            id_cliente=row['id_cliente'],
+            fecha_alta=datetime.fromisoformat(row['fecha_alta']),
+            id_persona=row['id_persona'],
+            nombre=row['nombre'],
+            apellido=row['apellido'],
+            mail=row['mail'],
+            telefono=str(row['telefono']),
+            # AJUSTE: Se lee row['fecha_nac']
+            fecha_nacimiento=datetime.fromisoformat(row['fecha_nac']),
+            tipo_documento=doc_obj,
+            nro_documento=row['nro_documento']
+        )
+
+    def get_all_clients(self):
+        # AJUSTE: Se selecciona 'p.fecha_nac'
+        sql = self.SQL_CLIENTES + " ORDER BY p.apellido, p.nombre"
         conn = None
         lista_clientes = []
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return lista_clientes
             
             rows = conn.cursor().execute(sql).fetchall()
             
             for row in rows:
-                doc_obj = Documento(
-                    id_tipo=row['id_tipo'], 
-                    descripcion=row['doc_desc']
-                )
-                cliente_obj = Cliente(
-                    id_cliente=row['id_cliente'],
-                    fecha_alta=datetime.fromisoformat(row['fecha_alta']),
-                    id_persona=row['id_persona'],
-                    nombre=row['nombre'],
-                    apellido=row['apellido'],
-                    mail=row['mail'],
-                    telefono=str(row['telefono']),
-                    # AJUSTE: Se lee row['fecha_nac']
-                    fecha_nacimiento=datetime.fromisoformat(row['fecha_nac']),
-                    tipo_documento=doc_obj,
-                    nro_documento=row['nro_documento']
-                )
-                lista_clientes.append(cliente_obj)
+                lista_clientes.append(self._fila_a_cliente(row))
             return lista_clientes
         except sqlite3.Error as e:
-            print(f"Error al obtener todos los clientes: {e}")
+            logger.error("Error al obtener todos los clientes: %s", e)
         finally:
             if conn:
                 conn.close()
         return lista_clientes
+
+    def get_clientes_pagina(self, after=None, limit=LIMITE_DEFAULT):
+        """Clientes por apellido y nombre, de a `limit` (objetos Cliente)."""
+        # CROSS JOIN fija el orden de los joins: se recorre Persona por
+        # idx_persona_apellido_nombre y se corta en `limit`, sin ordenar todo
+        select = """
+            SELECT 
+                c.id_cliente, c.fecha_alta,
+                p.id_persona, p.nombre, p.apellido, p.mail, p.telefono, 
+                p.fecha_nac, p.nro_documento,
+                doc.id_tipo, doc.descripcion as doc_desc
+            FROM Persona p
+            CROSS JOIN Cliente c ON c.id_persona = p.id_persona
+            JOIN Documento doc ON p.tipo_documento = doc.id_tipo
+        """
+        orden = [("p.apellido", "apellido"), ("p.nombre", "nombre"), ("p.id_persona", "id_persona")]
+        return self._consultar_pagina(select, [], [], orden, after, limit,
+                                      convertir=self._fila_a_cliente, contexto="clientes")
+
+    def _sql_busqueda(self, rol, select_columnas, joins):
+        # El rol (Cliente/Empleado) se filtra antes del LIMIT: los candidatos son todos del rol
+        pesos = ', '.join(str(peso) for peso in PESOS_BUSQUEDA)
+        return f"""
+            WITH encontrados AS MATERIALIZED (
+                SELECT PersonaFTS.rowid AS id_persona, bm25(PersonaFTS, {pesos}) AS puntaje
+                FROM PersonaFTS JOIN {rol} r ON r.id_persona = PersonaFTS.rowid
+                WHERE PersonaFTS MATCH ? LIMIT ?
+            )
+            SELECT {select_columnas}, f.puntaje, (SELECT COUNT(*) FROM encontrados) AS candidatos
+            FROM encontrados f
+            JOIN Persona p ON p.id_persona = f.id_persona
+            {joins}
+        """
+
+    def _buscar_personas(self, rol, select_columnas, joins, texto, after, limit, convertir, contexto):
+        """
+        Página de los del rol que coinciden con `texto`, más relevantes primero.
+        Se puntúan hasta CANDIDATOS_BUSQUEDA coincidencias: si se llegó al
+        tope, el orden es solo entre esas y la página trae 'aproximado': True.
+        """
+        candidatos = []
+
+        def convertir_fila(row):
+            candidatos.append(row['candidatos'])
+            return convertir(row)
+
+        pagina = self._consultar_pagina(
+            self._sql_busqueda(rol, select_columnas, joins), [],
+            [consulta_busqueda(texto), CANDIDATOS_BUSQUEDA], self.ORDEN_BUSQUEDA, after, limit,
+            convertir=convertir_fila, contexto=contexto
+        )
+        if pagina is not None:
+            # Llegar al tope = pudo haber más coincidencias sin puntuar
+            pagina['aproximado'] = bool(candidatos) and candidatos[0] >= CANDIDATOS_BUSQUEDA
+        return pagina
+
+    # Más relevantes primero (bm25 es menor cuanto mejor) y, a igual puntaje, por id
+    ORDEN_BUSQUEDA = [("f.puntaje", "puntaje"), ("f.id_persona", "id_persona")]
+
+    def buscar_clientes(self, texto, after=None, limit=LIMITE_DEFAULT):
+        """Clientes cuyo nombre, apellido, mail, teléfono o documento empiezan con lo tipeado (objetos Cliente)."""
+        return self._buscar_personas(
+            'Cliente',
+            """c.id_cliente, c.fecha_alta,
+                p.id_persona, p.nombre, p.apellido, p.mail, p.telefono,
+                p.fecha_nac, p.nro_documento,
+                doc.id_tipo, doc.descripcion as doc_desc""",
+            """JOIN Cliente c ON c.id_persona = p.id_persona
+            JOIN Documento doc ON p.tipo_documento = doc.id_tipo""",
+            texto, after, limit, self._fila_a_cliente, "búsqueda de clientes"
+        )
     
     def update_client_persona_data(self, id_cliente, persona_data):
         # AJUSTE: Se actualiza la columna 'fecha_nac'
@@ -831,9 +1043,10 @@ class DBManager:
                 id_cliente
             ))
             conn.commit()
+            self.reportes.invalidar()
             return cursor.rowcount > 0 
         except sqlite3.Error as e:
-            print(f"Error al actualizar cliente: {e}")
+            logger.error("Error al actualizar cliente: %s", e)
             if conn:
                 conn.rollback()
             return False
@@ -860,7 +1073,7 @@ class DBManager:
             conn.commit()
             return cursor.rowcount > 0
         except sqlite3.Error as e:
-            print(f"Error al actualizar fecha_alta: {e}")
+            logger.error("Error al actualizar fecha_alta: %s", e)
             if conn:
                 conn.rollback()
             return False
@@ -881,7 +1094,7 @@ class DBManager:
             ).fetchone()
             
             if not row:
-                print("Error: Cliente no encontrado.")
+                logger.error("Error: Cliente no encontrado.")
                 return False
                 
             id_persona = row['id_persona']
@@ -893,15 +1106,17 @@ class DBManager:
             cursor.execute("DELETE FROM Persona WHERE id_persona = ?", (id_persona,))
             
             conn.commit()
+            self.reportes.invalidar()
+            self.user_cache.invalidate_persona(id_persona)
             return True
 
         except sqlite3.IntegrityError:
-            print(f"Error de integridad: No se puede eliminar. El cliente (ID: {id_cliente}) probablemente tiene alquileres asociados.")
+            logger.error("Error de integridad: No se puede eliminar. El cliente (ID: %s) probablemente tiene alquileres asociados.", id_cliente)
             if conn:
                 conn.rollback()
             return False
         except (sqlite3.Error, ValueError) as e:
-            print(f"Error al eliminar cliente: {e}")
+            logger.error("Error al eliminar cliente: %s", e)
             if conn:
                 conn.rollback()
             return False
@@ -946,14 +1161,7 @@ class DBManager:
 
     #cambio-------------------------
 
-    def get_all_vehiculos(self):
-        conn = None
-        try:
-            conn = self._get_connection()
-            if conn is None: 
-                return []
-
-            query = """
+    SQL_VEHICULOS = """
             SELECT 
                 v.patente,
                 v.modelo,
@@ -969,32 +1177,43 @@ class DBManager:
             LEFT JOIN EstadoAuto ea ON v.id_estado = ea.id_estado
             LEFT JOIN Marca m ON v.id_marca = m.id_marca
             LEFT JOIN Color c ON v.id_color = c.id_color
-            ORDER BY v.patente
             """
 
-            cursor = conn.cursor()
-            cursor.execute(query)
+    @staticmethod
+    def _fila_a_vehiculo(row):
+        vehiculo = dict(row)
+        # Asegurarse de que todos los campos necesarios estén presentes
+        vehiculo['caja_manual'] = bool(vehiculo.get('caja_manual', 0))
+        return vehiculo
 
-            # Obtener los nombres de las columnas
-            columns = [column[0] for column in cursor.description]
+    def get_all_vehiculos(self):
+        conn = None
+        try:
+            conn = self._get_connection(readonly=True)
+            if conn is None: 
+                return []
 
-            # Convertir los resultados a una lista de diccionarios
-            vehiculos = []
-            for row in cursor.fetchall():
-                vehiculo = dict(zip(columns, row))
-                # Asegurarse de que todos los campos necesarios estén presentes
-                vehiculo['caja_manual'] = bool(vehiculo.get('caja_manual', 0))
-                vehiculos.append(vehiculo)
+            cursor = conn.cursor()
+            cursor.execute(self.SQL_VEHICULOS + " ORDER BY v.patente")
 
-            return vehiculos
+            # Convertir los resultados a una lista de diccionarios
+            return [self._fila_a_vehiculo(row) for row in cursor.fetchall()]
 
         except Exception as e:
-            print(f"Error en get_all_vehiculos: {str(e)}")
+            logger.error("Error en get_all_vehiculos: %s", e)
             return []
         finally:
             if conn:
                 conn.close()
 
+    def get_vehiculos_pagina(self, after=None, limit=LIMITE_DEFAULT, id_estado=None):
+        condiciones, params = [], []
+        if id_estado is not None:
+            condiciones.append("v.id_estado = ?")
+            params.append(id_estado)
+        return self._consultar_pagina(self.SQL_VEHICULOS, condiciones, params, [("v.patente", "patente")],
+                                      after, limit, convertir=self._fila_a_vehiculo, contexto="vehículos")
+
     def get_vehiculo_by_patente(self, patente):
         sql = """
             SELECT v.*, 
@@ -1009,13 +1228,13 @@ class DBManager:
         """
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return None
             row = conn.cursor().execute(sql, (patente.upper(),)).fetchone()
             if row:
                 return self._rebuild_vehiculo_obj(row)
         except sqlite3.Error as e:
-            print(f"Error al obtener vehiculo: {e}")
+            logger.error("Error al obtener vehiculo: %s", e)
         finally:
             if conn: conn.close()
         return None
@@ -1060,7 +1279,7 @@ class DBManager:
             conn.commit()
             return True
         except sqlite3.Error as e:
-            print(f"Error al crear vehiculo: {e}")
+            logger.error("Error al crear vehiculo: %s", e)
             if conn: conn.rollback()
             return False
         finally:
@@ -1093,9 +1312,10 @@ class DBManager:
                 patente
             ))
             conn.commit()
+            self.reportes.invalidar()
             return cursor.rowcount > 0
         except sqlite3.Error as e:
-            print(f"Error al actualizar vehiculo: {e}")
+            logger.error("Error al actualizar vehiculo: %s", e)
             if conn: conn.rollback()
             return False
         finally:
@@ -1111,31 +1331,22 @@ class DBManager:
             cursor = conn.cursor()
             cursor.execute(sql, (patente,))
             conn.commit()
+            self.reportes.invalidar()
             return cursor.rowcount > 0
         except sqlite3.IntegrityError:
-            print(f"Error de integridad: No se puede eliminar vehiculo {patente}. Tiene alquileres asociados.")
+            logger.error("Error de integridad: No se puede eliminar vehiculo %s. Tiene alquileres asociados.", patente)
             if conn: conn.rollback()
             return False
         except sqlite3.Error as e:
-            print(f"Error al eliminar vehiculo: {e}")
+            logger.error("Error al eliminar vehiculo: %s", e)
             if conn: conn.rollback()
             return False
-        finally:
-            if conn: conn.close()
-
-    #modificacion libres 
-    def get_vehiculos_libres(self, fecha_inicio=None, fecha_fin=None):
-        conn = None
-        try:
-            conn = self._get_connection()
-            if conn is None: 
-                return []
-
-            # Configurar el row_factory para devolver diccionarios
-            conn.row_factory = sqlite3.Row
+        finally:
+            if conn: conn.close()
 
-            # Consulta base para vehículos que están en estado Libre
-            query = """
+    def _query_vehiculos_libres(self, conn, id_marca=None, asientos=None, caja_manual=None):
+        # Consulta base para vehículos que están en estado Libre
+        query = """
             SELECT v.*, 
                 ea.descripcion as estado,
                 m.descripcion as marca,
@@ -1145,88 +1356,56 @@ class DBManager:
             JOIN Marca m ON v.id_marca = m.id_marca
             JOIN Color c ON v.id_color = c.id_color
             WHERE ea.descripcion = 'Libre'
-            """
+        """
+        params = []
+        if id_marca is not None:
+            query += " AND v.id_marca = ?"
+            params.append(id_marca)
+        if asientos is not None:
+            query += " AND v.asientos >= ?"
+            params.append(asientos)
+        if caja_manual is not None:
+            query += " AND v.caja_manual = ?"
+            params.append(1 if caja_manual else 0)
+        query += " ORDER BY v.modelo"
+        return [dict(row) for row in conn.cursor().execute(query, params).fetchall()]
+
+    #modificacion libres 
+    def get_vehiculos_libres(self, fecha_inicio=None, fecha_fin=None):
+        conn = None
+        try:
+            conn = self._get_connection(readonly=True)
+            if conn is None: 
+                return []
 
-            params = []
+            # Configurar el row_factory para devolver diccionarios
+            conn.row_factory = sqlite3.Row
 
-            # Si se proporcionan fechas, verificar disponibilidad
+            ocupadas = set()
+
+            # Si se proporcionan fechas, descartar los vehículos ocupados en el rango
             if fecha_inicio and fecha_fin:
                 try:
-                    inicio = datetime.fromisoformat(fecha_inicio)
-                    fin = datetime.fromisoformat(fecha_fin)
-
-                    # CORRECCIÓN: Verificar conflictos de fechas sin margen excesivo
-                    query += """
-                    AND v.patente NOT IN (
-                        SELECT a.patente 
-                        FROM Alquiler a
-                        JOIN EstadoAlquiler ea ON a.id_estado = ea.id_estado
-                        WHERE ea.descripcion IN ('Reservado', 'Activo')
-                        AND (
-                            -- Verificar superposición directa
-                            (a.fecha_inicio < ? AND a.fecha_fin > ?) OR
-                            (a.fecha_inicio BETWEEN ? AND ?) OR
-                            (a.fecha_fin BETWEEN ? AND ?) OR
-                            (a.fecha_inicio <= ? AND a.fecha_fin >= ?)
-                        )
-                    )
-                    """
-                    # Parámetros para la consulta
-                    params.extend([
-                        fin, inicio,        # Primera condición: superposición
-                        inicio, fin,        # Segunda: inicio entre fechas
-                        inicio, fin,        # Tercera: fin entre fechas  
-                        inicio, fin         # Cuarta: alquiler cubre todo el período
-                    ])
-
-                    # CORRECCIÓN: También excluir vehículos en mantenimiento
-                    query += """
-                    AND v.patente NOT IN (
-                        SELECT m.patente 
-                        FROM Mantenimiento m
-                        JOIN EstadoMantenimiento em ON m.id_estado = em.id_estado
-                        WHERE em.descripcion IN ('Pendiente', 'Realizando')
-                        AND (
-                            (m.fecha_inicio < ? AND m.fecha_fin > ?) OR
-                            (m.fecha_inicio BETWEEN ? AND ?) OR
-                            (m.fecha_fin BETWEEN ? AND ?) OR
-                            (m.fecha_inicio <= ? AND m.fecha_fin >= ?)
-                        )
+                    ocupadas = self._get_disponibilidad(conn).patentes_ocupadas(
+                        fecha_inicio, fecha_fin
                     )
-                    """
-                    # Parámetros para mantenimiento
-                    params.extend([
-                        fin, inicio,        # Primera condición: superposición
-                        inicio, fin,        # Segunda: inicio entre fechas
-                        inicio, fin,        # Tercera: fin entre fechas  
-                        inicio, fin         # Cuarta: mantenimiento cubre todo el período
-                    ])
-
                 except ValueError as e:
-                    print(f"Error al procesar fechas: {e}")
+                    logger.error("Error al procesar fechas: %s", e)
                     return []
 
-            query += " ORDER BY v.modelo"
-
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-
             # Convertir los resultados a una lista de diccionarios
             vehiculos = []
-            for row in cursor.fetchall():
-                vehiculo = dict(row)
+            for vehiculo in self._query_vehiculos_libres(conn):
                 # Asegurarse de que todos los campos necesarios estén presentes
-                if 'patente' in vehiculo:
+                if 'patente' in vehiculo and vehiculo['patente'] not in ocupadas:
                     vehiculos.append(vehiculo)
 
-            print(f"🔍 Vehículos libres encontrados: {len(vehiculos)}")
-            for v in vehiculos:
-                print(f"   - {v['patente']} - {v['modelo']} ({v['estado']})")
+            logger.debug("Vehículos libres encontrados: %d", len(vehiculos))
 
             return vehiculos
 
         except sqlite3.Error as e:
-            print(f"Error al obtener vehículos libres: {e}")
+            logger.error("Error al obtener vehículos libres: %s", e)
             return []
         finally:
             if conn: 
@@ -1234,147 +1413,363 @@ class DBManager:
 
     
     
-    # --- FUNCIONES DE ALQUILER ---
-
-    #modificado
+    def get_vehiculos_libres_multi(self, ventanas, id_marca=None, asientos=None, caja_manual=None):
+        """
+        Disponibilidad para varias ventanas de fechas en una sola consulta.
+        `ventanas` es una lista de (fecha_inicio, fecha_fin). Lanza ValueError
+        si alguna fecha es inválida o el fin no es posterior al inicio.
+        """
+        normalizadas = []
+        for fecha_inicio, fecha_fin in ventanas:
+            inicio, fin = normalizar_fecha(fecha_inicio), normalizar_fecha(fecha_fin)
+            if fin <= inicio:
+                raise ValueError(f"La ventana {fecha_inicio} - {fecha_fin} termina antes de empezar.")
+            normalizadas.append((inicio, fin))
 
-    def create_alquiler_transactional(self, data):
         conn = None
         try:
-            conn = self._get_connection()
-            if conn is None: 
-                return False
-                
-            cursor = conn.cursor()
-            cursor.execute("BEGIN")
-
-            # Verificar si el vehículo existe y está libre
-            cursor.execute("""
-                SELECT v.id_estado, ea.descripcion as estado_desc 
-                FROM Vehiculo v 
-                JOIN EstadoAuto ea ON v.id_estado = ea.id_estado 
-                WHERE v.patente = ?
-            """, (data['patente'],))
-            row = cursor.fetchone()
-            
-            if not row:
-                raise ValueError(f"El vehículo {data['patente']} no existe.")
-            
-            # Solo permitir si está Libre
-            if row['estado_desc'] != 'Libre':
-                raise ValueError(f"El vehículo {data['patente']} no está disponible. Estado actual: {row['estado_desc']}")
-
-            # Convertir fechas
-            fecha_inicio = datetime.fromisoformat(data['fecha_inicio'])
-            fecha_fin = datetime.fromisoformat(data['fecha_fin'])
-            hoy = datetime.now()
-            
-            # Validaciones básicas de fechas
-            if fecha_inicio.date() < hoy.date():
-                raise ValueError("La fecha de inicio no puede ser anterior a hoy")
-            
-            if fecha_fin <= fecha_inicio:
-                raise ValueError("La fecha de fin debe ser posterior a la fecha de inicio.")
-
-            # CORRECCIÓN: Verificar conflictos de manera más simple
-            sql_check_conflictos = """
-                SELECT id_alquiler 
-                FROM Alquiler 
-                WHERE patente = ? 
-                AND id_estado IN (1, 2)  -- Reservado o Activo
-                AND (
-                    (fecha_inicio < ? AND fecha_fin > ?) OR  -- Superposición
-                    (fecha_inicio BETWEEN ? AND ?) OR        -- Inicio dentro del rango
-                    (fecha_fin BETWEEN ? AND ?) OR           -- Fin dentro del rango
-                    (fecha_inicio <= ? AND fecha_fin >= ?)   -- Cubre todo el período
-                )
-                LIMIT 1
-            """
-            
-            cursor.execute(sql_check_conflictos, (
-                data['patente'],
-                fecha_fin, fecha_inicio,    # Primera condición
-                fecha_inicio, fecha_fin,    # Segunda condición  
-                fecha_inicio, fecha_fin,    # Tercera condición
-                fecha_inicio, fecha_fin     # Cuarta condición
-            ))
-            
-            if cursor.fetchone():
-                raise ValueError(f"El vehículo {data['patente']} ya tiene un alquiler programado que se superpone con las fechas solicitadas.")
+            conn = self._get_connection(readonly=True)
+            if conn is None:
+                return None
 
-            # Verificar mantenimientos
-            sql_check_mantenimiento = """
-                SELECT id_mantenimiento 
-                FROM Mantenimiento 
-                WHERE patente = ? 
-                AND id_estado IN (1, 3)  -- Realizando o Pendiente
-                AND (
-                    (fecha_inicio < ? AND fecha_fin > ?) OR
-                    (fecha_inicio BETWEEN ? AND ?) OR
-                    (fecha_fin BETWEEN ? AND ?) OR
-                    (fecha_inicio <= ? AND fecha_fin >= ?)
-                )
-                LIMIT 1
-            """
-            
-            cursor.execute(sql_check_mantenimiento, (
-                data['patente'], 
-                fecha_fin, fecha_inicio,
-                fecha_inicio, fecha_fin,
-                fecha_inicio, fecha_fin,
-                fecha_inicio, fecha_fin
-            ))
-            
-            if cursor.fetchone():
-                raise ValueError(f"El vehículo {data['patente']} tiene un mantenimiento programado en esas fechas.")
+            vehiculos = self._query_vehiculos_libres(conn, id_marca, asientos, caja_manual)
+            ocupadas = self._get_disponibilidad(conn).patentes_ocupadas_multi(normalizadas)
 
-            # Determinar estado del alquiler
-            es_hoy = fecha_inicio.date() == hoy.date()
-            estado_alquiler = 2 if es_hoy else 1  # 2: Activo, 1: Reservado
-            estado_vehiculo = 2 if es_hoy else 5  # 2: Alquilado, 5: Reservado
+            resultado_ventanas = []
+            for (inicio, fin), ocupadas_ventana in zip(normalizadas, ocupadas):
+                resultado_ventanas.append({
+                    'fecha_inicio': inicio,
+                    'fecha_fin': fin,
+                    'patentes': [v['patente'] for v in vehiculos if v['patente'] not in ocupadas_ventana],
+                })
 
-            # Insertar el alquiler
-            sql_alquiler = """
-                INSERT INTO Alquiler (patente, id_cliente, id_empleado, 
-                                    fecha_inicio, fecha_fin, id_estado)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """
-            
-            cursor.execute(sql_alquiler, (
-                data['patente'],
-                data['id_cliente'],
-                data['id_empleado'],
-                data['fecha_inicio'],
-                data['fecha_fin'],
-                estado_alquiler
-            ))
+            return {
+                'vehiculos': {v['patente']: v for v in vehiculos},
+                'ventanas': resultado_ventanas,
+            }
+        except sqlite3.Error as e:
+            logger.error("Error al obtener disponibilidad por ventanas: %s", e)
+            return None
+        finally:
+            if conn:
+                conn.close()
 
-            # Actualizar estado del vehículo
-            sql_update_auto = "UPDATE Vehiculo SET id_estado = ? WHERE patente = ?"
-            cursor.execute(sql_update_auto, (estado_vehiculo, data['patente']))
+    def get_calendario_disponibilidad(self, desde=None, dias=365):
+        """
+        Días libres de toda la flota como máscara de bits por patente:
+        bit d encendido = libre el día desde + d.
+        """
+        desde = desde or date.today()
+        todos = (1 << dias) - 1
+        conn = None
+        try:
+            conn = self._get_connection(readonly=True)
+            if conn is None: return None
+            patentes = [row['patente'] for row in conn.execute(
+                "SELECT patente FROM Vehiculo ORDER BY patente"
+            ).fetchall()]
+            ocupados = self._get_disponibilidad(conn).calendario(patentes, desde, dias)
+            return {patente: todos & ~mascara for patente, mascara in ocupados.items()}
+        except sqlite3.Error as e:
+            logger.error("Error al armar calendario de disponibilidad: %s", e)
+            return None
+        finally:
+            if conn: conn.close()
+    
+    # --- FUNCIONES DE ALQUILER ---
 
-            conn.commit()
-            print(f"✅ Alquiler creado exitosamente para {data['patente']}")
-            return True
+    #modificado
 
-        except sqlite3.Error as e:
-            print(f"❌ Error al crear alquiler (DB error): {e}")
-            if conn:
+    def _transaccion_inmediata(self, operacion, al_confirmar=None):
+        """
+        Corre operacion(cursor) dentro de BEGIN IMMEDIATE y confirma.
+
+        IMMEDIATE toma el lock de escritura antes de leer, así dos procesos que
+        reservan el mismo auto no pasan los dos el chequeo de superposición.
+        Si la base sigue ocupada después del timeout, se reintenta todo con
+        espera creciente (BUSY_RETRIES veces). al_confirmar(conn, resultado)
+        corre después del commit con la misma conexión, fuera de los
+        reintentos: si falla se registra, la escritura ya quedó hecha. Los
+        errores de la operación (ValueError de validación o de SQLite) se propagan.
+        """
+        for intento in range(BUSY_RETRIES + 1):
+            conn = self._get_connection()
+            if conn is None:
+                raise sqlite3.OperationalError("No hay conexión con la base de datos")
+            try:
+                cursor = conn.cursor()
+                cursor.execute("BEGIN IMMEDIATE")
+                resultado = operacion(cursor)
+                conn.commit()
+            except sqlite3.Error as e:
                 conn.rollback()
-            return False
-        except ValueError:
-            # Business validation errors should propagate to caller (API -> 400)
-            if conn:
+                conn.close()
+                if not base_ocupada(e) or intento == BUSY_RETRIES:
+                    raise
+                logger.warning("Base ocupada (%s), reintento %d de %d", e, intento + 1, BUSY_RETRIES)
+                # Con jitter, para que los que chocaron no vuelvan a chocar juntos
+                time.sleep(BUSY_BACKOFF_MS / 1000 * 2 ** intento * random.uniform(0.5, 1.5))
+                continue
+            except Exception:
                 conn.rollback()
-            raise
-        finally:
-            if conn:
                 conn.close()
+                raise
+
+            try:
+                if al_confirmar:
+                    al_confirmar(conn, resultado)
+            except Exception as e:
+                logger.error("Error después de confirmar la transacción: %s", e)
+            finally:
+                conn.close()
+            return resultado
 
+    def create_alquiler_transactional(self, data):
+        def al_confirmar(conn, _):
+            self.reportes.invalidar()
+            self._refrescar_disponibilidad(conn, data['patente'])
 
-    def get_all_alquileres(self, id_persona_filtro=None):
-        # CORRECCIÓN: Incluir todos los datos del cliente
-        base_sql = """
+        try:
+            self._transaccion_inmediata(lambda cursor: self._insertar_alquiler(cursor, data), al_confirmar)
+            logger.info("Alquiler creado para %s", data['patente'])
+            return True
+        except sqlite3.IntegrityError as e:
+            # El trigger de exclusión: otra escritura reservó esas fechas primero
+            if ERROR_ALQUILER_SUPERPUESTO in str(e):
+                raise ValueError(f"El vehículo {data['patente']} ya tiene un alquiler programado que se superpone con las fechas solicitadas.")
+            logger.error("Error al crear alquiler (DB error): %s", e)
+            return False
+        except sqlite3.Error as e:
+            logger.error("Error al crear alquiler (DB error): %s", e)
+            return False
+        # Los ValueError (validaciones de negocio) llegan al llamador (API -> 400)
+
+    def _insertar_alquiler(self, cursor, data):
+        # Verificar si el vehículo existe y está libre
+        cursor.execute("""
+            SELECT v.id_estado, ea.descripcion as estado_desc 
+            FROM Vehiculo v 
+            JOIN EstadoAuto ea ON v.id_estado = ea.id_estado 
+            WHERE v.patente = ?
+        """, (data['patente'],))
+        row = cursor.fetchone()
+        
+        if not row:
+            raise ValueError(f"El vehículo {data['patente']} no existe.")
+        
+        # Solo permitir si está Libre
+        if row['estado_desc'] != 'Libre':
+            raise ValueError(f"El vehículo {data['patente']} no está disponible. Estado actual: {row['estado_desc']}")
+
+        # Convertir fechas
+        fecha_inicio = parsear_fecha(data['fecha_inicio'])
+        fecha_fin = parsear_fecha(data['fecha_fin'])
+        hoy = datetime.now()
+        
+        # Validaciones básicas de fechas
+        if fecha_inicio.date() < hoy.date():
+            raise ValueError("La fecha de inicio no puede ser anterior a hoy")
+        
+        if fecha_fin <= fecha_inicio:
+            raise ValueError("La fecha de fin debe ser posterior a la fecha de inicio.")
+
+        # Verificar superposición con alquileres y mantenimientos vigentes
+        rango = {
+            'patente': data['patente'],
+            'inicio': normalizar_fecha(fecha_inicio),
+            'fin': normalizar_fecha(fecha_fin),
+        }
+
+        sql_check_conflictos = f"""
+            SELECT id_alquiler 
+            FROM Alquiler 
+            WHERE patente = :patente 
+            AND id_estado IN {ESTADOS_ALQUILER_BLOQUEANTES}
+            AND {SQL_SUPERPOSICION}
+            LIMIT 1
+        """
+        cursor.execute(sql_check_conflictos, rango)
+        
+        if cursor.fetchone():
+            raise ValueError(f"El vehículo {data['patente']} ya tiene un alquiler programado que se superpone con las fechas solicitadas.")
+
+        # Verificar mantenimientos
+        sql_check_mantenimiento = f"""
+            SELECT id_mantenimiento 
+            FROM Mantenimiento 
+            WHERE patente = :patente 
+            AND id_estado IN {ESTADOS_MANTENIMIENTO_BLOQUEANTES}
+            AND {SQL_SUPERPOSICION}
+            LIMIT 1
+        """
+        cursor.execute(sql_check_mantenimiento, rango)
+        
+        if cursor.fetchone():
+            raise ValueError(f"El vehículo {data['patente']} tiene un mantenimiento programado en esas fechas.")
+
+        # Determinar estado del alquiler
+        es_hoy = fecha_inicio.date() == hoy.date()
+        estado_alquiler = 2 if es_hoy else 1  # 2: Activo, 1: Reservado
+        estado_vehiculo = 2 if es_hoy else 5  # 2: Alquilado, 5: Reservado
+
+        # Insertar el alquiler
+        sql_alquiler = """
+            INSERT INTO Alquiler (patente, id_cliente, id_empleado, 
+                                fecha_inicio, fecha_fin, id_estado)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """
+        
+        cursor.execute(sql_alquiler, (
+            data['patente'],
+            data['id_cliente'],
+            data['id_empleado'],
+            rango['inicio'],
+            rango['fin'],
+            estado_alquiler
+        ))
+
+        # Actualizar estado del vehículo
+        sql_update_auto = "UPDATE Vehiculo SET id_estado = ? WHERE patente = ?"
+        cursor.execute(sql_update_auto, (estado_vehiculo, data['patente']))
+
+    def create_alquileres_bulk(self, items):
+        """
+        Crea varios alquileres en una sola transacción (reservas de flota).
+
+        Las mismas validaciones que create_alquiler_transactional, pero con un
+        chequeo de conflictos para todo el pedido y un solo INSERT/UPDATE.
+        Cada ítem se resuelve por separado: los válidos se crean aunque otros
+        fallen. Devuelve una lista, en el orden de `items`, de
+        {'indice', 'ok', 'id_alquiler' | 'error'}; None si falla la base.
+        """
+        def al_confirmar(conn, resultado):
+            _, creados = resultado
+            if not creados:
+                return
+            self.reportes.invalidar()
+            for patente in {fila['patente'] for fila in creados}:
+                self._refrescar_disponibilidad(conn, patente)
+
+        try:
+            resultados, creados = self._transaccion_inmediata(
+                lambda cursor: self._insertar_alquileres(cursor, items), al_confirmar
+            )
+            logger.info("Alquileres en bloque: %d creados de %d", len(creados), len(items))
+            return resultados
+        except sqlite3.Error as e:
+            logger.error("Error al crear alquileres en bloque (DB error): %s", e)
+            return None
+
+    def _insertar_alquileres(self, cursor, items):
+        # Se arma en cada intento: si la transacción se reintenta, no quedan restos del anterior
+        resultados = [{'indice': indice, 'ok': False} for indice in range(len(items))]
+        hoy = datetime.now()
+        validos = []
+        for indice, data in enumerate(items):
+            try:
+                fecha_inicio, fecha_fin = validar_campos_alquiler(data)
+                if fecha_inicio.date() < hoy.date():
+                    raise ValueError("La fecha de inicio no puede ser anterior a hoy")
+                if fecha_fin <= fecha_inicio:
+                    raise ValueError("La fecha de fin debe ser posterior a la fecha de inicio.")
+            except ValueError as e:
+                resultados[indice]['error'] = str(e)
+                continue
+            validos.append((indice, data, normalizar_fecha(fecha_inicio), normalizar_fecha(fecha_fin),
+                            fecha_inicio.date() == hoy.date()))
+        if not validos:
+            return resultados, []
+
+        # Estado de todos los vehículos pedidos y clientes/empleados existentes, una consulta por tabla
+        patentes = sorted({data['patente'] for _, data, _, _, _ in validos})
+        estados = dict(cursor.execute(f"""
+            SELECT v.patente, ea.descripcion FROM Vehiculo v
+            JOIN EstadoAuto ea ON v.id_estado = ea.id_estado
+            WHERE v.patente IN ({', '.join('?' * len(patentes))})
+        """, patentes).fetchall())
+        existentes = {}
+        for tabla, columna in (('Cliente', 'id_cliente'), ('Empleado', 'id_empleado')):
+            ids = sorted({str(data[columna]) for _, data, _, _, _ in validos})
+            existentes[columna] = {str(row[0]) for row in cursor.execute(
+                f"SELECT {columna} FROM {tabla} WHERE {columna} IN ({', '.join('?' * len(ids))})", ids
+            ).fetchall()}
+
+        # Conflictos de todo el pedido contra alquileres y mantenimientos vigentes, en una consulta
+        pedido = ', '.join(['(?, ?, ?, ?)'] * len(validos))
+        parametros = [valor for indice, data, inicio, fin, _ in validos
+                      for valor in (indice, data['patente'], inicio, fin)]
+        conflictos = {}
+        for indice, tipo in cursor.execute(f"""
+            WITH pedido(indice, patente, inicio, fin) AS (VALUES {pedido})
+            SELECT p.indice, 'alquiler' FROM pedido p
+            WHERE EXISTS (
+                SELECT 1 FROM Alquiler a
+                WHERE a.patente = p.patente AND a.id_estado IN {ESTADOS_ALQUILER_BLOQUEANTES}
+                AND a.fecha_inicio < p.fin AND a.fecha_fin > p.inicio
+            )
+            UNION ALL
+            SELECT p.indice, 'mantenimiento' FROM pedido p
+            WHERE EXISTS (
+                SELECT 1 FROM Mantenimiento m
+                WHERE m.patente = p.patente AND m.id_estado IN {ESTADOS_MANTENIMIENTO_BLOQUEANTES}
+                AND m.fecha_inicio < p.fin AND m.fecha_fin > p.inicio
+            )
+        """, parametros).fetchall():
+            # Si choca con los dos, se informa el alquiler (como en el alta individual)
+            conflictos.setdefault(indice, tipo)
+
+        filas, reservadas = [], set()
+        for indice, data, inicio, fin, es_hoy in validos:
+            patente = data['patente']
+            if patente not in estados:
+                error = f"El vehículo {patente} no existe."
+            elif str(data['id_cliente']) not in existentes['id_cliente']:
+                error = f"El cliente {data['id_cliente']} no existe."
+            elif str(data['id_empleado']) not in existentes['id_empleado']:
+                error = f"El empleado {data['id_empleado']} no existe."
+            elif patente in reservadas:
+                # Igual que pedirlos de a uno: el primero deja el auto reservado
+                error = f"El vehículo {patente} ya está incluido en otro alquiler de este pedido."
+            elif estados[patente] != 'Libre':
+                error = f"El vehículo {patente} no está disponible. Estado actual: {estados[patente]}"
+            elif conflictos.get(indice) == 'alquiler':
+                error = f"El vehículo {patente} ya tiene un alquiler programado que se superpone con las fechas solicitadas."
+            elif conflictos.get(indice) == 'mantenimiento':
+                error = f"El vehículo {patente} tiene un mantenimiento programado en esas fechas."
+            else:
+                error = None
+            if error:
+                resultados[indice]['error'] = error
+                continue
+            reservadas.add(patente)
+            filas.append({'indice': indice, 'patente': patente, 'id_cliente': data['id_cliente'],
+                          'id_empleado': data['id_empleado'], 'inicio': inicio, 'fin': fin,
+                          'estado': 2 if es_hoy else 1})  # 2: Activo, 1: Reservado
+        if not filas:
+            return resultados, []
+
+        # Con el lock de escritura tomado, los ids nuevos son los mayores al último
+        ultimo = cursor.execute("SELECT COALESCE(MAX(id_alquiler), 0) FROM Alquiler").fetchone()[0]
+        cursor.executemany("""
+            INSERT INTO Alquiler (patente, id_cliente, id_empleado, fecha_inicio, fecha_fin, id_estado)
+            VALUES (:patente, :id_cliente, :id_empleado, :inicio, :fin, :estado)
+        """, filas)
+        ids = dict(cursor.execute(
+            "SELECT patente, id_alquiler FROM Alquiler WHERE id_alquiler > ?", (ultimo,)
+        ).fetchall())
+
+        # Un UPDATE para todos los vehículos: 2 Alquilado si empieza hoy, 5 Reservado si no
+        activas = [fila['patente'] for fila in filas if fila['estado'] == 2]
+        cursor.execute(f"""
+            UPDATE Vehiculo SET id_estado = CASE WHEN patente IN ({', '.join('?' * len(activas))}) THEN 2 ELSE 5 END
+            WHERE patente IN ({', '.join('?' * len(filas))})
+        """, activas + [fila['patente'] for fila in filas])
+
+        for fila in filas:
+            resultados[fila['indice']].update(ok=True, id_alquiler=ids[fila['patente']])
+        return resultados, filas
+
+    SQL_ALQUILERES = """
             SELECT 
                 a.*, 
                 v.modelo, 
@@ -1400,6 +1795,10 @@ class DBManager:
             JOIN Persona p ON c.id_persona = p.id_persona
             JOIN Documento doc ON p.tipo_documento = doc.id_tipo
         """
+
+    def get_all_alquileres(self, id_persona_filtro=None):
+        # CORRECCIÓN: Incluir todos los datos del cliente
+        base_sql = self.SQL_ALQUILERES
         
         if id_persona_filtro:
             base_sql += """ 
@@ -1415,7 +1814,7 @@ class DBManager:
         conn = None
         lista = []
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return lista
             
             cursor = conn.cursor()
@@ -1425,11 +1824,51 @@ class DBManager:
                 lista.append(dict(row))
             return lista
         except sqlite3.Error as e:
-            print(f"Error al listar alquileres: {e}")
+            logger.error("Error al listar alquileres: %s", e)
             return []
         finally:
             if conn: conn.close()
 
+    def _filtros_alquiler(self, id_estado=None, desde=None, hasta=None, patente=None, id_usuario=None):
+        """SELECT y condiciones para listar alquileres filtrados (paginado o en streaming)."""
+        select = self.SQL_ALQUILERES
+        condiciones, params = [], []
+        if id_usuario is not None:
+            select += " JOIN Usuario u ON c.id_persona = u.id_persona"
+            condiciones.append("u.id_usuario = ?")
+            params.append(id_usuario)
+        if id_estado is not None:
+            condiciones.append("a.id_estado = ?")
+            params.append(id_estado)
+        if patente:
+            condiciones.append("a.patente = ?")
+            params.append(patente)
+        if desde:
+            condiciones.append("a.fecha_inicio >= ?")
+            params.append(normalizar_fecha(desde))
+        if hasta:
+            condiciones.append("a.fecha_inicio < ?")
+            params.append(normalizar_fecha(hasta))
+        return select, condiciones, params
+
+    def get_alquileres_pagina(self, after=None, limit=LIMITE_DEFAULT, **filtros):
+        """
+        Alquileres del más reciente al más antiguo, de a `limit`. Filtros opcionales:
+        id_estado, patente, fecha_inicio en [desde, hasta) y dueño (id_usuario del cliente).
+        """
+        select, condiciones, params = self._filtros_alquiler(**filtros)
+        orden = [("a.fecha_inicio", "fecha_inicio"), ("a.id_alquiler", "id_alquiler")]
+        return self._consultar_pagina(select, condiciones, params, orden, after, limit,
+                                      descendente=True, contexto="alquileres")
+
+    def iter_alquileres(self, **filtros):
+        """Como get_alquileres_pagina pero recorriendo todo el resultado de a lotes."""
+        select, condiciones, params = self._filtros_alquiler(**filtros)
+        if condiciones:
+            select += " WHERE " + " AND ".join(condiciones)
+        select += " ORDER BY a.fecha_inicio DESC, a.id_alquiler DESC"
+        return self._iterar(select, params, contexto="alquileres")
+
     def get_alquiler_by_id(self, id_alquiler):
         sql = """
             SELECT a.*, u.id_usuario
@@ -1440,13 +1879,13 @@ class DBManager:
         """
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return None
             row = conn.cursor().execute(sql, (id_alquiler,)).fetchone()
             if row:
                 return dict(row)
         except sqlite3.Error as e:
-            print(f"Error al obtener alquiler: {e}")
+            logger.error("Error al obtener alquiler: %s", e)
         finally:
             if conn: conn.close()
         return None
@@ -1460,9 +1899,16 @@ class DBManager:
             cursor = conn.cursor()
             cursor.execute(sql, (nuevo_id_estado, id_alquiler))
             conn.commit()
-            return cursor.rowcount > 0
+            self.reportes.invalidar()
+            actualizado = cursor.rowcount > 0
+            row = cursor.execute(
+                "SELECT patente FROM Alquiler WHERE id_alquiler = ?", (id_alquiler,)
+            ).fetchone()
+            if row:
+                self._refrescar_disponibilidad(conn, row['patente'])
+            return actualizado
         except sqlite3.Error as e:
-            print(f"Error al actualizar estado alquiler: {e}")
+            logger.error("Error al actualizar estado alquiler: %s", e)
             return False
         finally:
             if conn: conn.close()
@@ -1489,14 +1935,16 @@ class DBManager:
             cursor.execute("UPDATE Vehiculo SET id_estado = 1 WHERE patente = ?", (patente,))
 
             conn.commit()
+            self.reportes.invalidar()
+            self._refrescar_disponibilidad(conn, patente)
             return True
 
         except sqlite3.IntegrityError:
-            print(f"No se puede eliminar el alquiler {id_alquiler} (Probablemente tiene multas o daños asociados).")
+            logger.warning("No se puede eliminar el alquiler %s (Probablemente tiene multas o daños asociados).", id_alquiler)
             if conn: conn.rollback()
             return False
         except sqlite3.Error as e:
-            print(f"Error al eliminar alquiler: {e}")
+            logger.error("Error al eliminar alquiler: %s", e)
             if conn: conn.rollback()
             return False
         finally:
@@ -1525,10 +1973,12 @@ class DBManager:
             cursor.execute(sql_vehiculo, (patente,))
 
             conn.commit()
+            self.reportes.invalidar()
+            self._refrescar_disponibilidad(conn, patente)
             return True
 
         except (sqlite3.Error, ValueError) as e:
-            print(f"Error al finalizar/cancelar alquiler: {e}")
+            logger.error("Error al finalizar/cancelar alquiler: %s", e)
             if conn:
                 conn.rollback()
             return False
@@ -1544,13 +1994,72 @@ class DBManager:
             cursor = conn.cursor()
             cursor.execute(sql, (id_alquiler,))
             conn.commit()
+            self.reportes.invalidar()
             return cursor.rowcount > 0
         except sqlite3.Error as e:
-            print(f"Error al comenzar alquiler: {e}")
+            logger.error("Error al comenzar alquiler: %s", e)
             return False
         finally:
             if conn: conn.close()
 
+    # --- TRANSICIONES AUTOMÁTICAS (planificador) ---
+
+    # (nombre, UPDATE de todas las filas vencidas, estado que toma el vehículo o None,
+    # estados del vehículo desde los que puede tomarlo; si ya lo tenía, el UPDATE
+    # no cambia nada y no se avisa). Cada barrido toma todo lo atrasado de una
+    # vez: tras una caída la primera pasada pone todo al día
+    # y repetirla no cambia nada. El orden importa: un reservado que ya terminó
+    # pasa a Activo y enseguida a Atrasado. Un vehículo Ocupado no pasa a En
+    # mantenimiento (ni al revés) porque empiece lo otro: se deja y se avisa.
+    BARRIDOS = (
+        ('alquileres_iniciados',    # Reservado -> Activo (vehículo Ocupado desde Libre o Reservado; si ya estaba Ocupado, queda igual)
+         "UPDATE Alquiler SET id_estado = 2 WHERE id_estado = 1 AND fecha_inicio <= :ahora RETURNING patente",
+         2, (1, 2, 5)),
+        ('alquileres_atrasados',    # Activo -> Atrasado, pasado el día de fin (igual que marcar_alquiler_como_atrasado)
+         "UPDATE Alquiler SET id_estado = 3 WHERE id_estado = 2 AND fecha_fin < :hoy RETURNING patente",
+         None, ()),
+        ('mantenimientos_iniciados',    # Pendiente -> Realizando (vehículo En mantenimiento salvo que esté Ocupado; si ya lo estaba, queda igual)
+         "UPDATE Mantenimiento SET id_estado = 1 WHERE id_estado = 3 AND fecha_inicio <= :ahora RETURNING patente",
+         3, (1, 3, 4, 5)),
+    )
+
+    def barrer_transiciones(self, ahora=None):
+        """Corre los barridos en orden. Devuelve {barrido: filas cambiadas}."""
+        ahora = parsear_fecha(ahora or datetime.now())
+        return {barrido[0]: self.barrer_transicion(barrido[0], ahora) for barrido in self.BARRIDOS}
+
+    def barrer_transicion(self, nombre, ahora=None):
+        """Un barrido en su propia transacción. Devuelve las filas cambiadas; None si falló."""
+        _, sql, estado_vehiculo, compatibles = next(b for b in self.BARRIDOS if b[0] == nombre)
+        ahora = parsear_fecha(ahora or datetime.now())
+        parametros = {'ahora': normalizar_fecha(ahora), 'hoy': ahora.date().isoformat()}
+
+        def barrido(cursor):
+            filas = cursor.execute(sql, parametros).fetchall()
+            patentes = sorted({row['patente'] for row in filas})
+            if patentes and estado_vehiculo is not None:
+                actualizadas = {row['patente'] for row in cursor.execute(
+                    f"UPDATE Vehiculo SET id_estado = ? WHERE patente IN ({', '.join('?' * len(patentes))}) "
+                    f"AND id_estado IN ({', '.join('?' * len(compatibles))}) RETURNING patente",
+                    [estado_vehiculo] + patentes + list(compatibles)
+                ).fetchall()}
+                conflictos = [patente for patente in patentes if patente not in actualizadas]
+                if conflictos:
+                    logger.warning("Barrido %s: %d vehículo(s) ocupados por otro alquiler o mantenimiento, "
+                                   "se deja su estado: %s", nombre, len(conflictos), ', '.join(conflictos))
+            return len(filas)
+
+        def al_confirmar(conn, cambiadas):
+            # Origen y destino bloquean igual: el índice de disponibilidad no cambia
+            if cambiadas:
+                self.reportes.invalidar()
+
+        try:
+            return self._transaccion_inmediata(barrido, al_confirmar)
+        except sqlite3.Error as e:
+            logger.error("Error en el barrido %s: %s", nombre, e)
+            return None
+
     # --- FUNCIONES DE DANIO ---
 
     def create_danio(self, data):
@@ -1591,20 +2100,21 @@ class DBManager:
             alquiler = cursor.fetchone()
             
             if not alquiler:
-                print(f"Error: No se encontró el alquiler con ID {data['id_alquiler']}")
+                logger.error("Error: No se encontró el alquiler con ID %s", data['id_alquiler'])
                 return False
                 
             if alquiler[0] == 1:
-                print(f"Error: No se pueden registrar daños para alquileres en estado 'Reservado'")
+                logger.error("Error: No se pueden registrar daños para alquileres en estado 'Reservado'")
                 return False
             
             sql = "INSERT INTO Danio (id_alquiler, costo, detalle) VALUES (?, ?, ?)"
             cursor.execute(sql, (data['id_alquiler'], data['costo'], data['detalle']))
             conn.commit()
+            self.reportes.invalidar()
             return True
             
         except sqlite3.Error as e:
-            print(f"Error al crear daño: {e}")
+            logger.error("Error al crear daño: %s", e)
             return False
         finally:
             if conn: conn.close()
@@ -1613,12 +2123,12 @@ class DBManager:
         sql = "SELECT * FROM Danio WHERE id_alquiler = ?"
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return []
             rows = conn.cursor().execute(sql, (id_alquiler,)).fetchall()
             return [dict(row) for row in rows]
         except sqlite3.Error as e:
-            print(f"Error al obtener daños: {e}")
+            logger.error("Error al obtener daños: %s", e)
             return []
         finally:
             if conn: conn.close()
@@ -1632,9 +2142,10 @@ class DBManager:
             cursor = conn.cursor()
             cursor.execute(sql, (data['costo'], data['detalle'], id_danio))
             conn.commit()
+            self.reportes.invalidar()
             return cursor.rowcount > 0
         except sqlite3.Error as e:
-            print(f"Error al actualizar daño: {e}")
+            logger.error("Error al actualizar daño: %s", e)
             return False
         finally:
             if conn: conn.close()
@@ -1648,9 +2159,10 @@ class DBManager:
             cursor = conn.cursor()
             cursor.execute(sql, (id_danio,))
             conn.commit()
+            self.reportes.invalidar()
             return cursor.rowcount > 0
         except sqlite3.Error as e:
-            print(f"Error al eliminar daño: {e}")
+            logger.error("Error al eliminar daño: %s", e)
             return False
         finally:
             if conn: conn.close()
@@ -1699,11 +2211,11 @@ class DBManager:
             alquiler = cursor.fetchone()
             
             if not alquiler:
-                print(f"Error: No se encontró el alquiler con ID {data['alquiler_id']}")
+                logger.error("Error: No se encontró el alquiler con ID %s", data['alquiler_id'])
                 return False
                 
             if alquiler[0] == 1:  
-                print(f"Error: No se pueden registrar multas para alquileres en estado 'Reservado'")
+                logger.error("Error: No se pueden registrar multas para alquileres en estado 'Reservado'")
                 return False
 
             sql = "INSERT INTO Multa (alquiler_id, costo, detalle, fecha_multa) VALUES (?, ?, ?, ?)"
@@ -1711,13 +2223,14 @@ class DBManager:
                 data['alquiler_id'], 
                 data['costo'], 
                 data['detalle'], 
-                data['fecha_multa']
+                normalizar_fecha(data['fecha_multa'])
             ))
             conn.commit()
+            self.reportes.invalidar()
             return True
             
         except sqlite3.Error as e:
-            print(f"Error al crear multa: {e}")
+            logger.error("Error al crear multa: %s", e)
             return False
         finally:
             if conn: conn.close()
@@ -1726,12 +2239,12 @@ class DBManager:
         sql = "SELECT * FROM Multa WHERE alquiler_id = ?"
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return []
             rows = conn.cursor().execute(sql, (alquiler_id,)).fetchall()
             return [dict(row) for row in rows]
         except sqlite3.Error as e:
-            print(f"Error al obtener multas: {e}")
+            logger.error("Error al obtener multas: %s", e)
             return []
         finally:
             if conn: conn.close()
@@ -1746,13 +2259,14 @@ class DBManager:
             cursor.execute(sql, (
                 data['costo'], 
                 data['detalle'], 
-                data['fecha_multa'], 
+                normalizar_fecha(data['fecha_multa']), 
                 id_multa
             ))
             conn.commit()
+            self.reportes.invalidar()
             return cursor.rowcount > 0
         except sqlite3.Error as e:
-            print(f"Error al actualizar multa: {e}")
+            logger.error("Error al actualizar multa: %s", e)
             return False
         finally:
             if conn: conn.close()
@@ -1766,9 +2280,10 @@ class DBManager:
             cursor = conn.cursor()
             cursor.execute(sql, (id_multa,))
             conn.commit()
+            self.reportes.invalidar()
             return cursor.rowcount > 0
         except sqlite3.Error as e:
-            print(f"Error al eliminar multa: {e}")
+            logger.error("Error al eliminar multa: %s", e)
             return False
         finally:
             if conn: conn.close()
@@ -1782,21 +2297,20 @@ class DBManager:
             if conn is None: return False
             
             cursor = conn.cursor()
-            cursor.execute("BEGIN")
+            cursor.execute("BEGIN IMMEDIATE")
 
-            sql_check_alquiler = """
+            sql_check_alquiler = f"""
                 SELECT id_alquiler FROM Alquiler 
-                WHERE patente = ? 
-                AND id_estado IN (1, 2, 3)
-                AND (
-                    (fecha_inicio <= ? AND fecha_fin >= ?) 
-                )
+                WHERE patente = :patente 
+                AND id_estado IN {ESTADOS_ALQUILER_BLOQUEANTES}
+                AND {SQL_SUPERPOSICION}
             """
-            cursor.execute(sql_check_alquiler, (
-                data['patente'], 
-                data['fecha_fin'], 
-                data['fecha_inicio']
-            ))
+            rango = {
+                'patente': data['patente'],
+                'inicio': normalizar_fecha(data['fecha_inicio']),
+                'fin': normalizar_fecha(data['fecha_fin']),
+            }
+            cursor.execute(sql_check_alquiler, rango)
             
             if cursor.fetchone():
                 raise ValueError("El vehículo tiene alquileres programados en esas fechas.")
@@ -1830,18 +2344,19 @@ class DBManager:
             cursor.execute(sql_insert, (
                 data['patente'],
                 data['id_empleado'],
-                data['fecha_inicio'],
-                data['fecha_fin'],
+                rango['inicio'],
+                rango['fin'],
                 data['detalle'],
                 3 
             ))
 
             conn.commit()
+            self._refrescar_disponibilidad(conn, data['patente'])
             return True
 
         except sqlite3.Error as e:
             # DB-level errors (sqlite) -> log and return False
-            print(f"Error al programar mantenimiento (DB error): {e}")
+            logger.error("Error al programar mantenimiento (DB error): %s", e)
             if conn: conn.rollback()
             return False
         # NOTE: ValueError used as a business validation (overlapping rentals) should
@@ -1875,7 +2390,7 @@ class DBManager:
             conn.commit()
             return True
         except (sqlite3.Error, ValueError) as e:
-            print(f"Error al iniciar mantenimiento: {e}")
+            logger.error("Error al iniciar mantenimiento: %s", e)
             if conn: conn.rollback()
             return False
         finally:
@@ -1895,7 +2410,7 @@ class DBManager:
             if not row: raise ValueError("Mantenimiento no encontrado.")
             patente = row['patente']
 
-            fecha_real_fin = datetime.now()
+            fecha_real_fin = normalizar_fecha(datetime.now())
 
             sql_maint = "UPDATE Mantenimiento SET id_estado = 2, fecha_fin = ? WHERE id_mantenimiento = ? AND id_estado = 1"
             cursor.execute(sql_maint, (fecha_real_fin, id_mantenimiento))
@@ -1907,9 +2422,10 @@ class DBManager:
             cursor.execute(sql_vehiculo, (patente,))
 
             conn.commit()
+            self._refrescar_disponibilidad(conn, patente)
             return True
         except (sqlite3.Error, ValueError) as e:
-            print(f"Error al finalizar mantenimiento: {e}")
+            logger.error("Error al finalizar mantenimiento: %s", e)
             if conn: conn.rollback()
             return False
         finally:
@@ -1924,25 +2440,32 @@ class DBManager:
             cursor = conn.cursor()
             cursor.execute(sql, (id_mantenimiento,))
             conn.commit()
-            return cursor.rowcount > 0
+            cancelado = cursor.rowcount > 0
+            if cancelado:
+                row = cursor.execute(
+                    "SELECT patente FROM Mantenimiento WHERE id_mantenimiento = ?", (id_mantenimiento,)
+                ).fetchone()
+                self._refrescar_disponibilidad(conn, row['patente'])
+            return cancelado
         except sqlite3.Error as e:
-            print(f"Error al cancelar mantenimiento: {e}")
+            logger.error("Error al cancelar mantenimiento: %s", e)
             return False
         finally:
             if conn: conn.close()
 
-    def get_all_mantenimientos(self):
-        sql = """
+    SQL_MANTENIMIENTOS = """
             SELECT m.*, v.modelo, m.id_estado, em.descripcion as estado_desc
             FROM Mantenimiento m
             JOIN Vehiculo v ON m.patente = v.patente
             JOIN EstadoMantenimiento em ON m.id_estado = em.id_estado
-            ORDER BY m.fecha_inicio DESC
         """
+
+    def get_all_mantenimientos(self):
+        sql = self.SQL_MANTENIMIENTOS + " ORDER BY m.fecha_inicio DESC"
         conn = None
         lista = []
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return lista
             rows = conn.cursor().execute(sql).fetchall()
             
@@ -1950,11 +2473,41 @@ class DBManager:
                 lista.append(dict(row))
             return lista
         except sqlite3.Error as e:
-            print(f"Error al listar mantenimientos: {e}")
+            logger.error("Error al listar mantenimientos: %s", e)
             return []
         finally:
             if conn: conn.close()
 
+    def _filtros_mantenimiento(self, id_estado=None, desde=None, hasta=None, patente=None):
+        condiciones, params = [], []
+        if id_estado is not None:
+            condiciones.append("m.id_estado = ?")
+            params.append(id_estado)
+        if patente:
+            condiciones.append("m.patente = ?")
+            params.append(patente)
+        if desde:
+            condiciones.append("m.fecha_inicio >= ?")
+            params.append(normalizar_fecha(desde))
+        if hasta:
+            condiciones.append("m.fecha_inicio < ?")
+            params.append(normalizar_fecha(hasta))
+        return condiciones, params
+
+    def get_mantenimientos_pagina(self, after=None, limit=LIMITE_DEFAULT, **filtros):
+        condiciones, params = self._filtros_mantenimiento(**filtros)
+        orden = [("m.fecha_inicio", "fecha_inicio"), ("m.id_mantenimiento", "id_mantenimiento")]
+        return self._consultar_pagina(self.SQL_MANTENIMIENTOS, condiciones, params, orden, after, limit,
+                                      descendente=True, contexto="mantenimientos")
+
+    def iter_mantenimientos(self, **filtros):
+        condiciones, params = self._filtros_mantenimiento(**filtros)
+        sql = self.SQL_MANTENIMIENTOS
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        sql += " ORDER BY m.fecha_inicio DESC, m.id_mantenimiento DESC"
+        return self._iterar(sql, params, contexto="mantenimientos")
+
     def get_mantenimiento_by_id(self, id_mantenimiento):
         sql = """
             SELECT m.*, v.modelo, em.descripcion as estado_desc
@@ -1965,20 +2518,20 @@ class DBManager:
         """
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return None
             row = conn.cursor().execute(sql, (id_mantenimiento,)).fetchone()
             if row:
                 return dict(row)
             return None
         except sqlite3.Error as e:
-            print(f"Error al obtener mantenimiento: {e}")
+            logger.error("Error al obtener mantenimiento: %s", e)
             return None
         finally:
             if conn: conn.close()
 
     def delete_mantenimiento(self, id_mantenimiento):
-        sql_check = "SELECT id_estado FROM Mantenimiento WHERE id_mantenimiento = ?"
+        sql_check = "SELECT id_estado, patente FROM Mantenimiento WHERE id_mantenimiento = ?"
         sql_delete = "DELETE FROM Mantenimiento WHERE id_mantenimiento = ?"
         conn = None
         try:
@@ -1995,64 +2548,66 @@ class DBManager:
 
             cursor.execute(sql_delete, (id_mantenimiento,))
             conn.commit()
-            return cursor.rowcount > 0
+            eliminado = cursor.rowcount > 0
+            self._refrescar_disponibilidad(conn, row['patente'])
+            return eliminado
         except (sqlite3.Error, ValueError) as e:
-            print(f"Error al eliminar mantenimiento: {e}")
+            logger.error("Error al eliminar mantenimiento: %s", e)
             return False
         finally:
             if conn: conn.close()
 
     # --- REPORTES Y ESTADISTICAS ---
 
-    def get_report_alquileres_por_cliente(self, id_cliente):
-        sql = """
+    SQL_REPORTE_CLIENTE = f"""
             SELECT 
-                a.id_alquiler, a.fecha_inicio, a.fecha_fin, 
+                a.id_alquiler, a.fecha_inicio, a.fecha_fin, a.dias,
                 v.modelo, m.descripcion as marca, v.patente, v.precio_flota,
-                COALESCE((SELECT SUM(costo) FROM Multa WHERE alquiler_id = a.id_alquiler), 0) as total_multas,
-                COALESCE((SELECT SUM(costo) FROM Danio WHERE id_alquiler = a.id_alquiler), 0) as total_danios
+                {report_engine.SQL_CARGOS}
             FROM Alquiler a
             JOIN Vehiculo v ON a.patente = v.patente
             JOIN Marca m ON v.id_marca = m.id_marca
+            {report_engine.SQL_JOIN_CARGOS}
             WHERE a.id_cliente = ?
             ORDER BY a.fecha_inicio DESC
         """
+
+    @staticmethod
+    def _item_reporte_cliente(row):
+        costo_alquiler, costo_total = report_engine.costos(
+            row['dias'], row['precio_flota'], row['total_multas'], row['total_danios']
+        )
+        item = dict(row)
+        item['dias_alquilado'] = row['dias']
+        item['costo_alquiler_base'] = costo_alquiler
+        item['costo_final_total'] = costo_total
+        return item
+
+    @cacheado('alquileres_por_cliente')
+    def get_report_alquileres_por_cliente(self, id_cliente):
         conn = None
-        lista = []
         try:
-            conn = self._get_connection()
-            if conn is None: return lista
-            rows = conn.cursor().execute(sql, (id_cliente,)).fetchall()
-            
-            for row in rows:
-                fmt = '%Y-%m-%dT%H:%M:%S'
-                try:
-                    inicio = datetime.strptime(row['fecha_inicio'], fmt)
-                    fin = datetime.strptime(row['fecha_fin'], fmt)
-                except ValueError:
-                    # Fallback por si la fecha no tiene hora
-                    fmt_short = '%Y-%m-%d'
-                    inicio = datetime.strptime(row['fecha_inicio'][:10], fmt_short)
-                    fin = datetime.strptime(row['fecha_fin'][:10], fmt_short)
-
-                dias = (fin - inicio).days
-                if dias < 1: dias = 1
-                
-                costo_alquiler = dias * row['precio_flota']
-                costo_total = costo_alquiler + row['total_multas'] + row['total_danios']
+            conn = self._get_connection(readonly=True)
+            if conn is None: return []
+            tabla = report_engine.cargar(conn, self.SQL_REPORTE_CLIENTE, (id_cliente,))
 
-                item = dict(row)
-                item['dias_alquilado'] = dias
-                item['costo_alquiler_base'] = costo_alquiler
-                item['costo_final_total'] = costo_total
-                lista.append(item)
+            lista = tabla.filas()
+            for item in lista:
+                item['dias_alquilado'] = item['dias']
+                item['costo_alquiler_base'] = item.pop('total_alquiler')
+                item['costo_final_total'] = item.pop('total_general')
             return lista
         except Exception as e:
-            print(f"Error reporte cliente: {e}")
+            logger.error("Error reporte cliente: %s", e)
             return []
         finally:
             if conn: conn.close()
 
+    def iter_report_alquileres_por_cliente(self, id_cliente):
+        return self._iterar(self.SQL_REPORTE_CLIENTE, (id_cliente,),
+                            convertir=self._item_reporte_cliente, contexto="reporte de cliente")
+
+    @cacheado('ranking_vehiculos')
     def get_report_ranking_vehiculos(self, fecha_desde, fecha_hasta):
         sql = """
             SELECT v.patente, v.modelo, m.descripcion as marca, COUNT(a.id_alquiler) as cantidad_alquileres
@@ -2065,16 +2620,17 @@ class DBManager:
         """
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return []
             rows = conn.cursor().execute(sql, (fecha_desde, fecha_hasta)).fetchall()
             return [dict(row) for row in rows]
         except Exception as e:
-            print(f"Error reporte ranking: {e}")
+            logger.error("Error reporte ranking: %s", e)
             return []
         finally:
             if conn: conn.close()
 
+    @cacheado('evolucion_temporal')
     def get_report_evolucion_temporal(self, fecha_desde, fecha_hasta):
         sql = """
             SELECT strftime('%Y-%m', fecha_inicio) as periodo, COUNT(id_alquiler) as total_alquileres
@@ -2085,72 +2641,69 @@ class DBManager:
         """
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return []
             rows = conn.cursor().execute(sql, (fecha_desde, fecha_hasta)).fetchall()
             return [dict(row) for row in rows]
         except Exception as e:
-            print(f"Error reporte evolución: {e}")
+            logger.error("Error reporte evolución: %s", e)
             return []
         finally:
             if conn: conn.close()
 
-    def get_report_facturacion_mensual(self, fecha_desde, fecha_hasta):
-        # Solo alquileres FINALIZADOS (id_estado = 4)
-        sql = """
-            SELECT 
-                strftime('%Y-%m', a.fecha_fin) as periodo,
-                a.fecha_inicio, a.fecha_fin, v.precio_flota
-            FROM Alquiler a
-            JOIN Vehiculo v ON a.patente = v.patente
-            WHERE a.id_estado = 4 
-            AND a.fecha_fin >= ? AND a.fecha_fin <= ?
-            ORDER BY periodo ASC
+    # Etiqueta del período según la agrupación pedida (sobre FacturacionMensual.periodo = 'YYYY-MM')
+    # Mismas etiquetas que report_engine.PERIODOS: 'YYYY-MM', 'YYYY-N' (N = trimestre) y 'YYYY'
+    PERIODOS_FACTURACION = {
+        'mensual': "periodo",
+        'trimestral': "substr(periodo, 1, 4) || '-' || ((CAST(substr(periodo, 6, 2) AS INTEGER) + 2) / 3)",
+        'anual': "substr(periodo, 1, 4)",
+    }
+
+    @cacheado('facturacion_mensual')
+    def get_report_facturacion_mensual(self, fecha_desde, fecha_hasta, agrupacion='mensual'):
+        """
+        Facturación de alquileres FINALIZADOS por mes de fecha_fin, leída de la tabla
+        de hechos FacturacionMensual (migración 4): unas pocas filas por período en
+        lugar de recorrer cada alquiler. El rango se toma por meses completos.
+        """
+        expr_periodo = self.PERIODOS_FACTURACION.get(agrupacion)
+        if expr_periodo is None:
+            raise ValueError("Agrupación inválida. Use 'mensual', 'trimestral' o 'anual'")
+
+        sql = f"""
+            SELECT {expr_periodo} as periodo,
+                SUM(alquileres) as alquileres,
+                SUM(total_alquiler) as total_facturado,
+                SUM(total_multas) as total_multas,
+                SUM(total_danios) as total_danios
+            FROM FacturacionMensual
+            WHERE periodo >= strftime('%Y-%m', ?) AND periodo <= strftime('%Y-%m', ?)
+            GROUP BY 1
+            ORDER BY 1
         """
         conn = None
-        facturacion_por_mes = {}
-        
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return []
             rows = conn.cursor().execute(sql, (fecha_desde, fecha_hasta)).fetchall()
-            
+            resultado = []
             for row in rows:
-                periodo = row['periodo']
-                
-                fmt = '%Y-%m-%dT%H:%M:%S'
-                try:
-                    inicio = datetime.strptime(row['fecha_inicio'], fmt)
-                    fin = datetime.strptime(row['fecha_fin'], fmt)
-                except ValueError:
-                    fmt_short = '%Y-%m-%d'
-                    inicio = datetime.strptime(row['fecha_inicio'][:10], fmt_short)
-                    fin = datetime.strptime(row['fecha_fin'][:10], fmt_short)
-
-                dias = (fin - inicio).days
-                if dias < 1: dias = 1
-                
-                total_row = (dias * row['precio_flota'])
-                
-                if periodo in facturacion_por_mes:
-                    facturacion_por_mes[periodo] += total_row
-                else:
-                    facturacion_por_mes[periodo] = total_row
-            
-            resultado = [{"periodo": k, "total_facturado": v} for k, v in facturacion_por_mes.items()]
-            resultado.sort(key=lambda x: x['periodo'])
+                item = dict(row)
+                # Los triggers suman y restan: redondear evita arrastrar restos de coma flotante
+                for campo in ('total_facturado', 'total_multas', 'total_danios'):
+                    item[campo] = round(item[campo], 2)
+                resultado.append(item)
             return resultado
 
         except Exception as e:
-            print(f"Error reporte facturación: {e}")
+            logger.error("Error reporte facturación: %s", e)
             return []
         finally:
             if conn: conn.close()
 
     # Funciones específicas para PDF
 
-    def get_detailed_client_rentals_report(self, fecha_desde, fecha_hasta):
-        sql = """
+    SQL_DETALLE_CLIENTES = f"""
             SELECT 
                 -- Datos del cliente
                 c.id_cliente,
@@ -2161,127 +2714,154 @@ class DBManager:
                 a.id_alquiler,
                 a.fecha_inicio,
                 a.fecha_fin,
-                -- CÁLCULO CORREGIDO: días enteros (mínimo 1 día)
-                CASE 
-                    WHEN (JULIANDAY(a.fecha_fin) - JULIANDAY(a.fecha_inicio)) < 1 THEN 1
-                    ELSE CAST((JULIANDAY(a.fecha_fin) - JULIANDAY(a.fecha_inicio)) AS INTEGER)
-                END as dias,
+                -- Días enteros (mínimo 1), columna generada de Alquiler
+                a.dias,
                 v.modelo,
                 m.descripcion as marca,
                 v.patente,
                 v.precio_flota,
                 
-                -- Total por alquiler individual CORREGIDO
-                (v.precio_flota * 
-                    CASE 
-                        WHEN (JULIANDAY(a.fecha_fin) - JULIANDAY(a.fecha_inicio)) < 1 THEN 1
-                        ELSE CAST((JULIANDAY(a.fecha_fin) - JULIANDAY(a.fecha_inicio)) AS INTEGER)
-                    END
-                ) as total_alquiler,
-                
-                -- Multas asociadas al alquiler
-                COALESCE((
-                    SELECT SUM(multa.costo) 
-                    FROM Multa multa 
-                    WHERE multa.alquiler_id = a.id_alquiler
-                ), 0) as total_multas,
-                
-                -- Daños asociados al alquiler  
-                COALESCE((
-                    SELECT SUM(danio.costo) 
-                    FROM Danio danio 
-                    WHERE danio.id_alquiler = a.id_alquiler
-                ), 0) as total_danios,
-                
-                -- Total por cliente (para la fila principal) CORREGIDO
-                SUM(v.precio_flota * 
-                    CASE 
-                        WHEN (JULIANDAY(a.fecha_fin) - JULIANDAY(a.fecha_inicio)) < 1 THEN 1
-                        ELSE CAST((JULIANDAY(a.fecha_fin) - JULIANDAY(a.fecha_inicio)) AS INTEGER)
-                    END
-                ) OVER (PARTITION BY c.id_cliente) as total_cliente
+                -- Multas y daños asociados al alquiler (los totales los calcula report_engine)
+                {report_engine.SQL_CARGOS}
                 
             FROM Alquiler a
             JOIN Cliente c ON a.id_cliente = c.id_cliente
             JOIN Persona p ON c.id_persona = p.id_persona
             JOIN Vehiculo v ON a.patente = v.patente
             JOIN Marca m ON v.id_marca = m.id_marca
+            {report_engine.SQL_JOIN_CARGOS}
             WHERE a.id_estado = 4  -- Solo alquileres finalizados
             AND a.fecha_inicio BETWEEN ? AND ?
-            ORDER BY cliente, a.fecha_inicio DESC
+            ORDER BY cliente, c.id_cliente, a.fecha_inicio DESC, a.id_alquiler DESC
         """
-        
+
+    # Mismo reporte para report_engine: solo columnas de Alquiler (sin JOIN por fila);
+    # vehículos y clientes se cargan una vez y se unen en memoria
+    SQL_HECHOS_DETALLE = f"""
+            SELECT a.id_cliente, a.id_alquiler, a.fecha_inicio, a.fecha_fin, a.dias, a.patente,
+                {report_engine.SQL_CARGOS}
+            FROM Alquiler a
+            {report_engine.SQL_JOIN_CARGOS}
+            WHERE a.id_estado = 4 AND a.fecha_inicio BETWEEN ? AND ?
+            ORDER BY a.id_cliente, a.fecha_inicio DESC, a.id_alquiler DESC
+        """
+    SQL_DIMENSION_VEHICULOS = """
+            SELECT v.patente, v.modelo, m.descripcion, v.precio_flota
+            FROM Vehiculo v JOIN Marca m ON v.id_marca = m.id_marca
+        """
+    SQL_DIMENSION_CLIENTES = """
+            SELECT c.id_cliente, p.nombre || ' ' || p.apellido, p.nro_documento
+            FROM Cliente c JOIN Persona p ON c.id_persona = p.id_persona
+            WHERE c.id_cliente IN (SELECT value FROM json_each(?))
+        """
+
+    CAMPOS_DETALLE_ALQUILER = ('fecha_inicio', 'fecha_fin', 'dias', 'modelo', 'marca', 'patente', 'precio_flota',
+                               'total_alquiler', 'total_multas', 'total_danios', 'total_general')
+
+    @staticmethod
+    def _alquiler_detalle_cliente(row):
+        total_alquiler, total_general = report_engine.costos(
+            row['dias'], row['precio_flota'], row['total_multas'], row['total_danios']
+        )
+        return {
+            'fecha_inicio': row['fecha_inicio'],
+            'fecha_fin': row['fecha_fin'],
+            'dias': row['dias'],
+            'modelo': row['modelo'],
+            'marca': row['marca'],
+            'patente': row['patente'],
+            'precio_flota': row['precio_flota'],
+            'total_alquiler': total_alquiler,
+            'total_multas': row['total_multas'],
+            'total_danios': row['total_danios'],
+            'total_general': total_general
+        }
+
+    @cacheado('detalle_clientes')
+    def get_detailed_client_rentals_report(self, fecha_desde, fecha_hasta):
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return []
-            rows = conn.cursor().execute(sql, [fecha_desde, fecha_hasta]).fetchall()
-            
-            # Agrupar por cliente
+            tabla = report_engine.cargar(conn, self.SQL_HECHOS_DETALLE, (fecha_desde, fecha_hasta))
+            tabla.unir('patente', report_engine.dimension(conn, self.SQL_DIMENSION_VEHICULOS),
+                       ('modelo', 'marca', 'precio_flota'))
+
+            ids = tabla.columna('id_cliente')
+            clientes = report_engine.dimension(conn, self.SQL_DIMENSION_CLIENTES, (json.dumps(sorted(set(ids))),))
+            totales = tabla.agrupar(ids, campos=('total_alquiler',))
+
+            # Agrupar por cliente (las filas de cada cliente llegan juntas)
             clientes_dict = {}
-            for row in rows:
-                cliente_id = row['id_cliente']
-                
+            for cliente_id, alquiler in zip(ids, tabla.filas(self.CAMPOS_DETALLE_ALQUILER)):
+                if cliente_id not in clientes:
+                    continue
                 if cliente_id not in clientes_dict:
+                    nombre, nro_documento = clientes[cliente_id]
                     clientes_dict[cliente_id] = {
-                        'cliente': row['cliente'],
-                        'nro_documento': row['nro_documento'],
-                        'total_facturado': row['total_cliente'],
+                        'cliente': nombre,
+                        'nro_documento': nro_documento,
+                        'total_facturado': totales[cliente_id]['total_alquiler'],
                         'alquileres': []
                     }
-                
-                # Agregar alquiler individual
-                clientes_dict[cliente_id]['alquileres'].append({
-                    'fecha_inicio': row['fecha_inicio'],
-                    'fecha_fin': row['fecha_fin'],
-                    'dias': row['dias'],
-                    'modelo': row['modelo'],
-                    'marca': row['marca'],
-                    'patente': row['patente'],
-                    'precio_flota': row['precio_flota'],
-                    'total_alquiler': row['total_alquiler'],
-                    'total_multas': row['total_multas'],
-                    'total_danios': row['total_danios'],
-                    'total_general': row['total_alquiler'] + row['total_multas'] + row['total_danios']
-                })
-            
-            return list(clientes_dict.values())
+                clientes_dict[cliente_id]['alquileres'].append(alquiler)
+
+            # Mismo orden que el reporte en streaming: por nombre del cliente
+            orden = sorted(clientes_dict, key=lambda cliente_id: (clientes_dict[cliente_id]['cliente'], cliente_id))
+            return [clientes_dict[cliente_id] for cliente_id in orden]
             
         except Exception as e:
-            print(f"Error en reporte detallado por cliente: {e}")
+            logger.error("Error en reporte detallado por cliente: %s", e)
             return []
         finally:
             if conn: conn.close()
 
+    def iter_detailed_client_rentals_report(self, fecha_desde, fecha_hasta):
+        """
+        Mismo resultado que get_detailed_client_rentals_report, un cliente por vez.
+        Las filas de cada cliente llegan juntas y en memoria solo se arma el
+        grupo actual; su total se acumula a medida que pasan sus alquileres.
+        """
+        filas = self._iterar(self.SQL_DETALLE_CLIENTES, (fecha_desde, fecha_hasta), convertir=lambda row: row,
+                             contexto="reporte detallado por cliente")
+
+        def grupos():
+            actual, id_actual = None, None
+            try:
+                for row in filas:
+                    if row['id_cliente'] != id_actual:
+                        if actual is not None:
+                            yield actual
+                        id_actual = row['id_cliente']
+                        actual = {
+                            'cliente': row['cliente'],
+                            'nro_documento': row['nro_documento'],
+                            'total_facturado': 0,
+                            'alquileres': []
+                        }
+                    alquiler = self._alquiler_detalle_cliente(row)
+                    actual['total_facturado'] += alquiler['total_alquiler']
+                    actual['alquileres'].append(alquiler)
+                if actual is not None:
+                    yield actual
+            finally:
+                # Devuelve la conexión aunque el cliente corte la descarga
+                filas.close()
+        return grupos()
+
+    @cacheado('alquileres_por_periodo')
     def get_rentals_by_period_report(self, periodo_tipo='mensual', fecha_desde=None, fecha_hasta=None):
-        # Definir formato según el tipo de período
-        format_map = {
-            'mensual': "strftime('%Y-%m', fecha_inicio)", 
-            'trimestral': "strftime('%Y-') || ((strftime('%m', fecha_inicio) - 1) / 3 + 1)",
-            'anual': "strftime('%Y', fecha_inicio)"
-        }
-        
-        periodo_format = format_map.get(periodo_tipo.lower(), format_map['mensual'])
+        # Tipo de período: mensual ('YYYY-MM'), trimestral ('YYYY-N', N = trimestre) o anual ('YYYY')
+        tipo = periodo_tipo.lower()
+        if tipo not in report_engine.PERIODOS:
+            tipo = 'mensual'
         
+        # SQLite suma por mes (la unidad más chica) y el motor arma el período pedido
         sql = f"""
-            SELECT 
-                {periodo_format} as periodo,
-                COUNT(id_alquiler) as total_alquileres,
-                SUM(
-                    v.precio_flota * 
-                    CASE 
-                        -- CÁLCULO CORREGIDO: días enteros (mínimo 1 día)
-                        WHEN (JULIANDAY(a.fecha_fin) - JULIANDAY(a.fecha_inicio)) < 1 THEN 1
-                        ELSE CAST((JULIANDAY(a.fecha_fin) - JULIANDAY(a.fecha_inicio)) AS INTEGER)
-                    END
-                ) as ingresos_totales,
-                AVG(
-                    CASE 
-                        -- CÁLCULO CORREGIDO: días enteros para el promedio también
-                        WHEN (JULIANDAY(a.fecha_fin) - JULIANDAY(a.fecha_inicio)) < 1 THEN 1
-                        ELSE CAST((JULIANDAY(a.fecha_fin) - JULIANDAY(a.fecha_inicio)) AS INTEGER)
-                    END
-                ) as duracion_promedio
+            SELECT substr(a.fecha_inicio, 1, 7) as mes,
+                COUNT(*) as cantidad,
+                SUM(a.dias) as dias,
+                {report_engine.SQL_TOTAL_ALQUILER} as total_alquiler
             FROM Alquiler a
             JOIN Vehiculo v ON a.patente = v.patente
             WHERE a.id_estado = 4
@@ -2292,16 +2872,22 @@ class DBManager:
             sql += " AND fecha_inicio BETWEEN ? AND ?"
             params.extend([fecha_desde, fecha_hasta])
         
-        sql += f" GROUP BY {periodo_format} ORDER BY periodo"
+        sql += " GROUP BY mes"
         
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return []
-            rows = conn.cursor().execute(sql, params).fetchall()
-            return [dict(row) for row in rows]
+            tabla = report_engine.cargar(conn, sql, params)
+            grupos = tabla.agrupar(tabla.periodos('mes', tipo))
+            return [{
+                'periodo': periodo,
+                'total_alquileres': grupo['cantidad'],
+                'ingresos_totales': grupo['total_alquiler'],
+                'duracion_promedio': grupo['dias'] / grupo['cantidad'],
+            } for periodo, grupo in sorted(grupos.items())]
         except Exception as e:
-            print(f"Error en reporte por período: {e}")
+            logger.error("Error en reporte por período: %s", e)
             return []
         finally:
             if conn: conn.close()
@@ -2331,12 +2917,12 @@ class DBManager:
         """
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return []
             rows = conn.cursor().execute(sql, (id_usuario,)).fetchall()
             return [dict(row) for row in rows]
         except sqlite3.Error as e:
-            print(f"Error al obtener alquileres por usuario: {e}")
+            logger.error("Error al obtener alquileres por usuario: %s", e)
             return []
         finally:
             if conn: conn.close()
@@ -2346,16 +2932,36 @@ class DBManager:
         sql = "SELECT COUNT(*) as count FROM Vehiculo WHERE id_estado = 1"
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return 0
             row = conn.cursor().execute(sql).fetchone()
             return row['count'] if row else 0
         except sqlite3.Error as e:
-            print(f"Error al contar vehículos disponibles: {e}")
+            logger.error("Error al contar vehículos disponibles: %s", e)
             return 0
         finally:
             if conn: conn.close()
 
+    def get_contadores_dashboard(self):
+        """
+        Totales mantenidos por triggers (migración 2): {entidad: {id_estado: total}}.
+        Lee una tabla de pocas filas, sin importar el tamaño de la flota o del historial.
+        """
+        sql = "SELECT entidad, id_estado, total FROM ContadorDashboard"
+        conn = None
+        try:
+            conn = self._get_connection(readonly=True)
+            if conn is None: return None
+            contadores = {}
+            for row in conn.cursor().execute(sql).fetchall():
+                contadores.setdefault(row['entidad'], {})[row['id_estado']] = row['total']
+            return contadores
+        except sqlite3.Error as e:
+            logger.error("Error al obtener contadores del dashboard: %s", e)
+            return None
+        finally:
+            if conn: conn.close()
+
 
     def get_cliente_por_usuario(self, id_usuario):
         sql = """
@@ -2366,7 +2972,7 @@ class DBManager:
         """
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return None
             
             cursor = conn.cursor()
@@ -2376,7 +2982,7 @@ class DBManager:
             return row[0] if row else None
             
         except sqlite3.Error as e:
-            print(f"Error al obtener cliente por usuario: {e}")
+            logger.error("Error al obtener cliente por usuario: %s", e)
             return None
         finally:
             if conn: conn.close()
@@ -2390,14 +2996,14 @@ class DBManager:
         """
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return None
             row = conn.cursor().execute(sql, (id_usuario,)).fetchone()
             if row:
                 return {"id_empleado": row['id_empleado'], "id_persona": row['id_persona']}
             return None
         except sqlite3.Error as e:
-            print(f"Error obteniendo empleado por usuario: {e}")
+            logger.error("Error obteniendo empleado por usuario: %s", e)
             return None
         finally:
             if conn: conn.close()
@@ -2415,12 +3021,12 @@ class DBManager:
         """
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return []
             rows = conn.cursor().execute(sql, (id_empleado, limite)).fetchall()
             return [dict(row) for row in rows]
         except sqlite3.Error as e:
-            print(f"Error obteniendo alquileres por empleado: {e}")
+            logger.error("Error obteniendo alquileres por empleado: %s", e)
             return []
         finally:
             if conn: conn.close()
@@ -2438,7 +3044,7 @@ class DBManager:
         """
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None: return None
             
             row = conn.cursor().execute(sql, (id_usuario,)).fetchone()
@@ -2456,7 +3062,7 @@ class DBManager:
                     "id_tipo_documento": row['tipo_documento']
                 }
         except sqlite3.Error as e:
-            print(f"Error al obtener persona por usuario: {e}")
+            logger.error("Error al obtener persona por usuario: %s", e)
         finally:
             if conn:
                 conn.close()
@@ -2486,9 +3092,11 @@ class DBManager:
                 id_persona
             ))
             conn.commit()
+            self.reportes.invalidar()
+            self.user_cache.invalidate_persona(id_persona)
             return cursor.rowcount > 0
         except sqlite3.Error as e:
-            print(f"Error al actualizar persona: {e}")
+            logger.error("Error al actualizar persona: %s", e)
             if conn:
                 conn.rollback()
             return False
@@ -2499,12 +3107,12 @@ class DBManager:
     def create_empleado(self, persona_data, usuario_data, role_data):
         conn = self._get_connection()
         if conn is None:
-            print("Error: no se pudo abrir conexión a la BD.")
+            logger.error("Error: no se pudo abrir conexión a la BD.")
             return None
 
         # Verificar mail duplicado
         if self.get_user_data_for_login_by_mail(persona_data['mail']):
-            print(f"Error: el mail {persona_data['mail']} ya está registrado.")
+            logger.error("Error: el mail %s ya está registrado.", persona_data['mail'])
             return None
 
         try:
@@ -2558,57 +3166,73 @@ class DBManager:
             return cursor.lastrowid
 
         except Exception as e:
-            print("Error insertando empleado:", e)
+            logger.error("Error insertando empleado: %s", e)
             conn.rollback()
             return None
 
         finally:
             conn.close()
 
-    def get_all_empleados(self):
-        sql = """
+    SQL_EMPLEADOS = """
             SELECT e.id_empleado, e.id_persona, p.nombre, p.apellido, p.mail, p.telefono,
                 p.nro_documento, p.fecha_nac, e.fecha_alta, e.sueldo, p.tipo_documento, e.horario
             FROM Empleado e
             JOIN Persona p ON e.id_persona = p.id_persona
         """
+
+    @staticmethod
+    def _fila_a_empleado(row):
+        return {
+            "id_empleado": row["id_empleado"],
+            "id_persona": row["id_persona"],
+            "nombre": row["nombre"],
+            "apellido": row["apellido"],
+            "mail": row["mail"],
+            "telefono": row["telefono"],
+            "nro_documento": row["nro_documento"],
+            "fecha_nacimiento": str(row["fecha_nac"]),
+            "fecha_alta": str(row["fecha_alta"]),
+            "sueldo": row["sueldo"],
+            "tipo_documento": row["tipo_documento"],
+            "horario": row["horario"]
+        }
+
+    def get_all_empleados(self):
         conn = None
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(readonly=True)
             if conn is None:
                 return []
 
             cursor = conn.cursor()
-            cursor.execute(sql)
+            cursor.execute(self.SQL_EMPLEADOS)
             rows = cursor.fetchall()
 
-            empleados = []
-            for row in rows:
-                empleados.append({
-                    "id_empleado": row["id_empleado"],
-                    "id_persona": row["id_persona"],
-                    "nombre": row["nombre"],
-                    "apellido": row["apellido"],
-                    "mail": row["mail"],
-                    "telefono": row["telefono"],
-                    "nro_documento": row["nro_documento"],
-                    "fecha_nacimiento": str(row["fecha_nac"]),
-                    "fecha_alta": str(row["fecha_alta"]),
-                    "sueldo": row["sueldo"],
-                    "tipo_documento": row["tipo_documento"],
-                    "horario": row["horario"]
-                })
-
-            return empleados
+            return [self._fila_a_empleado(row) for row in rows]
 
         except Exception as e:
-            print(f"Error obteniendo empleados: {e}")
+            logger.error("Error obteniendo empleados: %s", e)
             return []
 
         finally:
             if conn:
                 conn.close()
 
+    def get_empleados_pagina(self, after=None, limit=LIMITE_DEFAULT):
+        orden = [("p.apellido", "apellido"), ("p.nombre", "nombre"), ("p.id_persona", "id_persona")]
+        return self._consultar_pagina(self.SQL_EMPLEADOS, [], [], orden, after, limit,
+                                      convertir=self._fila_a_empleado, contexto="empleados")
+
+    def buscar_empleados(self, texto, after=None, limit=LIMITE_DEFAULT):
+        """Como buscar_clientes, sobre los empleados (diccionarios como get_all_empleados)."""
+        return self._buscar_personas(
+            'Empleado',
+            """e.id_empleado, e.id_persona, p.nombre, p.apellido, p.mail, p.telefono,
+                p.nro_documento, p.fecha_nac, e.fecha_alta, e.sueldo, p.tipo_documento, e.horario""",
+            "JOIN Empleado e ON e.id_persona = p.id_persona",
+            texto, after, limit, self._fila_a_empleado, "búsqueda de empleados"
+        )
+
     def update_employee_full(self, id_empleado, persona_data, role_data):
         conn = None
         cursor = None
@@ -2656,7 +3280,7 @@ class DBManager:
             return True
 
         except Exception as e:
-            print("ERROR update_employee_full:", e)
+            logger.error("ERROR update_employee_full: %s", e)
             if conn:
                 conn.rollback()
             return False
@@ -2682,7 +3306,7 @@ class DBManager:
             ).fetchone()
 
             if not row:
-                print("Error: Empleado no encontrado.")
+                logger.error("Error: Empleado no encontrado.")
                 return False
 
             id_persona = row["id_persona"]
@@ -2699,17 +3323,18 @@ class DBManager:
             cursor.execute("DELETE FROM Persona WHERE id_persona = ?", (id_persona,))
 
             conn.commit()
+            self.user_cache.invalidate_persona(id_persona)
             return True
 
         except sqlite3.IntegrityError:
-            print(f"Error de integridad: No se puede eliminar. "
-                f"El empleado (ID: {id_empleado}) probablemente tiene alquileres asociados.")
+            logger.error("Error de integridad: No se puede eliminar. "
+                         "El empleado (ID: %s) probablemente tiene alquileres asociados.", id_empleado)
             if conn:
                 conn.rollback()
             return False
 
         except (sqlite3.Error, ValueError) as e:
-            print(f"Error al eliminar empleado: {e}")
+            logger.error("Error al eliminar empleado: %s", e)
             if conn:
                 conn.rollback()
             return False
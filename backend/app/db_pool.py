@@ -0,0 +1,222 @@
+import sqlite3
+import threading
+import time
+from collections import deque
+
+import metrics
+
+
+# Perfiles de almacenamiento: PRAGMAs que se aplican a cada conexión nueva.
+# - 'compatible': modo rollback-journal por defecto de SQLite (comportamiento original).
+# - 'wal': los lectores no bloquean al escritor ni viceversa.
+STORAGE_PROFILES = {
+    'compatible': {
+        'journal_mode': None,
+        'synchronous': None,
+        'cache_size': None,
+        'mmap_size': None,
+        'temp_store': None,
+    },
+    'wal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -20000,       # negativo = KiB (~20 MB por conexión)
+        'mmap_size': 268435456,     # 256 MB
+        'temp_store': 'MEMORY',
+    },
+}
+
+
+def apply_storage_profile(conn, profile, readonly=False):
+    """Aplica los PRAGMAs del perfil. Las conexiones de lectura quedan en query_only."""
+    if isinstance(profile, str):
+        profile = STORAGE_PROFILES[profile]
+
+    # journal_mode es persistente en el archivo: lo fija solo el escritor
+    if profile.get('journal_mode') and not readonly:
+        conn.execute(f"PRAGMA journal_mode = {profile['journal_mode']};")
+    for pragma in ('synchronous', 'cache_size', 'mmap_size', 'temp_store'):
+        valor = profile.get(pragma)
+        if valor is not None:
+            conn.execute(f"PRAGMA {pragma} = {valor};")
+    if readonly:
+        conn.execute("PRAGMA query_only = ON;")
+
+
+def base_ocupada(error):
+    """True si el error es SQLITE_BUSY / SQLITE_LOCKED: otra conexión tiene tomada la base."""
+    codigo = getattr(error, 'sqlite_errorcode', None)
+    if codigo is not None:
+        return codigo & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    mensaje = str(error)
+    return isinstance(error, sqlite3.OperationalError) and ('locked' in mensaje or 'busy' in mensaje)
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    Conexión SQLite que, en lugar de cerrarse, vuelve al pool del que salió.
+
+    El resto de DBManager sigue usando el patrón `conn.close()` en el
+    `finally`, por lo que el pool es transparente para los métodos existentes.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool = None
+
+    # Todas las consultas pasan por cursor(): con métricas activas se miden
+    def cursor(self, factory=None):
+        if factory is None:
+            factory = metrics.CursorMedido if metrics.METRICS_ENABLED else sqlite3.Cursor
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def close(self):
+        if self._pool is None:
+            super().close()
+        else:
+            self._pool.release(self)
+
+    def really_close(self):
+        self._pool = None
+        super().close()
+
+
+class ConnectionPool:
+    """
+    Pool acotado de conexiones SQLite ya configuradas.
+
+    - Como máximo `max_size` conexiones abiertas a la vez.
+    - Si un hilo ya tiene una conexión tomada y vuelve a pedir una (llamadas
+      anidadas, ej: create_vehiculo -> get_marca_by_id), recibe la misma
+      conexión en lugar de ocupar otra. Así el pool no se agota solo.
+    - Si no hay conexiones libres, el hilo espera hasta `timeout` segundos.
+    """
+
+    def __init__(self, db_path, max_size=5, timeout=10.0, setup=None, name=None):
+        self.db_path = db_path
+        self.name = name
+        self._etiquetas_metricas = (('pool', name),)
+        self.max_size = max_size
+        self.timeout = timeout
+        self._setup = setup
+
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._idle = deque()
+        self._size = 0
+        self._local = threading.local()
+
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+
+    def _new_connection(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            factory=PooledConnection,
+            check_same_thread=False,
+            timeout=self.timeout,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON;")
+        if self._setup:
+            self._setup(conn)
+        return conn
+
+    def acquire(self):
+        held = getattr(self._local, 'held', None)
+        if held is not None:
+            # Reentrada del mismo hilo: se reutiliza la conexión que ya tiene
+            self._local.depth += 1
+            with self._lock:
+                self._checkouts += 1
+            return held
+
+        conn = None
+        inicio = time.perf_counter()
+        with self._available:
+            self._checkouts += 1
+            if not self._idle and self._size >= self.max_size:
+                self._waits += 1
+                deadline = time.monotonic() + self.timeout
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise sqlite3.OperationalError(
+                            "Pool de conexiones agotado: no hay conexiones libres."
+                        )
+                    self._available.wait(remaining)
+
+            if self._idle:
+                conn = self._idle.popleft()
+            else:
+                # Reservamos el lugar antes de conectar para respetar el límite
+                self._size += 1
+
+        if conn is None:
+            try:
+                conn = self._new_connection()
+            except sqlite3.Error:
+                with self._available:
+                    self._size -= 1
+                    self._available.notify()
+                raise
+
+        conn._pool = self
+        self._local.held = conn
+        self._local.depth = 1
+        if self.name and metrics.METRICS_ENABLED:
+            metrics.REGISTRO.observar_clave('alquileres_db_acquire_duration_seconds',
+                                            self._etiquetas_metricas, time.perf_counter() - inicio)
+        return conn
+
+    def held_by_current_thread(self):
+        return getattr(self._local, 'held', None) is not None
+
+    def release(self, conn):
+        if getattr(self._local, 'held', None) is conn:
+            self._local.depth -= 1
+            if self._local.depth > 0:
+                return
+            self._local.held = None
+
+        # Nunca devolver al pool una conexión con una transacción a medias
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = sqlite3.Row
+        except sqlite3.Error:
+            conn.really_close()
+            with self._available:
+                self._size -= 1
+                self._available.notify()
+            return
+
+        with self._available:
+            self._idle.append(conn)
+            self._available.notify()
+
+    def close_all(self):
+        with self._available:
+            while self._idle:
+                self._idle.popleft().really_close()
+                self._size -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+            }
@@ -0,0 +1,39 @@
+from datetime import date, datetime
+
+
+# ============================================================
+# FECHAS DE ALQUILERES, MANTENIMIENTOS Y MULTAS
+# ============================================================
+# En la base todas las fechas se guardan como texto ISO sin microsegundos
+# ni zona horaria: 'YYYY-MM-DDTHH:MM:SS'. Así se comparan y ordenan como
+# strings (y por índice) sin convertir nada. Toda conversión pasa por acá.
+
+FORMATO_FECHA = '%Y-%m-%dT%H:%M:%S'
+
+# Patrón GLOB de SQLite que cumple una fecha ya normalizada
+GLOB_FECHA = '[0-9][0-9][0-9][0-9]-[0-1][0-9]-[0-3][0-9]T[0-2][0-9]:[0-5][0-9]:[0-5][0-9]'
+
+# Días cobrados de un alquiler: días enteros, mínimo 1 (igual que dias_alquiler)
+SQL_DIAS = "MAX(1, CAST(julianday(fecha_fin) - julianday(fecha_inicio) AS INTEGER))"
+
+
+def parsear_fecha(valor):
+    """datetime, date o texto ISO ('T' o espacio, con o sin hora) -> datetime sin zona."""
+    if isinstance(valor, datetime):
+        fecha = valor
+    elif isinstance(valor, date):
+        fecha = datetime(valor.year, valor.month, valor.day)
+    else:
+        fecha = datetime.fromisoformat(str(valor).strip())
+    return fecha.replace(microsecond=0, tzinfo=None)
+
+
+def normalizar_fecha(valor):
+    """Devuelve la fecha como texto ISO 'YYYY-MM-DDTHH:MM:SS' (comparable como string)."""
+    if valor is None:
+        return None
+    return parsear_fecha(valor).isoformat()
+
+
+def dias_alquiler(fecha_inicio, fecha_fin):
+    return max(1, (parsear_fecha(fecha_fin) - parsear_fecha(fecha_inicio)).days)
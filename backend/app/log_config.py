@@ -0,0 +1,113 @@
+"""
+Logging de la aplicación.
+
+Los módulos piden su logger con obtener_logger("db_manager") y registran con
+formato diferido (logger.info("... %s", valor)): si el nivel está apagado el
+mensaje ni siquiera se arma. configurar_logging() pone un QueueHandler en el
+logger raíz de la aplicación: el hilo del request solo encola el registro y
+un hilo aparte (QueueListener) lo escribe, así la salida no frena requests.
+
+Cada registro lleva el id del request (X-Request-ID) que lo originó.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import time
+import uuid
+
+# Nivel (DEBUG, INFO, WARNING, ERROR) y formato ('texto' o 'json') de la salida
+LOG_LEVEL = os.environ.get('ALQUILERES_LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.environ.get('ALQUILERES_LOG_FORMAT', 'texto').lower()
+
+RAIZ = 'alquileres'
+FORMATO_TEXTO = '%(asctime)s %(levelname)s [%(id_request)s] %(name)s: %(message)s'
+
+# Un id recibido del cliente solo se acepta si es corto y sin caracteres raros
+ID_VALIDO = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+_id_request = contextvars.ContextVar('id_request', default='-')
+_listener = None
+
+
+def obtener_logger(nombre):
+    """Logger hijo del de la aplicación: 'db_manager' -> 'alquileres.db_manager'."""
+    return logging.getLogger(f"{RAIZ}.{nombre}")
+
+
+def iniciar_request(id_recibido=None):
+    """Fija el id del request actual (el recibido si es válido, o uno nuevo) y lo devuelve."""
+    id_request = id_recibido if id_recibido and ID_VALIDO.match(id_recibido) else uuid.uuid4().hex[:16]
+    _id_request.set(id_request)
+    return id_request
+
+
+def terminar_request():
+    _id_request.set('-')
+
+
+def id_request_actual():
+    return _id_request.get()
+
+
+class FiltroIdRequest(logging.Filter):
+    """Agrega record.id_request. Corre en el hilo que registra, donde el id es el correcto."""
+
+    def filter(self, record):
+        record.id_request = _id_request.get()
+        return True
+
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro, para herramientas que agregan logs."""
+
+    def format(self, record):
+        datos = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created)) + f'.{int(record.msecs):03d}',
+            'nivel': record.levelname,
+            'logger': record.name,
+            'id_request': getattr(record, 'id_request', '-'),
+            'mensaje': record.getMessage(),
+        }
+        if record.exc_info:
+            datos['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False)
+
+
+def configurar_logging(nivel=LOG_LEVEL, formato=LOG_FORMAT, destino=None):
+    """
+    Configura el logger de la aplicación una sola vez (las llamadas siguientes
+    no hacen nada). `destino` es el stream de salida; por defecto, stderr.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    salida = logging.StreamHandler(destino or sys.stderr)
+    salida.setFormatter(FormatoJSON() if formato == 'json' else logging.Formatter(FORMATO_TEXTO))
+
+    cola = queue.SimpleQueue()
+    encolador = logging.handlers.QueueHandler(cola)
+    encolador.addFilter(FiltroIdRequest())
+
+    raiz = logging.getLogger(RAIZ)
+    raiz.setLevel(getattr(logging, nivel, logging.INFO))
+    raiz.addHandler(encolador)
+    raiz.propagate = False
+
+    _listener = logging.handlers.QueueListener(cola, salida)
+    _listener.start()
+    atexit.register(detener_logging)
+
+
+def detener_logging():
+    """Escribe lo que quede en la cola y detiene el hilo de salida."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
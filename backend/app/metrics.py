@@ -0,0 +1,278 @@
+"""
+Métricas de la aplicación, expuestas en formato de texto de Prometheus (/api/_metrics).
+
+- Latencia por ruta (hooks de Flask en api.py).
+- Tiempo y filas por sentencia SQL: las conexiones de los pools usan
+  CursorMedido, que suma el tiempo de execute() y de los fetch*() de cada
+  sentencia y lo registra cuando la sentencia termina.
+- Espera para obtener una conexión de cada pool.
+- Opcional: log de consultas lentas con su EXPLAIN QUERY PLAN.
+"""
+import functools
+import os
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from log_config import obtener_logger
+
+logger = obtener_logger('metrics')
+
+# ALQUILERES_METRICS=0 apaga la medición de SQL; ALQUILERES_SLOW_QUERY_MS > 0 activa el log de lentas
+METRICS_ENABLED = os.environ.get('ALQUILERES_METRICS', '1') != '0'
+SLOW_QUERY_MS = float(os.environ.get('ALQUILERES_SLOW_QUERY_MS', 0))
+# Si está definido, /api/_metrics también acepta este token en X-Metrics-Token (para el scraper)
+METRICS_TOKEN = os.environ.get('ALQUILERES_METRICS_TOKEN')
+
+# Límites de los histogramas, en segundos
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Sentencias distintas que se miden por separado; las demás se suman en 'otras'
+MAX_SENTENCIAS = 500
+LARGO_SENTENCIA = 200
+
+HISTOGRAMAS = {
+    'alquileres_http_request_duration_seconds': 'Duración de los requests por ruta (sin el cuerpo en streaming)',
+    'alquileres_db_query_duration_seconds': 'Tiempo por sentencia SQL: ejecución más lectura de sus filas',
+    'alquileres_db_acquire_duration_seconds': 'Espera para obtener una conexión del pool',
+    'alquileres_scheduler_sweep_duration_seconds': 'Duración de cada barrido del planificador de estados',
+}
+CONTADORES = {
+    'alquileres_http_requests_total': 'Requests respondidos por ruta y código de estado',
+    'alquileres_db_query_rows_total': 'Filas leídas por sentencia SQL',
+    'alquileres_db_slow_queries_total': 'Sentencias que superaron ALQUILERES_SLOW_QUERY_MS',
+    'alquileres_scheduler_transitions_total': 'Filas que cambiaron de estado, por barrido del planificador',
+    'alquileres_scheduler_errors_total': 'Barridos del planificador que fallaron',
+}
+
+
+@functools.lru_cache(maxsize=2048)
+def normalizar_sentencia(sql):
+    """Una línea, listas IN (?, ?, ...) colapsadas y largo acotado: sirve de etiqueta."""
+    texto = ' '.join(sql.split())
+    texto = re.sub(r'\(\s*\?(?:\s*,\s*\?)+\s*\)', '(?, ...)', texto)
+    return texto[:LARGO_SENTENCIA]
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _etiquetas(pares):
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{clave}="{_escapar(valor)}"' for clave, valor in pares) + '}'
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class RegistroMetricas:
+    """
+    Histogramas y contadores con etiquetas, más colectores que aportan valores
+    del momento (estado de los pools y caches) al exportar.
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histogramas = {nombre: {} for nombre in HISTOGRAMAS}  # nombre -> etiquetas -> [conteos, suma, cantidad]
+        self._contadores = {nombre: {} for nombre in CONTADORES}    # nombre -> etiquetas -> valor
+        self._colectores = {}
+        self._sentencias = set()
+        self._claves_sql = {}       # SQL tal como llega -> etiquetas ya armadas
+
+    def observar(self, nombre, valor, **etiquetas):
+        self.observar_clave(nombre, tuple(sorted(etiquetas.items())), valor)
+
+    def sumar(self, nombre, valor=1, **etiquetas):
+        self.sumar_clave(nombre, tuple(sorted(etiquetas.items())), valor)
+
+    def observar_clave(self, nombre, clave, valor):
+        indice = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._histogramas[nombre].get(clave)
+            if serie is None:
+                serie = self._histogramas[nombre][clave] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def sumar_clave(self, nombre, clave, valor=1):
+        with self._lock:
+            self._contadores[nombre][clave] = self._contadores[nombre].get(clave, 0) + valor
+
+    def clave_sentencia(self, sql):
+        """Etiquetas de una sentencia; se arman una vez por texto de SQL."""
+        clave = self._claves_sql.get(sql)
+        if clave is not None:
+            return clave
+        sentencia = normalizar_sentencia(sql)
+        with self._lock:
+            if sentencia not in self._sentencias:
+                if len(self._sentencias) >= MAX_SENTENCIAS:
+                    sentencia = 'otras'
+                else:
+                    self._sentencias.add(sentencia)
+            clave = (('sentencia', sentencia),)
+            if len(self._claves_sql) < 4 * MAX_SENTENCIAS:
+                self._claves_sql[sql] = clave
+        return clave
+
+    def registrar_colector(self, nombre, funcion):
+        """
+        `funcion()` devuelve [(métrica, tipo, ayuda, [(etiquetas, valor), ...])].
+        Registrar otra vez con el mismo nombre reemplaza al anterior.
+        """
+        with self._lock:
+            self._colectores[nombre] = funcion
+
+    def reiniciar(self):
+        with self._lock:
+            for series in self._histogramas.values():
+                series.clear()
+            for series in self._contadores.values():
+                series.clear()
+            self._sentencias.clear()
+            self._claves_sql.clear()
+
+    def exportar(self):
+        with self._lock:
+            histogramas = {nombre: {clave: (list(s[0]), s[1], s[2]) for clave, s in series.items()}
+                           for nombre, series in self._histogramas.items()}
+            contadores = {nombre: dict(series) for nombre, series in self._contadores.items()}
+            colectores = list(self._colectores.values())
+
+        lineas = []
+        for nombre, series in histogramas.items():
+            lineas += [f'# HELP {nombre} {HISTOGRAMAS[nombre]}', f'# TYPE {nombre} histogram']
+            for clave, (conteos, suma, cantidad) in sorted(series.items()):
+                acumulado = 0
+                for limite, conteo in zip(self.buckets + ('+Inf',), conteos):
+                    acumulado += conteo
+                    lineas.append(f'{nombre}_bucket{_etiquetas(clave + (("le", limite),))} {acumulado}')
+                lineas.append(f'{nombre}_sum{_etiquetas(clave)} {_numero(suma)}')
+                lineas.append(f'{nombre}_count{_etiquetas(clave)} {cantidad}')
+        for nombre, series in contadores.items():
+            lineas += [f'# HELP {nombre} {CONTADORES[nombre]}', f'# TYPE {nombre} counter']
+            for clave, valor in sorted(series.items()):
+                lineas.append(f'{nombre}{_etiquetas(clave)} {_numero(valor)}')
+        for colector in colectores:
+            try:
+                for nombre, tipo, ayuda, muestras in colector():
+                    lineas += [f'# HELP {nombre} {ayuda}', f'# TYPE {nombre} {tipo}']
+                    for etiquetas, valor in muestras:
+                        lineas.append(f'{nombre}{_etiquetas(tuple(sorted(etiquetas.items())))} {_numero(valor)}')
+            except Exception as e:
+                logger.error("Error en un colector de métricas: %s", e)
+        return '\n'.join(lineas) + '\n'
+
+
+REGISTRO = RegistroMetricas()
+
+
+class CursorMedido(sqlite3.Cursor):
+    """
+    Cursor que mide cada sentencia: ejecución más lectura de filas.
+
+    La sentencia se registra al terminar: cuando un fetch agota el resultado,
+    al ejecutar otra con el mismo cursor o al liberarse el cursor.
+    """
+
+    _sentencia = None
+
+    def execute(self, sql, parameters=()):
+        self._terminar()
+        self._empezar(sql, parameters)
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._medir(time.perf_counter() - inicio, 0)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._terminar()
+        self._empezar(sql, None)
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._medir(time.perf_counter() - inicio, 0)
+            self._terminar()
+
+    def fetchone(self):
+        inicio = time.perf_counter()
+        fila = super().fetchone()
+        self._medir(time.perf_counter() - inicio, 0 if fila is None else 1)
+        if fila is None:
+            self._terminar()
+        return fila
+
+    def fetchmany(self, size=None):
+        tamanio = self.arraysize if size is None else size
+        inicio = time.perf_counter()
+        filas = super().fetchmany(tamanio)
+        self._medir(time.perf_counter() - inicio, len(filas))
+        if len(filas) < tamanio:
+            self._terminar()
+        return filas
+
+    def fetchall(self):
+        inicio = time.perf_counter()
+        filas = super().fetchall()
+        self._medir(time.perf_counter() - inicio, len(filas))
+        self._terminar()
+        return filas
+
+    def close(self):
+        self._terminar()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._terminar()
+        except Exception:
+            pass
+
+    def _empezar(self, sql, parameters):
+        self._sentencia = sql
+        self._parametros = parameters
+        self._tiempo = 0.0
+        self._filas = 0
+        self._lenta = False
+
+    def _medir(self, segundos, filas):
+        if self._sentencia is None:
+            return
+        self._tiempo += segundos
+        self._filas += filas
+        # Se registra mientras la conexión sigue en manos de este hilo
+        if SLOW_QUERY_MS and not self._lenta and self._tiempo * 1000 >= SLOW_QUERY_MS:
+            self._lenta = True
+            self._registrar_lenta()
+
+    def _terminar(self):
+        if self._sentencia is None:
+            return
+        clave = REGISTRO.clave_sentencia(self._sentencia)
+        REGISTRO.observar_clave('alquileres_db_query_duration_seconds', clave, self._tiempo)
+        if self._filas:
+            REGISTRO.sumar_clave('alquileres_db_query_rows_total', clave, self._filas)
+        self._sentencia = None
+
+    def _registrar_lenta(self):
+        REGISTRO.sumar_clave('alquileres_db_slow_queries_total', REGISTRO.clave_sentencia(self._sentencia))
+        plan = 'sin plan (executemany)'
+        if self._parametros is not None:
+            try:
+                # Cursor común: el EXPLAIN no se mide ni se vuelve a reportar
+                filas = sqlite3.Cursor(self.connection).execute(
+                    f"EXPLAIN QUERY PLAN {self._sentencia}", self._parametros
+                ).fetchall()
+                plan = ' | '.join(str(fila[3]) for fila in filas) or '-'
+            except sqlite3.Error as e:
+                plan = f'sin plan ({e})'
+        logger.warning("Consulta lenta (%.1f ms, %d filas hasta ahora): %s -- plan: %s",
+                       self._tiempo * 1000, self._filas, normalizar_sentencia(self._sentencia), plan)
@@ -0,0 +1,619 @@
+import sqlite3
+from datetime import datetime
+
+from availability_index import ESTADOS_ALQUILER_BLOQUEANTES
+from fechas import GLOB_FECHA, SQL_DIAS, normalizar_fecha
+from log_config import obtener_logger
+import credenciales
+
+logger = obtener_logger('migrations')
+
+# ============================================================
+# MIGRACIONES DE ESQUEMA VERSIONADAS
+# ============================================================
+# Cada migración es una función que recibe un cursor y se aplica una sola
+# vez, dentro de su propia transacción. Las versiones aplicadas quedan
+# registradas en la tabla Migracion. Para agregar una nueva: escribir la
+# función y sumarla al final de MIGRACIONES con la versión siguiente.
+
+
+def _tabla_existe(cursor, tabla):
+    row = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (tabla,)
+    ).fetchone()
+    return row is not None
+
+
+def _columnas(cursor, tabla):
+    return {row[1] for row in cursor.execute(f"PRAGMA table_info({tabla})").fetchall()}
+
+
+def _crear_indice(cursor, nombre, tabla, columnas):
+    # Las bases mínimas (tests, scripts) pueden no tener todas las tablas
+    if not _tabla_existe(cursor, tabla):
+        return False
+    if not set(columnas) <= _columnas(cursor, tabla):
+        return False
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} ({', '.join(columnas)})")
+    return True
+
+
+# --- 001: índices de búsqueda ---
+
+INDICES_BUSQUEDA = [
+    # Alquiler: por cliente / empleado (listados y dashboard, ordenados por fecha)
+    ('idx_alquiler_cliente_inicio', 'Alquiler', ('id_cliente', 'fecha_inicio')),
+    ('idx_alquiler_empleado_inicio', 'Alquiler', ('id_empleado', 'fecha_inicio')),
+    # Alquiler: chequeo de superposición por vehículo
+    ('idx_alquiler_patente_estado', 'Alquiler', ('patente', 'id_estado', 'fecha_inicio', 'fecha_fin')),
+    # Alquiler: reportes por rango de fechas
+    ('idx_alquiler_inicio', 'Alquiler', ('fecha_inicio',)),
+    ('idx_alquiler_estado_inicio', 'Alquiler', ('id_estado', 'fecha_inicio')),
+    ('idx_alquiler_estado_fin', 'Alquiler', ('id_estado', 'fecha_fin')),
+    # Multas y daños por alquiler
+    ('idx_multa_alquiler', 'Multa', ('alquiler_id',)),
+    ('idx_danio_alquiler', 'Danio', ('id_alquiler',)),
+    # Login por mail y joins Persona <-> Usuario/Cliente
+    ('idx_persona_mail', 'Persona', ('mail',)),
+    ('idx_usuario_persona', 'Usuario', ('id_persona',)),
+    ('idx_cliente_persona', 'Cliente', ('id_persona',)),
+    # Mantenimiento: chequeo de superposición por vehículo
+    ('idx_mantenimiento_patente_estado', 'Mantenimiento', ('patente', 'id_estado', 'fecha_inicio', 'fecha_fin')),
+    # Conteo de vehículos por estado (dashboard)
+    ('idx_vehiculo_estado', 'Vehiculo', ('id_estado',)),
+]
+
+
+def _m001_indices_busqueda(cursor):
+    for nombre, tabla, columnas in INDICES_BUSQUEDA:
+        _crear_indice(cursor, nombre, tabla, columnas)
+
+
+# --- 002: contadores del dashboard ---
+
+# entidad -> (tabla, columna de estado o None). Los triggers mantienen
+# ContadorDashboard dentro de la misma transacción que modifica la tabla,
+# así que cualquier mutador (DBManager, scripts, sqlite3) lo deja consistente.
+CONTADORES_DASHBOARD = {
+    'vehiculo': ('Vehiculo', 'id_estado'),
+    'alquiler': ('Alquiler', 'id_estado'),
+    'mantenimiento': ('Mantenimiento', 'id_estado'),
+    'cliente': ('Cliente', None),
+}
+
+
+def _crear_contador(cursor, entidad, tabla, columna):
+    if not _tabla_existe(cursor, tabla):
+        return False
+    if columna and columna not in _columnas(cursor, tabla):
+        return False
+    nuevo = f"NEW.{columna}" if columna else "0"
+    viejo = f"OLD.{columna}" if columna else "0"
+    sumar = f"""
+        INSERT INTO ContadorDashboard (entidad, id_estado, total) VALUES ('{entidad}', {nuevo}, 1)
+        ON CONFLICT (entidad, id_estado) DO UPDATE SET total = total + 1;"""
+    restar = f"""
+        UPDATE ContadorDashboard SET total = total - 1
+        WHERE entidad = '{entidad}' AND id_estado = {viejo};"""
+
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_contador_{entidad}_ins "
+                   f"AFTER INSERT ON {tabla} BEGIN {sumar} END")
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_contador_{entidad}_del "
+                   f"AFTER DELETE ON {tabla} BEGIN {restar} END")
+    if columna:
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_contador_{entidad}_upd "
+                       f"AFTER UPDATE OF {columna} ON {tabla} "
+                       f"WHEN OLD.{columna} IS NOT NEW.{columna} BEGIN {restar} {sumar} END")
+
+    # Carga inicial con lo que ya existe
+    if columna:
+        cursor.execute(f"""
+            INSERT INTO ContadorDashboard (entidad, id_estado, total)
+            SELECT '{entidad}', {columna}, COUNT(*) FROM {tabla} GROUP BY {columna}
+        """)
+    else:
+        cursor.execute(f"""
+            INSERT INTO ContadorDashboard (entidad, id_estado, total)
+            SELECT '{entidad}', 0, COUNT(*) FROM {tabla}
+        """)
+    return True
+
+
+def _m002_contadores_dashboard(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ContadorDashboard (
+            entidad TEXT NOT NULL,
+            id_estado INTEGER NOT NULL,
+            total INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (entidad, id_estado)
+        )
+    """)
+    for entidad, (tabla, columna) in CONTADORES_DASHBOARD.items():
+        _crear_contador(cursor, entidad, tabla, columna)
+
+
+# --- 003: índices para listados paginados ---
+
+INDICES_LISTADOS = [
+    # Clientes y empleados se listan por apellido y nombre
+    ('idx_persona_apellido_nombre', 'Persona', ('apellido', 'nombre')),
+    # Mantenimientos del más reciente al más antiguo
+    ('idx_mantenimiento_inicio', 'Mantenimiento', ('fecha_inicio',)),
+]
+
+
+def _m003_indices_listados(cursor):
+    for nombre, tabla, columnas in INDICES_LISTADOS:
+        _crear_indice(cursor, nombre, tabla, columnas)
+
+
+# --- 004: tabla de hechos de facturación ---
+
+# Una fila por (mes de fecha_fin, patente, cliente) con lo facturado por los
+# alquileres FINALIZADOS (id_estado = 4): cantidad, días, días * precio_flota,
+# multas y daños. Los triggers suman o restan la contribución de un alquiler
+# cada vez que entra o sale del estado 4, o cambian sus multas, daños o el
+# precio del vehículo; reconstruir_facturacion() la recalcula desde cero.
+
+def _dias(alias):
+    # Misma regla que los reportes en Python: días enteros, mínimo 1
+    return (f"MAX(1, COALESCE(CAST(julianday({alias}.fecha_fin) - julianday({alias}.fecha_inicio) "
+            f"AS INTEGER), 1))")
+
+
+def _clave_facturacion(alias):
+    return f"strftime('%Y-%m', {alias}.fecha_fin), {alias}.patente, {alias}.id_cliente"
+
+
+def _sumar_alquiler(alias):
+    return f"""
+        INSERT INTO FacturacionMensual
+            (periodo, patente, id_cliente, alquileres, dias, total_alquiler, total_multas, total_danios)
+        SELECT {_clave_facturacion(alias)}, 1, {_dias(alias)}, {_dias(alias)} * v.precio_flota,
+            COALESCE((SELECT SUM(costo) FROM Multa WHERE alquiler_id = {alias}.id_alquiler), 0),
+            COALESCE((SELECT SUM(costo) FROM Danio WHERE id_alquiler = {alias}.id_alquiler), 0)
+        FROM Vehiculo v
+        WHERE v.patente = {alias}.patente AND {alias}.id_estado = 4
+        ON CONFLICT (periodo, patente, id_cliente) DO UPDATE SET
+            alquileres = alquileres + excluded.alquileres,
+            dias = dias + excluded.dias,
+            total_alquiler = total_alquiler + excluded.total_alquiler,
+            total_multas = total_multas + excluded.total_multas,
+            total_danios = total_danios + excluded.total_danios;"""
+
+
+def _restar_alquiler(alias):
+    return f"""
+        UPDATE FacturacionMensual SET
+            alquileres = alquileres - 1,
+            dias = dias - {_dias(alias)},
+            total_alquiler = total_alquiler - {_dias(alias)} *
+                COALESCE((SELECT precio_flota FROM Vehiculo WHERE patente = {alias}.patente), 0),
+            total_multas = total_multas -
+                COALESCE((SELECT SUM(costo) FROM Multa WHERE alquiler_id = {alias}.id_alquiler), 0),
+            total_danios = total_danios -
+                COALESCE((SELECT SUM(costo) FROM Danio WHERE id_alquiler = {alias}.id_alquiler), 0)
+        WHERE (periodo, patente, id_cliente) = ({_clave_facturacion(alias)}) AND {alias}.id_estado = 4;
+        DELETE FROM FacturacionMensual
+        WHERE (periodo, patente, id_cliente) = ({_clave_facturacion(alias)}) AND alquileres <= 0;"""
+
+
+def _ajustar_cargo(columna_total, id_alquiler, costo):
+    # Multas y daños de un alquiler finalizado se suman a la fila de ese alquiler
+    return f"""
+        UPDATE FacturacionMensual SET {columna_total} = {columna_total} + ({costo})
+        WHERE (periodo, patente, id_cliente) = (
+            SELECT strftime('%Y-%m', fecha_fin), patente, id_cliente
+            FROM Alquiler WHERE id_alquiler = {id_alquiler} AND id_estado = 4
+        );"""
+
+
+def reconstruir_facturacion(cursor):
+    """Recalcula FacturacionMensual desde Alquiler, Vehiculo, Multa y Danio."""
+    cursor.execute("DELETE FROM FacturacionMensual")
+    cursor.execute(f"""
+        INSERT INTO FacturacionMensual
+            (periodo, patente, id_cliente, alquileres, dias, total_alquiler, total_multas, total_danios)
+        SELECT {_clave_facturacion('a')}, COUNT(*), SUM({_dias('a')}), SUM({_dias('a')} * v.precio_flota),
+            COALESCE(SUM(mu.total), 0), COALESCE(SUM(da.total), 0)
+        FROM Alquiler a
+        JOIN Vehiculo v ON v.patente = a.patente
+        LEFT JOIN (SELECT alquiler_id, SUM(costo) AS total FROM Multa GROUP BY alquiler_id) mu
+            ON mu.alquiler_id = a.id_alquiler
+        LEFT JOIN (SELECT id_alquiler, SUM(costo) AS total FROM Danio GROUP BY id_alquiler) da
+            ON da.id_alquiler = a.id_alquiler
+        WHERE a.id_estado = 4
+        GROUP BY 1, 2, 3
+    """)
+
+
+def _m004_facturacion_mensual(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS FacturacionMensual (
+            periodo TEXT NOT NULL,
+            patente TEXT NOT NULL,
+            id_cliente INTEGER NOT NULL,
+            alquileres INTEGER NOT NULL DEFAULT 0,
+            dias INTEGER NOT NULL DEFAULT 0,
+            total_alquiler REAL NOT NULL DEFAULT 0,
+            total_multas REAL NOT NULL DEFAULT 0,
+            total_danios REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (periodo, patente, id_cliente)
+        )
+    """)
+    # Los triggers leen las cuatro tablas: sin alguna (bases mínimas) no se instalan
+    if not all(_tabla_existe(cursor, t) for t in ('Alquiler', 'Vehiculo', 'Multa', 'Danio')):
+        return
+
+    cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_facturacion_alquiler_ins
+        AFTER INSERT ON Alquiler WHEN NEW.id_estado = 4
+        BEGIN {_sumar_alquiler('NEW')} END""")
+    cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_facturacion_alquiler_upd
+        AFTER UPDATE OF id_estado, fecha_inicio, fecha_fin, patente, id_cliente ON Alquiler
+        WHEN OLD.id_estado = 4 OR NEW.id_estado = 4
+        BEGIN {_restar_alquiler('OLD')} {_sumar_alquiler('NEW')} END""")
+    cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_facturacion_alquiler_del
+        BEFORE DELETE ON Alquiler WHEN OLD.id_estado = 4
+        BEGIN {_restar_alquiler('OLD')} END""")
+
+    for tabla, columna, total in (('Multa', 'alquiler_id', 'total_multas'), ('Danio', 'id_alquiler', 'total_danios')):
+        nombre = tabla.lower()
+        cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_facturacion_{nombre}_ins
+            AFTER INSERT ON {tabla}
+            BEGIN {_ajustar_cargo(total, f'NEW.{columna}', 'NEW.costo')} END""")
+        cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_facturacion_{nombre}_upd
+            AFTER UPDATE OF costo, {columna} ON {tabla}
+            BEGIN {_ajustar_cargo(total, f'OLD.{columna}', '-OLD.costo')}
+                  {_ajustar_cargo(total, f'NEW.{columna}', 'NEW.costo')} END""")
+        cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_facturacion_{nombre}_del
+            AFTER DELETE ON {tabla}
+            BEGIN {_ajustar_cargo(total, f'OLD.{columna}', '-OLD.costo')} END""")
+
+    # El total del alquiler sigue al precio actual del vehículo, como el reporte original
+    cursor.execute("""CREATE TRIGGER IF NOT EXISTS trg_facturacion_precio_upd
+        AFTER UPDATE OF precio_flota ON Vehiculo
+        BEGIN
+            UPDATE FacturacionMensual
+            SET total_alquiler = total_alquiler + (NEW.precio_flota - OLD.precio_flota) * dias
+            WHERE patente = NEW.patente;
+        END""")
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_facturacion_cliente ON FacturacionMensual (id_cliente, periodo)")
+    reconstruir_facturacion(cursor)
+
+
+# --- 005: fechas normalizadas y columna generada de días ---
+
+# Columnas de fecha que se normalizan a 'YYYY-MM-DDTHH:MM:SS'
+COLUMNAS_FECHA = {
+    'Alquiler': ('fecha_inicio', 'fecha_fin'),
+    'Mantenimiento': ('fecha_inicio', 'fecha_fin'),
+    'Multa': ('fecha_multa',),
+}
+
+
+def _normalizar_columna(cursor, tabla, columna):
+    filas = cursor.execute(
+        f"SELECT rowid, {columna} FROM {tabla} WHERE {columna} NOT GLOB ?", (GLOB_FECHA,)
+    ).fetchall()
+    for rowid, valor in filas:
+        try:
+            nuevo = normalizar_fecha(valor)
+        except ValueError:
+            # Se deja como está para revisarlo a mano: no se inventan fechas
+            logger.warning("%s.%s con fecha ilegible en rowid %s: %r", tabla, columna, rowid, valor)
+            continue
+        cursor.execute(f"UPDATE {tabla} SET {columna} = ? WHERE rowid = ?", (nuevo, rowid))
+
+
+def _m005_fechas_normalizadas(cursor):
+    for tabla, columnas in COLUMNAS_FECHA.items():
+        if not _tabla_existe(cursor, tabla):
+            continue
+        existentes = _columnas(cursor, tabla)
+        for columna in columnas:
+            if columna in existentes:
+                _normalizar_columna(cursor, tabla, columna)
+
+    if _tabla_existe(cursor, 'Alquiler') and 'dias' not in _columnas(cursor, 'Alquiler'):
+        # VIRTUAL: ALTER TABLE no puede agregar columnas STORED. Con las fechas
+        # normalizadas julianday() no tiene que adivinar formatos.
+        cursor.execute(f"ALTER TABLE Alquiler ADD COLUMN dias INTEGER GENERATED ALWAYS AS ({SQL_DIAS}) VIRTUAL")
+
+    # A partir de acá ninguna escritura puede dejar una fecha con otro formato
+    for tabla in ('Alquiler', 'Mantenimiento'):
+        if not _tabla_existe(cursor, tabla):
+            continue
+        condicion = (f"NEW.fecha_inicio NOT GLOB '{GLOB_FECHA}' OR NEW.fecha_fin NOT GLOB '{GLOB_FECHA}'")
+        for evento in ('INSERT', 'UPDATE OF fecha_inicio, fecha_fin'):
+            sufijo = 'ins' if evento == 'INSERT' else 'upd'
+            cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_fecha_{tabla.lower()}_{sufijo}
+                BEFORE {evento} ON {tabla} WHEN {condicion}
+                BEGIN SELECT RAISE(ABORT, 'Fecha no normalizada en {tabla} (se espera YYYY-MM-DDTHH:MM:SS)'); END""")
+
+
+# --- 006: cargos (multas y daños) por alquiler ---
+
+# Una fila por alquiler que tenga multas o daños, con sus totales y la cantidad
+# de cargos. Los reportes la unen con un LEFT JOIN en lugar de correr dos
+# subconsultas SUM(costo) por fila; los triggers la mantienen con cada alta,
+# modificación o baja de Multa/Danio (venga de DBManager o de un script).
+CARGOS_ALQUILER = (('Multa', 'alquiler_id', 'total_multas'), ('Danio', 'id_alquiler', 'total_danios'))
+
+
+def _sumar_cargo(total, id_alquiler, costo, cantidad):
+    return f"""
+        INSERT INTO CargoAlquiler (id_alquiler, {total}, cantidad) VALUES ({id_alquiler}, {costo}, {cantidad})
+        ON CONFLICT (id_alquiler) DO UPDATE SET
+            {total} = {total} + excluded.{total},
+            cantidad = cantidad + excluded.cantidad;
+        DELETE FROM CargoAlquiler WHERE id_alquiler = {id_alquiler} AND cantidad <= 0;"""
+
+
+def reconstruir_cargos(cursor):
+    """Recalcula CargoAlquiler desde Multa y Danio."""
+    cursor.execute("DELETE FROM CargoAlquiler")
+    cursor.execute("""
+        INSERT INTO CargoAlquiler (id_alquiler, total_multas, total_danios, cantidad)
+        SELECT id_alquiler, SUM(multa), SUM(danio), COUNT(*) FROM (
+            SELECT alquiler_id AS id_alquiler, costo AS multa, 0 AS danio FROM Multa
+            UNION ALL
+            SELECT id_alquiler, 0, costo FROM Danio
+        )
+        GROUP BY id_alquiler
+    """)
+
+
+def _m006_cargos_alquiler(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS CargoAlquiler (
+            id_alquiler INTEGER PRIMARY KEY,
+            total_multas REAL NOT NULL DEFAULT 0,
+            total_danios REAL NOT NULL DEFAULT 0,
+            cantidad INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    if not all(_tabla_existe(cursor, tabla) for tabla, _, _ in CARGOS_ALQUILER):
+        return
+
+    for tabla, columna, total in CARGOS_ALQUILER:
+        nombre = tabla.lower()
+        cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_cargo_{nombre}_ins
+            AFTER INSERT ON {tabla}
+            BEGIN {_sumar_cargo(total, f'NEW.{columna}', 'NEW.costo', 1)} END""")
+        cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_cargo_{nombre}_upd
+            AFTER UPDATE OF costo, {columna} ON {tabla}
+            BEGIN {_sumar_cargo(total, f'OLD.{columna}', '-OLD.costo', -1)}
+                  {_sumar_cargo(total, f'NEW.{columna}', 'NEW.costo', 1)} END""")
+        cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_cargo_{nombre}_del
+            AFTER DELETE ON {tabla}
+            BEGIN {_sumar_cargo(total, f'OLD.{columna}', '-OLD.costo', -1)} END""")
+
+    reconstruir_cargos(cursor)
+
+
+# --- 007: exclusión de alquileres superpuestos ---
+
+# SQLite no tiene restricciones de exclusión: un trigger rechaza cualquier
+# alquiler vigente (reservado, activo o atrasado) que se superponga con otro
+# vigente del mismo vehículo, aunque la escritura no pase por DBManager.
+ERROR_ALQUILER_SUPERPUESTO = 'Alquiler superpuesto con otro vigente del mismo vehículo'
+_BLOQUEANTES = f"({', '.join(str(estado) for estado in ESTADOS_ALQUILER_BLOQUEANTES)})"
+_SQL_SUPERPUESTO = f"""
+        SELECT RAISE(ABORT, '{ERROR_ALQUILER_SUPERPUESTO}')
+        WHERE EXISTS (
+            SELECT 1 FROM Alquiler
+            WHERE patente = NEW.patente AND id_estado IN {_BLOQUEANTES}
+            AND fecha_inicio < NEW.fecha_fin AND fecha_fin > NEW.fecha_inicio
+            AND id_alquiler IS NOT NEW.id_alquiler
+        );"""
+
+
+def _alquiler_con_fechas(cursor):
+    return (_tabla_existe(cursor, 'Alquiler')
+            and {'patente', 'fecha_inicio', 'fecha_fin', 'id_estado'} <= _columnas(cursor, 'Alquiler'))
+
+
+def _m007_exclusion_alquileres(cursor):
+    if not _alquiler_con_fechas(cursor):
+        return
+    bloqueantes, superpuesto = _BLOQUEANTES, _SQL_SUPERPUESTO
+    cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_alquiler_superpuesto_ins
+        BEFORE INSERT ON Alquiler WHEN NEW.id_estado IN {bloqueantes}
+        BEGIN {superpuesto} END""")
+    cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_alquiler_superpuesto_upd
+        BEFORE UPDATE OF patente, fecha_inicio, fecha_fin, id_estado ON Alquiler WHEN NEW.id_estado IN {bloqueantes}
+        BEGIN {superpuesto} END""")
+
+    # Lo que ya estaba superpuesto se deja (no se inventan estados), pero se avisa
+    existentes = cursor.execute(f"""
+        SELECT COUNT(*) FROM Alquiler a
+        WHERE a.id_estado IN {bloqueantes} AND EXISTS (
+            SELECT 1 FROM Alquiler b
+            WHERE b.patente = a.patente AND b.id_estado IN {bloqueantes} AND b.id_alquiler > a.id_alquiler
+            AND b.fecha_inicio < a.fecha_fin AND b.fecha_fin > a.fecha_inicio
+        )
+    """).fetchone()[0]
+    if existentes:
+        logger.warning("Hay %d alquileres vigentes superpuestos con otro: revisarlos a mano", existentes)
+
+
+# --- 008: transiciones automáticas de estado ---
+
+# El planificador pasa alquileres de Reservado a Activo y de Activo a Atrasado
+# en bloque. Pasar de un estado vigente a otro sin mover el vehículo ni
+# agrandar las fechas no puede crear una superposición nueva: el trigger de
+# 007 se limita a los cambios que sí pueden, así un par viejo superpuesto no
+# frena el barrido entero. Más el índice para buscar mantenimientos pendientes.
+
+def _m008_transiciones_automaticas(cursor):
+    _crear_indice(cursor, 'idx_mantenimiento_estado_inicio', 'Mantenimiento', ('id_estado', 'fecha_inicio'))
+    if not _alquiler_con_fechas(cursor):
+        return
+    cursor.execute("DROP TRIGGER IF EXISTS trg_alquiler_superpuesto_upd")
+    cursor.execute(f"""CREATE TRIGGER trg_alquiler_superpuesto_upd
+        BEFORE UPDATE OF patente, fecha_inicio, fecha_fin, id_estado ON Alquiler
+        WHEN NEW.id_estado IN {_BLOQUEANTES} AND (
+            OLD.id_estado NOT IN {_BLOQUEANTES} OR NEW.patente IS NOT OLD.patente
+            OR NEW.fecha_inicio < OLD.fecha_inicio OR NEW.fecha_fin > OLD.fecha_fin
+        )
+        BEGIN {_SQL_SUPERPUESTO} END""")
+
+
+# --- 009: búsqueda de texto en personas ---
+
+# Índice FTS5 de contenido externo sobre Persona: guarda solo el índice
+# invertido (los textos se leen de Persona) y lo mantienen los triggers, así
+# que cualquier alta, cambio o baja de una persona queda buscable al instante.
+# unicode61 sin tildes y sin mayúsculas ('maria' encuentra 'María'); los
+# índices de prefijos de 2 y 3 caracteres hacen rápidas las búsquedas cortas
+# mientras se tipea. El mail se parte en sus palabras (juan, perez, gmail).
+COLUMNAS_BUSQUEDA_PERSONA = ('nombre', 'apellido', 'mail', 'telefono', 'nro_documento')
+
+
+def _m009_busqueda_personas(cursor):
+    if not _tabla_existe(cursor, 'Persona'):
+        return
+    if not set(COLUMNAS_BUSQUEDA_PERSONA) <= _columnas(cursor, 'Persona'):
+        return
+    columnas = ', '.join(COLUMNAS_BUSQUEDA_PERSONA)
+    nuevos = ', '.join(f'NEW.{c}' for c in COLUMNAS_BUSQUEDA_PERSONA)
+    viejos = ', '.join(f'OLD.{c}' for c in COLUMNAS_BUSQUEDA_PERSONA)
+    try:
+        cursor.execute(f"""CREATE VIRTUAL TABLE IF NOT EXISTS PersonaFTS USING fts5(
+            {columnas}, content='Persona', content_rowid='id_persona',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )""")
+    except sqlite3.OperationalError as e:
+        # SQLite compilado sin FTS5: la base sigue funcionando, sin búsqueda de texto
+        logger.warning("No se pudo crear el índice de búsqueda de personas (FTS5): %s", e)
+        return
+    cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_persona_fts_ins AFTER INSERT ON Persona
+        BEGIN INSERT INTO PersonaFTS (rowid, {columnas}) VALUES (NEW.id_persona, {nuevos}); END""")
+    cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_persona_fts_del AFTER DELETE ON Persona
+        BEGIN INSERT INTO PersonaFTS (PersonaFTS, rowid, {columnas}) VALUES ('delete', OLD.id_persona, {viejos}); END""")
+    cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_persona_fts_upd AFTER UPDATE OF {columnas} ON Persona
+        BEGIN
+            INSERT INTO PersonaFTS (PersonaFTS, rowid, {columnas}) VALUES ('delete', OLD.id_persona, {viejos});
+            INSERT INTO PersonaFTS (rowid, {columnas}) VALUES (NEW.id_persona, {nuevos});
+        END""")
+    # Carga inicial con las personas que ya existen
+    cursor.execute("INSERT INTO PersonaFTS (PersonaFTS) VALUES ('rebuild')")
+
+
+# --- 010: registro de cambios de ocupación ---
+
+# El índice de disponibilidad vive en la memoria de cada proceso. Los triggers
+# anotan la patente de cada alquiler o mantenimiento que se crea, cambia de
+# fechas, estado o vehículo, o se borra, venga de donde venga la escritura;
+# cada índice relee solo las patentes anotadas desde su última lectura. Se
+# conservan las últimas RETENCION_CAMBIOS_OCUPACION anotaciones: un índice
+# que quedó más atrás se recarga entero.
+RETENCION_CAMBIOS_OCUPACION = 10000
+TABLAS_OCUPACION = ('Alquiler', 'Mantenimiento')
+
+
+def _m010_cambios_ocupacion(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS CambioOcupacion (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            patente TEXT NOT NULL
+        )
+    """)
+    cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_cambio_ocupacion_retencion
+        AFTER INSERT ON CambioOcupacion
+        BEGIN DELETE FROM CambioOcupacion WHERE seq <= NEW.seq - {RETENCION_CAMBIOS_OCUPACION}; END""")
+    for tabla in TABLAS_OCUPACION:
+        if not (_tabla_existe(cursor, tabla)
+                and {'patente', 'fecha_inicio', 'fecha_fin', 'id_estado'} <= _columnas(cursor, tabla)):
+            continue
+        nombre = tabla.lower()
+        cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{nombre}_ocupacion_ins AFTER INSERT ON {tabla}
+            BEGIN INSERT INTO CambioOcupacion (patente) VALUES (NEW.patente); END""")
+        cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{nombre}_ocupacion_upd
+            AFTER UPDATE OF patente, fecha_inicio, fecha_fin, id_estado ON {tabla}
+            BEGIN
+                INSERT INTO CambioOcupacion (patente) VALUES (NEW.patente);
+                INSERT INTO CambioOcupacion (patente) SELECT OLD.patente WHERE OLD.patente IS NOT NEW.patente;
+            END""")
+        cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{nombre}_ocupacion_del AFTER DELETE ON {tabla}
+            BEGIN INSERT INTO CambioOcupacion (patente) VALUES (OLD.patente); END""")
+
+
+# --- 011: contraseñas en texto plano ---
+
+# El alta de empleados desde el mostrador guardaba la contraseña tal cual.
+# verificar() ya no acepta texto plano: esas filas se reescriben una vez con
+# el hash actual.
+
+
+def _m011_hashear_texto_plano(cursor):
+    if not _tabla_existe(cursor, 'Usuario'):
+        return
+    filas = [(id_usuario, password) for id_usuario, password in
+             cursor.execute("SELECT id_usuario, password FROM Usuario WHERE password IS NOT NULL").fetchall()
+             if not credenciales.es_hash(password)]
+    for id_usuario, password in filas:
+        cursor.execute("UPDATE Usuario SET password = ? WHERE id_usuario = ?",
+                       (credenciales.hashear(password), id_usuario))
+    if filas:
+        logger.info("Migración 11: %d contraseña(s) en texto plano reescritas", len(filas))
+
+
+MIGRACIONES = [
+    (1, 'Índices de búsqueda por claves foráneas y fechas', _m001_indices_busqueda),
+    (2, 'Contadores del dashboard mantenidos por triggers', _m002_contadores_dashboard),
+    (3, 'Índices para listados paginados', _m003_indices_listados),
+    (4, 'Tabla de hechos de facturación mensual', _m004_facturacion_mensual),
+    (5, 'Fechas normalizadas y columna generada de días', _m005_fechas_normalizadas),
+    (6, 'Totales de multas y daños por alquiler', _m006_cargos_alquiler),
+    (7, 'Exclusión de alquileres vigentes superpuestos', _m007_exclusion_alquileres),
+    (8, 'Transiciones automáticas de estado', _m008_transiciones_automaticas),
+    (9, 'Búsqueda de texto en personas (FTS5)', _m009_busqueda_personas),
+    (10, 'Registro de cambios de ocupación', _m010_cambios_ocupacion),
+    (11, 'Contraseñas en texto plano pasadas a hash', _m011_hashear_texto_plano),
+]
+
+
+def version_actual(conn):
+    cursor = conn.cursor()
+    if not _tabla_existe(cursor, 'Migracion'):
+        return 0
+    row = cursor.execute("SELECT MAX(version) FROM Migracion").fetchone()
+    return row[0] or 0
+
+
+def aplicar_migraciones(conn):
+    """Aplica en orden las migraciones pendientes. Devuelve las versiones aplicadas."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Migracion (
+            version INTEGER PRIMARY KEY,
+            descripcion TEXT NOT NULL,
+            fecha_aplicada TEXT NOT NULL
+        )
+    """)
+    conn.commit()
+
+    aplicadas = []
+    for version, descripcion, migracion in MIGRACIONES:
+        if version <= version_actual(conn):
+            continue
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            # Otro proceso pudo haberla aplicado mientras esperábamos el lock
+            if cursor.execute("SELECT 1 FROM Migracion WHERE version = ?", (version,)).fetchone():
+                conn.rollback()
+                continue
+            migracion(cursor)
+            cursor.execute(
+                "INSERT INTO Migracion (version, descripcion, fecha_aplicada) VALUES (?, ?, ?)",
+                (version, descripcion, datetime.now().replace(microsecond=0).isoformat())
+            )
+            conn.commit()
+            aplicadas.append(version)
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error("Error al aplicar migración %s (%s): %s", version, descripcion, e)
+            raise
+    return aplicadas
@@ -0,0 +1,63 @@
+import base64
+import json
+
+
+# ============================================================
+# PAGINACIÓN POR CURSOR (KEYSET)
+# ============================================================
+# En lugar de OFFSET (que recorre y descarta todas las filas anteriores), cada
+# página arranca estrictamente después de la clave de orden de la última fila
+# devuelta. El cursor es esa clave serializada: opaco para el cliente, y el
+# costo de pedir la página N no depende de N.
+
+LIMITE_DEFAULT = 50
+LIMITE_MAX = 500
+
+
+def codificar_cursor(valores):
+    texto = json.dumps(list(valores), separators=(',', ':'))
+    return base64.urlsafe_b64encode(texto.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor, cantidad):
+    """Devuelve la lista de valores de la clave. ValueError si el cursor no es válido."""
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno).decode('utf-8'))
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError("Cursor inválido")
+    if not isinstance(valores, list) or len(valores) != cantidad:
+        raise ValueError("Cursor inválido")
+    for valor in valores:
+        if not isinstance(valor, (str, int, float)) or isinstance(valor, bool):
+            raise ValueError("Cursor inválido")
+    return valores
+
+
+def normalizar_limite(limite):
+    if limite in (None, ''):
+        return LIMITE_DEFAULT
+    try:
+        limite = int(limite)
+    except (TypeError, ValueError):
+        raise ValueError("El parámetro 'limit' debe ser un entero")
+    if limite < 1:
+        raise ValueError("El parámetro 'limit' debe ser mayor a 0")
+    return min(limite, LIMITE_MAX)
+
+
+def parsear_campos(fields, permitidos):
+    """'a,b' -> ['a', 'b'] validando contra `permitidos`. None si no se pidió proyección."""
+    if not fields:
+        return None
+    campos = [c.strip() for c in fields.split(',') if c.strip()]
+    desconocidos = [c for c in campos if c not in permitidos]
+    if desconocidos:
+        raise ValueError(f"Campos desconocidos: {', '.join(desconocidos)}")
+    return campos
+
+
+def proyectar(items, campos):
+    if not campos:
+        return items
+    return [{c: item.get(c) for c in campos} for item in items]
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pdf_writer import EscritorPDF
+from log_config import obtener_logger
+
+logger = obtener_logger('pdf_jobs')
+
+# Carpeta de PDFs generados, hilos que los arman y vida (segundos) de un trabajo terminado
+PDF_DIR = os.environ.get('ALQUILERES_PDF_DIR',
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pdf_cache'))
+PDF_WORKERS = int(os.environ.get('ALQUILERES_PDF_WORKERS', 2))
+PDF_JOB_TTL = float(os.environ.get('ALQUILERES_PDF_JOB_TTL', 3600))
+
+PENDIENTE, PROCESANDO, LISTO, ERROR = 'pendiente', 'procesando', 'listo', 'error'
+
+# Mismos valores por defecto que los endpoints /reportes/pdf/*
+FECHAS_DEFAULT = {'fecha_desde': '2000-01-01', 'fecha_hasta': '2100-01-01'}
+AGRUPACIONES = ('mensual', 'trimestral', 'anual')
+
+
+def _moneda(valor):
+    return f"$ {valor or 0:,.2f}"
+
+
+def _rango(params):
+    return f"Desde {params['fecha_desde'][:10]} hasta {params['fecha_hasta'][:10]}"
+
+
+# --- Un render por reporte: (db_manager, parámetros, archivo binario) ---
+
+def _pdf_detalle_clientes(db, params, archivo):
+    pdf = EscritorPDF(archivo, 'Detalle de alquileres por cliente', [
+        ('Inicio', 55), ('Fin', 55), ('Días', 30), ('Vehículo', 105), ('Patente', 50),
+        ('Alquiler', 60), ('Multas', 50), ('Daños', 50), ('Total', 60),
+    ], _rango(params))
+    # Un cliente por vez: la memoria no depende del tamaño del reporte
+    for cliente in db.iter_detailed_client_rentals_report(params['fecha_desde'], params['fecha_hasta']):
+        pdf.texto(f"{cliente['cliente']} - Doc. {cliente['nro_documento']} - "
+                  f"{len(cliente['alquileres'])} alquileres - {_moneda(cliente['total_facturado'])}", negrita=True)
+        for a in cliente['alquileres']:
+            pdf.fila([a['fecha_inicio'][:10], a['fecha_fin'][:10], a['dias'], f"{a['marca']} {a['modelo']}",
+                      a['patente'], _moneda(a['total_alquiler']), _moneda(a['total_multas']),
+                      _moneda(a['total_danios']), _moneda(a['total_general'])])
+    pdf.cerrar()
+
+
+def _pdf_alquileres_periodo(db, params, archivo):
+    pdf = EscritorPDF(archivo, f"Alquileres por período ({params['periodo']})", [
+        ('Período', 130), ('Total alquileres', 125), ('Ingresos', 130), ('Duración promedio (días)', 130),
+    ], _rango(params))
+    for p in db.get_rentals_by_period_report(params['periodo'], params['fecha_desde'], params['fecha_hasta']):
+        pdf.fila([p['periodo'], p['total_alquileres'], _moneda(p['ingresos_totales']),
+                  f"{p['duracion_promedio']:.1f}"])
+    pdf.cerrar()
+
+
+def _pdf_ranking_vehiculos(db, params, archivo):
+    pdf = EscritorPDF(archivo, 'Ranking de vehículos más alquilados', [
+        ('Pos.', 40), ('Modelo', 150), ('Marca', 130), ('Patente', 100), ('Alquileres', 95),
+    ], _rango(params))
+    ranking = db.get_report_ranking_vehiculos(params['fecha_desde'], params['fecha_hasta'])
+    for posicion, v in enumerate(ranking, start=1):
+        pdf.fila([posicion, v['modelo'], v['marca'], v['patente'], v['cantidad_alquileres']])
+    pdf.cerrar()
+
+
+def _pdf_facturacion(db, params, archivo):
+    pdf = EscritorPDF(archivo, f"Facturación ({params['agrupacion']})", [
+        ('Período', 95), ('Alquileres', 80), ('Alquiler', 95), ('Multas', 85), ('Daños', 85), ('Total', 75),
+    ], _rango(params))
+    for f in db.get_report_facturacion_mensual(params['fecha_desde'], params['fecha_hasta'], params['agrupacion']):
+        total = f['total_facturado'] + f['total_multas'] + f['total_danios']
+        pdf.fila([f['periodo'], f['alquileres'], _moneda(f['total_facturado']), _moneda(f['total_multas']),
+                  _moneda(f['total_danios']), _moneda(total)])
+    pdf.cerrar()
+
+
+# Nombre -> (render, parámetros aceptados con su valor por defecto)
+REPORTES_PDF = {
+    'detalle-clientes-completo': (_pdf_detalle_clientes, FECHAS_DEFAULT),
+    'alquileres-periodo': (_pdf_alquileres_periodo, {**FECHAS_DEFAULT, 'periodo': 'mensual'}),
+    'ranking-vehiculos': (_pdf_ranking_vehiculos, FECHAS_DEFAULT),
+    'facturacion-mensual': (_pdf_facturacion, {**FECHAS_DEFAULT, 'agrupacion': 'mensual'}),
+}
+
+
+def normalizar_parametros(reporte, params):
+    """Solo los parámetros que usa el reporte, como texto y con sus valores por defecto."""
+    if reporte not in REPORTES_PDF:
+        raise ValueError(f"Reporte inválido. Use uno de: {', '.join(REPORTES_PDF)}")
+    _, defaults = REPORTES_PDF[reporte]
+    params = params or {}
+    normalizados = {clave: str(params.get(clave) or default) for clave, default in defaults.items()}
+    if normalizados.get('agrupacion', 'mensual') not in AGRUPACIONES:
+        raise ValueError("Agrupación inválida. Use 'mensual', 'trimestral' o 'anual'")
+    return normalizados
+
+
+class GestorTrabajosPDF:
+    """
+    Genera los PDF de reportes en un pool de hilos, fuera del hilo del request.
+
+    Cada PDF queda en disco con un nombre que combina el reporte, un hash de
+    los parámetros y la versión de datos de DBManager.reportes: pedir lo mismo
+    sin escrituras de por medio reutiliza el archivo, y dos pedidos iguales a
+    la vez comparten una sola generación. Los archivos de versiones viejas se
+    borran cuando ya no los referencia ningún trabajo vigente.
+    """
+
+    def __init__(self, db_manager, directorio=PDF_DIR, max_workers=PDF_WORKERS, ttl=PDF_JOB_TTL):
+        self.db_manager = db_manager
+        self.directorio = directorio
+        self.max_workers = max_workers
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._executor = None           # Se crea con el primer pedido
+        self._trabajos = {}             # id -> trabajo
+        self._en_curso = {}             # nombre de archivo -> ids de los trabajos que lo esperan
+
+    def encolar(self, reporte, params, id_usuario):
+        params = normalizar_parametros(reporte, params)
+        version = self.db_manager.reportes.version
+        clave = hashlib.sha256(json.dumps([reporte, params], sort_keys=True).encode('utf-8')).hexdigest()[:24]
+        nombre = f"{reporte}-{clave}-v{version}.pdf"
+
+        with self._lock:
+            self._iniciar()
+            trabajo = {
+                'id': uuid.uuid4().hex, 'reporte': reporte, 'parametros': params, 'estado': PENDIENTE,
+                'error': None, 'id_usuario': id_usuario, 'creado': time.time(), 'archivo': nombre,
+            }
+            if os.path.exists(os.path.join(self.directorio, nombre)):
+                trabajo['estado'] = LISTO
+            elif nombre in self._en_curso:
+                self._en_curso[nombre].append(trabajo['id'])
+            else:
+                self._en_curso[nombre] = [trabajo['id']]
+                self._executor.submit(self._generar, nombre, reporte, params)
+            self._trabajos[trabajo['id']] = trabajo
+            self._purgar(version)
+            return self._publico(trabajo)
+
+    def obtener(self, id_trabajo):
+        with self._lock:
+            trabajo = self._trabajos.get(id_trabajo)
+            return self._publico(trabajo) if trabajo else None
+
+    def ruta(self, id_trabajo):
+        """Ruta del PDF si el trabajo terminó bien; None si no existe o todavía no está listo."""
+        with self._lock:
+            trabajo = self._trabajos.get(id_trabajo)
+            if not trabajo or trabajo['estado'] != LISTO:
+                return None
+            return os.path.join(self.directorio, trabajo['archivo'])
+
+    def cerrar(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    # --- Internos ---
+
+    def _iniciar(self):
+        if self._executor is not None:
+            return
+        os.makedirs(self.directorio, exist_ok=True)
+        # La versión de datos vuelve a 0 al reiniciar: lo generado antes puede no coincidir
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith(('.pdf', '.part')):
+                os.remove(os.path.join(self.directorio, nombre))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='pdf')
+
+    def _generar(self, nombre, reporte, params):
+        self._marcar(nombre, PROCESANDO)
+        ruta = os.path.join(self.directorio, nombre)
+        temporal = f"{ruta}.part"
+        try:
+            render, _ = REPORTES_PDF[reporte]
+            with open(temporal, 'wb') as archivo:
+                render(self.db_manager, params, archivo)
+            # Se publica completo o no se publica
+            os.replace(temporal, ruta)
+            self._marcar(nombre, LISTO)
+        except Exception as e:
+            logger.error("Error generando PDF %s: %s", reporte, e)
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            self._marcar(nombre, ERROR, str(e))
+
+    def _marcar(self, nombre, estado, error=None):
+        with self._lock:
+            ids = self._en_curso.get(nombre, [])
+            for id_trabajo in ids:
+                if id_trabajo in self._trabajos:
+                    self._trabajos[id_trabajo]['estado'] = estado
+                    self._trabajos[id_trabajo]['error'] = error
+            if estado in (LISTO, ERROR):
+                self._en_curso.pop(nombre, None)
+
+    def _purgar(self, version):
+        """Olvida trabajos terminados viejos y borra PDFs de otras versiones que nadie referencia."""
+        limite = time.time() - self.ttl
+        for id_trabajo, trabajo in list(self._trabajos.items()):
+            if trabajo['estado'] in (LISTO, ERROR) and trabajo['creado'] < limite:
+                del self._trabajos[id_trabajo]
+
+        en_uso = {trabajo['archivo'] for trabajo in self._trabajos.values()}
+        sufijo = f"-v{version}.pdf"
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith('.pdf') and not nombre.endswith(sufijo) and nombre not in en_uso:
+                try:
+                    os.remove(os.path.join(self.directorio, nombre))
+                except OSError as e:
+                    logger.warning("No se pudo borrar el PDF %s: %s", nombre, e)
+
+    @staticmethod
+    def _publico(trabajo):
+        return {clave: trabajo[clave] for clave in ('id', 'reporte', 'parametros', 'estado', 'error', 'id_usuario')}
@@ -0,0 +1,143 @@
+"""
+Escritor mínimo de PDF 1.4, sin dependencias externas.
+
+Arma reportes tabulares en Helvetica sobre hojas A4. Cada página se comprime
+y se escribe al archivo apenas se completa, así que la memoria no crece con la
+cantidad de filas: el índice (xref) y el árbol de páginas se escriben al cerrar.
+"""
+import zlib
+
+ANCHO, ALTO = 595, 842      # A4 en puntos
+MARGEN = 40
+TAMANIO = 8                 # Tamaño de letra de las filas
+INTERLINEA = 12
+ANCHO_CARACTER = 0.5        # Ancho promedio de Helvetica (en em), para recortar celdas
+
+# Objetos fijos; las páginas se numeran a partir de PRIMER_OBJETO_PAGINA
+CATALOGO, PAGINAS, FUENTE, FUENTE_NEGRITA = 1, 2, 3, 4
+PRIMER_OBJETO_PAGINA = 5
+
+
+def _texto_pdf(valor):
+    """Cadena literal de PDF en WinAnsi: escapa \\, ( y ), y reemplaza lo que no entra."""
+    datos = str(valor).encode('cp1252', errors='replace')
+    return b'(' + datos.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+def _recortar(valor, ancho):
+    texto = '' if valor is None else str(valor)
+    maximo = max(1, int(ancho / (TAMANIO * ANCHO_CARACTER)))
+    return texto if len(texto) <= maximo else texto[:maximo - 1] + '…'
+
+
+class EscritorPDF:
+    """
+    Reporte tabular: título, subtítulo y encabezado de columnas en cada página.
+
+    `archivo` es un archivo binario abierto; `columnas` es una lista de
+    (título, ancho en puntos). Se agregan filas con fila() o líneas sueltas
+    con texto(), y cerrar() termina el documento (no cierra el archivo).
+    """
+
+    def __init__(self, archivo, titulo, columnas, subtitulo=''):
+        self._archivo = archivo
+        self._posicion = 0
+        self._offsets = {}
+        self._paginas = []
+        self._siguiente = PRIMER_OBJETO_PAGINA
+        self._lineas = None
+        self._y = 0
+        self.titulo = titulo
+        self.subtitulo = subtitulo
+        self.columnas = columnas
+
+        self._escribir(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        self._objeto(FUENTE, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+        self._objeto(FUENTE_NEGRITA,
+                     b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>')
+
+    def fila(self, celdas, negrita=False):
+        self._reservar()
+        x = MARGEN
+        for valor, (_, ancho) in zip(celdas, self.columnas):
+            self._texto(x, self._y, _recortar(valor, ancho), negrita)
+            x += ancho
+        self._y -= INTERLINEA
+
+    def texto(self, linea, negrita=False):
+        """Línea que ocupa todo el ancho (por ejemplo, el encabezado de un grupo)."""
+        self._reservar()
+        self._texto(MARGEN, self._y, _recortar(linea, ANCHO - 2 * MARGEN), negrita)
+        self._y -= INTERLINEA
+
+    def cerrar(self):
+        if self._lineas is None and not self._paginas:
+            self._nueva_pagina()
+        self._terminar_pagina()
+
+        kids = b' '.join(b'%d 0 R' % numero for numero in self._paginas)
+        self._objeto(PAGINAS, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(self._paginas)))
+        self._objeto(CATALOGO, b'<< /Type /Catalog /Pages %d 0 R >>' % PAGINAS)
+
+        inicio_xref = self._posicion
+        cantidad = self._siguiente
+        partes = [b'xref\n0 %d\n' % cantidad, b'0000000000 65535 f \n']
+        for numero in range(1, cantidad):
+            partes.append(b'%010d 00000 n \n' % self._offsets[numero])
+        partes.append(b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+                      % (cantidad, CATALOGO, inicio_xref))
+        self._escribir(b''.join(partes))
+
+    # --- Internos ---
+
+    def _escribir(self, datos):
+        self._archivo.write(datos)
+        self._posicion += len(datos)
+
+    def _objeto(self, numero, cuerpo):
+        self._offsets[numero] = self._posicion
+        self._escribir(b'%d 0 obj\n%s\nendobj\n' % (numero, cuerpo))
+
+    def _texto(self, x, y, valor, negrita=False):
+        fuente = b'/F2' if negrita else b'/F1'
+        self._lineas.append(b'BT %s %d Tf %d %d Td %s Tj ET' % (fuente, TAMANIO, x, y, _texto_pdf(valor)))
+
+    def _reservar(self):
+        """Pasa a una página nueva si la línea siguiente no entra en la actual."""
+        if self._lineas is None or self._y < MARGEN + INTERLINEA:
+            self._terminar_pagina()
+            self._nueva_pagina()
+
+    def _nueva_pagina(self):
+        self._lineas = []
+        y = ALTO - MARGEN
+        self._lineas.append(b'BT /F2 14 Tf %d %d Td %s Tj ET' % (MARGEN, y - 14, _texto_pdf(self.titulo)))
+        y -= 30
+        if self.subtitulo:
+            self._texto(MARGEN, y, self.subtitulo)
+            y -= INTERLINEA + 6
+        x = MARGEN
+        for titulo, ancho in self.columnas:
+            self._texto(x, y, _recortar(titulo, ancho), negrita=True)
+            x += ancho
+        self._lineas.append(b'0.5 w %d %d m %d %d l S' % (MARGEN, y - 4, ANCHO - MARGEN, y - 4))
+        self._y = y - INTERLINEA - 4
+
+    def _terminar_pagina(self):
+        if self._lineas is None:
+            return
+        numero_pagina = len(self._paginas) + 1
+        self._texto(ANCHO - MARGEN - 40, MARGEN / 2, f'Página {numero_pagina}')
+        contenido = zlib.compress(b'\n'.join(self._lineas), 6)
+        self._lineas = None
+
+        numero_contenido, numero = self._siguiente, self._siguiente + 1
+        self._siguiente += 2
+        self._objeto(numero_contenido, b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream'
+                     % (len(contenido), contenido))
+        self._objeto(numero, (
+            b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] '
+            b'/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> >> /Contents %d 0 R >>'
+            % (PAGINAS, ANCHO, ALTO, FUENTE, FUENTE_NEGRITA, numero_contenido)
+        ))
+        self._paginas.append(numero)
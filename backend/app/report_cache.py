@@ -0,0 +1,67 @@
+import functools
+import threading
+from collections import OrderedDict
+
+
+class ReportCache:
+    """
+    Cache en memoria de resultados de reportes, con descarte del menos usado (LRU).
+
+    La clave es (reporte, parámetros, versión de datos). Los mutadores de
+    DBManager que tocan datos de reportes (alquileres, multas, daños,
+    vehículos, personas) llaman a invalidar(), que sube la versión: desde
+    ese momento ninguna entrada anterior vuelve a coincidir.
+
+    Los resultados se comparten entre llamadas: quien los usa no debe modificarlos.
+    """
+
+    def __init__(self, max_size=200):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._items = OrderedDict()     # (reporte, params, version) -> resultado
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def obtener(self, reporte, params, calcular):
+        with self._lock:
+            clave = (reporte, params, self.version)
+            if clave in self._items:
+                self._items.move_to_end(clave)
+                self.hits += 1
+                return self._items[clave]
+            self.misses += 1
+
+        # Se calcula fuera del lock: dos pedidos iguales a la vez consultan los dos
+        resultado = calcular()
+        # Vacío puede ser un error de la base (los get_report_* devuelven []): no se guarda
+        if not resultado:
+            return resultado
+        with self._lock:
+            # Si hubo una escritura mientras se calculaba, el resultado ya es viejo
+            if clave[2] == self.version:
+                self._items[clave] = resultado
+                self._items.move_to_end(clave)
+                while len(self._items) > self.max_size:
+                    self._items.popitem(last=False)
+        return resultado
+
+    def invalidar(self):
+        with self._lock:
+            self.version += 1
+            self._items.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._items), "hits": self.hits, "misses": self.misses, "version": self.version}
+
+
+def cacheado(reporte):
+    """Decorador para métodos get_report_* de DBManager: pasa por self.reportes."""
+    def decorador(metodo):
+        @functools.wraps(metodo)
+        def envoltura(self, *args, **kwargs):
+            params = args + tuple(sorted(kwargs.items()))
+            return self.reportes.obtener(reporte, params, lambda: metodo(self, *args, **kwargs))
+        return envoltura
+    return decorador
@@ -0,0 +1,170 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se calcula con listas de Python
+    np = None
+
+
+# ============================================================
+# MOTOR DE REPORTES DE ALQUILERES
+# ============================================================
+# Los reportes cargan sus columnas una sola vez (una lista/array por campo,
+# no un objeto por fila) y acá se calculan duración, costos y agrupaciones
+# sobre la columna entera. La regla de costos vive solo en este módulo:
+#
+#   total_alquiler = dias * precio_flota        (dias: columna generada de Alquiler)
+#   total_general  = total_alquiler + total_multas + total_danios
+
+# Cargos asociados a un alquiler, para sumar a la consulta de cada reporte:
+# SQL_CARGOS va en el SELECT y SQL_JOIN_CARGOS en el FROM (tabla CargoAlquiler,
+# migración 6; sin fila para el alquiler = sin multas ni daños)
+SQL_CARGOS = "COALESCE(ca.total_multas, 0) AS total_multas, COALESCE(ca.total_danios, 0) AS total_danios"
+SQL_JOIN_CARGOS = "LEFT JOIN CargoAlquiler ca ON ca.id_alquiler = a.id_alquiler"
+
+# La misma regla en SQL, para consultas que ya llegan agregadas (una fila por grupo,
+# con su `cantidad`): el motor usa estos totales en lugar de recalcularlos
+SQL_TOTAL_ALQUILER = "SUM(a.dias * v.precio_flota)"
+
+# Columnas numéricas que usa el motor y su valor si la consulta no las trae
+NUMERICAS = {'cantidad': 1, 'dias': 0, 'precio_flota': 0, 'total_multas': 0, 'total_danios': 0}
+SUMAS = ('cantidad', 'dias', 'total_alquiler', 'total_multas', 'total_danios', 'total_general')
+
+# Etiqueta de período sobre una fecha normalizada 'YYYY-MM-DDTHH:MM:SS' (o su prefijo 'YYYY-MM')
+PERIODOS = {
+    'mensual': lambda fecha: fecha[:7],
+    'trimestral': lambda fecha: f"{fecha[:4]}-{(int(fecha[5:7]) + 2) // 3}",
+    'anual': lambda fecha: fecha[:4],
+}
+
+
+def costos(dias, precio_flota, total_multas=0, total_danios=0):
+    """La misma regla que TablaAlquileres, para una sola fila: (total_alquiler, total_general)."""
+    total_alquiler = dias * precio_flota
+    return total_alquiler, total_alquiler + total_multas + total_danios
+
+
+def _vector(valores):
+    if np is not None:
+        return np.asarray(valores, dtype=float)
+    return list(valores)
+
+
+def _lista(vector):
+    return vector.tolist() if np is not None else vector
+
+
+class TablaAlquileres:
+    """
+    Resultado de una consulta de reporte guardado por columnas.
+
+    Se arma con `cargar(conn, sql, params)`; cada columna del SELECT queda
+    accesible por nombre y se agregan `total_alquiler` y `total_general`.
+    Cada fila puede ser un alquiler o un grupo ya sumado en SQL con su `cantidad`.
+    """
+
+    def __init__(self, nombres, filas):
+        self.n = len(filas)
+        columnas = list(zip(*filas)) if filas else [()] * len(nombres)
+        self._columnas = dict(zip(nombres, columnas))
+        self._vectores = None
+
+    def __len__(self):
+        return self.n
+
+    def unir(self, columna, dimension, nombres):
+        """
+        Agrega `nombres` tomados de `dimension` ({clave: (valores...)}, ver
+        `dimension()`) según la clave de cada fila en `columna`. Reemplaza un
+        JOIN por fila contra tablas chicas (vehículos, clientes).
+        """
+        vacio = (None,) * len(nombres)
+        valores = [dimension.get(clave, vacio) for clave in self._columnas[columna]]
+        nuevas = list(zip(*valores)) if valores else [()] * len(nombres)
+        self._columnas.update(zip(nombres, nuevas))
+        self._vectores = None
+
+    def _calcular(self):
+        if self._vectores is not None:
+            return self._vectores
+        cantidad, dias, precio, multas, danios = (
+            _vector(self._columnas.get(nombre, [defecto] * self.n)) for nombre, defecto in NUMERICAS.items()
+        )
+        if 'total_alquiler' in self._columnas:
+            total_alquiler = _vector(self._columnas['total_alquiler'])
+        elif np is not None:
+            total_alquiler = dias * precio
+        else:
+            total_alquiler = [d * p for d, p in zip(dias, precio)]
+        if np is not None:
+            total_general = total_alquiler + multas + danios
+        else:
+            total_general = [t + m + d for t, m, d in zip(total_alquiler, multas, danios)]
+        self._vectores = {
+            'cantidad': cantidad, 'dias': dias, 'total_multas': multas, 'total_danios': danios,
+            'total_alquiler': total_alquiler, 'total_general': total_general,
+        }
+        return self._vectores
+
+    def columna(self, nombre):
+        if nombre in ('total_alquiler', 'total_general'):
+            return _lista(self._calcular()[nombre])
+        return list(self._columnas[nombre])
+
+    def agrupar(self, claves, campos=SUMAS):
+        """
+        Sumas de `campos` (por defecto todos los de SUMAS) por clave, una clave por fila.
+        Devuelve {clave: {...}} en el orden en que aparece cada clave.
+        """
+        indices = {}
+        inversa = [indices.setdefault(clave, len(indices)) for clave in claves]
+        grupos = len(indices)
+        vectores = self._calcular()
+        if np is not None:
+            inversa = np.asarray(inversa, dtype=np.intp)
+            sumas = {campo: np.bincount(inversa, weights=vectores[campo], minlength=grupos).tolist()
+                     for campo in campos}
+            if 'cantidad' in sumas:
+                sumas['cantidad'] = [int(c) for c in sumas['cantidad']]
+        else:
+            sumas = {}
+            for campo in campos:
+                acumulado = [0] * grupos
+                for g, valor in zip(inversa, vectores[campo]):
+                    acumulado[g] += valor
+                sumas[campo] = acumulado
+
+        resultado = {}
+        for clave, g in indices.items():
+            resultado[clave] = {campo: sumas[campo][g] for campo in campos}
+        return resultado
+
+    def periodos(self, columna, tipo):
+        """Etiqueta de período ('mensual', 'trimestral', 'anual') de cada fila."""
+        etiqueta = PERIODOS[tipo]
+        return [etiqueta(fecha) for fecha in self._columnas[columna]]
+
+    def filas(self, campos=None):
+        """
+        Lista de dicts con `campos` (columnas de la consulta o totales calculados).
+        Sin `campos`: todas las columnas de la consulta más los dos totales.
+        """
+        if campos is None:
+            campos = list(self._columnas) + ['total_alquiler', 'total_general']
+        valores = [self.columna(campo) for campo in campos]
+        return [dict(zip(campos, fila)) for fila in zip(*valores)]
+
+
+def cargar(conn, sql, params=()):
+    """Ejecuta la consulta de un reporte y devuelve sus filas como TablaAlquileres."""
+    cursor = conn.cursor()
+    # Tuplas en lugar de sqlite3.Row: el motor solo necesita las columnas
+    cursor.row_factory = None
+    filas = cursor.execute(sql, params).fetchall()
+    nombres = [d[0] for d in cursor.description]
+    return TablaAlquileres(nombres, filas)
+
+
+def dimension(conn, sql, params=()):
+    """{primera columna: (resto de las columnas)} para usar con TablaAlquileres.unir()."""
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    return {fila[0]: fila[1:] for fila in cursor.execute(sql, params).fetchall()}
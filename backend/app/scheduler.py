@@ -0,0 +1,82 @@
+import os
+import threading
+import time
+from datetime import datetime
+from log_config import obtener_logger
+
+logger = obtener_logger('scheduler')
+
+# ALQUILERES_SCHEDULER=0 lo apaga (por ejemplo, si hay varios procesos y basta con que barra uno);
+# ALQUILERES_SCHEDULER_INTERVAL: segundos entre pasadas
+SCHEDULER_ENABLED = os.environ.get('ALQUILERES_SCHEDULER', '1') != '0'
+SCHEDULER_INTERVAL = float(os.environ.get('ALQUILERES_SCHEDULER_INTERVAL', 60))
+
+
+class PlanificadorEstados:
+    """
+    Pasa de estado, por fecha, los alquileres y mantenimientos que nadie tocó:
+    Reservado -> Activo, Activo -> Atrasado y mantenimiento Pendiente ->
+    Realizando (ver DBManager.BARRIDOS). Corre en un hilo aparte, una pasada
+    al arrancar y otra cada `intervalo` segundos.
+
+    Cada barrido es un UPDATE sobre todo lo vencido, así que la pasada al
+    arrancar pone al día lo que pasó con el servidor caído, y que dos procesos
+    barran a la vez no hace daño: el segundo no encuentra nada.
+    """
+
+    def __init__(self, db_manager, intervalo=SCHEDULER_INTERVAL):
+        self.db_manager = db_manager
+        self.intervalo = intervalo
+        self.ultima_pasada = None       # time.time() de la última pasada completa
+        self._detener = threading.Event()
+        self._hilo = None
+        db_manager.metricas.registrar_colector('planificador', self._muestras_metricas)
+
+    def iniciar(self):
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._correr, name='planificador', daemon=True)
+        self._hilo.start()
+        logger.info("Planificador de estados iniciado (cada %ss)", self.intervalo)
+
+    def detener(self, timeout=5):
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+            self._hilo = None
+
+    def pasada(self, ahora=None):
+        """Corre todos los barridos con la misma fecha de corte. Devuelve {barrido: filas} (None si falló)."""
+        ahora = ahora or datetime.now()
+        metricas = self.db_manager.metricas
+        resultados = {}
+        for nombre, *_ in self.db_manager.BARRIDOS:
+            inicio = time.perf_counter()
+            filas = self.db_manager.barrer_transicion(nombre, ahora)
+            metricas.observar('alquileres_scheduler_sweep_duration_seconds', time.perf_counter() - inicio,
+                              barrido=nombre)
+            if filas is None:
+                metricas.sumar('alquileres_scheduler_errors_total', barrido=nombre)
+            elif filas:
+                metricas.sumar('alquileres_scheduler_transitions_total', filas, barrido=nombre)
+                logger.info("Barrido %s: %d cambios de estado", nombre, filas)
+            resultados[nombre] = filas
+        self.ultima_pasada = time.time()
+        return resultados
+
+    def _correr(self):
+        while not self._detener.is_set():
+            try:
+                self.pasada()
+            except Exception as e:
+                # Un error inesperado no debe matar el hilo: se reintenta en la próxima pasada
+                logger.error("Error en la pasada del planificador: %s", e)
+            self._detener.wait(self.intervalo)
+
+    def _muestras_metricas(self):
+        if self.ultima_pasada is None:
+            return []
+        return [('alquileres_scheduler_last_run_timestamp_seconds', 'gauge',
+                 'Momento (epoch) de la última pasada completa del planificador',
+                 [({}, self.ultima_pasada)])]
@@ -0,0 +1,121 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+
+class UserCache:
+    """
+    Cache en memoria de usuarios (objetos Usuario) con vencimiento (TTL) y
+    descarte del menos usado (LRU). Se invalida explícitamente cuando cambian
+    los datos del usuario o de su persona.
+    """
+
+    def __init__(self, max_size=1000, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._items = OrderedDict()     # id_usuario -> (vence, usuario)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _clave(id_usuario):
+        try:
+            return int(id_usuario)
+        except (TypeError, ValueError):
+            return None
+
+    def get(self, id_usuario):
+        clave = self._clave(id_usuario)
+        with self._lock:
+            item = self._items.get(clave)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._items[clave]
+                self.misses += 1
+                return None
+            self._items.move_to_end(clave)
+            self.hits += 1
+            return item[1]
+
+    def put(self, id_usuario, usuario):
+        clave = self._clave(id_usuario)
+        if clave is None:
+            return
+        with self._lock:
+            self._items[clave] = (time.monotonic() + self.ttl, usuario)
+            self._items.move_to_end(clave)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def invalidate(self, id_usuario):
+        with self._lock:
+            self._items.pop(self._clave(id_usuario), None)
+
+    def invalidate_persona(self, id_persona):
+        # Los usuarios guardan id_persona (ver DBManager.get_full_usuario_by_id)
+        with self._lock:
+            for clave in [k for k, (_, u) in self._items.items()
+                          if getattr(u, 'id_persona', None) == id_persona]:
+                del self._items[clave]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._items), "hits": self.hits, "misses": self.misses}
+
+
+class SessionStore:
+    """
+    Tokens de sesión opacos emitidos en el login: token -> id_usuario.
+
+    Todos duran lo mismo, así que el orden de creación es el de vencimiento:
+    cada login descarta los vencidos del principio (los de clientes que no
+    volvieron) y, pasado `max_size`, las sesiones más viejas.
+    """
+
+    def __init__(self, ttl=8 * 3600, max_size=100000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._sesiones = OrderedDict()  # token -> (vence, id_usuario), en orden de creación
+
+    def crear(self, id_usuario):
+        token = secrets.token_urlsafe(32)
+        ahora = time.monotonic()
+        with self._lock:
+            while self._sesiones and next(iter(self._sesiones.values()))[0] < ahora:
+                self._sesiones.popitem(last=False)
+            self._sesiones[token] = (ahora + self.ttl, int(id_usuario))
+            while len(self._sesiones) > self.max_size:
+                self._sesiones.popitem(last=False)
+        return token
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sesiones)
+
+    def resolver(self, token):
+        if not token:
+            return None
+        with self._lock:
+            sesion = self._sesiones.get(token)
+            if sesion is None:
+                return None
+            if sesion[0] < time.monotonic():
+                del self._sesiones[token]
+                return None
+            return sesion[1]
+
+    def revocar(self, token):
+        with self._lock:
+            return self._sesiones.pop(token, None) is not None
+
+    def revocar_usuario(self, id_usuario):
+        with self._lock:
+            for token in [t for t, (_, u) in self._sesiones.items() if u == int(id_usuario)]:
+                del self._sesiones[token]
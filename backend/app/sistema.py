@@ -1,18 +1,34 @@
 from datetime import date, datetime
 from db_manager import DBManager
-import hashlib
+from session_cache import SessionStore
+from paginacion import LIMITE_DEFAULT
+from fechas import parsear_fecha
+from pdf_jobs import GestorTrabajosPDF
+from scheduler import PlanificadorEstados
+from log_config import obtener_logger
+import credenciales
+
+logger = obtener_logger('sistema')
 
 class SistemaAlquiler:
     def __init__(self):
         self.db_manager = DBManager()
+        # Tokens de sesión emitidos en el login (ver api.obtener_usuario_actual)
+        self.sesiones = SessionStore()
+        # PDFs de reportes generados en segundo plano (ver api /reportes/jobs)
+        self.trabajos_pdf = GestorTrabajosPDF(self.db_manager)
+        # Logins ya verificados: evitan repetir la derivación de la contraseña (ver credenciales.py)
+        self.verificaciones = credenciales.CacheVerificaciones()
+        # Transiciones de estado por fecha; el hilo lo arranca api.py (ver scheduler.py)
+        self.planificador = PlanificadorEstados(self.db_manager)
 
     @staticmethod
     def _hash_password(password):
-        return hashlib.sha256(password.encode('utf-8')).hexdigest()
+        return credenciales.hashear(password)
 
     @staticmethod
     def _verify_password(input_password, stored_hash):
-        return SistemaAlquiler._hash_password(input_password) == stored_hash
+        return credenciales.verificar(input_password, stored_hash)[0]
 
     def registrar_usuario_cliente(self, data):
         try:
@@ -40,17 +56,17 @@ class SistemaAlquiler:
             )
 
             if id_persona_creada:
-                print(f"Usuario cliente creado con ID de persona: {id_persona_creada}")
+                logger.info("Usuario cliente creado con ID de persona: %s", id_persona_creada)
                 return True
             else:
-                print("El registro falló.")
+                logger.warning("El registro falló.")
                 return False
                 
         except KeyError as e:
-            print(f"Error en los datos de registro: falta la clave {e}")
+            logger.error("Error en los datos de registro: falta la clave %s", e)
             return False
         except Exception as e:
-            print(f"Error inesperado durante el registro: {e}")
+            logger.error("Error inesperado durante el registro: %s", e)
             return False
         
     def registrar_usuario_admin(self, data):
@@ -79,17 +95,17 @@ class SistemaAlquiler:
             )
 
             if id_persona_creada:
-                print(f"Usuario admin creado con ID de persona: {id_persona_creada}")
+                logger.info("Usuario admin creado con ID de persona: %s", id_persona_creada)
                 return True
             else:
-                print("El registro falló.")
+                logger.warning("El registro falló.")
                 return False
                 
         except KeyError as e:
-            print(f"Error en los datos de registro: falta la clave {e}")
+            logger.error("Error en los datos de registro: falta la clave %s", e)
             return False
         except Exception as e:
-            print(f"Error inesperado durante el registro: {e}")
+            logger.error("Error inesperado durante el registro: %s", e)
             return False
         
     def registrar_usuario_empleado(self, data):
@@ -125,49 +141,48 @@ class SistemaAlquiler:
             return id_empleado  # API devolverá el ID
 
         except Exception as e:
-            print("Error registrando empleado:", e)
+            logger.error("Error registrando empleado: %s", e)
             return None
 
     def login(self, mail, password):
-        user_login_data = self.db_manager.get_user_data_for_login_by_mail(mail)
+        # Una sola consulta: el usuario completo junto con su hash
+        usuario_completo = self.db_manager.get_usuario_para_login(mail)
 
-        if not user_login_data:
-            print("Login fallido: Email no encontrado.")
+        if not usuario_completo:
+            logger.warning("Login fallido: Email no encontrado.")
             return None
 
-        stored_hash = user_login_data['password']
+        id_usuario = usuario_completo.id_usuario
+        stored_hash = usuario_completo.password
 
-        # Si la contraseña no está hasheada, la guardamos hasheada
-        if not self._verify_password(password, stored_hash):
-            if stored_hash == password:  # Detecta password no hasheado
-                print("Login exitoso (contraseña no hasheada).")
-                hashed = self._hash_password(password)
-                success = self.db_manager.actualizar_usuario(user_login_data['id_usuario'], {'password_hash': hashed})
-                if not success:
-                    print("Error actualizando contraseña en la base de datos.")
-            else:
-                print("Login fallido: Contraseña incorrecta.")
+        if not self.verificaciones.contiene(id_usuario, stored_hash, password):
+            ok, rehashear = credenciales.verificar(password, stored_hash)
+            if not ok:
+                logger.warning("Login fallido: Contraseña incorrecta.")
                 return None
-
-        id_usuario = user_login_data['id_usuario']
-        usuario_completo = self.db_manager.get_full_usuario_by_id(id_usuario)
-
-        if not usuario_completo:
-            print("Error: El usuario existe pero no se pudo cargar el perfil completo.")
-            return None
-
+            # Hash viejo (SHA-256 sin sal, texto plano o costo anterior): se guarda con el actual
+            if rehashear:
+                nuevo = credenciales.hashear(password)
+                if self.db_manager.actualizar_hash_password(id_usuario, stored_hash, nuevo):
+                    logger.info("Contraseña del usuario %s rehasheada con %s.", id_usuario, credenciales.KDF)
+                    usuario_completo.password = stored_hash = nuevo
+                else:
+                    logger.error("Error actualizando contraseña en la base de datos.")
+            self.verificaciones.agregar(id_usuario, stored_hash, password)
+
+        # Los requests que siguen resuelven el usuario desde memoria
+        self.db_manager.user_cache.put(id_usuario, usuario_completo)
         self.usuario_actual = usuario_completo
-        print(f"Login exitoso. Bienvenido {self.usuario_actual.user_name}")
+        logger.info("Login exitoso. Bienvenido %s", self.usuario_actual.user_name)
         return usuario_completo
 
-
     def logout(self):
-        print(f"Cerrando sesión de {self.usuario_actual.user_name}.")
+        logger.info("Cerrando sesión de %s.", self.usuario_actual.user_name)
         self.usuario_actual = None
 
     def check_permission(self, required_permission_desc, usuario=None):
         if not usuario:
-            print("Acción fallida: No hay usuario logueado.")
+            logger.warning("Acción fallida: No hay usuario logueado.")
             return False
         
         if usuario.permiso.descripcion.upper() == required_permission_desc.upper():
@@ -178,15 +193,16 @@ class SistemaAlquiler:
     
     def eliminar_usuario(self, id_usuario_eliminar, usuario_solicitante):
         if not self.check_permission("Admin", usuario_solicitante):
-            print("Se requiere permiso de Admin para eliminar usuarios.")
+            logger.warning("Se requiere permiso de Admin para eliminar usuarios.")
             return False
         
         if str(id_usuario_eliminar) == str(usuario_solicitante.id_usuario):
-            print("No puedes eliminarte a ti mismo.")
+            logger.warning("No puedes eliminarte a ti mismo.")
             return False
 
         if self.db_manager.delete_user_full(id_usuario_eliminar):
-            print(f"Usuario {id_usuario_eliminar} eliminado correctamente.")
+            self.sesiones.revocar_usuario(id_usuario_eliminar)
+            logger.info("Usuario %s eliminado correctamente.", id_usuario_eliminar)
             return True
         
         return False
@@ -209,14 +225,14 @@ class SistemaAlquiler:
             # Verificar que el usuario existe
             usuario = self.db_manager.get_full_usuario_by_id(user_id)
             if not usuario:
-                print(f"Usuario con ID {user_id} no encontrado")
+                logger.warning("Usuario con ID %s no encontrado", user_id)
                 return False
             
             # Si se proporciona un usuario_actual, verificar permisos
             if usuario_actual:
                 # El usuario solo puede actualizar su propio perfil o ser admin
                 if usuario_actual.id_usuario != user_id and not self.check_permission("Admin", usuario_actual):
-                    print("No tiene permisos para actualizar este usuario")
+                    logger.warning("No tiene permisos para actualizar este usuario")
                     return False
             
             # Preparar los datos para actualizar
@@ -230,7 +246,7 @@ class SistemaAlquiler:
             if 'current_password' in update_data and 'new_password' in update_data:
                 # Verificar que la contraseña actual sea correcta
                 if not self._verify_password(update_data['current_password'], usuario.password):
-                    print("La contraseña actual no es correcta")
+                    logger.warning("La contraseña actual no es correcta")
                     return False
                 
                 # Actualizar la contraseña (usando 'password' en lugar de 'password_hash')
@@ -241,10 +257,15 @@ class SistemaAlquiler:
                 return True
             
             # Actualizar en la base de datos
-            return self.db_manager.actualizar_usuario(user_id, update_fields)
+            if not self.db_manager.actualizar_usuario(user_id, update_fields):
+                return False
+            if 'password' in update_fields:
+                # Con la contraseña nueva, ninguna sesión abierta con la anterior sigue valiendo
+                self.sesiones.revocar_usuario(user_id)
+            return True
         
         except Exception as e:
-            print(f"Error al actualizar usuario: {e}")
+            logger.error("Error al actualizar usuario: %s", e)
             return False
     def obtener_estado_auto_por_id(self, id_estado: int):
         return self.db_manager.get_estado_auto_by_id(id_estado)
@@ -272,17 +293,17 @@ class SistemaAlquiler:
             )
 
             if id_cliente_creado:
-                print(f"Cliente (mostrador) creado con ID: {id_cliente_creado}")
+                logger.info("Cliente (mostrador) creado con ID: %s", id_cliente_creado)
                 return id_cliente_creado
             else:
-                print("La creación del cliente falló.")
+                logger.warning("La creación del cliente falló.")
                 return None
                 
         except KeyError as e:
-            print(f"Error en los datos de creación: falta la clave {e}")
+            logger.error("Error en los datos de creación: falta la clave %s", e)
             return None
         except Exception as e:
-            print(f"Error inesperado durante la creación: {e}")
+            logger.error("Error inesperado durante la creación: %s", e)
             return None
 
     def buscar_cliente_por_id(self, id_cliente, usuario):
@@ -292,7 +313,7 @@ class SistemaAlquiler:
         cliente = self.db_manager.get_client_by_id(id_cliente)
         
         if not cliente:
-            print(f"No se encontró cliente con ID: {id_cliente}")
+            logger.warning("No se encontró cliente con ID: %s", id_cliente)
             return None
         
         return cliente
@@ -304,7 +325,7 @@ class SistemaAlquiler:
         cliente = self.db_manager.get_client_by_document(tipo_documento_id, nro_documento)
         
         if not cliente:
-            print(f"No se encontró cliente con documento: {tipo_documento_id} / {nro_documento}")
+            logger.warning("No se encontró cliente con documento: %s / %s", tipo_documento_id, nro_documento)
             return None
         
         return cliente
@@ -315,6 +336,18 @@ class SistemaAlquiler:
         
         return self.db_manager.get_all_clients()
 
+    def listar_clientes_pagina(self, usuario, after=None, limit=LIMITE_DEFAULT):
+        if not self.check_permission('admin', usuario) and not self.check_permission('empleado', usuario):
+            return {"items": [], "next_cursor": None}
+
+        return self.db_manager.get_clientes_pagina(after, limit)
+
+    def buscar_clientes(self, usuario, texto, after=None, limit=LIMITE_DEFAULT):
+        if not self.check_permission('admin', usuario) and not self.check_permission('empleado', usuario):
+            return {"items": [], "next_cursor": None}
+
+        return self.db_manager.buscar_clientes(texto, after, limit)
+
     def actualizar_datos_cliente(self, id_cliente, data, usuario):
         if not self.check_permission('admin', usuario) and not self.check_permission('empleado', usuario):
             return False
@@ -336,17 +369,17 @@ class SistemaAlquiler:
 
             
             if exito_persona and exito_cliente: #actualizo ahora si,la persona y el cliente para que cambie la fecha alta
-                print(f"Datos del cliente {id_cliente} actualizados.")
+                logger.info("Datos del cliente %s actualizados.", id_cliente)
                 return True
             else:
-                print(f"No se pudo actualizar al cliente {id_cliente} (o no hubo cambios).")
+                logger.warning("No se pudo actualizar al cliente %s (o no hubo cambios).", id_cliente)
                 return False
 
         except KeyError as e:
-            print(f"Error en los datos de actualización: falta la clave {e}")
+            logger.error("Error en los datos de actualización: falta la clave %s", e)
             return False
         except Exception as e:
-            print(f"Error inesperado durante la actualización: {e}")
+            logger.error("Error inesperado durante la actualización: %s", e)
             return False
 
     def eliminar_cliente(self, id_cliente, usuario):
@@ -356,10 +389,10 @@ class SistemaAlquiler:
         exito = self.db_manager.delete_client_full(id_cliente)
         
         if exito:
-            print(f"Cliente {id_cliente} eliminado exitosamente.")
+            logger.info("Cliente %s eliminado exitosamente.", id_cliente)
             return True
         else:
-            print(f"No se pudo eliminar al cliente {id_cliente}.")
+            logger.warning("No se pudo eliminar al cliente %s.", id_cliente)
             return False
         
     # --- ABMC de VEHICULOS ---
@@ -379,14 +412,14 @@ class SistemaAlquiler:
         try:
             exito = self.db_manager.create_vehiculo(data)
             if exito:
-                print(f"Vehiculo {data['patente']} creado.")
+                logger.info("Vehiculo %s creado.", data['patente'])
                 return data['patente']
             return False
         except KeyError as e:
-            print(f"Error en datos de vehiculo: falta la clave {e}")
+            logger.error("Error en datos de vehiculo: falta la clave %s", e)
             return False
         except Exception as e:
-            print(f"Error inesperado al crear vehiculo: {e}")
+            logger.error("Error inesperado al crear vehiculo: %s", e)
             return False
 
     def actualizar_vehiculo(self, patente, data, usuario):
@@ -395,15 +428,15 @@ class SistemaAlquiler:
         try:
             exito = self.db_manager.update_vehiculo(patente, data)
             if exito:
-                print(f"Vehiculo {patente} actualizado.")
+                logger.info("Vehiculo %s actualizado.", patente)
             else:
-                print(f"No se actualizó vehiculo {patente} (no se encontró o no hubo cambios).")
+                logger.warning("No se actualizó vehiculo %s (no se encontró o no hubo cambios).", patente)
             return exito
         except KeyError as e:
-            print(f"Error en datos de vehiculo: falta la clave {e}")
+            logger.error("Error en datos de vehiculo: falta la clave %s", e)
             return False
         except Exception as e:
-            print(f"Error inesperado al actualizar vehiculo: {e}")
+            logger.error("Error inesperado al actualizar vehiculo: %s", e)
             return False
 
     def eliminar_vehiculo(self, patente, usuario):
@@ -412,12 +445,12 @@ class SistemaAlquiler:
         try:
             exito = self.db_manager.delete_vehiculo(patente)
             if exito:
-                print(f"Vehiculo {patente} eliminado.")
+                logger.info("Vehiculo %s eliminado.", patente)
             else:
-                print(f"No se pudo eliminar vehiculo {patente} (no encontrado o con dependencias).")
+                logger.warning("No se pudo eliminar vehiculo %s (no encontrado o con dependencias).", patente)
             return exito
         except Exception as e:
-            print(f"Error inesperado al eliminar vehiculo: {e}")
+            logger.error("Error inesperado al eliminar vehiculo: %s", e)
             return False
         
     # --- BUSCAR VEHICULOS LIBRES ---
@@ -439,7 +472,7 @@ class SistemaAlquiler:
 
     def crear_nuevo_alquiler(self, patente, id_cliente, id_empleado, fecha_inicio, fecha_fin, estado, usuario):
         if not usuario:
-            print("Debe estar logueado para crear un alquiler.")
+            logger.warning("Debe estar logueado para crear un alquiler.")
             return False
 
         alquiler_data = {
@@ -452,10 +485,16 @@ class SistemaAlquiler:
         }
         
         if self.db_manager.create_alquiler_transactional(alquiler_data):
-            print("Alquiler creado exitosamente.")
+            logger.info("Alquiler creado exitosamente.")
             return True
         return False
 
+    def crear_alquileres_bulk(self, alquileres, usuario):
+        if not usuario:
+            logger.warning("Debe estar logueado para crear alquileres.")
+            return None
+        return self.db_manager.create_alquileres_bulk(alquileres)
+
     def consultar_todos_alquileres(self, usuario):
         if not usuario:
             return []
@@ -474,7 +513,7 @@ class SistemaAlquiler:
 
         alquiler = self.db_manager.get_alquiler_by_id(id_alquiler)
         if not alquiler:
-            print("Alquiler no encontrado.")
+            logger.warning("Alquiler no encontrado.")
             return None
 
         es_admin = self.check_permission("Admin", usuario)
@@ -486,7 +525,7 @@ class SistemaAlquiler:
         if alquiler['id_persona_cliente'] == usuario.id_usuario:
             return alquiler
         
-        print("No tiene permisos para ver este alquiler.")
+        logger.warning("No tiene permisos para ver este alquiler.")
         return None
 
     def actualizar_estado_alquiler(self, id_alquiler, nuevo_id_estado, usuario):
@@ -494,24 +533,24 @@ class SistemaAlquiler:
         es_empleado = self.check_permission("Empleado", usuario)
 
         if not (es_admin or es_empleado):
-            print("Se requiere permiso de Admin o Empleado.")
+            logger.warning("Se requiere permiso de Admin o Empleado.")
             return False
         
         if self.db_manager.update_alquiler_estado_only(id_alquiler, nuevo_id_estado):
-            print(f"Estado del alquiler {id_alquiler} actualizado.")
+            logger.info("Estado del alquiler %s actualizado.", id_alquiler)
             return True
-        print("No se pudo actualizar el alquiler.")
+        logger.warning("No se pudo actualizar el alquiler.")
         return False
 
     def eliminar_alquiler(self, id_alquiler, usuario):
         if not self.check_permission("Admin", usuario):
-            print("Se requiere permiso de Admin.")
+            logger.warning("Se requiere permiso de Admin.")
             return False
         
         if self.db_manager.delete_alquiler(id_alquiler):
-            print(f"Alquiler {id_alquiler} eliminado.")
+            logger.info("Alquiler %s eliminado.", id_alquiler)
             return True
-        print("No se pudo eliminar el alquiler.")
+        logger.warning("No se pudo eliminar el alquiler.")
         return False
 
     def marcar_alquiler_como_atrasado(self, id_alquiler, usuario):
@@ -523,23 +562,23 @@ class SistemaAlquiler:
 
         alquiler = self.db_manager.get_alquiler_by_id(id_alquiler)
         if not alquiler:
-            print("Alquiler no encontrado.")
+            logger.warning("Alquiler no encontrado.")
             return False
 
         ESTADOS_FINALES = [4, 5]
         if alquiler['id_estado'] in ESTADOS_FINALES:
-            print("El alquiler ya está finalizado o cancelado.")
+            logger.warning("El alquiler ya está finalizado o cancelado.")
             return False
 
-        fecha_fin = date.fromisoformat(alquiler['fecha_fin'])
+        fecha_fin = parsear_fecha(alquiler['fecha_fin']).date()
         hoy = date.today()
 
         if hoy > fecha_fin:
             if self.db_manager.update_alquiler_estado_only(id_alquiler, 3):
-                print(f"Alquiler {id_alquiler} marcado como ATRASADO.")
+                logger.info("Alquiler %s marcado como ATRASADO.", id_alquiler)
                 return True
         else:
-            print(f"No se puede marcar atrasado. La fecha de fin ({fecha_fin}) aún no ha pasado.")
+            logger.warning("No se puede marcar atrasado. La fecha de fin (%s) aún no ha pasado.", fecha_fin)
         
         return False
 
@@ -552,27 +591,27 @@ class SistemaAlquiler:
 
         alquiler = self.db_manager.get_alquiler_by_id(id_alquiler)
         if not alquiler:
-            print("Alquiler no encontrado.")
+            logger.warning("Alquiler no encontrado.")
             return False
 
         if alquiler['id_estado'] not in [2, 3]:
-            print(f"No se puede finalizar. El estado actual es: {alquiler['estado_desc']}")
+            logger.warning("No se puede finalizar. El estado actual es: %s", alquiler['estado_desc'])
             return False
 
         if self.db_manager.finalize_or_cancel_alquiler(id_alquiler, 4):
-            print(f"Alquiler {id_alquiler} FINALIZADO. Vehículo liberado.")
+            logger.info("Alquiler %s FINALIZADO. Vehículo liberado.", id_alquiler)
             return True
         
         return False
 
     def cancelar_alquiler(self, id_alquiler, usuario):
         if not usuario:
-            print("Debe estar logueado para cancelar.")
+            logger.warning("Debe estar logueado para cancelar.")
             return False
 
         alquiler = self.db_manager.get_alquiler_by_id(id_alquiler)
         if not alquiler:
-            print("Alquiler no encontrado.")
+            logger.warning("Alquiler no encontrado.")
             return False
         cliente = self.db_manager.get_client_by_id(alquiler['id_cliente'])
         persona = self.db_manager.get_persona_por_usuario(usuario.id_usuario)
@@ -580,16 +619,16 @@ class SistemaAlquiler:
         es_empleado = self.check_permission("Empleado", usuario)
         if not (es_admin or es_empleado):
             if cliente.id_persona != persona['id_persona']:
-                print("No tiene permiso para cancelar este alquiler (no le pertenece).")
+                logger.warning("No tiene permiso para cancelar este alquiler (no le pertenece).")
                 
                 return False
         
         if alquiler['id_estado'] in [2, 3, 4, 5]:
-            print("El alquiler ya comenzó, no se puede cancelar.")
+            logger.warning("El alquiler ya comenzó, no se puede cancelar.")
             return False
         
         if self.db_manager.finalize_or_cancel_alquiler(id_alquiler, 5):
-            print(f"Alquiler {id_alquiler} CANCELADO. Vehículo liberado.")
+            logger.info("Alquiler %s CANCELADO. Vehículo liberado.", id_alquiler)
             return True
         
         return False
@@ -599,14 +638,14 @@ class SistemaAlquiler:
         es_empleado = self.check_permission("Empleado", usuario)
         
         if not (es_admin or es_empleado):
-            print("Se requiere permiso de Admin o Empleado.")
+            logger.warning("Se requiere permiso de Admin o Empleado.")
             return False
 
         if self.db_manager.start_reserved_rental(id_alquiler):
-            print(f"Alquiler {id_alquiler} iniciado (Pasó de Reservado a Activo).")
+            logger.info("Alquiler %s iniciado (Pasó de Reservado a Activo).", id_alquiler)
             return True
         else:
-            print(f"No se pudo iniciar el alquiler {id_alquiler}. Verifique que exista y esté en estado 'Reservado'.")
+            logger.warning("No se pudo iniciar el alquiler %s. Verifique que exista y esté en estado 'Reservado'.", id_alquiler)
             return False
     
     # --- FUNCIONES DE DANIO ---
@@ -616,7 +655,7 @@ class SistemaAlquiler:
         es_empleado = self.check_permission("Empleado", usuario)
         
         if not (es_admin or es_empleado):
-            print("Se requiere permiso de Admin o Empleado.")
+            logger.warning("Se requiere permiso de Admin o Empleado.")
             return False
         
         data = {
@@ -625,7 +664,7 @@ class SistemaAlquiler:
             'detalle': detalle
         }
         if self.db_manager.create_danio(data):
-            print("Daño registrado exitosamente.")
+            logger.info("Daño registrado exitosamente.")
             return True
         return False
 
@@ -635,14 +674,14 @@ class SistemaAlquiler:
 
         alquiler = self.db_manager.get_alquiler_by_id(id_alquiler)
         if not alquiler:
-            print("Alquiler no encontrado.")
+            logger.warning("Alquiler no encontrado.")
             return []
 
         es_admin = self.check_permission("Admin", usuario)
         es_empleado = self.check_permission("Empleado", usuario)
         if not (es_admin or es_empleado):
             if alquiler['id_usuario'] != usuario.id_usuario:
-                print("No tiene permisos para ver daños de este alquiler.")
+                logger.warning("No tiene permisos para ver daños de este alquiler.")
                 return []
 
         return self.db_manager.get_danios_by_alquiler(id_alquiler)
@@ -652,12 +691,12 @@ class SistemaAlquiler:
         es_empleado = self.check_permission("Empleado", usuario)
         
         if not (es_admin or es_empleado):
-            print("Se requiere permiso de Admin o Empleado.")
+            logger.warning("Se requiere permiso de Admin o Empleado.")
             return False
         
         data = {'costo': costo, 'detalle': detalle}
         if self.db_manager.update_danio(id_danio, data):
-            print("Daño actualizado.")
+            logger.info("Daño actualizado.")
             return True
         return False
 
@@ -666,11 +705,11 @@ class SistemaAlquiler:
         es_empleado = self.check_permission("Empleado", usuario)
         
         if not (es_admin or es_empleado):
-            print("Se requiere permiso de Admin o Empleado.")
+            logger.warning("Se requiere permiso de Admin o Empleado.")
             return False
         
         if self.db_manager.delete_danio(id_danio):
-            print("Daño eliminado.")
+            logger.info("Daño eliminado.")
             return True
         return False
 
@@ -681,7 +720,7 @@ class SistemaAlquiler:
         es_empleado = self.check_permission("Empleado", usuario)
         
         if not (es_admin or es_empleado):
-            print("Se requiere permiso de Admin o Empleado.")
+            logger.warning("Se requiere permiso de Admin o Empleado.")
             return False
         
         data = {
@@ -691,7 +730,7 @@ class SistemaAlquiler:
             'fecha_multa': fecha_multa
         }
         if self.db_manager.create_multa(data):
-            print("Multa registrada exitosamente.")
+            logger.info("Multa registrada exitosamente.")
             return True
         return False
 
@@ -701,7 +740,7 @@ class SistemaAlquiler:
 
         alquiler = self.db_manager.get_alquiler_by_id(id_alquiler)
         if not alquiler:
-            print("Alquiler no encontrado.")
+            logger.warning("Alquiler no encontrado.")
             return []
 
         es_admin = self.check_permission("Admin", usuario)
@@ -709,7 +748,7 @@ class SistemaAlquiler:
 
         if not (es_admin or es_empleado):
             if alquiler['id_usuario'] != usuario.id_usuario:
-                print("No tiene permisos para ver multas de este alquiler.")
+                logger.warning("No tiene permisos para ver multas de este alquiler.")
                 return []
 
         return self.db_manager.get_multas_by_alquiler(id_alquiler)
@@ -719,7 +758,7 @@ class SistemaAlquiler:
         es_empleado = self.check_permission("Empleado", usuario)
         
         if not (es_admin or es_empleado):
-            print("Se requiere permiso de Admin o Empleado.")
+            logger.warning("Se requiere permiso de Admin o Empleado.")
             return False
         
         data = {
@@ -728,7 +767,7 @@ class SistemaAlquiler:
             'fecha_multa': fecha_multa
         }
         if self.db_manager.update_multa(id_multa, data):
-            print("Multa actualizada.")
+            logger.info("Multa actualizada.")
             return True
         return False
 
@@ -737,11 +776,11 @@ class SistemaAlquiler:
         es_empleado = self.check_permission("Empleado", usuario)
         
         if not (es_admin or es_empleado):
-            print("Se requiere permiso de Admin o Empleado.")
+            logger.warning("Se requiere permiso de Admin o Empleado.")
             return False
         
         if self.db_manager.delete_multa(id_multa):
-            print("Multa eliminada.")
+            logger.info("Multa eliminada.")
             return True
         return False
     
@@ -752,7 +791,7 @@ class SistemaAlquiler:
         es_empleado = self.check_permission("Empleado", usuario)
         
         if not (es_admin or es_empleado):
-            print("Se requiere permiso de Admin o Empleado.")
+            logger.warning("Se requiere permiso de Admin o Empleado.")
             return False
         
         data = {
@@ -764,7 +803,7 @@ class SistemaAlquiler:
         }
 
         if self.db_manager.schedule_mantenimiento(data):
-            print("Mantenimiento programado exitosamente (Pendiente).")
+            logger.info("Mantenimiento programado exitosamente (Pendiente).")
             return True
         return False
 
@@ -773,13 +812,13 @@ class SistemaAlquiler:
         es_empleado = self.check_permission("Empleado", usuario)
         
         if not (es_admin or es_empleado):
-            print("Se requiere permiso de Admin o Empleado.")
+            logger.warning("Se requiere permiso de Admin o Empleado.")
             return False
 
         if self.db_manager.start_mantenimiento(id_mantenimiento):
-            print("Mantenimiento iniciado. Vehículo puesto 'En Mantenimiento'.")
+            logger.info("Mantenimiento iniciado. Vehículo puesto 'En Mantenimiento'.")
             return True
-        print("No se pudo iniciar el mantenimiento.")
+        logger.warning("No se pudo iniciar el mantenimiento.")
         return False
 
     def finalizar_mantenimiento(self, id_mantenimiento, usuario):
@@ -787,13 +826,13 @@ class SistemaAlquiler:
         es_empleado = self.check_permission("Empleado", usuario)
         
         if not (es_admin or es_empleado):
-            print("Se requiere permiso de Admin o Empleado.")
+            logger.warning("Se requiere permiso de Admin o Empleado.")
             return False
 
         if self.db_manager.finish_mantenimiento(id_mantenimiento):
-            print("Mantenimiento finalizado. Vehículo liberado.")
+            logger.info("Mantenimiento finalizado. Vehículo liberado.")
             return True
-        print("No se pudo finalizar el mantenimiento.")
+        logger.warning("No se pudo finalizar el mantenimiento.")
         return False
 
     def cancelar_mantenimiento(self, id_mantenimiento, usuario):
@@ -801,13 +840,13 @@ class SistemaAlquiler:
         es_empleado = self.check_permission("Empleado", usuario)
         
         if not (es_admin or es_empleado):
-            print("Se requiere permiso de Admin o Empleado.")
+            logger.warning("Se requiere permiso de Admin o Empleado.")
             return False
 
         if self.db_manager.cancel_pending_mantenimiento(id_mantenimiento):
-            print("Mantenimiento cancelado.")
+            logger.info("Mantenimiento cancelado.")
             return True
-        print("No se pudo cancelar (Tal vez ya no está pendiente).")
+        logger.warning("No se pudo cancelar (Tal vez ya no está pendiente).")
         return False
     
     def listar_todos_mantenimientos(self, usuario):
@@ -819,6 +858,18 @@ class SistemaAlquiler:
         
         return self.db_manager.get_all_mantenimientos()
 
+    def listar_mantenimientos_pagina(self, usuario, after=None, limit=LIMITE_DEFAULT, **filtros):
+        if not (self.check_permission("Admin", usuario) or self.check_permission("Empleado", usuario)):
+            return {"items": [], "next_cursor": None}
+
+        return self.db_manager.get_mantenimientos_pagina(after, limit, **filtros)
+
+    def exportar_mantenimientos(self, usuario, **filtros):
+        if not (self.check_permission("Admin", usuario) or self.check_permission("Empleado", usuario)):
+            return None
+
+        return self.db_manager.iter_mantenimientos(**filtros)
+
     def consultar_mantenimiento_por_id(self, id_mantenimiento, usuario):
         es_admin = self.check_permission("Admin", usuario)
         es_empleado = self.check_permission("Empleado", usuario)
@@ -830,11 +881,11 @@ class SistemaAlquiler:
 
     def eliminar_mantenimiento(self, id_mantenimiento, usuario):
         if not self.check_permission("Admin", usuario):
-            print("Se requiere permiso de Admin para eliminar registros de mantenimiento.")
+            logger.warning("Se requiere permiso de Admin para eliminar registros de mantenimiento.")
             return False
 
         if self.db_manager.delete_mantenimiento(id_mantenimiento):
-            print(f"Mantenimiento {id_mantenimiento} eliminado.")
+            logger.info("Mantenimiento %s eliminado.", id_mantenimiento)
             return True
         return False
     
@@ -876,6 +927,22 @@ class SistemaAlquiler:
         
         return self.db_manager.get_report_alquileres_por_cliente(id_cliente)
 
+    def exportar_reporte_alquileres_cliente(self, id_cliente, usuario):
+        """Versión en streaming de reporte_alquileres_cliente (mismas reglas de acceso)."""
+        if not usuario:
+            return None
+
+        es_admin = self.check_permission("Admin", usuario)
+        es_empleado = self.check_permission("Empleado", usuario)
+
+        if not (es_admin or es_empleado):
+            # Un cliente solo puede ver su propio reporte
+            cliente = self.db_manager.get_client_by_id(id_cliente)
+            if not cliente or str(usuario.id_persona) != str(cliente.id_persona):
+                return None
+
+        return self.db_manager.iter_report_alquileres_por_cliente(id_cliente)
+
     def reporte_ranking_vehiculos(self, fecha_desde, fecha_hasta):
         # Público
         return self.db_manager.get_report_ranking_vehiculos(fecha_desde, fecha_hasta)
@@ -889,14 +956,14 @@ class SistemaAlquiler:
         
         return self.db_manager.get_report_evolucion_temporal(fecha_desde, fecha_hasta)
 
-    def reporte_facturacion_mensual(self, fecha_desde, fecha_hasta, usuario):
+    def reporte_facturacion_mensual(self, fecha_desde, fecha_hasta, usuario, agrupacion='mensual'):
         es_admin = self.check_permission("Admin", usuario)
         es_empleado = self.check_permission("Empleado", usuario)
 
         if not (es_admin or es_empleado):
             return None
         
-        return self.db_manager.get_report_facturacion_mensual(fecha_desde, fecha_hasta)
+        return self.db_manager.get_report_facturacion_mensual(fecha_desde, fecha_hasta, agrupacion)
 
     def reporte_detalle_clientes_pdf(self, fecha_desde, fecha_hasta, usuario):
         """Reporte para PDF: Detalle de alquileres agrupado por cliente"""
@@ -936,91 +1003,87 @@ class SistemaAlquiler:
         
         return self.db_manager.get_detailed_client_rentals_report(fecha_desde, fecha_hasta)
     
+    def exportar_reporte_detalle_clientes_completo(self, fecha_desde, fecha_hasta, usuario):
+        if not usuario:
+            return None
+
+        if not (self.check_permission("Admin", usuario) or self.check_permission("Empleado", usuario)):
+            return None
+
+        return self.db_manager.iter_detailed_client_rentals_report(fecha_desde, fecha_hasta)
+
+    def solicitar_reporte_pdf(self, reporte, parametros, usuario):
+        """Encola la generación del PDF. None sin permiso; ValueError si el pedido es inválido."""
+        if not usuario:
+            return None
+
+        if not (self.check_permission("Admin", usuario) or self.check_permission("Empleado", usuario)):
+            return None
+
+        return self.trabajos_pdf.encolar(reporte, parametros, usuario.id_usuario)
+
+    def consultar_reporte_pdf(self, id_trabajo, usuario):
+        """Estado de un trabajo: solo lo ve quien lo pidió o un Admin."""
+        if not usuario:
+            return None
+
+        trabajo = self.trabajos_pdf.obtener(id_trabajo)
+        if not trabajo:
+            return None
+        if trabajo['id_usuario'] != usuario.id_usuario and not self.check_permission("Admin", usuario):
+            return None
+        return trabajo
+
     # --- NUEVOS MÉTODOS PARA DASHBOARD ---
 
     def obtener_estadisticas_dashboard(self, usuario):
         """Obtiene estadísticas personalizadas para el dashboard según el rol del usuario"""
         try:
-            print(f"DEBUG: obtener_estadisticas_dashboard para usuario {usuario.user_name}, rol: {usuario.permiso.descripcion}")
+            logger.debug("obtener_estadisticas_dashboard para usuario %s, rol: %s", usuario.user_name, usuario.permiso.descripcion)
             
             if self.check_permission("Admin", usuario) or self.check_permission("Empleado", usuario):
                 stats = self._estadisticas_admin_empleado()
-                print(f"DEBUG: Estadísticas para admin/empleado: {stats}")
+                logger.debug("Estadísticas para admin/empleado: %s", stats)
                 return stats
             elif self.check_permission("Cliente", usuario):
                 stats = self._estadisticas_cliente(usuario)
-                print(f"DEBUG: Estadísticas para cliente: {stats}")
+                logger.debug("Estadísticas para cliente: %s", stats)
                 return stats
             else:
-                print("DEBUG: Usuario sin permisos reconocidos")
+                logger.debug("Usuario sin permisos reconocidos")
                 return {}
                 
-        except Exception as e:
-            print(f"ERROR en obtener_estadisticas_dashboard: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error en obtener_estadisticas_dashboard")
             return {}
 
     def _estadisticas_admin_empleado(self):
-        """Estadísticas para admin y empleado - VERSIÓN CORREGIDA"""
+        """Estadísticas para admin y empleado, leídas de los contadores del dashboard"""
         try:
-            print("DEBUG: Obteniendo datos para estadísticas admin/empleado...")
-            
-            vehiculos = self.db_manager.get_all_vehiculos()
-            alquileres = self.db_manager.get_all_alquileres()
-            clientes = self.db_manager.get_all_clients()
-            mantenimientos = self.db_manager.get_all_mantenimientos()
-            
-            print(f"DEBUG: {len(vehiculos)} vehículos, {len(alquileres)} alquileres, {len(clientes)} clientes, {len(mantenimientos)} mantenimientos")
-            
-            # CORRECCIÓN: Acceso seguro a propiedades
-            vehiculos_libres = []
-            for v in vehiculos:
-                try:
-                    # Verificar si el vehículo está libre
-                    if v['estado'] == 'Libre':
-                        vehiculos_libres.append(v)
-                    elif hasattr(v, 'estado') and isinstance(v.estado, str) and v.estado == 'Libre':
-                        vehiculos_libres.append(v)
-                except Exception as e:
-                    print(f"DEBUG - Error procesando vehículo {v.patente}: {e}")
-                    continue
-            
-            # CORRECCIÓN: Filtrar alquileres activos (id_estado 2 = Activo, 3 = Atrasado)
-            alquileres_activos = []
-            for a in alquileres:
-                try:
-                    if a.get('id_estado') in [2, 3]:
-                        alquileres_activos.append(a)
-                except Exception as e:
-                    print(f"DEBUG - Error procesando alquiler {a.get('id_alquiler')}: {e}")
-                    continue
-            
-            # CORRECCIÓN: Filtrar mantenimientos pendientes (id_estado 3 = Pendiente)
-            mantenimientos_pendientes = []
-            for m in mantenimientos:
-                try:
-                    if m.get('id_estado') == 3:
-                        mantenimientos_pendientes.append(m)
-                except Exception as e:
-                    print(f"DEBUG - Error procesando mantenimiento {m.get('id_mantenimiento')}: {e}")
-                    continue
-            
+            contadores = self.db_manager.get_contadores_dashboard()
+            if contadores is None:
+                return {}
+
+            vehiculos = contadores.get('vehiculo', {})
+            alquileres = contadores.get('alquiler', {})
+            mantenimientos = contadores.get('mantenimiento', {})
+
             stats = {
-                'total_vehiculos': len(vehiculos),
-                'vehiculos_disponibles': len(vehiculos_libres),
-                'alquileres_activos': len(alquileres_activos),
-                'mantenimientos_pendientes': len(mantenimientos_pendientes),
-                'total_clientes': len(clientes)
+                'total_vehiculos': sum(vehiculos.values()),
+                # id_estado 1 = Libre
+                'vehiculos_disponibles': vehiculos.get(1, 0),
+                # id_estado 2 = Activo, 3 = Atrasado
+                'alquileres_activos': alquileres.get(2, 0) + alquileres.get(3, 0),
+                # id_estado 3 = Pendiente
+                'mantenimientos_pendientes': mantenimientos.get(3, 0),
+                'total_clientes': sum(contadores.get('cliente', {}).values())
             }
-            
-            print(f"DEBUG: Estadísticas calculadas: {stats}")
+
+            logger.debug("Estadísticas calculadas: %s", stats)
             return stats
-            
-        except Exception as e:
-            print(f"ERROR en _estadisticas_admin_empleado: {e}")
-            import traceback
-            traceback.print_exc()
+
+        except Exception:
+            logger.exception("Error en _estadisticas_admin_empleado")
             return {}
 
     def _estadisticas_cliente(self, usuario):
@@ -1033,7 +1096,6 @@ class SistemaAlquiler:
             # Obtener todos los alquileres del cliente usando id_usuario
             alquileres_cliente = self.db_manager.get_alquileres_por_usuario(usuario.id_usuario)
             vehiculos = self.db_manager.get_all_vehiculos()
-            print(vehiculos)
             
             vehiculos_libres = [v for v in vehiculos if v['estado'] == 'Libre']
             alquileres_activos = [a for a in alquileres_cliente if a.get('id_estado') in [2, 3]]
@@ -1049,7 +1111,7 @@ class SistemaAlquiler:
                 'total_vehiculos': len(vehiculos)  # Agregado para mantener consistencia
             }
         except Exception as e:
-            print(f"Error en estadísticas cliente: {e}")
+            logger.error("Error en estadísticas cliente: %s", e)
             return {}
 
     def _obtener_vehiculo_favorito_cliente(self, id_usuario, alquileres_cliente, vehiculos):
@@ -1077,7 +1139,7 @@ class SistemaAlquiler:
             
             return None
         except Exception as e:
-            print(f"Error obteniendo vehículo favorito: {e}")
+            logger.error("Error obteniendo vehículo favorito: %s", e)
             return None
 
     def obtener_ultimo_alquiler_cliente(self, usuario):
@@ -1101,7 +1163,7 @@ class SistemaAlquiler:
             return alquileres_ordenados[0] if alquileres_ordenados else None
             
         except Exception as e:
-            print(f"Error obteniendo último alquiler: {e}")
+            logger.error("Error obteniendo último alquiler: %s", e)
             return None
 
     def verificar_disponibilidad_vehiculo(self, patente):
@@ -1112,7 +1174,7 @@ class SistemaAlquiler:
                 return True
             return False
         except Exception as e:
-            print(f"Error verificando disponibilidad: {e}")
+            logger.error("Error verificando disponibilidad: %s", e)
             return False
     
     def consultar_alquileres_usuario(self, usuario):
@@ -1125,12 +1187,34 @@ class SistemaAlquiler:
         
         elif self.check_permission("Cliente", usuario):
             # Cliente solo ve sus propios alquileres
-            print(f"DEBUG: Usuario es Cliente (ID: {usuario.id_usuario}), devolviendo solo sus alquileres")
+            logger.debug("Usuario es Cliente (ID: %s), devolviendo solo sus alquileres", usuario.id_usuario)
             return self.db_manager.get_alquileres_por_usuario(usuario.id_usuario)
         else:
-            print("DEBUG: Usuario sin permisos reconocidos")
+            logger.debug("Usuario sin permisos reconocidos")
             return []
         
+    def consultar_alquileres_pagina(self, usuario, after=None, limit=LIMITE_DEFAULT, **filtros):
+        """Versión paginada de consultar_alquileres_usuario (mismas reglas de acceso)."""
+        if not usuario:
+            return {"items": [], "next_cursor": None}
+
+        if self.check_permission("Admin", usuario) or self.check_permission("Empleado", usuario):
+            return self.db_manager.get_alquileres_pagina(after, limit, **filtros)
+        elif self.check_permission("Cliente", usuario):
+            return self.db_manager.get_alquileres_pagina(after, limit, id_usuario=usuario.id_usuario, **filtros)
+        return {"items": [], "next_cursor": None}
+
+    def exportar_alquileres(self, usuario, **filtros):
+        """Iterador (streaming) con los alquileres visibles para el usuario; None sin permisos."""
+        if not usuario:
+            return None
+
+        if self.check_permission("Admin", usuario) or self.check_permission("Empleado", usuario):
+            return self.db_manager.iter_alquileres(**filtros)
+        elif self.check_permission("Cliente", usuario):
+            return self.db_manager.iter_alquileres(id_usuario=usuario.id_usuario, **filtros)
+        return None
+
     def get_cliente_por_usuario(self, id_usuario):
     
         return self.db_manager.get_cliente_por_usuario(id_usuario)
@@ -1140,7 +1224,7 @@ class SistemaAlquiler:
             # Primero obtener el ID del empleado desde el usuario
             empleado = self.db_manager.get_empleado_por_usuario(id_usuario)
             if not empleado:
-                print("Empleado no encontrado para el usuario")
+                logger.warning("Empleado no encontrado para el usuario")
                 return []
             
             # Obtener los alquileres de ese empleado
@@ -1148,7 +1232,7 @@ class SistemaAlquiler:
             return alquileres
             
         except Exception as e:
-            print(f"Error obteniendo alquileres del empleado: {e}")
+            logger.error("Error obteniendo alquileres del empleado: %s", e)
             return []
     
     def obtener_persona_por_usuario(self, id_usuario):
@@ -1157,13 +1241,13 @@ class SistemaAlquiler:
     def actualizar_persona_por_usuario(self, id_usuario, persona_data, usuario_solicitante):
         # Verificar que el usuario solo pueda editar su propio perfil
         if str(usuario_solicitante.id_usuario) != str(id_usuario):
-            print("No puedes editar el perfil de otro usuario")
+            logger.warning("No puedes editar el perfil de otro usuario")
             return False
         
         # Obtener el id_persona del usuario
         persona_actual = self.db_manager.get_persona_por_usuario(id_usuario)
         if not persona_actual:
-            print("No se encontró la persona asociada al usuario")
+            logger.warning("No se encontró la persona asociada al usuario")
             return False
         
         # Actualizar los datos de la persona
@@ -1190,7 +1274,7 @@ class SistemaAlquiler:
             # Usuario
             usuario_data = {
                 "user_name": usuario["user_name"],
-                "password": usuario["password"],
+                "password": self._hash_password(usuario["password"]),
                 "id_permiso": usuario["id_permiso"]
             }
 
@@ -1205,7 +1289,7 @@ class SistemaAlquiler:
             return id_empleado
 
         except Exception as e:
-            print("Error en crear_empleado_mostrador:", e)
+            logger.error("Error en crear_empleado_mostrador: %s", e)
             return None
         
     def listar_todos_los_empleados(self, usuario):
@@ -1217,9 +1301,21 @@ class SistemaAlquiler:
             return self.db_manager.get_all_empleados()
         
         except Exception as e:
-            print(f"Error en listar_todos_los_empleados: {e}")
+            logger.error("Error en listar_todos_los_empleados: %s", e)
             return []
 
+    def listar_empleados_pagina(self, usuario, after=None, limit=LIMITE_DEFAULT):
+        if not self.check_permission('Admin', usuario) and not self.check_permission('Empleado', usuario):
+            return {"items": [], "next_cursor": None}
+
+        return self.db_manager.get_empleados_pagina(after, limit)
+
+    def buscar_empleados(self, usuario, texto, after=None, limit=LIMITE_DEFAULT):
+        if not self.check_permission('Admin', usuario) and not self.check_permission('Empleado', usuario):
+            return {"items": [], "next_cursor": None}
+
+        return self.db_manager.buscar_empleados(texto, after, limit)
+
     def actualizar_datos_empleado(self, id_empleado, data, usuario_actual):
         # Verificar permisos según tu lógica
         if not self.check_permission('admin', usuario_actual):
@@ -1238,9 +1334,9 @@ class SistemaAlquiler:
         exito = self.db_manager.delete_employee_full(id_empleado)
 
         if exito:
-            print(f"Empleado {id_empleado} eliminado exitosamente.")
+            logger.info("Empleado %s eliminado exitosamente.", id_empleado)
             return True
         else:
-            print(f"No se pudo eliminar al empleado {id_empleado}.")
+            logger.warning("No se pudo eliminar al empleado %s.", id_empleado)
             return False
         
\ No newline at end of file
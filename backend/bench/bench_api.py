@@ -0,0 +1,404 @@
+"""
+Benchmark de la API: latencia (p50/p95/p99) y throughput de login, búsqueda de
+disponibilidad, alta de alquileres, listados, dashboard y todos los reportes,
+sobre una base generada con backend/db/generar_datos.py.
+
+Por defecto corre la aplicación en el mismo proceso (Flask test_client) sobre
+una copia de la base, así cada corrida parte de los mismos datos y los números
+son comparables entre commits. Con --url mide un servidor ya levantado por HTTP
+(que debe estar usando una base generada y recién creada).
+
+Uso:
+    python backend/db/generar_datos.py /tmp/bench.sqlite --referencia 2025-01-01
+    python backend/bench/bench_api.py /tmp/bench.sqlite --salida antes.json
+    (cambios)
+    python backend/bench/bench_api.py /tmp/bench.sqlite --salida despues.json --comparar antes.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+# El log de cada request distorsiona los tiempos; se lee al importar log_config
+os.environ.setdefault('ALQUILERES_LOG_LEVEL', 'WARNING')
+# Sin planificador: una pasada en medio de la corrida cambiaría los datos medidos
+os.environ.setdefault('ALQUILERES_SCHEDULER', '0')
+
+from backend.db.generar_datos import APELLIDOS, DOMINIO, NOMBRES, PASSWORD  # noqa: E402
+
+RAIZ_REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+ESPERA_PDF = 120
+
+
+# --- Clientes: la app en proceso o un servidor por HTTP ---
+
+class ClienteFlask:
+    def __init__(self, app):
+        self._cliente = app.test_client()
+
+    def pedir(self, metodo, ruta, datos=None, token=None):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        respuesta = self._cliente.open(ruta, method=metodo, json=datos, headers=headers)
+        # Lee el cuerpo completo: los reportes en streaming se arman mientras se leen
+        cuerpo = respuesta.get_data()
+        respuesta.close()
+        return respuesta.status_code, cuerpo
+
+
+class ClienteHTTP:
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+
+    def pedir(self, metodo, ruta, datos=None, token=None):
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        cuerpo = json.dumps(datos).encode('utf-8') if datos is not None else None
+        pedido = urllib.request.Request(self.url + ruta, data=cuerpo, headers=headers, method=metodo)
+        try:
+            with urllib.request.urlopen(pedido, timeout=300) as respuesta:
+                return respuesta.status, respuesta.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+
+# --- Escenarios ---
+
+class Contexto:
+    """Tokens e ids que usan los escenarios; se arma una vez antes de medir."""
+
+    def __init__(self, cliente, n_clientes):
+        self.tokens = {}
+        for rol in ('admin', 'empleado1', 'cliente1'):
+            status, cuerpo = cliente.pedir('POST', '/api/login',
+                                           {'email': f'{rol}@{DOMINIO}', 'password': PASSWORD})
+            if status != 200:
+                raise SystemExit(f"No se pudo iniciar sesión como {rol}@{DOMINIO} ({status}). "
+                                 f"¿La base fue creada con generar_datos.py?")
+            self.tokens[rol] = json.loads(cuerpo)['token']
+
+        _, cuerpo = cliente.pedir('GET', '/api/vehiculos', token=self.tokens['admin'])
+        vehiculos = json.loads(cuerpo)
+        self.patentes = sorted(v['patente'] for v in vehiculos)
+        self.patentes_libres = sorted(v['patente'] for v in vehiculos if v.get('estado') == 'Libre')
+        self.n_clientes = n_clientes
+        self.hoy = date.today()
+        self._altas = 0
+        self._lock = threading.Lock()
+
+    def ventana_alta(self):
+        """Vehículo y fechas para un alquiler nuevo: más allá de las reservas generadas y sin repetirse."""
+        with self._lock:
+            numero = self._altas
+            self._altas += 1
+        vuelta, indice = divmod(numero, len(self.patentes_libres))
+        inicio = self.hoy + timedelta(days=400 + 7 * vuelta)
+        return self.patentes_libres[indice], inicio, inicio + timedelta(days=3)
+
+
+def _rango_fechas(rnd, ctx, maximo_dias=60):
+    inicio = ctx.hoy + timedelta(days=rnd.randint(1, 60))
+    return inicio, inicio + timedelta(days=rnd.randint(1, maximo_dias))
+
+
+def _login(cliente, ctx, rnd):
+    n = rnd.randint(1, ctx.n_clientes)
+    return cliente.pedir('POST', '/api/login', {'email': f'cliente{n}@{DOMINIO}', 'password': PASSWORD})
+
+
+def _libres(cliente, ctx, rnd):
+    inicio, fin = _rango_fechas(rnd, ctx, 14)
+    return cliente.pedir('GET', f'/api/vehiculos/libres?fecha_inicio={inicio}&fecha_fin={fin}',
+                         token=ctx.tokens['cliente1'])
+
+
+def _libres_bulk(cliente, ctx, rnd):
+    ventanas = []
+    for _ in range(10):
+        inicio, fin = _rango_fechas(rnd, ctx, 14)
+        ventanas.append({'fecha_inicio': str(inicio), 'fecha_fin': str(fin)})
+    return cliente.pedir('POST', '/api/vehiculos/libres/bulk', {'ventanas': ventanas}, token=ctx.tokens['cliente1'])
+
+
+def _calendario(cliente, ctx, rnd):
+    return cliente.pedir('GET', '/api/vehiculos/calendario?dias=90', token=ctx.tokens['cliente1'])
+
+
+def _crear_alquiler(cliente, ctx, rnd):
+    patente, inicio, fin = ctx.ventana_alta()
+    datos = {'patente': patente, 'id_cliente': rnd.randint(1, ctx.n_clientes), 'id_empleado': 1,
+             'fecha_inicio': f'{inicio}T10:00:00', 'fecha_fin': f'{fin}T10:00:00'}
+    return cliente.pedir('POST', '/api/alquileres', datos, token=ctx.tokens['empleado1'])
+
+
+def _listado(ruta, rol='admin'):
+    def pedir(cliente, ctx, rnd):
+        return cliente.pedir('GET', ruta, token=ctx.tokens[rol])
+    return pedir
+
+
+def _vehiculo(cliente, ctx, rnd):
+    return cliente.pedir('GET', f'/api/vehiculos/{rnd.choice(ctx.patentes)}', token=ctx.tokens['admin'])
+
+
+def _busqueda_clientes(cliente, ctx, rnd):
+    # Lo que se tipea en el mostrador: apellido y el principio del nombre
+    texto = f"{rnd.choice(APELLIDOS)} {rnd.choice(NOMBRES)[:rnd.randint(2, 4)]}"
+    return cliente.pedir('GET', f'/api/clientes/search?q={urllib.parse.quote(texto)}&limit=20',
+                         token=ctx.tokens['empleado1'])
+
+
+def _busqueda_documento(cliente, ctx, rnd):
+    # Primeros dígitos de un documento (generar_datos numera los clientes desde 30000001)
+    documento = str(30000000 + rnd.randint(1, ctx.n_clientes))
+    return cliente.pedir('GET', f'/api/clientes/search?q={documento[:rnd.randint(4, len(documento))]}&limit=20',
+                         token=ctx.tokens['empleado1'])
+
+
+def _reporte_cliente(cliente, ctx, rnd):
+    # Los ids bajos son los clientes con más historial
+    id_cliente = 1 + int(ctx.n_clientes * rnd.random() ** 2)
+    return cliente.pedir('GET', f'/api/reportes/cliente/{id_cliente}', token=ctx.tokens['admin'])
+
+
+def _reporte_pdf_servidor(reporte):
+    def pedir(cliente, ctx, rnd):
+        token = ctx.tokens['admin']
+        status, cuerpo = cliente.pedir('POST', '/api/reportes/jobs', {'reporte': reporte}, token=token)
+        if status not in (200, 202):
+            return status, cuerpo
+        trabajo = json.loads(cuerpo)
+        limite = time.perf_counter() + ESPERA_PDF
+        while trabajo['estado'] not in ('listo', 'error') and time.perf_counter() < limite:
+            time.sleep(0.005)
+            _, cuerpo = cliente.pedir('GET', f"/api/reportes/jobs/{trabajo['id']}", token=token)
+            trabajo = json.loads(cuerpo)
+        return cliente.pedir('GET', f"/api/reportes/jobs/{trabajo['id']}/pdf", token=token)
+    return pedir
+
+
+# Nombre -> (función, ¿lee reportes?). El orden es el de ejecución; el alta va
+# al final para que los reportes se midan sobre los datos generados.
+ESCENARIOS = {
+    'login': (_login, False),
+    'disponibilidad': (_libres, False),
+    'disponibilidad-bulk': (_libres_bulk, False),
+    'calendario': (_calendario, False),
+    'vehiculo': (_vehiculo, False),
+    'listado-vehiculos': (_listado('/api/vehiculos'), False),
+    'listado-clientes': (_listado('/api/clientes?limit=50'), False),
+    'listado-empleados': (_listado('/api/empleados?limit=50'), False),
+    'listado-alquileres': (_listado('/api/alquileres?limit=50'), False),
+    'listado-alquileres-cliente': (_listado('/api/alquileres', 'cliente1'), False),
+    'busqueda-clientes': (_busqueda_clientes, False),
+    'busqueda-documento': (_busqueda_documento, False),
+    'listado-mantenimientos': (_listado('/api/mantenimientos?limit=50'), False),
+    'dashboard-admin': (_listado('/api/dashboard/estadisticas'), False),
+    'dashboard-cliente': (_listado('/api/dashboard/estadisticas', 'cliente1'), False),
+    'dashboard-empleado': (_listado('/api/dashboard/alquileres/empleado', 'empleado1'), False),
+    'reporte-cliente': (_reporte_cliente, True),
+    'reporte-ranking': (_listado('/api/reportes/ranking-vehiculos'), True),
+    'reporte-evolucion': (_listado('/api/reportes/evolucion-alquileres'), True),
+    'reporte-facturacion': (_listado('/api/reportes/facturacion?agrupacion=mensual'), True),
+    'reporte-pdf-periodo': (_listado('/api/reportes/pdf/alquileres-periodo'), True),
+    'reporte-pdf-ranking': (_listado('/api/reportes/pdf/ranking-vehiculos'), True),
+    'reporte-pdf-facturacion': (_listado('/api/reportes/pdf/facturacion-mensual'), True),
+    'reporte-detalle-completo': (_listado('/api/reportes/pdf/detalle-clientes-completo'), True),
+    'pdf-servidor-periodo': (_reporte_pdf_servidor('alquileres-periodo'), True),
+    'pdf-servidor-detalle': (_reporte_pdf_servidor('detalle-clientes-completo'), True),
+    'crear-alquiler': (_crear_alquiler, False),
+}
+
+
+# --- Medición ---
+
+def percentil(ordenados, p):
+    if not ordenados:
+        return 0.0
+    indice = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados) + 0.5) - 1))
+    return ordenados[indice]
+
+
+def medir(nombre, funcion, clientes, ctx, iteraciones, calentamiento, seed, antes_de_cada=None):
+    """Corre el escenario repartido en un hilo por cliente; devuelve sus estadísticas."""
+    # Semilla propia por escenario: elegir un subconjunto no cambia los parámetros de los demás
+    semilla = f'{seed}-{nombre}'
+    rnd = random.Random(semilla)
+    for _ in range(calentamiento):
+        if antes_de_cada:
+            antes_de_cada()
+        funcion(clientes[0], ctx, rnd)
+
+    latencias, errores = [], []
+    lock = threading.Lock()
+    por_hilo = [iteraciones // len(clientes) + (i < iteraciones % len(clientes)) for i in range(len(clientes))]
+
+    def trabajar(indice):
+        rnd_hilo = random.Random(f'{semilla}-{indice}')
+        propias, fallidas = [], []
+        for _ in range(por_hilo[indice]):
+            if antes_de_cada:
+                antes_de_cada()
+            inicio = time.perf_counter()
+            status, _ = funcion(clientes[indice], ctx, rnd_hilo)
+            propias.append(time.perf_counter() - inicio)
+            if status >= 400:
+                fallidas.append(status)
+        with lock:
+            latencias.extend(propias)
+            errores.extend(fallidas)
+
+    hilos = [threading.Thread(target=trabajar, args=(i,)) for i in range(len(clientes))]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    total = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        'iteraciones': len(latencias),
+        'errores': len(errores),
+        'codigos_error': sorted(set(errores)),
+        'p50_ms': percentil(latencias, 50) * 1000,
+        'p95_ms': percentil(latencias, 95) * 1000,
+        'p99_ms': percentil(latencias, 99) * 1000,
+        'max_ms': (latencias[-1] if latencias else 0) * 1000,
+        'media_ms': (sum(latencias) / len(latencias) if latencias else 0) * 1000,
+        'req_s': len(latencias) / total if total else 0,
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ_REPO, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _totales(path):
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        return {tabla: conn.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+                for tabla in ('Vehiculo', 'Cliente', 'Empleado', 'Alquiler', 'Multa', 'Danio', 'Mantenimiento')}
+    finally:
+        conn.close()
+
+
+def imprimir(resultados, base=None):
+    encabezado = f"{'escenario':28s} {'n':>5s} {'err':>4s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'req/s':>8s}"
+    if base:
+        encabezado += f" {'Δp50':>7s} {'Δp95':>7s} {'Δreq/s':>7s}"
+    print(encabezado)
+    for nombre, r in resultados.items():
+        linea = (f"{nombre:28s} {r['iteraciones']:5d} {r['errores']:4d} {r['p50_ms']:9.2f} {r['p95_ms']:9.2f} "
+                 f"{r['p99_ms']:9.2f} {r['req_s']:8.1f}")
+        anterior = (base or {}).get(nombre)
+        if anterior:
+            cambio = lambda clave: (f"{(r[clave] / anterior[clave] - 1) * 100:+6.0f}%"
+                                    if anterior[clave] else '      -')
+            linea += f" {cambio('p50_ms')} {cambio('p95_ms')} {cambio('req_s')}"
+        print(linea)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la API sobre una base generada.')
+    parser.add_argument('base', nargs='?', help='Base de generar_datos.py (se usa una copia); no hace falta con --url')
+    parser.add_argument('--url', help='Medir un servidor ya levantado (ej. http://localhost:5000)')
+    parser.add_argument('--clientes', type=int, default=None,
+                        help='Clientes de la base (por defecto se cuentan en la base)')
+    parser.add_argument('--iteraciones', type=int, default=50)
+    parser.add_argument('--calentamiento', type=int, default=3)
+    parser.add_argument('--hilos', type=int, default=1, help='Pedidos concurrentes por escenario')
+    parser.add_argument('--escenarios', help=f"Lista separada por comas (de: {', '.join(ESCENARIOS)})")
+    parser.add_argument('--sin-cache', action='store_true',
+                        help='Invalida la cache de reportes antes de cada pedido (solo en proceso)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--salida', help='Guarda los resultados en este JSON')
+    parser.add_argument('--comparar', help='JSON de una corrida anterior para mostrar la diferencia')
+    args = parser.parse_args()
+
+    if not args.url and not args.base:
+        parser.error('Indique la base generada o --url')
+    nombres = args.escenarios.split(',') if args.escenarios else list(ESCENARIOS)
+    desconocidos = [n for n in nombres if n not in ESCENARIOS]
+    if desconocidos:
+        parser.error(f"Escenarios desconocidos: {', '.join(desconocidos)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        invalidar = None
+        totales = None
+        if args.url:
+            clientes = [ClienteHTTP(args.url) for _ in range(args.hilos)]
+        else:
+            totales = _totales(args.base)
+            copia = os.path.join(tmp, 'bench.sqlite')
+            shutil.copy(args.base, copia)
+            os.environ['ALQUILERES_PDF_DIR'] = os.path.join(tmp, 'pdf')
+            from db_manager import DBManager
+            DBManager._instance = None
+            dbm = DBManager(db_path=copia)
+            # api crea su SistemaAlquiler sobre el DBManager ya inicializado con la copia
+            from api import app, sistema
+            clientes = [ClienteFlask(app) for _ in range(args.hilos)]
+            if args.sin_cache:
+                invalidar = dbm.reportes.invalidar
+
+        n_clientes = args.clientes or (totales or {}).get('Cliente')
+        if not n_clientes:
+            parser.error('Con --url indique --clientes')
+        ctx = Contexto(clientes[0], n_clientes)
+
+        resultados = {}
+        for nombre in nombres:
+            funcion, lee_reportes = ESCENARIOS[nombre]
+            resultados[nombre] = medir(nombre, funcion, clientes, ctx, args.iteraciones, args.calentamiento,
+                                       args.seed, invalidar if lee_reportes else None)
+            print(f"  {nombre}: p50 {resultados[nombre]['p50_ms']:.2f} ms", file=sys.stderr)
+
+        if not args.url:
+            sistema.trabajos_pdf.cerrar()
+            dbm.read_pool.close_all()
+            dbm.write_pool.close_all()
+
+    base = None
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            base = json.load(archivo)['escenarios']
+    imprimir(resultados, base)
+
+    if args.salida:
+        datos = {
+            'commit': _commit(),
+            'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'modo': args.url or 'en proceso',
+            'datos': totales,
+            'parametros': {clave: getattr(args, clave) for clave in
+                           ('iteraciones', 'calentamiento', 'hilos', 'sin_cache', 'seed')},
+            'escenarios': resultados,
+        }
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(datos, archivo, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {args.salida}")
+
+
+if __name__ == '__main__':
+    main()
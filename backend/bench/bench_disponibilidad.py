@@ -0,0 +1,125 @@
+"""
+Compara la consulta de disponibilidad original (cuatro rangos con OR sobre
+todo Alquiler/Mantenimiento) contra AvailabilityIndex.
+
+Uso:
+    python backend/bench/bench_disponibilidad.py [--alquileres 100000] [--vehiculos 500]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from availability_index import AvailabilityIndex, normalizar_fecha  # noqa: E402
+
+
+SQL_ORIGINAL = """
+    SELECT v.patente FROM Vehiculo v
+    WHERE v.patente NOT IN (
+        SELECT a.patente FROM Alquiler a
+        WHERE a.id_estado IN (1, 2)
+        AND (
+            (a.fecha_inicio < ? AND a.fecha_fin > ?) OR
+            (a.fecha_inicio BETWEEN ? AND ?) OR
+            (a.fecha_fin BETWEEN ? AND ?) OR
+            (a.fecha_inicio <= ? AND a.fecha_fin >= ?)
+        )
+    )
+    AND v.patente NOT IN (
+        SELECT m.patente FROM Mantenimiento m
+        WHERE m.id_estado IN (1, 3)
+        AND (
+            (m.fecha_inicio < ? AND m.fecha_fin > ?) OR
+            (m.fecha_inicio BETWEEN ? AND ?) OR
+            (m.fecha_fin BETWEEN ? AND ?) OR
+            (m.fecha_inicio <= ? AND m.fecha_fin >= ?)
+        )
+    )
+"""
+
+
+def generar(path, n_alquileres, n_vehiculos, seed=42):
+    rnd = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE Vehiculo (patente TEXT PRIMARY KEY);
+        CREATE TABLE Alquiler (id_alquiler INTEGER PRIMARY KEY, patente TEXT,
+                               fecha_inicio TEXT, fecha_fin TEXT, id_estado INTEGER);
+        CREATE TABLE Mantenimiento (id_mantenimiento INTEGER PRIMARY KEY, patente TEXT,
+                                    fecha_inicio TEXT, fecha_fin TEXT, id_estado INTEGER);
+    """)
+    patentes = [f'AA{i:03d}ZZ' for i in range(n_vehiculos)]
+    conn.executemany("INSERT INTO Vehiculo VALUES (?)", [(p,) for p in patentes])
+
+    base = datetime(2020, 1, 1)
+    filas = []
+    for _ in range(n_alquileres):
+        inicio = base + timedelta(hours=rnd.randint(0, 24 * 365 * 6))
+        fin = inicio + timedelta(hours=rnd.randint(4, 24 * 14))
+        filas.append((rnd.choice(patentes), inicio.isoformat(), fin.isoformat(),
+                      rnd.choice((1, 2, 4, 4, 4, 5))))
+    conn.executemany(
+        "INSERT INTO Alquiler (patente, fecha_inicio, fecha_fin, id_estado) VALUES (?, ?, ?, ?)", filas
+    )
+    mant = []
+    for _ in range(n_alquileres // 50):
+        inicio = base + timedelta(hours=rnd.randint(0, 24 * 365 * 6))
+        mant.append((rnd.choice(patentes), inicio.isoformat(),
+                     (inicio + timedelta(days=2)).isoformat(), rnd.choice((1, 2, 3))))
+    conn.executemany(
+        "INSERT INTO Mantenimiento (patente, fecha_inicio, fecha_fin, id_estado) VALUES (?, ?, ?, ?)", mant
+    )
+    conn.commit()
+    return conn
+
+
+def medir(fn, ventanas):
+    t0 = time.perf_counter()
+    for inicio, fin in ventanas:
+        fn(inicio, fin)
+    return (time.perf_counter() - t0) / len(ventanas) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--alquileres', type=int, default=100_000)
+    parser.add_argument('--vehiculos', type=int, default=500)
+    parser.add_argument('--consultas', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = generar(os.path.join(tmp, 'bench.sqlite'), args.alquileres, args.vehiculos)
+        conn.row_factory = sqlite3.Row
+
+        rnd = random.Random(1)
+        ventanas = []
+        for _ in range(args.consultas):
+            inicio = datetime(2020, 1, 1) + timedelta(hours=rnd.randint(0, 24 * 365 * 6))
+            ventanas.append((normalizar_fecha(inicio), normalizar_fecha(inicio + timedelta(days=5))))
+
+        def original(inicio, fin):
+            return conn.execute(SQL_ORIGINAL, (fin, inicio, inicio, fin, inicio, fin, inicio, fin) * 2).fetchall()
+
+        t0 = time.perf_counter()
+        indice = AvailabilityIndex()
+        indice.cargar(conn)
+        carga_ms = (time.perf_counter() - t0) * 1000
+
+        def con_indice(inicio, fin):
+            return indice.patentes_ocupadas(inicio, fin)
+
+        print(f"Alquileres: {args.alquileres}  Vehículos: {args.vehiculos}  Consultas: {args.consultas}")
+        print(f"  SQL original:      {medir(original, ventanas):8.2f} ms/consulta")
+        print(f"  AvailabilityIndex: {medir(con_indice, ventanas):8.2f} ms/consulta "
+              f"(carga inicial {carga_ms:.0f} ms)")
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Logins por segundo por núcleo según el costo del KDF (credenciales.py), para
+elegir ALQUILERES_KDF_COST según el tráfico esperado.
+
+Por cada costo mide la verificación de una contraseña en un proceso por
+núcleo (la derivación libera el GIL, pero así no depende de eso) y, si se
+pasa --objetivo, marca el costo más alto que todavía lo cubre con --nucleos.
+Con --base mide además el login completo (una consulta + verificación) sobre
+una base generada, con y sin el cache de verificaciones.
+
+Uso:
+    python backend/bench/bench_login.py [--kdf pbkdf2_sha256] [--costos 100000,310000,600000]
+        [--segundos 2] [--nucleos 4] [--objetivo 50] [--base /tmp/bench.sqlite]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+os.environ.setdefault('ALQUILERES_LOG_LEVEL', 'WARNING')
+os.environ.setdefault('ALQUILERES_SCHEDULER', '0')
+
+import credenciales  # noqa: E402
+from backend.db.generar_datos import DOMINIO, PASSWORD  # noqa: E402
+
+COSTOS = {
+    'pbkdf2_sha256': (100_000, 210_000, 310_000, 600_000, 1_000_000),
+    'scrypt': (13, 14, 15, 16),
+}
+
+
+def verificaciones_por_segundo(algoritmo, costo, segundos):
+    """Verificaciones correctas por segundo en este proceso."""
+    guardado = credenciales.hashear(PASSWORD, algoritmo, costo)
+    cantidad, inicio = 0, time.perf_counter()
+    while True:
+        ok, _ = credenciales.verificar(PASSWORD, guardado)
+        assert ok
+        cantidad += 1
+        transcurrido = time.perf_counter() - inicio
+        if transcurrido >= segundos:
+            return cantidad / transcurrido
+
+
+def medir_costo(pool, nucleos, algoritmo, costo, segundos):
+    tareas = [pool.submit(verificaciones_por_segundo, algoritmo, costo, segundos) for _ in range(nucleos)]
+    total = sum(tarea.result() for tarea in tareas)
+    return total / nucleos, total
+
+
+def medir_login(base, segundos):
+    """Logins completos por segundo (un solo hilo) con el cache de verificaciones apagado y prendido."""
+    from db_manager import DBManager
+    from sistema import SistemaAlquiler
+
+    DBManager._instance = None
+    DBManager(db_path=base)
+    sistema = SistemaAlquiler()
+    mail = f'cliente1@{DOMINIO}'
+    # El primer login rehashea si la base se generó con otro KDF o costo
+    assert sistema.login(mail, PASSWORD), f"No se pudo loguear {mail} en {base}"
+
+    resultados = {}
+    for nombre, ttl in (('sin cache', 0), ('con cache', 300)):
+        sistema.verificaciones = credenciales.CacheVerificaciones(ttl=ttl)
+        cantidad, inicio = 0, time.perf_counter()
+        while time.perf_counter() - inicio < segundos:
+            assert sistema.login(mail, PASSWORD)
+            cantidad += 1
+        resultados[nombre] = cantidad / (time.perf_counter() - inicio)
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--kdf', choices=sorted(credenciales.ALGORITMOS), default=credenciales.KDF)
+    parser.add_argument('--costos', help='Lista separada por comas (por defecto, una escala típica del KDF)')
+    parser.add_argument('--segundos', type=float, default=2.0, help='Duración de cada medición')
+    parser.add_argument('--nucleos', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--objetivo', type=float, help='Logins por segundo que tiene que soportar el servidor')
+    parser.add_argument('--base', help='Base generada con backend/db/generar_datos.py para medir el login completo')
+    args = parser.parse_args()
+
+    costos = [int(c) for c in args.costos.split(',')] if args.costos else COSTOS[args.kdf]
+    print(f"KDF: {args.kdf}  Núcleos: {args.nucleos}  Costo actual: {credenciales.KDF} {credenciales.KDF_COST}")
+    print(f"  {'costo':>10s} {'ms/login':>10s} {'login/s/núcleo':>15s} {f'login/s ({args.nucleos} núcleos)':>22s}")
+
+    elegido = None
+    with ProcessPoolExecutor(max_workers=args.nucleos) as pool:
+        for costo in costos:
+            por_nucleo, total = medir_costo(pool, args.nucleos, args.kdf, costo, args.segundos)
+            alcanza = args.objetivo is not None and total >= args.objetivo
+            if alcanza:
+                elegido = costo
+            marca = '  <- cubre el objetivo' if alcanza else ''
+            print(f"  {costo:>10d} {1000 / por_nucleo:>10.1f} {por_nucleo:>15.1f} {total:>22.1f}{marca}")
+
+    if args.objetivo is not None:
+        if elegido is None:
+            print(f"Ningún costo cubre {args.objetivo:.0f} login/s con {args.nucleos} núcleos")
+        else:
+            print(f"Costo más alto que cubre {args.objetivo:.0f} login/s: ALQUILERES_KDF_COST={elegido}")
+
+    if args.base:
+        for nombre, por_segundo in medir_login(args.base, args.segundos).items():
+            print(f"  Login completo {nombre:10s} {por_segundo:10.1f} login/s (1 hilo)")
+
+
+if __name__ == '__main__':
+    main()
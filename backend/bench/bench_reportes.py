@@ -0,0 +1,192 @@
+"""
+Compara los reportes de alquileres como se calculaban antes (CASE con
+JULIANDAY repetido, SUM() OVER por cliente, strptime fila por fila) contra
+los mismos reportes armados con report_engine.
+
+Uso:
+    python backend/bench/bench_reportes.py [--alquileres 1000000] [--clientes 2000] [--vehiculos 500]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+import report_engine  # noqa: E402
+from db_manager import DBManager  # noqa: E402
+from backend.db.create_db import crear_esquema, poblar_catalogos  # noqa: E402
+
+
+DIAS_ORIGINAL = """
+    CASE
+        WHEN (JULIANDAY(a.fecha_fin) - JULIANDAY(a.fecha_inicio)) < 1 THEN 1
+        ELSE CAST((JULIANDAY(a.fecha_fin) - JULIANDAY(a.fecha_inicio)) AS INTEGER)
+    END
+"""
+
+SQL_DETALLE_ORIGINAL = f"""
+    SELECT c.id_cliente, p.nombre || ' ' || p.apellido as cliente, p.nro_documento,
+        a.id_alquiler, a.fecha_inicio, a.fecha_fin, {DIAS_ORIGINAL} as dias,
+        v.modelo, m.descripcion as marca, v.patente, v.precio_flota,
+        (v.precio_flota * {DIAS_ORIGINAL}) as total_alquiler,
+        COALESCE((SELECT SUM(costo) FROM Multa WHERE alquiler_id = a.id_alquiler), 0) as total_multas,
+        COALESCE((SELECT SUM(costo) FROM Danio WHERE id_alquiler = a.id_alquiler), 0) as total_danios,
+        SUM(v.precio_flota * {DIAS_ORIGINAL}) OVER (PARTITION BY c.id_cliente) as total_cliente
+    FROM Alquiler a
+    JOIN Cliente c ON a.id_cliente = c.id_cliente
+    JOIN Persona p ON c.id_persona = p.id_persona
+    JOIN Vehiculo v ON a.patente = v.patente
+    JOIN Marca m ON v.id_marca = m.id_marca
+    WHERE a.id_estado = 4 AND a.fecha_inicio BETWEEN ? AND ?
+    ORDER BY cliente, a.fecha_inicio DESC
+"""
+
+SQL_PERIODO_ORIGINAL = f"""
+    SELECT strftime('%Y-%m', fecha_inicio) as periodo, COUNT(id_alquiler) as total_alquileres,
+        SUM(v.precio_flota * {DIAS_ORIGINAL}) as ingresos_totales,
+        AVG({DIAS_ORIGINAL}) as duracion_promedio
+    FROM Alquiler a
+    JOIN Vehiculo v ON a.patente = v.patente
+    WHERE a.id_estado = 4 AND fecha_inicio BETWEEN ? AND ?
+    GROUP BY strftime('%Y-%m', fecha_inicio) ORDER BY periodo
+"""
+
+SQL_CLIENTE_ORIGINAL = """
+    SELECT a.id_alquiler, a.fecha_inicio, a.fecha_fin, v.modelo, m.descripcion as marca, v.patente, v.precio_flota,
+        COALESCE((SELECT SUM(costo) FROM Multa WHERE alquiler_id = a.id_alquiler), 0) as total_multas,
+        COALESCE((SELECT SUM(costo) FROM Danio WHERE id_alquiler = a.id_alquiler), 0) as total_danios
+    FROM Alquiler a
+    JOIN Vehiculo v ON a.patente = v.patente
+    JOIN Marca m ON v.id_marca = m.id_marca
+    WHERE a.id_cliente = ?
+    ORDER BY a.fecha_inicio DESC
+"""
+
+
+def detalle_original(conn, desde, hasta):
+    clientes = {}
+    for row in conn.execute(SQL_DETALLE_ORIGINAL, (desde, hasta)):
+        grupo = clientes.setdefault(row['id_cliente'], {
+            'cliente': row['cliente'], 'nro_documento': row['nro_documento'],
+            'total_facturado': row['total_cliente'], 'alquileres': []
+        })
+        grupo['alquileres'].append({
+            'fecha_inicio': row['fecha_inicio'], 'fecha_fin': row['fecha_fin'], 'dias': row['dias'],
+            'modelo': row['modelo'], 'marca': row['marca'], 'patente': row['patente'],
+            'precio_flota': row['precio_flota'], 'total_alquiler': row['total_alquiler'],
+            'total_multas': row['total_multas'], 'total_danios': row['total_danios'],
+            'total_general': row['total_alquiler'] + row['total_multas'] + row['total_danios']
+        })
+    return list(clientes.values())
+
+
+def periodo_original(conn, desde, hasta):
+    return [dict(row) for row in conn.execute(SQL_PERIODO_ORIGINAL, (desde, hasta))]
+
+
+def cliente_original(conn, id_cliente):
+    lista = []
+    for row in conn.execute(SQL_CLIENTE_ORIGINAL, (id_cliente,)):
+        inicio = datetime.strptime(row['fecha_inicio'], '%Y-%m-%dT%H:%M:%S')
+        fin = datetime.strptime(row['fecha_fin'], '%Y-%m-%dT%H:%M:%S')
+        dias = max(1, (fin - inicio).days)
+        item = dict(row)
+        item['costo_final_total'] = dias * row['precio_flota'] + row['total_multas'] + row['total_danios']
+        lista.append(item)
+    return lista
+
+
+def generar(path, n_alquileres, n_clientes, n_vehiculos, seed=42):
+    rnd = random.Random(seed)
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    crear_esquema(cursor)
+    poblar_catalogos(cursor)
+    cursor.executemany(
+        "INSERT INTO Persona (nombre, apellido, telefono, mail, fecha_nac, tipo_documento, nro_documento) "
+        "VALUES (?, ?, 0, ?, '1990-01-01', 1, ?)",
+        [(f'N{i}', f'A{i}', f'p{i}@mail.com', 30000000 + i) for i in range(1, n_clientes + 1)]
+    )
+    cursor.executemany("INSERT INTO Cliente (id_persona, fecha_alta) VALUES (?, '2024-01-01')",
+                       [(i,) for i in range(1, n_clientes + 1)])
+    patentes = [f'AA{i:03d}ZZ' for i in range(n_vehiculos)]
+    cursor.executemany("INSERT INTO Vehiculo VALUES (?, 'M', 1, 2020, ?, 5, 4, 0, 1, 1)",
+                       [(p, rnd.randint(50, 300)) for p in patentes])
+
+    base = datetime(2020, 1, 1)
+    filas = []
+    for _ in range(n_alquileres):
+        inicio = base + timedelta(hours=rnd.randint(0, 24 * 365 * 6))
+        fin = inicio + timedelta(hours=rnd.randint(2, 24 * 14))
+        filas.append((rnd.choice(patentes), rnd.randint(1, n_clientes), inicio.isoformat(), fin.isoformat(),
+                      rnd.choice((2, 4, 4, 4, 5))))
+    cursor.executemany(
+        "INSERT INTO Alquiler (patente, id_cliente, id_empleado, fecha_inicio, fecha_fin, id_estado) "
+        "VALUES (?, ?, 1, ?, ?, ?)", filas
+    )
+    cursor.executemany(
+        "INSERT INTO Multa (alquiler_id, costo, detalle, fecha_multa) VALUES (?, ?, 'x', '2020-01-01T00:00:00')",
+        [(rnd.randint(1, n_alquileres), rnd.randint(10, 100)) for _ in range(n_alquileres // 10)]
+    )
+    cursor.executemany(
+        "INSERT INTO Danio (id_alquiler, costo, detalle) VALUES (?, ?, 'x')",
+        [(rnd.randint(1, n_alquileres), rnd.randint(10, 100)) for _ in range(n_alquileres // 20)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def medir(fn, *args):
+    t0 = time.perf_counter()
+    resultado = fn(*args)
+    return resultado, (time.perf_counter() - t0) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--alquileres', type=int, default=1_000_000)
+    parser.add_argument('--clientes', type=int, default=2000)
+    parser.add_argument('--vehiculos', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.sqlite')
+        generar(path, args.alquileres, args.clientes, args.vehiculos)
+        # Aplica las migraciones (columna generada `dias`, índices, tabla de facturación)
+        DBManager._instance = None
+        dbm = DBManager(db_path=path)
+
+        conn = sqlite3.connect(path)
+        conn.row_factory = sqlite3.Row
+        desde, hasta = '2020-01-01T00:00:00', '2025-12-31T23:59:59'
+
+        casos = [
+            ('Detalle por cliente', lambda: detalle_original(conn, desde, hasta),
+             lambda: dbm.get_detailed_client_rentals_report(desde, hasta)),
+            ('Alquileres por período', lambda: periodo_original(conn, desde, hasta),
+             lambda: dbm.get_rentals_by_period_report('mensual', desde, hasta)),
+            ('Reporte de un cliente', lambda: cliente_original(conn, 7),
+             lambda: dbm.get_report_alquileres_por_cliente(7)),
+        ]
+
+        motor = 'NumPy' if report_engine.np is not None else 'Python puro'
+        print(f"Alquileres: {args.alquileres}  Clientes: {args.clientes}  Motor: {motor}")
+        for nombre, original, con_motor in casos:
+            esperado, ms_original = medir(original)
+            obtenido, ms_motor = medir(con_motor)
+            assert len(esperado) == len(obtenido), nombre
+            print(f"  {nombre:24s} original {ms_original:9.1f} ms   report_engine {ms_motor:9.1f} ms "
+                  f"({ms_original / ms_motor:4.1f}x)")
+        conn.close()
+        dbm.read_pool.close_all()
+        dbm.write_pool.close_all()
+
+
+if __name__ == '__main__':
+    main()
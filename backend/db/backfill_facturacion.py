@@ -0,0 +1,33 @@
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+from migrations import aplicar_migraciones, reconstruir_facturacion
+
+# ============================================================
+# RECONSTRUCCIÓN DE LA TABLA FacturacionMensual
+# ============================================================
+# Los triggers la mantienen al día; este comando la recalcula desde cero
+# (por ejemplo después de importar datos con los triggers desactivados).
+#
+#   python backend/db/backfill_facturacion.py [ruta_a_la_base]
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, "alquileres.db")
+
+
+if __name__ == "__main__":
+    ruta = sys.argv[1] if len(sys.argv) > 1 else DB_PATH
+    conn = sqlite3.connect(ruta)
+    # Crea la tabla y los triggers si la base todavía no tiene la migración
+    aplicar_migraciones(conn)
+
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    reconstruir_facturacion(cursor)
+    conn.commit()
+
+    filas = cursor.execute("SELECT COUNT(*), COALESCE(SUM(alquileres), 0) FROM FacturacionMensual").fetchone()
+    conn.close()
+    print(f"FacturacionMensual reconstruida: {filas[0]} filas, {filas[1]} alquileres finalizados.")
@@ -0,0 +1,289 @@
+import argparse
+import heapq
+import os
+import random
+import sqlite3
+import sys
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+import credenciales
+from migrations import aplicar_migraciones
+from backend.db.create_db import crear_esquema, poblar_catalogos
+
+# ============================================================
+# GENERADOR DE DATOS SINTÉTICOS (PRUEBAS DE CARGA)
+# ============================================================
+# Llena el esquema real con N vehículos, clientes y empleados y varios años
+# de alquileres, multas, daños y mantenimientos. Con la misma semilla y la
+# misma fecha de referencia genera exactamente la misma base.
+#
+#   python backend/db/generar_datos.py salida.sqlite --vehiculos 500 --clientes 20000 --anios 5
+#
+# Todos los usuarios tienen la contraseña PASSWORD. Los mails son
+# admin@bench.local, empleado<N>@bench.local y cliente<N>@bench.local.
+
+PASSWORD = 'bench1234'
+DOMINIO = 'bench.local'
+
+# Proporciones: fracción de los alquileres terminados con multa / con daño, etc.
+OCUPACION = 0.6                 # Fracción del tiempo que un auto pasa alquilado
+DIAS_PROMEDIO_ALQUILER = 5
+PROB_CANCELADO = 0.06
+PROB_ATRASADO = 0.15            # Entre los que terminaron la última semana
+PROB_MULTA = 0.06
+PROB_DANIO = 0.03
+DIAS_ENTRE_SERVICES = 120
+DIAS_RESERVAS_FUTURAS = 90
+
+NOMBRES = ['Juan', 'María', 'Carlos', 'Lucía', 'Martín', 'Sofía', 'Diego', 'Valentina', 'Pablo', 'Camila',
+           'Jorge', 'Florencia', 'Nicolás', 'Agustina', 'Federico', 'Julieta', 'Matías', 'Paula', 'Tomás', 'Ana']
+APELLIDOS = ['González', 'Rodríguez', 'Gómez', 'Fernández', 'López', 'Díaz', 'Martínez', 'Pérez', 'García',
+             'Sánchez', 'Romero', 'Sosa', 'Torres', 'Álvarez', 'Ruiz', 'Ramírez', 'Flores', 'Acosta', 'Medina']
+# id_marca -> modelos (ver poblar_catalogos)
+MODELOS = {
+    1: ['Corolla', 'Etios', 'Yaris', 'Hilux', 'SW4'],
+    2: ['Focus', 'Fiesta', 'Ka', 'Ranger', 'EcoSport'],
+    3: ['Cruze', 'Onix', 'Tracker', 'S10', 'Prisma'],
+    4: ['Sandero', 'Logan', 'Kangoo', 'Duster', 'Kwid'],
+    5: ['Gol', 'Polo', 'Vento', 'Amarok', 'T-Cross'],
+    6: ['208', '308', '2008', 'Partner', '3008'],
+}
+DETALLES_MULTA = ['Exceso de velocidad', 'Estacionamiento indebido', 'Semáforo en rojo', 'Peaje impago']
+DETALLES_DANIO = ['Rayón en paragolpes', 'Espejo roto', 'Tapizado manchado', 'Abolladura en puerta', 'Llanta dañada']
+DETALLES_MANTENIMIENTO = ['Service de 10.000 km', 'Cambio de aceite y filtros', 'Cambio de neumáticos',
+                          'Revisión de frenos', 'Alineación y balanceo']
+
+LOTE = 20000
+FORMATO = '%Y-%m-%dT%H:%M:%S'
+
+
+def _patente(i):
+    letras = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    i, numero = divmod(i, 1000)
+    i, a = divmod(i, 26)
+    i, b = divmod(i, 26)
+    i, c = divmod(i, 26)
+    return f"A{letras[c]}{numero:03d}{letras[b]}{letras[a]}"
+
+
+def _hora(dia, rnd, desde=8, hasta=20):
+    return dia + timedelta(hours=rnd.randint(desde, hasta - 1), minutes=rnd.choice((0, 15, 30, 45)))
+
+
+def _personas(cursor, rnd, cantidad, rol, primer_documento, pass_hash):
+    """Inserta Persona + Usuario para `cantidad` personas; devuelve sus id_persona."""
+    permiso = {'cliente': 1, 'empleado': 2, 'admin': 3}[rol]
+    ids = []
+    for inicio in range(0, cantidad, LOTE):
+        personas, usuarios = [], []
+        for i in range(inicio + 1, min(cantidad, inicio + LOTE) + 1):
+            sufijo = '' if rol == 'admin' else str(i)
+            nacimiento = date(1950, 1, 1) + timedelta(days=rnd.randint(0, 365 * 55))
+            personas.append((rnd.choice(NOMBRES), rnd.choice(APELLIDOS), rnd.randint(1100000000, 3899999999),
+                             f"{rol}{sufijo}@{DOMINIO}", nacimiento.isoformat(), 1, primer_documento + i))
+        for fila in personas:
+            cursor.execute("INSERT INTO Persona (nombre, apellido, telefono, mail, fecha_nac, tipo_documento, "
+                           "nro_documento) VALUES (?, ?, ?, ?, ?, ?, ?)", fila)
+            ids.append(cursor.lastrowid)
+            usuarios.append((cursor.lastrowid, fila[3].split('@')[0], pass_hash, permiso))
+        cursor.executemany("INSERT INTO Usuario (id_persona, user_name, password, id_permiso) VALUES (?, ?, ?, ?)",
+                           usuarios)
+    return ids
+
+
+def _eventos_vehiculo(rnd, patente, desde, hasta):
+    """
+    Línea de tiempo de un vehículo: alquileres y services que no se superponen,
+    en orden. Es un generador para poder intercalar todos los vehículos por fecha.
+    """
+    hueco_promedio = DIAS_PROMEDIO_ALQUILER * (1 - OCUPACION) / OCUPACION
+    dia = desde + timedelta(days=rnd.randint(0, 10))
+    proximo_service = dia + timedelta(days=rnd.randint(1, DIAS_ENTRE_SERVICES))
+    while dia < hasta:
+        if dia >= proximo_service:
+            inicio = _hora(dia, rnd, 8, 12)
+            fin = _hora(dia + timedelta(days=rnd.choice((0, 1, 1, 2, 3))), rnd, 14, 19)
+            yield 'mantenimiento', patente, inicio, fin
+            proximo_service = fin + timedelta(days=DIAS_ENTRE_SERVICES + rnd.randint(-20, 20))
+        else:
+            inicio = _hora(dia, rnd)
+            dias = max(1, min(45, round(rnd.lognormvariate(1.3, 0.7))))
+            fin = _hora(dia + timedelta(days=dias), rnd)
+            yield 'alquiler', patente, inicio, fin
+        # El auto vuelve a estar disponible al día siguiente de devuelto
+        dia = datetime.combine(fin.date(), datetime.min.time()) + \
+            timedelta(days=1 + int(rnd.expovariate(1 / hueco_promedio)))
+
+
+def _estado_alquiler(rnd, inicio, fin, ahora):
+    if fin < ahora:
+        if rnd.random() < PROB_CANCELADO:
+            return 5
+        if fin > ahora - timedelta(days=7) and rnd.random() < PROB_ATRASADO:
+            return 3
+        return 4
+    if inicio <= ahora:
+        return 2
+    return 5 if rnd.random() < PROB_CANCELADO else 1
+
+
+def _estado_mantenimiento(rnd, inicio, fin, ahora):
+    if fin < ahora:
+        return 4 if rnd.random() < PROB_CANCELADO else 2
+    return 1 if inicio <= ahora else 3
+
+
+def generar(path, vehiculos=200, clientes=5000, empleados=20, anios=3, seed=42, referencia=None):
+    """
+    Crea la base en `path` y devuelve la cantidad de filas por tabla.
+    `referencia` es el "hoy" de los datos (por defecto, hoy): define qué
+    alquileres están terminados, en curso o reservados.
+    """
+    rnd = random.Random(seed)
+    ahora = datetime.combine(referencia or date.today(), datetime.min.time()) + timedelta(hours=12)
+    desde = datetime.combine(ahora.date() - timedelta(days=365 * anios), datetime.min.time())
+    hasta = datetime.combine(ahora.date() + timedelta(days=DIAS_RESERVAS_FUTURAS), datetime.min.time())
+
+    conn = sqlite3.connect(path)
+    # Sin journal mientras se carga: si falla, la base se descarta
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    cursor = conn.cursor()
+    crear_esquema(cursor)
+    poblar_catalogos(cursor)
+
+    # --- Personas ---
+    # Un solo hash (con el KDF configurado) para todos: derivar uno por usuario tardaría horas.
+    # La sal sale de la semilla, así la base sigue siendo reproducible.
+    pass_hash = credenciales.hashear(PASSWORD, sal=random.Random(seed).randbytes(credenciales.LARGO_SAL))
+    id_admin = _personas(cursor, rnd, 1, 'admin', 20000000, pass_hash)[0]
+    cursor.execute("INSERT INTO Administrador (id_persona, descripcion) VALUES (?, 'Administrador general')",
+                   (id_admin,))
+    for id_persona in _personas(cursor, rnd, empleados, 'empleado', 25000000, pass_hash):
+        alta = desde.date() + timedelta(days=rnd.randint(0, 365))
+        cursor.execute("INSERT INTO Empleado (fecha_alta, sueldo, horario, id_persona) VALUES (?, ?, ?, ?)",
+                       (alta.isoformat(), rnd.randrange(700000, 1500000, 50000),
+                        rnd.choice(('8:00-16:00', '9:00-18:00', '12:00-20:00')), id_persona))
+    filas = []
+    for id_persona in _personas(cursor, rnd, clientes, 'cliente', 30000000, pass_hash):
+        alta = desde.date() + timedelta(days=rnd.randint(0, 365 * anios))
+        filas.append((id_persona, alta.isoformat()))
+    cursor.executemany("INSERT INTO Cliente (id_persona, fecha_alta) VALUES (?, ?)", filas)
+
+    # --- Vehículos ---
+    patentes = [_patente(i) for i in range(vehiculos)]
+    filas = []
+    for patente in patentes:
+        marca = rnd.randint(1, 6)
+        modelo = rnd.choice(MODELOS[marca])
+        filas.append((patente, modelo, marca, rnd.randint(2012, ahora.year), rnd.randrange(12000, 60000, 500),
+                      7 if modelo in ('SW4', 'Partner', 'Kangoo') else 5, rnd.choice((3, 4, 5)),
+                      int(rnd.random() < 0.6), 1, rnd.randint(1, 6)))
+    cursor.executemany("INSERT INTO Vehiculo (patente, modelo, id_marca, anio, precio_flota, asientos, puertas, "
+                       "caja_manual, id_estado, id_color) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", filas)
+
+    # --- Alquileres y mantenimientos, en orden de fecha para que los ids sean cronológicos ---
+    lineas = [_eventos_vehiculo(random.Random(rnd.random()), patente, desde, hasta) for patente in patentes]
+    cola = []
+    for indice, linea in enumerate(lineas):
+        evento = next(linea, None)
+        if evento:
+            cola.append((evento[2], indice, evento))
+    heapq.heapify(cola)
+
+    estado_vehiculo = {}
+    alquileres, multas, danios, mantenimientos = [], [], [], []
+    id_alquiler = 0
+    while cola:
+        _, indice, (tipo, patente, inicio, fin) = heapq.heappop(cola)
+        siguiente = next(lineas[indice], None)
+        if siguiente:
+            heapq.heappush(cola, (siguiente[2], indice, siguiente))
+
+        if tipo == 'mantenimiento':
+            estado = _estado_mantenimiento(rnd, inicio, fin, ahora)
+            if estado == 1:
+                estado_vehiculo[patente] = 3
+            mantenimientos.append((patente, rnd.randint(1, empleados), inicio.strftime(FORMATO),
+                                   fin.strftime(FORMATO), rnd.choice(DETALLES_MANTENIMIENTO), estado))
+            continue
+
+        id_alquiler += 1
+        estado = _estado_alquiler(rnd, inicio, fin, ahora)
+        if estado in (2, 3):
+            estado_vehiculo[patente] = 2
+        # Los clientes frecuentes (ids bajos) alquilan mucho más que el resto
+        id_cliente = 1 + int(clientes * rnd.random() ** 2)
+        alquileres.append((id_alquiler, patente, id_cliente, rnd.randint(1, empleados),
+                           inicio.strftime(FORMATO), fin.strftime(FORMATO), estado))
+        if estado in (3, 4):
+            if rnd.random() < PROB_MULTA:
+                momento = inicio + (fin - inicio) * rnd.random()
+                multas.append((id_alquiler, rnd.randrange(15000, 120000, 500), rnd.choice(DETALLES_MULTA),
+                               momento.strftime(FORMATO)))
+            if rnd.random() < PROB_DANIO:
+                danios.append((id_alquiler, rnd.randrange(20000, 400000, 1000), rnd.choice(DETALLES_DANIO)))
+
+        if len(alquileres) >= LOTE:
+            _volcar(cursor, alquileres, multas, danios, mantenimientos)
+    _volcar(cursor, alquileres, multas, danios, mantenimientos)
+
+    cursor.executemany("UPDATE Vehiculo SET id_estado = ? WHERE patente = ?",
+                       [(estado, patente) for patente, estado in estado_vehiculo.items()])
+    conn.commit()
+
+    # Índices, contadores y tablas derivadas se arman una sola vez sobre los datos cargados
+    conn.execute("PRAGMA journal_mode = DELETE")
+    aplicar_migraciones(conn)
+    conn.execute("ANALYZE")
+    conn.commit()
+
+    tablas = ('Persona', 'Cliente', 'Empleado', 'Vehiculo', 'Alquiler', 'Multa', 'Danio', 'Mantenimiento')
+    totales = {tabla: conn.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0] for tabla in tablas}
+    conn.close()
+    return totales
+
+
+def _volcar(cursor, alquileres, multas, danios, mantenimientos):
+    cursor.executemany("INSERT INTO Alquiler (id_alquiler, patente, id_cliente, id_empleado, fecha_inicio, "
+                       "fecha_fin, id_estado) VALUES (?, ?, ?, ?, ?, ?, ?)", alquileres)
+    cursor.executemany("INSERT INTO Multa (alquiler_id, costo, detalle, fecha_multa) VALUES (?, ?, ?, ?)", multas)
+    cursor.executemany("INSERT INTO Danio (id_alquiler, costo, detalle) VALUES (?, ?, ?)", danios)
+    cursor.executemany("INSERT INTO Mantenimiento (patente, id_empleado, fecha_inicio, fecha_fin, detalle, "
+                       "id_estado) VALUES (?, ?, ?, ?, ?, ?)", mantenimientos)
+    for lista in (alquileres, multas, danios, mantenimientos):
+        lista.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera una base de datos sintética para pruebas de carga.')
+    parser.add_argument('salida', help='Archivo SQLite a crear')
+    parser.add_argument('--vehiculos', type=int, default=200)
+    parser.add_argument('--clientes', type=int, default=5000)
+    parser.add_argument('--empleados', type=int, default=20)
+    parser.add_argument('--anios', type=int, default=3, help='Años de historia hacia atrás')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--referencia', type=date.fromisoformat, default=None,
+                        help='Fecha "hoy" de los datos (YYYY-MM-DD); fijarla hace la base reproducible entre días')
+    parser.add_argument('--reemplazar', action='store_true', help='Borra la salida si ya existe')
+    args = parser.parse_args()
+
+    if os.path.exists(args.salida):
+        if not args.reemplazar:
+            parser.error(f"{args.salida} ya existe (use --reemplazar)")
+        os.remove(args.salida)
+
+    t0 = datetime.now()
+    totales = generar(args.salida, args.vehiculos, args.clientes, args.empleados, args.anios,
+                      args.seed, args.referencia)
+    segundos = (datetime.now() - t0).total_seconds()
+    print(f"Base generada en {args.salida} ({segundos:.1f} s):")
+    for tabla, total in totales.items():
+        print(f"  {tabla:14s} {total:>10,}")
+    print(f"Contraseña de todos los usuarios: {PASSWORD} (admin@{DOMINIO}, empleado1@{DOMINIO}, cliente1@{DOMINIO})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import sqlite3
+from datetime import date, timedelta
+from backend.tests.test_reservas_concurrentes import preparar, superpuestos
+from backend.app.db_manager import DBManager
+
+
+def dia(offset, hora='10:00:00'):
+    return f"{date.today() + timedelta(days=offset)}T{hora}"
+
+
+def pedido(patente, desde, hasta, **extra):
+    return {'patente': patente, 'id_cliente': 1, 'id_empleado': 1,
+            'fecha_inicio': dia(desde), 'fecha_fin': dia(hasta), **extra}
+
+
+def test_bulk_creates_valid_items_and_reports_each_failure(tmp_path):
+    dbpath = str(tmp_path / 'bulk.sqlite')
+    preparar(dbpath)
+    dbm = DBManager()
+    # Un alquiler previo sobre BB003BB y un service sobre BB004BB
+    assert dbm.create_alquiler_transactional(pedido('BB003BB', 10, 15))
+    conn = sqlite3.connect(dbpath)
+    conn.execute("UPDATE Vehiculo SET id_estado = 1 WHERE patente = 'BB003BB'")
+    conn.execute("INSERT INTO Mantenimiento (patente, fecha_inicio, fecha_fin, id_estado, detalle, id_empleado) "
+                 "VALUES ('BB004BB', ?, ?, 3, 'service', 1)", (dia(12), dia(14)))
+    conn.commit()
+    conn.close()
+
+    resultados = dbm.create_alquileres_bulk([
+        pedido('BB000BB', 0, 3),                     # empieza hoy: Activo
+        pedido('BB001BB', 10, 12),
+        pedido('BB001BB', 20, 22),                   # repetido en el mismo pedido
+        pedido('BB003BB', 12, 18),                   # choca con el alquiler previo
+        pedido('BB004BB', 13, 16),                   # choca con el mantenimiento
+        pedido('ZZ999ZZ', 10, 12),                   # no existe
+        pedido('BB005BB', 12, 10),                   # fechas invertidas
+        pedido('BB006BB', 10, 12, id_cliente=999),   # cliente inexistente
+        {'patente': 'BB007BB', 'id_cliente': 1, 'id_empleado': 1},
+        pedido('BB008BB', 30, 31),
+    ])
+
+    assert [r['indice'] for r in resultados] == list(range(10))
+    assert [r['ok'] for r in resultados] == [True, True] + [False] * 7 + [True]
+    errores = [r.get('error', '') for r in resultados]
+    assert 'este pedido' in errores[2]
+    assert 'alquiler programado' in errores[3]
+    assert 'mantenimiento' in errores[4]
+    assert 'no existe' in errores[5] and 'cliente' in errores[7]
+    assert 'posterior' in errores[6] and 'fecha' in errores[8]
+
+    conn = sqlite3.connect(dbpath)
+    creados = conn.execute(
+        "SELECT a.id_alquiler, a.patente, a.id_estado, v.id_estado FROM Alquiler a "
+        "JOIN Vehiculo v ON v.patente = a.patente WHERE a.patente IN ('BB000BB', 'BB001BB', 'BB008BB') "
+        "ORDER BY a.patente"
+    ).fetchall()
+    conn.close()
+    assert [(p, ea, ev) for _, p, ea, ev in creados] == [
+        ('BB000BB', 2, 2), ('BB001BB', 1, 5), ('BB008BB', 1, 5)
+    ]
+    assert {r['id_alquiler'] for r in resultados if r['ok']} == {fila[0] for fila in creados}
+    assert superpuestos(dbpath) == 0
+
+    # Lo creado en bloque ya cuenta para la disponibilidad
+    libres = {v['patente'] for v in dbm.get_vehiculos_libres(dia(10), dia(12))}
+    assert 'BB001BB' not in libres and 'BB002BB' in libres
+
+
+def test_bulk_with_nothing_valid_writes_nothing(tmp_path):
+    dbpath = str(tmp_path / 'bulk_vacio.sqlite')
+    preparar(dbpath)
+    dbm = DBManager()
+
+    resultados = dbm.create_alquileres_bulk([pedido('ZZ999ZZ', 10, 12), pedido('BB000BB', -3, 2)])
+
+    assert not any(r['ok'] for r in resultados)
+    conn = sqlite3.connect(dbpath)
+    assert conn.execute("SELECT COUNT(*) FROM Alquiler WHERE patente LIKE 'BB%'").fetchone()[0] == 0
+    conn.close()
+
+
+def test_bulk_names_the_missing_or_mistyped_field(tmp_path):
+    dbpath = str(tmp_path / 'campos.sqlite')
+    preparar(dbpath)
+    dbm = DBManager()
+
+    sin_patente = pedido('BB000BB', 10, 12)
+    del sin_patente['patente']
+    resultados = dbm.create_alquileres_bulk([
+        sin_patente,
+        pedido('BB001BB', 10, 12, id_cliente=None, id_empleado=None),
+        pedido('BB002BB', 10, 12, id_cliente=[1]),
+        pedido('BB003BB', 10, 12, fecha_fin='mañana'),
+        {'patente': 'BB004BB', 'id_cliente': 1, 'id_empleado': 1, 'fecha_fin': dia(12)},
+        pedido('BB005BB', 10, 12, id_cliente='1'),
+    ])
+
+    assert [r.get('error') for r in resultados] == [
+        'Falta patente.',
+        'Faltan id_cliente, id_empleado.',
+        'id_cliente debe ser un número entero.',
+        'fecha_fin no es una fecha válida.',
+        'Falta fecha_inicio.',
+        None,
+    ]
+    assert resultados[-1]['ok']
@@ -0,0 +1,180 @@
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from backend.app.db_manager import DBManager
+from backend.app.availability_index import AvailabilityIndex, se_superponen
+
+
+def setup_db(path):
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+    CREATE TABLE EstadoAuto (id_estado INTEGER PRIMARY KEY, descripcion TEXT);
+    CREATE TABLE Marca (id_marca INTEGER PRIMARY KEY, descripcion TEXT);
+    CREATE TABLE Color (id_color INTEGER PRIMARY KEY, descripcion TEXT);
+    CREATE TABLE Vehiculo (
+        patente TEXT PRIMARY KEY, modelo TEXT, id_marca INTEGER, anio INTEGER,
+        precio_flota REAL, asientos INTEGER, puertas INTEGER, caja_manual INTEGER,
+        id_estado INTEGER, id_color INTEGER
+    );
+    CREATE TABLE Alquiler (
+        id_alquiler INTEGER PRIMARY KEY AUTOINCREMENT, patente TEXT, id_cliente INTEGER,
+        id_empleado INTEGER, fecha_inicio TEXT, fecha_fin TEXT, id_estado INTEGER
+    );
+    CREATE TABLE Mantenimiento (
+        id_mantenimiento INTEGER PRIMARY KEY AUTOINCREMENT, patente TEXT, id_empleado INTEGER,
+        fecha_inicio TEXT, fecha_fin TEXT, detalle TEXT, id_estado INTEGER
+    );
+    INSERT INTO EstadoAuto VALUES (1, 'Libre'), (2, 'Ocupado'), (5, 'Reservado');
+    INSERT INTO Marca VALUES (1, 'Toyota');
+    INSERT INTO Color VALUES (1, 'Blanco');
+    ''')
+    for patente in ('V1', 'V2', 'V3'):
+        conn.execute("INSERT INTO Vehiculo VALUES (?, ?, 1, 2020, 10000, 4, 4, 0, 1, 1)", (patente, 'M' + patente))
+    conn.execute("INSERT INTO Alquiler (patente, id_cliente, id_empleado, fecha_inicio, fecha_fin, id_estado) "
+                 "VALUES ('V1', 1, 1, '2030-01-10T10:00:00', '2030-01-15T10:00:00', 1)")
+    conn.execute("INSERT INTO Alquiler (patente, id_cliente, id_empleado, fecha_inicio, fecha_fin, id_estado) "
+                 "VALUES ('V3', 1, 1, '2030-01-01T10:00:00', '2030-01-30T10:00:00', 4)")
+    conn.execute("INSERT INTO Mantenimiento (patente, id_empleado, fecha_inicio, fecha_fin, detalle, id_estado) "
+                 "VALUES ('V2', 1, '2030-01-12T00:00:00', '2030-01-13T00:00:00', 'service', 3)")
+    conn.commit()
+    conn.close()
+
+
+def patentes(vehiculos):
+    return sorted(v['patente'] for v in vehiculos)
+
+
+def test_libres_excludes_rentals_and_maintenance(tmp_path):
+    dbpath = str(tmp_path / 'disp.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath)
+
+    assert patentes(dbm.get_vehiculos_libres('2030-01-11T00:00:00', '2030-01-14T00:00:00')) == ['V3']
+    # Intervalos semiabiertos: devolver a las 10:00 y retirar a las 10:00 no choca
+    assert patentes(dbm.get_vehiculos_libres('2030-01-15T10:00:00', '2030-01-20T00:00:00')) == ['V1', 'V2', 'V3']
+    assert patentes(dbm.get_vehiculos_libres('2030-01-12', '2030-01-12T12:00:00')) == ['V3']
+
+
+def test_index_follows_rental_changes(tmp_path):
+    dbpath = str(tmp_path / 'disp.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath)
+
+    assert 'V3' in patentes(dbm.get_vehiculos_libres('2030-02-01T00:00:00', '2030-02-05T00:00:00'))
+
+    dbm.create_alquiler_transactional({
+        'patente': 'V3', 'id_cliente': 1, 'id_empleado': 1,
+        'fecha_inicio': '2030-02-02T09:00:00', 'fecha_fin': '2030-02-03T09:00:00',
+    })
+    # El vehículo queda Reservado: se vuelve a marcar Libre para ver solo el índice
+    conn = sqlite3.connect(dbpath)
+    conn.execute("UPDATE Vehiculo SET id_estado = 1 WHERE patente = 'V3'")
+    conn.commit()
+    conn.close()
+    assert 'V3' not in patentes(dbm.get_vehiculos_libres('2030-02-01T00:00:00', '2030-02-05T00:00:00'))
+
+    conn = sqlite3.connect(dbpath)
+    id_alquiler = conn.execute("SELECT MAX(id_alquiler) FROM Alquiler").fetchone()[0]
+    conn.close()
+    assert dbm.finalize_or_cancel_alquiler(id_alquiler, 5)
+    assert 'V3' in patentes(dbm.get_vehiculos_libres('2030-02-01T00:00:00', '2030-02-05T00:00:00'))
+
+
+def test_index_matches_brute_force():
+    rnd = random.Random(7)
+    base = datetime(2030, 1, 1)
+    filas = []
+    for i in range(400):
+        inicio = base + timedelta(hours=rnd.randint(0, 24 * 60))
+        fin = inicio + timedelta(hours=rnd.randint(1, 24 * 10))
+        filas.append({'tipo': 'A', 'id': i, 'patente': f'P{rnd.randint(0, 19)}',
+                      'fecha_inicio': inicio.isoformat(), 'fecha_fin': fin.isoformat()})
+
+    indice = AvailabilityIndex()
+    indice._por_patente = indice._armar(filas)
+    indice.cargado = True
+
+    for _ in range(200):
+        inicio = base + timedelta(hours=rnd.randint(0, 24 * 60))
+        fin = inicio + timedelta(hours=rnd.randint(1, 24 * 5))
+        esperado = {
+            f['patente'] for f in filas
+            if se_superponen(f['fecha_inicio'], f['fecha_fin'], inicio.isoformat(), fin.isoformat())
+        }
+        assert indice.patentes_ocupadas(inicio, fin) == esperado
+
+
+def test_multi_window_matches_single_queries(tmp_path):
+    dbpath = str(tmp_path / 'disp.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath)
+
+    ventanas = [
+        ('2030-01-11T00:00:00', '2030-01-14T00:00:00'),
+        ('2030-01-15T10:00:00', '2030-01-20T00:00:00'),
+        ('2030-01-12', '2030-01-12T12:00:00'),
+    ]
+    resultado = dbm.get_vehiculos_libres_multi(ventanas)
+
+    assert sorted(resultado['vehiculos']) == ['V1', 'V2', 'V3']
+    for (inicio, fin), ventana in zip(ventanas, resultado['ventanas']):
+        assert sorted(ventana['patentes']) == patentes(dbm.get_vehiculos_libres(inicio, fin))
+
+    assert dbm.get_vehiculos_libres_multi(ventanas, id_marca=2)['vehiculos'] == {}
+
+
+def test_calendar_bitmap_follows_schedule(tmp_path):
+    dbpath = str(tmp_path / 'disp.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath)
+
+    desde = datetime(2030, 1, 10).date()
+    libres = dbm.get_calendario_disponibilidad(desde, 10)
+    todos = (1 << 10) - 1
+
+    # V1 ocupado del 10 (10:00) al 15 (10:00): días 0..5 inclusive
+    assert libres['V1'] == todos & ~0b111111
+    # V2 en mantenimiento el 12 completo (hasta el 13 00:00 exclusivo)
+    assert libres['V2'] == todos & ~(1 << 2)
+    # V3 solo tiene un alquiler finalizado
+    assert libres['V3'] == todos
+
+    # Al cancelar el alquiler de V1 su calendario se recalcula
+    assert dbm.finalize_or_cancel_alquiler(1, 5)
+    assert dbm.get_calendario_disponibilidad(desde, 10)['V1'] == todos
+
+
+def test_index_sees_writes_from_other_connections(tmp_path):
+    dbpath = str(tmp_path / 'disp.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath)
+    rango = ('2030-03-01T00:00:00', '2030-03-05T00:00:00')
+    assert patentes(dbm.get_vehiculos_libres(*rango)) == ['V1', 'V2', 'V3']
+
+    # Otro proceso (u otro worker) reserva y cancela sin pasar por este DBManager
+    conn = sqlite3.connect(dbpath)
+    id_alquiler = conn.execute(
+        "INSERT INTO Alquiler (patente, id_cliente, id_empleado, fecha_inicio, fecha_fin, id_estado) "
+        "VALUES ('V2', 1, 1, '2030-03-02T10:00:00', '2030-03-03T10:00:00', 1)"
+    ).lastrowid
+    conn.commit()
+    assert patentes(dbm.get_vehiculos_libres(*rango)) == ['V1', 'V3']
+    assert dbm.get_calendario_disponibilidad(datetime(2030, 3, 1).date(), 4)['V2'] == 0b1001
+
+    conn.execute("UPDATE Alquiler SET id_estado = 5 WHERE id_alquiler = ?", (id_alquiler,))
+    conn.commit()
+    assert patentes(dbm.get_vehiculos_libres(*rango)) == ['V1', 'V2', 'V3']
+
+    # Si las anotaciones pendientes ya se descartaron, recarga todo
+    conn.execute("INSERT INTO Mantenimiento (patente, id_empleado, fecha_inicio, fecha_fin, detalle, id_estado) "
+                 "VALUES ('V1', 1, '2030-03-01T00:00:00', '2030-03-02T00:00:00', 'service', 3)")
+    conn.execute("DELETE FROM CambioOcupacion")
+    conn.execute("INSERT INTO CambioOcupacion (seq, patente) VALUES (?, 'otra')", (dbm.disponibilidad.secuencia + 50,))
+    conn.commit()
+    conn.close()
+    assert patentes(dbm.get_vehiculos_libres(*rango)) == ['V2', 'V3']
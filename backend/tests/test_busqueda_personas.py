@@ -0,0 +1,106 @@
+import sqlite3
+import pytest
+from backend.app import db_manager
+from backend.app.db_manager import DBManager
+from backend.tests.test_reservas_concurrentes import preparar
+
+PERSONA = ("INSERT INTO Persona (nombre, apellido, telefono, mail, fecha_nac, tipo_documento, nro_documento) "
+           "VALUES (?, ?, ?, ?, '1990-01-01', 1, ?)")
+
+
+def alta(conn, rol, *persona):
+    id_persona = conn.execute(PERSONA, persona).lastrowid
+    if rol == 'Cliente':
+        conn.execute("INSERT INTO Cliente (id_persona, fecha_alta) VALUES (?, '2024-01-01')", (id_persona,))
+    else:
+        conn.execute("INSERT INTO Empleado (fecha_alta, sueldo, horario, id_persona) "
+                     "VALUES ('2024-01-01', 1, '9-18', ?)", (id_persona,))
+    return id_persona
+
+
+def nombres(pagina):
+    return [f"{c.nombre} {c.apellido}" for c in pagina['items']]
+
+
+def test_search_is_prefix_accent_insensitive_and_follows_persona_changes(tmp_path):
+    dbpath = str(tmp_path / 'busqueda.sqlite')
+    preparar(dbpath)
+    dbm = DBManager()
+
+    # Las altas van por fuera del DBManager: el índice lo mantienen los triggers
+    conn = sqlite3.connect(dbpath)
+    maria = alta(conn, 'Cliente', 'María', 'González', 1155550000, 'mgonzalez@correo.com', 40111222)
+    alta(conn, 'Cliente', 'Mariano', 'Gómez', 1166660000, 'mariano@otro.com', 40999888)
+    alta(conn, 'Empleado', 'Marta', 'Gonzalo', 1177770000, 'marta@agencia.com', 41000000)
+    conn.commit()
+
+    assert set(nombres(dbm.buscar_clientes('maria'))) == {'María González', 'Mariano Gómez'}
+    assert nombres(dbm.buscar_clientes('GONZÁLEZ mar')) == ['María González']
+    assert nombres(dbm.buscar_clientes('4011')) == ['María González']
+    assert nombres(dbm.buscar_clientes('correo.com')) == ['María González']
+    assert nombres(dbm.buscar_clientes('1166')) == ['Mariano Gómez']
+    # Cada búsqueda se queda en su rol
+    assert nombres(dbm.buscar_clientes('marta')) == []
+    assert [e['apellido'] for e in dbm.buscar_empleados('marta gon')['items']] == ['Gonzalo']
+
+    # Nombre con más peso que el mail: el que se llama así va primero
+    alta(conn, 'Cliente', 'Correa', 'Ruiz', 1188880000, 'cruiz@mail.com', 42000000)
+    conn.commit()
+    assert nombres(dbm.buscar_clientes('corre'))[0] == 'Correa Ruiz'
+
+    conn.execute("UPDATE Persona SET apellido = 'Suárez' WHERE id_persona = ?", (maria,))
+    conn.commit()
+    assert nombres(dbm.buscar_clientes('gonzalez')) == []
+    assert nombres(dbm.buscar_clientes('suarez')) == ['María Suárez']
+
+    conn.execute("DELETE FROM Cliente WHERE id_persona = ?", (maria,))
+    conn.execute("DELETE FROM Persona WHERE id_persona = ?", (maria,))
+    conn.commit()
+    conn.close()
+    assert nombres(dbm.buscar_clientes('suarez')) == []
+
+    # Nada de la sintaxis de FTS5 llega al MATCH; sin 2 caracteres útiles, ValueError
+    assert nombres(dbm.buscar_clientes('o"brien AND (x* OR')) == []
+    for texto in ('a', '  ', '*-"'):
+        with pytest.raises(ValueError):
+            dbm.buscar_clientes(texto)
+
+
+def test_search_pages_through_ties_without_repeating(tmp_path):
+    dbpath = str(tmp_path / 'paginas.sqlite')
+    preparar(dbpath)
+    dbm = DBManager()
+
+    conn = sqlite3.connect(dbpath)
+    esperados = {alta(conn, 'Cliente', 'Ana', 'López', 1100000000 + i, f'ana{i}@mail.com', 50000000 + i)
+                 for i in range(25)}
+    conn.commit()
+    conn.close()
+
+    vistos, after = [], None
+    while True:
+        pagina = dbm.buscar_clientes('ana lop', after=after, limit=10)
+        assert len(pagina['items']) <= 10
+        vistos += [c.id_persona for c in pagina['items']]
+        after = pagina['next_cursor']
+        if after is None:
+            break
+    assert len(vistos) == len(set(vistos)) and set(vistos) == esperados
+
+
+def test_results_past_the_candidate_cap_are_flagged_approximate(tmp_path, monkeypatch):
+    dbpath = str(tmp_path / 'tope.sqlite')
+    preparar(dbpath)
+    dbm = DBManager()
+    conn = sqlite3.connect(dbpath)
+    for i in range(6):
+        alta(conn, 'Cliente', 'Ana', f'Ruiz{i}', 1100000000 + i, f'ana{i}@mail.com', 60000000 + i)
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(db_manager, 'CANDIDATOS_BUSQUEDA', 7)
+    assert dbm.buscar_clientes('ana')['aproximado'] is False
+    monkeypatch.setattr(db_manager, 'CANDIDATOS_BUSQUEDA', 4)
+    pagina = dbm.buscar_clientes('ana')
+    # Se ordenan solo los primeros candidatos y la página lo avisa
+    assert len(pagina['items']) == 4 and pagina['aproximado'] is True
@@ -0,0 +1,47 @@
+import sqlite3
+from backend.app.db_manager import DBManager
+from backend.app.migrations import reconstruir_cargos
+from backend.tests.test_facturacion import setup_db
+
+
+def rollup_vs_reconstruido(dbpath):
+    conn = sqlite3.connect(dbpath)
+    consulta = "SELECT id_alquiler, round(total_multas, 6), round(total_danios, 6), cantidad FROM CargoAlquiler ORDER BY 1"
+    mantenido = conn.execute(consulta).fetchall()
+    conn.execute("BEGIN")
+    reconstruir_cargos(conn.cursor())
+    recalculado = conn.execute(consulta).fetchall()
+    conn.rollback()
+    conn.close()
+    return mantenido, recalculado
+
+
+def test_charges_rollup_follows_multa_and_danio_changes(tmp_path):
+    dbpath = str(tmp_path / 'cargos.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath)
+
+    mantenido, recalculado = rollup_vs_reconstruido(dbpath)
+    assert mantenido and mantenido == recalculado
+
+    conn = sqlite3.connect(dbpath)
+    conn.execute("INSERT INTO Danio (id_alquiler, costo, detalle) VALUES (8, 40, 'x'), (8, 10, 'y'), (9, 5, 'z')")
+    conn.commit()
+    id_danio = conn.execute("SELECT MIN(id_danio) FROM Danio WHERE id_alquiler = 8").fetchone()[0]
+    id_multa = conn.execute("SELECT id_multa FROM Multa WHERE alquiler_id = 8").fetchone()[0]
+    conn.close()
+
+    assert dbm.update_danio(id_danio, {'costo': 60, 'detalle': 'x'})
+    assert dbm.update_multa(id_multa, {'costo': 45, 'detalle': 'x', 'fecha_multa': '2024-06-01'})
+    assert dbm.delete_danio(id_danio + 2)
+
+    conn = sqlite3.connect(dbpath)
+    assert conn.execute("SELECT total_multas, total_danios, cantidad FROM CargoAlquiler WHERE id_alquiler = 8").fetchone() == (45, 70, 3)
+    # Sin cargos no queda fila: el LEFT JOIN de los reportes devuelve 0
+    assert conn.execute("SELECT 1 FROM CargoAlquiler WHERE id_alquiler = 9").fetchone() is None
+    conn.close()
+
+    assert dbm.delete_multa(id_multa)
+    mantenido, recalculado = rollup_vs_reconstruido(dbpath)
+    assert mantenido == recalculado
@@ -0,0 +1,72 @@
+import sqlite3
+from backend.app.catalog_cache import CatalogCache
+from backend.app.db_manager import DBManager
+
+
+def setup_db(path):
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+    CREATE TABLE Marca (id_marca INTEGER PRIMARY KEY, descripcion TEXT);
+    CREATE TABLE Color (id_color INTEGER PRIMARY KEY, descripcion TEXT);
+    INSERT INTO Marca VALUES (1, 'Toyota'), (2, 'Ford');
+    INSERT INTO Color VALUES (1, 'Negro');
+    ''')
+    conn.commit()
+    conn.close()
+
+
+def test_catalogs_are_served_from_memory(tmp_path):
+    dbpath = str(tmp_path / 'catalogos.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath)
+
+    assert [m.descripcion for m in dbm.get_all_marcas()] == ['Toyota', 'Ford']
+    lecturas = dbm.get_pool_stats()['lectura']['checkouts']
+    for _ in range(10):
+        assert dbm.get_marca_by_id(2).descripcion == 'Ford'
+        assert dbm.get_marca_by_id('1').descripcion == 'Toyota'
+        assert dbm.get_marca_by_id(9) is None
+        assert len(dbm.get_all_marcas()) == 2
+    assert dbm.get_pool_stats()['lectura']['checkouts'] == lecturas
+
+
+def test_invalidate_reloads_and_changes_etag(tmp_path):
+    dbpath = str(tmp_path / 'catalogos.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath)
+
+    etag = dbm.catalogos.etag('Marca')
+    version = dbm.catalogos.version
+    assert dbm.catalogos.etag('Marca') == etag
+
+    conn = sqlite3.connect(dbpath)
+    conn.execute("INSERT INTO Marca VALUES (3, 'Fiat')")
+    conn.commit()
+    conn.close()
+    # Sin invalidar sigue sirviendo la versión en memoria
+    assert dbm.get_marca_by_id(3) is None
+
+    dbm.catalogos.invalidate('Marca')
+    assert dbm.catalogos.version == version + 1
+    assert dbm.get_marca_by_id(3).descripcion == 'Fiat'
+    assert dbm.catalogos.etag('Marca') != etag
+    # Las demás tablas no cambian
+    assert dbm.get_color_by_id(1).descripcion == 'Negro'
+
+
+def test_invalidate_during_a_read_never_breaks_it():
+    cargas = []
+
+    def cargar(tabla):
+        cargas.append(tabla)
+        # Otro hilo invalida justo mientras se está cargando
+        cache.invalidate()
+        return [{'id_marca': 1, 'descripcion': f'Toyota {len(cargas)}'}]
+
+    cache = CatalogCache(cargar, {'Marca': 'id_marca'})
+    assert cache.all('Marca') == [{'id_marca': 1, 'descripcion': 'Toyota 1'}]
+    assert cache.get('Marca', 1)['descripcion'] == 'Toyota 2'
+    # Lo cargado durante una invalidación no se guarda: se vuelve a leer
+    assert cache.etag('Marca') and len(cargas) == 3
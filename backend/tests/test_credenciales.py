@@ -0,0 +1,118 @@
+import hashlib
+import sqlite3
+from datetime import date
+import pytest
+from backend.app import migrations
+from backend.app import sistema as modulo_sistema
+from backend.app.db_manager import DBManager
+from backend.app.sistema import SistemaAlquiler
+from backend.db.generar_datos import DOMINIO, PASSWORD, generar
+
+# El mismo módulo que usan sistema y generar_datos (se importan sin el paquete)
+credenciales = modulo_sistema.credenciales
+
+
+@pytest.fixture
+def kdf_rapido(monkeypatch):
+    monkeypatch.setattr(credenciales, 'KDF', 'pbkdf2_sha256')
+    monkeypatch.setattr(credenciales, 'KDF_COST', 1000)
+
+
+def test_hash_is_salted_and_flags_old_formats_for_rehash(kdf_rapido):
+    a, b = credenciales.hashear('secreta'), credenciales.hashear('secreta')
+    assert a != b and a.startswith('pbkdf2_sha256$1000$')
+    assert credenciales.verificar('secreta', a) == (True, False)
+    assert credenciales.verificar('otra', a) == (False, False)
+
+    # Costo o algoritmo distinto del configurado: válido, pero hay que rehashear
+    assert credenciales.verificar('secreta', credenciales.hashear('secreta', costo=2000)) == (True, True)
+    assert credenciales.verificar('secreta', credenciales.hashear('secreta', 'scrypt', 10)) == (True, True)
+    # Filas viejas: SHA-256 sin sal. El texto plano no es un formato válido
+    assert credenciales.verificar('secreta', hashlib.sha256(b'secreta').hexdigest()) == (True, True)
+    assert credenciales.verificar('secreta', 'secreta') == (False, False)
+    # El hash SHA-256 guardado no sirve como contraseña
+    sha = hashlib.sha256(b'secreta').hexdigest()
+    assert credenciales.verificar(sha, sha) == (False, False)
+    assert credenciales.verificar('secreta', 'pbkdf2_sha256$1000$roto$') == (False, False)
+    assert credenciales.verificar('secreta', None) == (False, False)
+
+
+def test_login_is_one_query_rehashes_legacy_rows_and_remembers_verifications(tmp_path, kdf_rapido, monkeypatch):
+    dbpath = str(tmp_path / 'login.sqlite')
+    generar(dbpath, vehiculos=2, clientes=3, empleados=1, anios=1, referencia=date(2025, 6, 1))
+    mail = f'cliente1@{DOMINIO}'
+    conn = sqlite3.connect(dbpath)
+    conn.execute("UPDATE Usuario SET password = ? WHERE user_name = 'cliente1'",
+                 (hashlib.sha256(PASSWORD.encode('utf-8')).hexdigest(),))
+    conn.commit()
+    conn.close()
+
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath)
+    sistema = SistemaAlquiler()
+    sistema.db_manager = dbm
+    # El login ya no pasa por las dos consultas de antes
+    monkeypatch.setattr(dbm, 'get_user_data_for_login_by_mail', None)
+    monkeypatch.setattr(dbm, 'get_full_usuario_by_id', None)
+
+    usuario = sistema.login(mail, PASSWORD)
+    assert usuario and usuario.user_name == 'cliente1' and usuario.permiso.descripcion == 'Cliente'
+    guardado = dbm.get_usuario_para_login(mail).password
+    assert guardado.startswith('pbkdf2_sha256$1000$') and usuario.password == guardado
+    assert dbm.user_cache.get(usuario.id_usuario) is usuario
+
+    # El segundo login no repite la derivación; una contraseña incorrecta sí la paga y falla
+    assert sistema.login(mail, PASSWORD)
+    assert sistema.verificaciones.stats()['hits'] == 1
+    assert sistema.login(mail, 'incorrecta') is None
+    assert sistema.login('nadie@' + DOMINIO, PASSWORD) is None
+
+    # Con una fila SHA-256 filtrada, mandar el hash como contraseña no entra ni la reemplaza
+    legado = hashlib.sha256(PASSWORD.encode('utf-8')).hexdigest()
+    conn = sqlite3.connect(dbpath)
+    conn.execute("UPDATE Usuario SET password = ? WHERE user_name = 'cliente2'", (legado,))
+    conn.commit()
+    conn.close()
+    assert sistema.login(f'cliente2@{DOMINIO}', legado) is None
+    assert dbm.get_usuario_para_login(f'cliente2@{DOMINIO}').password == legado
+
+    # Con otra contraseña guardada lo recordado ya no aplica
+    assert dbm.actualizar_hash_password(usuario.id_usuario, guardado, credenciales.hashear('nueva'))
+    assert sistema.login(mail, PASSWORD) is None
+    assert sistema.login(mail, 'nueva')
+
+
+def test_password_change_revokes_open_sessions(tmp_path, kdf_rapido):
+    dbpath = str(tmp_path / 'cambio.sqlite')
+    generar(dbpath, vehiculos=2, clientes=2, empleados=1, anios=1, referencia=date(2025, 6, 1))
+    DBManager._instance = None
+    sistema = SistemaAlquiler()
+    sistema.db_manager = DBManager(db_path=dbpath)
+    usuario = sistema.login(f'cliente1@{DOMINIO}', PASSWORD)
+    robado, otro = sistema.sesiones.crear(usuario.id_usuario), sistema.sesiones.crear(usuario.id_usuario + 1)
+
+    # Cambiar solo el nombre no corta las sesiones; cambiar la contraseña sí
+    assert sistema.actualizar_usuario(usuario.id_usuario, {'user_name': 'cliente1b'})
+    assert sistema.sesiones.resolver(robado) == usuario.id_usuario
+    assert sistema.actualizar_usuario(usuario.id_usuario, {'current_password': PASSWORD, 'new_password': 'nueva123'})
+    assert sistema.sesiones.resolver(robado) is None
+    assert sistema.sesiones.resolver(otro) == usuario.id_usuario + 1
+    assert sistema.login(f'cliente1@{DOMINIO}', 'nueva123')
+
+
+def test_plain_text_rows_are_rehashed_once_by_migration(tmp_path, kdf_rapido):
+    dbpath = str(tmp_path / 'plano.sqlite')
+    generar(dbpath, vehiculos=2, clientes=2, empleados=1, anios=1, referencia=date(2025, 6, 1))
+    sha = hashlib.sha256(PASSWORD.encode('utf-8')).hexdigest()
+    conn = sqlite3.connect(dbpath)
+    conn.execute("UPDATE Usuario SET password = ? WHERE user_name = 'cliente1'", (PASSWORD,))
+    conn.execute("UPDATE Usuario SET password = ? WHERE user_name = 'cliente2'", (sha,))
+    migrations._m011_hashear_texto_plano(conn.cursor())
+    conn.commit()
+    guardados = dict(conn.execute("SELECT user_name, password FROM Usuario").fetchall())
+    conn.close()
+
+    assert guardados['cliente1'].startswith('pbkdf2_sha256$')
+    assert credenciales.verificar(PASSWORD, guardados['cliente1'])[0]
+    # Los SHA-256 los pasa a hash el login, no la migración
+    assert guardados['cliente2'] == sha
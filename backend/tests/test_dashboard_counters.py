@@ -0,0 +1,78 @@
+import sqlite3
+from backend.app.db_manager import DBManager
+
+
+def setup_db(path):
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+    CREATE TABLE Vehiculo (
+        patente TEXT PRIMARY KEY, modelo TEXT, id_marca INTEGER, anio INTEGER,
+        precio_flota REAL, asientos INTEGER, puertas INTEGER, caja_manual INTEGER,
+        id_estado INTEGER, id_color INTEGER
+    );
+    CREATE TABLE Alquiler (
+        id_alquiler INTEGER PRIMARY KEY AUTOINCREMENT, patente TEXT, id_cliente INTEGER,
+        id_empleado INTEGER, fecha_inicio TEXT, fecha_fin TEXT, id_estado INTEGER
+    );
+    CREATE TABLE Mantenimiento (
+        id_mantenimiento INTEGER PRIMARY KEY AUTOINCREMENT, patente TEXT, id_empleado INTEGER,
+        fecha_inicio TEXT, fecha_fin TEXT, detalle TEXT, id_estado INTEGER
+    );
+    CREATE TABLE Cliente (id_cliente INTEGER PRIMARY KEY AUTOINCREMENT, id_persona INTEGER, fecha_alta TEXT);
+    INSERT INTO Vehiculo VALUES ('V1', 'M1', 1, 2020, 1, 4, 4, 0, 1, 1), ('V2', 'M2', 1, 2020, 1, 4, 4, 0, 2, 1);
+    INSERT INTO Alquiler (patente, id_cliente, id_empleado, fecha_inicio, fecha_fin, id_estado) VALUES
+        ('V2', 1, 1, '2030-01-01T10:00:00', '2030-01-05T10:00:00', 2),
+        ('V1', 1, 1, '2030-02-01T10:00:00', '2030-02-05T10:00:00', 1);
+    INSERT INTO Mantenimiento (patente, id_empleado, fecha_inicio, fecha_fin, detalle, id_estado) VALUES
+        ('V1', 1, '2030-03-01T00:00:00', '2030-03-02T00:00:00', 'service', 3);
+    INSERT INTO Cliente (id_persona, fecha_alta) VALUES (1, '2024-01-01'), (2, '2024-01-01');
+    ''')
+    conn.commit()
+    conn.close()
+
+
+def contar(dbpath):
+    # Lo mismo que guardan los contadores, calculado recorriendo las tablas
+    conn = sqlite3.connect(dbpath)
+    esperado = {}
+    for entidad, tabla, columna in (('vehiculo', 'Vehiculo', 'id_estado'), ('alquiler', 'Alquiler', 'id_estado'),
+                                    ('mantenimiento', 'Mantenimiento', 'id_estado'), ('cliente', 'Cliente', '0')):
+        for id_estado, total in conn.execute(f"SELECT {columna}, COUNT(*) FROM {tabla} GROUP BY 1"):
+            esperado.setdefault(entidad, {})[id_estado] = total
+    conn.close()
+    return esperado
+
+
+def sin_ceros(contadores):
+    return {e: {k: v for k, v in c.items() if v} for e, c in contadores.items()}
+
+
+def test_counters_follow_mutations(tmp_path):
+    dbpath = str(tmp_path / 'contadores.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath)
+
+    # Carga inicial desde los datos existentes
+    assert dbm.get_contadores_dashboard() == contar(dbpath)
+
+    assert dbm.update_alquiler_estado_only(2, 2)
+    assert dbm.update_alquiler_estado_only(1, 4)
+    dbm.delete_alquiler(2)
+
+    conn = sqlite3.connect(dbpath)
+    conn.execute("UPDATE Vehiculo SET id_estado = 1 WHERE patente = 'V2'")
+    conn.execute("INSERT INTO Vehiculo VALUES ('V3', 'M3', 1, 2020, 1, 4, 4, 0, 3, 1)")
+    conn.execute("UPDATE Mantenimiento SET id_estado = 2")
+    conn.execute("DELETE FROM Cliente WHERE id_cliente = 1")
+    conn.commit()
+    # Una transacción revertida no deja rastro en los contadores
+    conn.execute("DELETE FROM Vehiculo")
+    conn.rollback()
+    conn.close()
+
+    contadores = dbm.get_contadores_dashboard()
+    assert sin_ceros(contadores) == contar(dbpath)
+    assert contadores['vehiculo'][1] == 2
+    assert contadores['alquiler'].get(2, 0) + contadores['alquiler'].get(3, 0) == 0
+    assert contadores['cliente'][0] == 1
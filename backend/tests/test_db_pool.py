@@ -0,0 +1,152 @@
+import sqlite3
+import threading
+import pytest
+from backend.app.db_manager import DBManager
+
+
+def setup_db(path):
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+    CREATE TABLE IF NOT EXISTS Marca (id_marca INTEGER PRIMARY KEY, descripcion TEXT);
+    ''')
+    conn.executemany("INSERT INTO Marca (id_marca, descripcion) VALUES (?, ?)", [(1, 'Toyota'), (2, 'Ford')])
+    conn.commit()
+    conn.close()
+
+
+def leer_marca(dbm, id_marca):
+    # Lectura con el mismo patrón que los métodos de DBManager
+    conn = dbm._get_connection(readonly=True)
+    try:
+        row = conn.execute("SELECT * FROM Marca WHERE id_marca = ?", (id_marca,)).fetchone()
+        return row['descripcion'] if row else None
+    finally:
+        conn.close()
+
+
+def test_connections_are_recycled(tmp_path):
+    dbpath = str(tmp_path / 'pool.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath, pool_size=2)
+
+    for _ in range(20):
+        assert leer_marca(dbm, 1) == 'Toyota'
+        assert leer_marca(dbm, 2) == 'Ford'
+
+    stats = dbm.get_pool_stats()['lectura']
+    assert stats['checkouts'] == 40
+    # Todas las llamadas fueron secuenciales: una sola conexión alcanzó
+    assert stats['size'] == 1
+    assert stats['in_use'] == 0
+
+
+def test_nested_calls_reuse_thread_connection(tmp_path):
+    dbpath = str(tmp_path / 'pool.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath, pool_size=1, pool_timeout=0.5)
+
+    conn = dbm._get_connection(readonly=True)
+    # Con pool de tamaño 1, una llamada anidada no debe quedar esperando
+    assert leer_marca(dbm, 2) == 'Ford'
+    conn.close()
+
+    assert dbm.get_pool_stats()['lectura']['in_use'] == 0
+
+
+def test_pool_is_bounded_across_threads(tmp_path):
+    dbpath = str(tmp_path / 'pool.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath, pool_size=2)
+
+    errores = []
+
+    def worker():
+        for _ in range(50):
+            if leer_marca(dbm, 1) is None:
+                errores.append('sin resultado')
+
+    hilos = [threading.Thread(target=worker) for _ in range(8)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    stats = dbm.get_pool_stats()['lectura']
+    assert not errores
+    assert stats['size'] <= 2
+    assert stats['checkouts'] == 400
+
+
+def test_uncommitted_transaction_is_rolled_back_on_release(tmp_path):
+    dbpath = str(tmp_path / 'pool.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath, pool_size=1)
+
+    conn = dbm._get_connection()
+    conn.execute("BEGIN")
+    conn.execute("INSERT INTO Marca (id_marca, descripcion) VALUES (3, 'Fiat')")
+    conn.close()
+
+    assert leer_marca(dbm, 3) is None
+
+
+def test_wal_profile_is_applied(tmp_path):
+    dbpath = str(tmp_path / 'pool.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath, storage_profile='wal')
+
+    conn = dbm._get_connection()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    conn.close()
+
+
+def test_read_connections_are_query_only(tmp_path):
+    dbpath = str(tmp_path / 'pool.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath)
+
+    conn = dbm._get_connection(readonly=True)
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO Marca (id_marca, descripcion) VALUES (9, 'Fiat')")
+    finally:
+        conn.close()
+
+
+def test_readers_not_blocked_by_open_write(tmp_path):
+    dbpath = str(tmp_path / 'pool.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath, pool_timeout=0.5)
+
+    # Otro hilo mantiene una transacción de escritura abierta
+    escribiendo = threading.Event()
+    terminar = threading.Event()
+
+    def escritor():
+        conn = dbm._get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("UPDATE Marca SET descripcion = 'X' WHERE id_marca = 1")
+        escribiendo.set()
+        terminar.wait(5)
+        conn.commit()
+        conn.close()
+
+    hilo = threading.Thread(target=escritor)
+    hilo.start()
+    escribiendo.wait(5)
+    try:
+        # El lector ve la última versión confirmada sin esperar al escritor
+        assert leer_marca(dbm, 1) == 'Toyota'
+    finally:
+        terminar.set()
+        hilo.join()
+
+    assert leer_marca(dbm, 1) == 'X'
@@ -0,0 +1,108 @@
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from backend.app import report_engine
+from backend.app.db_manager import DBManager
+from backend.app.migrations import reconstruir_facturacion
+from backend.db.create_db import crear_esquema, poblar_catalogos
+
+
+def setup_db(path):
+    rnd = random.Random(11)
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    crear_esquema(cursor)
+    poblar_catalogos(cursor)
+    for i in range(1, 6):
+        cursor.execute(
+            "INSERT INTO Persona (nombre, apellido, telefono, mail, fecha_nac, tipo_documento, nro_documento) "
+            "VALUES (?, ?, 0, ?, '1990-01-01', 1, ?)", (f'N{i}', f'A{i}', f'p{i}@mail.com', 30000000 + i)
+        )
+        cursor.execute("INSERT INTO Cliente (id_persona, fecha_alta) VALUES (?, '2024-01-01')", (i,))
+    for n, p in enumerate(('AA001AA', 'AA002AA', 'AA003AA')):
+        cursor.execute("INSERT INTO Vehiculo VALUES (?, 'M', 1, 2020, ?, 5, 4, 0, 1, 1)", (p, 100 + 50 * n))
+    base = datetime(2024, 1, 1, 10)
+    for i in range(1, 151):
+        inicio = base + timedelta(days=rnd.randint(0, 300), hours=rnd.randint(0, 12))
+        fin = inicio + timedelta(days=rnd.randint(0, 9), hours=rnd.randint(0, 12))
+        cursor.execute(
+            "INSERT INTO Alquiler (patente, id_cliente, id_empleado, fecha_inicio, fecha_fin, id_estado) "
+            "VALUES (?, ?, 1, ?, ?, ?)",
+            (rnd.choice(('AA001AA', 'AA002AA', 'AA003AA')), rnd.randint(1, 5),
+             inicio.isoformat(), fin.isoformat(), rnd.choice((2, 4, 4, 5)))
+        )
+        if i % 4 == 0:
+            cursor.execute("INSERT INTO Multa (alquiler_id, costo, detalle, fecha_multa) VALUES (?, 30, 'x', ?)",
+                           (i, fin.isoformat()))
+    conn.commit()
+    conn.close()
+
+
+def facturacion_original(dbpath, desde, hasta):
+    # El cálculo que hacía el reporte antes: alquiler por alquiler, en Python
+    conn = sqlite3.connect(dbpath)
+    totales = {}
+    for periodo, inicio, fin, precio in conn.execute("""
+        SELECT strftime('%Y-%m', a.fecha_fin), a.fecha_inicio, a.fecha_fin, v.precio_flota
+        FROM Alquiler a JOIN Vehiculo v ON a.patente = v.patente
+        WHERE a.id_estado = 4 AND a.fecha_fin >= ? AND a.fecha_fin <= ?""", (desde, hasta)):
+        dias = max(1, (datetime.fromisoformat(fin) - datetime.fromisoformat(inicio)).days)
+        totales[periodo] = totales.get(periodo, 0) + dias * precio
+    conn.close()
+    return {k: round(v, 2) for k, v in totales.items()}
+
+
+def tabla_vs_reconstruida(dbpath):
+    conn = sqlite3.connect(dbpath)
+    consulta = "SELECT * FROM FacturacionMensual ORDER BY periodo, patente, id_cliente"
+    mantenida = conn.execute(consulta).fetchall()
+    conn.execute("BEGIN")
+    reconstruir_facturacion(conn.cursor())
+    recalculada = conn.execute(consulta).fetchall()
+    conn.rollback()
+    conn.close()
+    redondear = lambda filas: [tuple(round(x, 6) if isinstance(x, float) else x for x in f) for f in filas]
+    return redondear(mantenida), redondear(recalculada)
+
+
+def test_fact_table_matches_report_and_follows_changes(tmp_path):
+    dbpath = str(tmp_path / 'facturacion.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath)
+
+    desde, hasta = '2024-01-01', '2024-12-31T23:59:59'
+    reporte = dbm.get_report_facturacion_mensual(desde, hasta)
+    assert {r['periodo']: r['total_facturado'] for r in reporte} == facturacion_original(dbpath, desde, hasta)
+
+    trimestral = dbm.get_report_facturacion_mensual(desde, hasta, 'trimestral')
+    assert [r['periodo'] for r in trimestral][:2] == ['2024-1', '2024-2']
+    # La misma etiqueta que el reporte de alquileres por período
+    assert {r['periodo'] for r in trimestral} == {report_engine.PERIODOS['trimestral'](r['periodo']) for r in reporte}
+    assert round(sum(r['total_facturado'] for r in trimestral), 2) == round(sum(r['total_facturado'] for r in reporte), 2)
+
+    # Cambios por los mutadores del DBManager y por SQL directo
+    conn = sqlite3.connect(dbpath)
+    activos = [r[0] for r in conn.execute("SELECT id_alquiler FROM Alquiler WHERE id_estado = 2 LIMIT 3")]
+    finalizados = [r[0] for r in conn.execute("SELECT id_alquiler FROM Alquiler WHERE id_estado = 4 LIMIT 3")]
+    conn.close()
+    assert dbm.finalize_or_cancel_alquiler(activos[0], 4)
+    assert dbm.finalize_or_cancel_alquiler(finalizados[0], 5)
+    assert dbm.update_alquiler_estado_only(activos[1], 4)
+    dbm.delete_alquiler(finalizados[1])
+
+    conn = sqlite3.connect(dbpath)
+    conn.execute("INSERT INTO Multa (alquiler_id, costo, detalle, fecha_multa) VALUES (?, 75, 'x', '2024-05-01')",
+                 (activos[0],))
+    conn.execute("INSERT INTO Danio (id_alquiler, costo, detalle) VALUES (?, 40, 'x')", (finalizados[2],))
+    conn.execute("UPDATE Multa SET costo = costo * 2 WHERE id_multa % 3 = 0")
+    conn.execute("DELETE FROM Multa WHERE id_multa % 5 = 0")
+    conn.execute("UPDATE Vehiculo SET precio_flota = 333 WHERE patente = 'AA002AA'")
+    conn.execute("UPDATE Alquiler SET fecha_fin = '2024-12-20T10:00:00' WHERE id_alquiler = ?", (finalizados[2],))
+    conn.commit()
+    conn.close()
+
+    mantenida, recalculada = tabla_vs_reconstruida(dbpath)
+    assert mantenida == recalculada
+    reporte = dbm.get_report_facturacion_mensual(desde, hasta)
+    assert {r['periodo']: r['total_facturado'] for r in reporte} == facturacion_original(dbpath, desde, hasta)
@@ -0,0 +1,83 @@
+import sqlite3
+import pytest
+from backend.app.db_manager import DBManager
+from backend.app.fechas import dias_alquiler, normalizar_fecha
+from backend.db.create_db import crear_esquema, poblar_catalogos
+
+
+# Filas cargadas antes de la migración, con los formatos que convivían en la base
+LEGADO = [
+    ('2024-03-01 10:00:00', '2024-03-04 09:00:00'),
+    ('2024-03-10T08:30:00.123456', '2024-03-10T20:00:00'),
+    ('2024-04-01', '2024-04-08'),
+    ('2024-05-01T10:00:00', '2024-05-03T10:00:00'),
+]
+
+
+def setup_db(path):
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    crear_esquema(cursor)
+    poblar_catalogos(cursor)
+    cursor.execute(
+        "INSERT INTO Persona (nombre, apellido, telefono, mail, fecha_nac, tipo_documento, nro_documento) "
+        "VALUES ('N', 'A', 0, 'n@mail.com', '1990-01-01', 1, 30000000)"
+    )
+    cursor.execute("INSERT INTO Cliente (id_persona, fecha_alta) VALUES (1, '2024-01-01')")
+    cursor.execute("INSERT INTO Empleado VALUES (1, '2024-01-01', 1000, 'M', 1)")
+    cursor.execute("INSERT INTO Vehiculo VALUES ('AA001AA', 'M', 1, 2020, 100, 5, 4, 0, 1, 1)")
+    for inicio, fin in LEGADO:
+        cursor.execute(
+            "INSERT INTO Alquiler (patente, id_cliente, id_empleado, fecha_inicio, fecha_fin, id_estado) "
+            "VALUES ('AA001AA', 1, 1, ?, ?, 4)", (inicio, fin)
+        )
+    cursor.execute("INSERT INTO Multa (alquiler_id, costo, detalle, fecha_multa) VALUES (1, 30, 'x', '2024-03-02 12:00')")
+    conn.commit()
+    conn.close()
+
+
+def test_migration_normalizes_legacy_dates(tmp_path):
+    dbpath = str(tmp_path / 'fechas.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    DBManager(db_path=dbpath)
+
+    conn = sqlite3.connect(dbpath)
+    filas = conn.execute("SELECT fecha_inicio, fecha_fin, dias FROM Alquiler ORDER BY id_alquiler").fetchall()
+    for (inicio, fin, dias), (inicio_legado, fin_legado) in zip(filas, LEGADO):
+        assert inicio == normalizar_fecha(inicio_legado)
+        assert fin == normalizar_fecha(fin_legado)
+        assert dias == dias_alquiler(inicio_legado, fin_legado)
+    assert [f[2] for f in filas] == [2, 1, 7, 2]
+    assert conn.execute("SELECT fecha_multa FROM Multa").fetchone()[0] == '2024-03-02T12:00:00'
+
+    # Una escritura que se saltea la normalización la rechaza la base
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute(
+            "INSERT INTO Alquiler (patente, id_cliente, id_empleado, fecha_inicio, fecha_fin, id_estado) "
+            "VALUES ('AA001AA', 1, 1, '2024-06-01 10:00', '2024-06-02T10:00:00', 1)"
+        )
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("UPDATE Alquiler SET fecha_fin = '2024-03-05' WHERE id_alquiler = 1")
+    conn.close()
+
+
+def test_writers_store_normalized_dates(tmp_path):
+    dbpath = str(tmp_path / 'fechas.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath)
+
+    dbm.schedule_mantenimiento({
+        'patente': 'AA001AA', 'id_empleado': 1, 'detalle': 'service',
+        'fecha_inicio': '2024-07-01 08:00', 'fecha_fin': '2024-07-02',
+    })
+    conn = sqlite3.connect(dbpath)
+    assert conn.execute("SELECT fecha_inicio, fecha_fin FROM Mantenimiento").fetchone() == (
+        '2024-07-01T08:00:00', '2024-07-02T00:00:00'
+    )
+    conn.close()
+
+    reporte = dbm.get_report_alquileres_por_cliente(1)
+    assert [r['dias_alquilado'] for r in reporte] == [2, 7, 1, 2]
+    assert reporte[0]['costo_alquiler_base'] == 200
@@ -0,0 +1,45 @@
+import sqlite3
+from datetime import date
+from backend.app.db_manager import DBManager
+from backend.db.generar_datos import DOMINIO, PASSWORD, generar
+
+
+def test_generated_data_is_reproducible_consistent_and_usable(tmp_path):
+    rutas = [str(tmp_path / 'a.sqlite'), str(tmp_path / 'b.sqlite')]
+    totales = [generar(ruta, vehiculos=8, clientes=40, empleados=3, anios=1, seed=7,
+                       referencia=date(2025, 6, 1)) for ruta in rutas]
+    assert totales[0] == totales[1]
+    assert totales[0]['Vehiculo'] == 8 and totales[0]['Cliente'] == 40 and totales[0]['Empleado'] == 3
+    assert totales[0]['Alquiler'] > 100 and totales[0]['Mantenimiento'] > 0
+
+    filas = []
+    for ruta in rutas:
+        conn = sqlite3.connect(ruta)
+        filas.append(conn.execute("SELECT * FROM Alquiler ORDER BY id_alquiler").fetchall())
+        # Ningún vehículo tiene dos alquileres ni un alquiler y un service a la vez
+        superpuestos = conn.execute("""
+            SELECT COUNT(*) FROM Alquiler a JOIN Alquiler b
+            ON a.patente = b.patente AND a.id_alquiler < b.id_alquiler
+            AND a.fecha_inicio < b.fecha_fin AND a.fecha_fin > b.fecha_inicio
+        """).fetchone()[0]
+        en_service = conn.execute("""
+            SELECT COUNT(*) FROM Alquiler a JOIN Mantenimiento m
+            ON a.patente = m.patente AND a.fecha_inicio < m.fecha_fin AND a.fecha_fin > m.fecha_inicio
+        """).fetchone()[0]
+        assert superpuestos == 0 and en_service == 0
+        # Los ids siguen el orden de las fechas; lo anterior a la referencia no queda reservado
+        assert conn.execute("SELECT COUNT(*) FROM Alquiler a JOIN Alquiler b ON a.id_alquiler < b.id_alquiler "
+                            "AND a.fecha_inicio > b.fecha_inicio").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM Alquiler WHERE id_estado = 1 "
+                            "AND fecha_fin < '2025-06-01'").fetchone()[0] == 0
+        conn.close()
+    assert filas[0] == filas[1]
+
+    # Las tablas derivadas quedaron armadas por las migraciones
+    DBManager._instance = None
+    dbm = DBManager(db_path=rutas[0])
+    usuario = dbm.get_user_data_for_login_by_mail(f'admin@{DOMINIO}')
+    assert usuario and usuario['password'] != PASSWORD
+    facturacion = dbm.get_report_facturacion_mensual('2000-01-01', '2100-01-01', 'anual')
+    finalizados = sum(1 for fila in filas[0] if fila[6] == 4)
+    assert sum(f['alquileres'] for f in facturacion) == finalizados
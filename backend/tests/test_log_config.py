@@ -0,0 +1,43 @@
+import io
+import json
+import logging
+from backend.app import log_config
+
+
+def test_logs_go_through_queue_with_request_id_and_lazy_debug():
+    raiz = logging.getLogger(log_config.RAIZ)
+    salida = io.StringIO()
+    try:
+        log_config.configurar_logging(nivel='INFO', formato='json', destino=salida)
+        logger = log_config.obtener_logger('prueba')
+
+        armados = []
+
+        class Costoso:
+            def __str__(self):
+                armados.append(1)
+                return 'costoso'
+
+        assert log_config.iniciar_request('abc-123') == 'abc-123'
+        logger.debug("No sale: %s", Costoso())
+        logger.info("Alquiler %s creado", 7)
+        # Un id con caracteres raros se reemplaza por uno generado
+        otro = log_config.iniciar_request('x\ny')
+        assert otro != 'x\ny' and log_config.ID_VALIDO.match(otro)
+        log_config.terminar_request()
+        logger.warning("Fuera de un request")
+        log_config.detener_logging()
+
+        lineas = [json.loads(linea) for linea in salida.getvalue().splitlines()]
+        # DEBUG apagado: el argumento ni siquiera se convirtió a texto
+        assert armados == []
+        assert [(l['nivel'], l['mensaje'], l['id_request']) for l in lineas] == [
+            ('INFO', 'Alquiler 7 creado', 'abc-123'),
+            ('WARNING', 'Fuera de un request', '-'),
+        ]
+        assert lineas[0]['logger'] == 'alquileres.prueba'
+    finally:
+        log_config.detener_logging()
+        raiz.handlers.clear()
+        raiz.propagate = True
+        raiz.setLevel(logging.NOTSET)
@@ -0,0 +1,40 @@
+import logging
+import re
+from backend.app import db_manager
+from backend.app.db_manager import DBManager
+from backend.tests.test_facturacion import setup_db
+
+
+def valor(texto, prefijo):
+    for linea in texto.splitlines():
+        if linea.startswith(prefijo):
+            return float(linea.rsplit(' ', 1)[1])
+    return None
+
+
+def test_sql_timing_rows_and_slow_query_plan(tmp_path, monkeypatch, caplog):
+    dbpath = str(tmp_path / 'metricas.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath)
+    dbm.metricas.reiniciar()
+    metrics = db_manager.metrics
+    monkeypatch.setattr(metrics, 'SLOW_QUERY_MS', 0.0001)
+
+    with caplog.at_level(logging.WARNING, logger='alquileres.metrics'):
+        reporte = dbm.get_rentals_by_period_report('mensual')
+    texto = dbm.metricas.exportar()
+
+    sentencia = 'sentencia="SELECT substr(a.fecha_inicio, 1, 7) as mes, COUNT(*) as cantidad'
+    assert valor(texto, f'alquileres_db_query_duration_seconds_count{{{sentencia}') == 1
+    # Las filas se cuentan en el fetch: una por mes
+    assert valor(texto, f'alquileres_db_query_rows_total{{{sentencia}') == len(reporte)
+    assert valor(texto, 'alquileres_db_acquire_duration_seconds_count{pool="lectura"}') >= 1
+    assert valor(texto, 'alquileres_db_pool_connections{estado="en_uso",pool="lectura"}') == 0
+
+    lentas = [r.getMessage() for r in caplog.records if 'SELECT substr(a.fecha_inicio' in r.getMessage()]
+    assert len(lentas) == 1 and re.search(r'plan: .*SEARCH a USING INDEX', lentas[0])
+
+    # Las listas IN de distinto largo son una sola sentencia
+    assert dbm.metricas.clave_sentencia("SELECT 1 WHERE x IN (?, ?)") == \
+        dbm.metricas.clave_sentencia("SELECT 1\n WHERE x IN (?,?,?,?)")
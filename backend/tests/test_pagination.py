@@ -0,0 +1,78 @@
+import random
+import sqlite3
+import pytest
+from datetime import datetime, timedelta
+from backend.app.db_manager import DBManager
+from backend.db.create_db import crear_esquema, poblar_catalogos
+
+
+def setup_db(path):
+    rnd = random.Random(7)
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    crear_esquema(cursor)
+    poblar_catalogos(cursor)
+    for i in range(1, 31):
+        cursor.execute(
+            "INSERT INTO Persona (nombre, apellido, telefono, mail, fecha_nac, tipo_documento, nro_documento) "
+            "VALUES (?, ?, 0, ?, '1990-01-01', 1, ?)", (f'N{i}', f'A{i % 4}', f'p{i}@mail.com', 30000000 + i)
+        )
+        cursor.execute("INSERT INTO Usuario (id_persona, user_name, password, id_permiso) VALUES (?, ?, 'x', 1)",
+                       (i, f'u{i}'))
+        cursor.execute("INSERT INTO Cliente (id_persona, fecha_alta) VALUES (?, '2024-01-01')", (i,))
+    for p in ('AA001AA', 'AA002AA', 'AA003AA'):
+        cursor.execute("INSERT INTO Vehiculo VALUES (?, 'M', 1, 2020, 1000, 5, 4, 0, 1, 1)", (p,))
+    base = datetime(2024, 1, 1)
+    for _ in range(120):
+        # Pocas fechas distintas: fuerza empates en fecha_inicio
+        inicio = base + timedelta(days=rnd.randint(0, 20))
+        cursor.execute(
+            "INSERT INTO Alquiler (patente, id_cliente, id_empleado, fecha_inicio, fecha_fin, id_estado) "
+            "VALUES (?, ?, 1, ?, ?, ?)",
+            (rnd.choice(('AA001AA', 'AA002AA', 'AA003AA')), rnd.randint(1, 30),
+             inicio.isoformat(), (inicio + timedelta(days=2)).isoformat(), rnd.choice((1, 2, 4)))
+        )
+    conn.commit()
+    conn.close()
+
+
+def recorrer(pagina, **kwargs):
+    items, after, paginas = [], None, 0
+    while True:
+        resultado = pagina(after=after, **kwargs)
+        items.extend(resultado['items'])
+        paginas += 1
+        after = resultado['next_cursor']
+        if after is None:
+            return items, paginas
+
+
+def test_keyset_pages_cover_everything_once(tmp_path):
+    dbpath = str(tmp_path / 'paginas.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath)
+
+    todos = dbm.get_all_alquileres()
+    items, paginas = recorrer(dbm.get_alquileres_pagina, limit=7)
+    assert paginas == 18
+    assert [a['id_alquiler'] for a in items] == [
+        a['id_alquiler'] for a in sorted(todos, key=lambda a: (a['fecha_inicio'], a['id_alquiler']), reverse=True)
+    ]
+
+    filtrados, _ = recorrer(dbm.get_alquileres_pagina, limit=5, id_estado=2, patente='AA002AA',
+                            desde='2024-01-05', hasta='2024-01-15')
+    assert sorted(a['id_alquiler'] for a in filtrados) == sorted(
+        a['id_alquiler'] for a in todos
+        if a['id_estado'] == 2 and a['patente'] == 'AA002AA' and '2024-01-05' <= a['fecha_inicio'] < '2024-01-15'
+    )
+
+    propios, _ = recorrer(dbm.get_alquileres_pagina, limit=3, id_usuario=4)
+    assert {a['id_alquiler'] for a in propios} == {a['id_alquiler'] for a in dbm.get_all_alquileres(id_persona_filtro=4)}
+
+    clientes, _ = recorrer(dbm.get_clientes_pagina, limit=4)
+    assert [c.id_cliente for c in clientes] == [c.id_cliente for c in sorted(
+        dbm.get_all_clients(), key=lambda c: (c.apellido, c.nombre, c.id_persona))]
+
+    with pytest.raises(ValueError):
+        dbm.get_alquileres_pagina(after='no-es-un-cursor')
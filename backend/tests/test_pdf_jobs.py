@@ -0,0 +1,54 @@
+import os
+import re
+import time
+import pytest
+from backend.app.db_manager import DBManager
+from backend.app.pdf_jobs import GestorTrabajosPDF
+from backend.tests.test_facturacion import setup_db
+
+
+def esperar(gestor, id_trabajo, limite=10):
+    fin = time.time() + limite
+    while time.time() < fin:
+        trabajo = gestor.obtener(id_trabajo)
+        if trabajo['estado'] in ('listo', 'error'):
+            return trabajo
+        time.sleep(0.02)
+    raise AssertionError('El trabajo no terminó')
+
+
+def test_pdf_jobs_render_in_background_and_reuse_disk_cache(tmp_path):
+    dbpath = str(tmp_path / 'pdf.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath)
+    gestor = GestorTrabajosPDF(dbm, directorio=str(tmp_path / 'pdfs'))
+    params = {'fecha_desde': '2024-01-01T00:00:00', 'fecha_hasta': '2024-12-31T23:59:59'}
+
+    trabajo = gestor.encolar('detalle-clientes-completo', params, 1)
+    assert trabajo['estado'] in ('pendiente', 'procesando', 'listo')
+    assert esperar(gestor, trabajo['id'])['estado'] == 'listo'
+    with open(gestor.ruta(trabajo['id']), 'rb') as archivo:
+        contenido = archivo.read()
+    assert contenido.startswith(b'%PDF-1.4') and contenido.rstrip().endswith(b'%%EOF')
+    # Más filas que las que entran en una hoja: varias páginas, todas en el árbol
+    paginas = int(re.search(rb'/Type /Pages /Kids \[[^\]]*\] /Count (\d+)', contenido).group(1))
+    assert paginas > 1 and contenido.count(b'/Type /Page ') == paginas
+
+    # Mismos parámetros y mismos datos: el PDF sale del disco, sin volver a generarlo
+    repetido = gestor.encolar('detalle-clientes-completo', dict(params), 2)
+    assert repetido['estado'] == 'listo' and repetido['id'] != trabajo['id']
+    assert gestor.ruta(repetido['id']) == gestor.ruta(trabajo['id'])
+
+    # Una escritura cambia la versión: otro archivo
+    dbm.reportes.invalidar()
+    nuevo = gestor.encolar('detalle-clientes-completo', params, 1)
+    assert esperar(gestor, nuevo['id'])['estado'] == 'listo'
+    assert gestor.ruta(nuevo['id']) != gestor.ruta(trabajo['id'])
+    assert len(os.listdir(tmp_path / 'pdfs')) == 2
+
+    with pytest.raises(ValueError):
+        gestor.encolar('inexistente', {}, 1)
+    with pytest.raises(ValueError):
+        gestor.encolar('facturacion-mensual', {'agrupacion': 'semanal'}, 1)
+    gestor.cerrar()
@@ -0,0 +1,125 @@
+import random
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from backend.app.db_manager import DBManager
+from backend.db.create_db import crear_esquema, poblar_catalogos
+
+
+# Tablas que crecen con el uso: sobre ellas no se acepta un SCAN sin índice
+TABLAS_GRANDES = {'Alquiler', 'Multa', 'Danio', 'Persona', 'Usuario', 'Cliente'}
+
+
+def setup_db(path):
+    rnd = random.Random(3)
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    crear_esquema(cursor)
+    poblar_catalogos(cursor)
+
+    for i in range(1, 301):
+        cursor.execute(
+            "INSERT INTO Persona (nombre, apellido, telefono, mail, fecha_nac, tipo_documento, nro_documento) "
+            "VALUES (?, ?, 0, ?, '1990-01-01', 1, ?)", (f'N{i}', f'A{i}', f'p{i}@mail.com', 30000000 + i)
+        )
+        cursor.execute(
+            "INSERT INTO Usuario (id_persona, user_name, password, id_permiso) VALUES (?, ?, 'x', ?)",
+            (i, f'u{i}', 2 if i == 1 else 1)
+        )
+        if i == 1:
+            cursor.execute("INSERT INTO Empleado (fecha_alta, sueldo, horario, id_persona) VALUES ('2024-01-01', 1, '9-18', 1)")
+        else:
+            cursor.execute("INSERT INTO Cliente (id_persona, fecha_alta) VALUES (?, '2024-01-01')", (i,))
+
+    patentes = [f'AA{i:03d}AA' for i in range(20)]
+    for p in patentes:
+        cursor.execute("INSERT INTO Vehiculo VALUES (?, 'M', 1, 2020, 1000, 5, 4, 0, 1, 1)", (p,))
+
+    base = datetime(2024, 1, 1)
+    for i in range(1, 2001):
+        inicio = base + timedelta(days=rnd.randint(0, 700))
+        fin = inicio + timedelta(days=rnd.randint(1, 10))
+        cursor.execute(
+            "INSERT INTO Alquiler (patente, id_cliente, id_empleado, fecha_inicio, fecha_fin, id_estado) "
+            "VALUES (?, ?, 1, ?, ?, ?)",
+            (rnd.choice(patentes), rnd.randint(1, 299), inicio.isoformat(), fin.isoformat(), rnd.choice((1, 2, 4, 5)))
+        )
+        if i % 3 == 0:
+            cursor.execute("INSERT INTO Multa (alquiler_id, costo, detalle, fecha_multa) VALUES (?, 10, 'x', ?)",
+                           (i, inicio.isoformat()))
+            cursor.execute("INSERT INTO Danio (id_alquiler, costo, detalle) VALUES (?, 10, 'x')", (i,))
+    conn.commit()
+    conn.close()
+
+
+def escaneos_completos(conn, sql):
+    plan = conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()
+    malos = []
+    for row in plan:
+        detalle = row[3]
+        m = re.match(r'SCAN (\w+)', detalle)
+        if m and m.group(1) in TABLAS_GRANDES and 'INDEX' not in detalle:
+            malos.append(detalle)
+    return malos
+
+
+def test_hot_queries_use_indexes(tmp_path):
+    dbpath = str(tmp_path / 'planes.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath)
+
+    # Capturar el SQL (con parámetros) que ejecuta cada conexión del pool
+    ejecutadas = []
+    for pool in (dbm.read_pool, dbm.write_pool):
+        pool.close_all()
+        setup = pool._setup
+        def con_traza(conn, setup=setup):
+            if setup:
+                setup(conn)
+            conn.set_trace_callback(ejecutadas.append)
+        pool._setup = con_traza
+
+    desde, hasta = '2024-03-01T00:00:00', '2024-09-01T00:00:00'
+    dbm.get_user_data_for_login_by_mail('p10@mail.com')
+    dbm.get_full_usuario_by_id(10)
+    dbm.get_client_by_id(5)
+    dbm.get_client_by_document(1, 30000010)
+    dbm.get_alquiler_by_id(42)
+    dbm.get_multas_by_alquiler(42)
+    dbm.get_danios_by_alquiler(42)
+    dbm.get_all_alquileres(id_persona_filtro=10)
+    dbm.get_alquileres_por_usuario(10)
+    dbm.get_alquileres_por_empleado(1)
+    dbm.get_cliente_por_usuario(10)
+    dbm.get_empleado_por_usuario(1)
+    dbm.get_persona_por_usuario(10)
+    dbm.get_report_alquileres_por_cliente(9)
+    dbm.get_report_ranking_vehiculos(desde, hasta)
+    dbm.get_report_evolucion_temporal(desde, hasta)
+    dbm.get_report_facturacion_mensual(desde, hasta)
+    dbm.get_detailed_client_rentals_report(desde, hasta)
+    dbm.get_rentals_by_period_report('mensual', desde, hasta)
+    dbm.get_vehiculos_libres('2030-01-01T10:00:00', '2030-01-05T10:00:00')
+    pagina = dbm.get_alquileres_pagina(limit=20)
+    dbm.get_alquileres_pagina(after=pagina['next_cursor'], limit=20, id_estado=2)
+    dbm.get_alquileres_pagina(limit=20, id_usuario=10)
+    pagina = dbm.get_clientes_pagina(limit=20)
+    dbm.get_clientes_pagina(after=pagina['next_cursor'], limit=20)
+    dbm.create_alquiler_transactional({
+        'patente': 'AA001AA', 'id_cliente': 3, 'id_empleado': 1,
+        'fecha_inicio': '2030-01-01T10:00:00', 'fecha_fin': '2030-01-03T10:00:00',
+    })
+
+    conn = sqlite3.connect(dbpath)
+    problemas = {}
+    for sql in ejecutadas:
+        if not re.match(r'\s*(SELECT|UPDATE|DELETE|WITH)', sql, re.IGNORECASE):
+            continue
+        malos = escaneos_completos(conn, sql)
+        if malos:
+            problemas[' '.join(sql.split())[:160]] = malos
+    conn.close()
+
+    assert len(ejecutadas) > 20
+    assert not problemas, problemas
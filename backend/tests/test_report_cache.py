@@ -0,0 +1,59 @@
+import sqlite3
+from backend.app.db_manager import DBManager
+from backend.app.report_cache import ReportCache
+from backend.tests.test_facturacion import setup_db
+
+
+def test_repeated_reports_are_served_without_sql(tmp_path):
+    dbpath = str(tmp_path / 'reportes.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath)
+    desde, hasta = '2024-01-01T00:00:00', '2024-12-31T23:59:59'
+
+    detalle = dbm.get_detailed_client_rentals_report(desde, hasta)
+    periodo = dbm.get_rentals_by_period_report('mensual', desde, hasta)
+    lecturas = dbm.get_pool_stats()['lectura']['checkouts']
+    for _ in range(5):
+        assert dbm.get_detailed_client_rentals_report(desde, hasta) == detalle
+        assert dbm.get_rentals_by_period_report('mensual', desde, hasta) == periodo
+    assert dbm.get_pool_stats()['lectura']['checkouts'] == lecturas
+    assert dbm.get_cache_stats()['reportes']['hits'] == 10
+
+    # Otros parámetros son otra entrada
+    dbm.get_rentals_by_period_report('anual', desde, hasta)
+    assert dbm.get_pool_stats()['lectura']['checkouts'] == lecturas + 1
+
+    # Modificar una multa por el DBManager cambia la versión: el reporte se recalcula
+    conn = sqlite3.connect(dbpath)
+    id_multa = conn.execute(
+        "SELECT id_multa FROM Multa JOIN Alquiler ON alquiler_id = id_alquiler WHERE id_estado = 4 LIMIT 1"
+    ).fetchone()[0]
+    conn.close()
+    version = dbm.get_cache_stats()['reportes']['version']
+    assert dbm.update_multa(id_multa, {'costo': 500, 'detalle': 'x', 'fecha_multa': '2024-06-01'})
+    assert dbm.get_cache_stats()['reportes']['version'] == version + 1
+    nuevo = dbm.get_detailed_client_rentals_report(desde, hasta)
+    assert dbm.get_pool_stats()['lectura']['checkouts'] > lecturas + 1
+    total = lambda reporte: sum(a['total_multas'] for c in reporte for a in c['alquileres'])
+    assert total(nuevo) != total(detalle)
+
+
+def test_lru_eviction_and_empty_results():
+    cache = ReportCache(max_size=2)
+    calculos = []
+    calcular = lambda n: lambda: calculos.append(n) or [n]
+
+    cache.obtener('r', (1,), calcular(1))
+    cache.obtener('r', (2,), calcular(2))
+    cache.obtener('r', (1,), calcular(1))       # (1,) pasa a ser el más reciente
+    cache.obtener('r', (3,), calcular(3))       # descarta (2,)
+    cache.obtener('r', (1,), calcular(1))
+    cache.obtener('r', (2,), calcular(2))
+    assert calculos == [1, 2, 3, 2]
+    assert cache.stats()['size'] == 2
+
+    # Un resultado vacío (posible error de la base) no se guarda
+    cache.obtener('vacio', (), lambda: calculos.append('v') or [])
+    cache.obtener('vacio', (), lambda: calculos.append('v') or [])
+    assert calculos[-2:] == ['v', 'v']
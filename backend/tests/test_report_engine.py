@@ -0,0 +1,116 @@
+import sqlite3
+import pytest
+from backend.app import report_engine
+from backend.app.db_manager import DBManager
+from backend.app.fechas import dias_alquiler
+from backend.tests.test_facturacion import setup_db
+
+
+def preparar(tmp_path):
+    dbpath = str(tmp_path / 'reportes.sqlite')
+    setup_db(dbpath)
+    conn = sqlite3.connect(dbpath)
+    conn.executemany("INSERT INTO Danio (id_alquiler, costo, detalle) VALUES (?, 15, 'x')", [(i,) for i in range(1, 151, 7)])
+    conn.commit()
+    conn.close()
+    DBManager._instance = None
+    return dbpath, DBManager(db_path=dbpath)
+
+
+def alquileres_finalizados(dbpath):
+    # Cálculo de referencia, alquiler por alquiler
+    conn = sqlite3.connect(dbpath)
+    filas = conn.execute("""
+        SELECT a.id_alquiler, a.id_cliente, a.fecha_inicio, a.fecha_fin, v.precio_flota,
+            (SELECT COALESCE(SUM(costo), 0) FROM Multa WHERE alquiler_id = a.id_alquiler),
+            (SELECT COALESCE(SUM(costo), 0) FROM Danio WHERE id_alquiler = a.id_alquiler)
+        FROM Alquiler a JOIN Vehiculo v ON a.patente = v.patente
+        WHERE a.id_estado = 4""").fetchall()
+    conn.close()
+    return [(ida, idc, inicio, dias_alquiler(inicio, fin) * precio, multas, danios)
+            for ida, idc, inicio, fin, precio, multas, danios in filas]
+
+
+def test_detailed_report_matches_row_by_row_totals(tmp_path):
+    dbpath, dbm = preparar(tmp_path)
+    desde, hasta = '2024-01-01T00:00:00', '2024-12-31T23:59:59'
+
+    reporte = dbm.get_detailed_client_rentals_report(desde, hasta)
+    assert [c['cliente'] for c in reporte] == sorted(c['cliente'] for c in reporte)
+
+    esperado = {}
+    for _, id_cliente, _, base, multas, danios in alquileres_finalizados(dbpath):
+        total = esperado.setdefault(f'N{id_cliente} A{id_cliente}', [0, 0])
+        total[0] += base
+        total[1] += base + multas + danios
+    for cliente in reporte:
+        base, general = esperado[cliente['cliente']]
+        assert round(cliente['total_facturado'], 2) == round(base, 2)
+        assert round(sum(a['total_general'] for a in cliente['alquileres']), 2) == round(general, 2)
+        fechas = [a['fecha_inicio'] for a in cliente['alquileres']]
+        assert fechas == sorted(fechas, reverse=True)
+    assert len(reporte) == len(esperado)
+
+
+def test_period_report_rolls_up_months(tmp_path):
+    dbpath, dbm = preparar(tmp_path)
+    filas = alquileres_finalizados(dbpath)
+
+    mensual = dbm.get_rentals_by_period_report('mensual')
+    assert sum(p['total_alquileres'] for p in mensual) == len(filas)
+    assert round(sum(p['ingresos_totales'] for p in mensual), 2) == round(sum(f[3] for f in filas), 2)
+
+    trimestral = dbm.get_rentals_by_period_report('trimestral')
+    q1 = [f for f in filas if f[2][:7] in ('2024-01', '2024-02', '2024-03')]
+    assert trimestral[0]['periodo'] == '2024-1'
+    assert trimestral[0]['total_alquileres'] == len(q1)
+    assert round(trimestral[0]['ingresos_totales'], 2) == round(sum(f[3] for f in q1), 2)
+
+    anual = dbm.get_rentals_by_period_report('anual')
+    assert [(p['periodo'], p['total_alquileres']) for p in anual] == [('2024', len(filas))]
+
+    cliente = dbm.get_report_alquileres_por_cliente(2)
+    costos = {f[0]: f[3] + f[4] + f[5] for f in alquileres_finalizados(dbpath) if f[1] == 2}
+    for item in cliente:
+        if item['id_alquiler'] in costos:
+            assert round(item['costo_final_total'], 2) == round(costos[item['id_alquiler']], 2)
+
+
+def redondear(valor):
+    if isinstance(valor, dict):
+        return {clave: redondear(v) for clave, v in valor.items()}
+    if isinstance(valor, list):
+        return [redondear(v) for v in valor]
+    return round(valor, 6) if isinstance(valor, float) else valor
+
+
+def calcular(conn):
+    """Lo que usan los reportes: filas con totales, sumas por trimestre y grupos ya sumados en SQL."""
+    alquileres = report_engine.cargar(conn, f"""
+        SELECT a.id_alquiler, a.id_cliente, a.fecha_inicio, a.dias, v.precio_flota, {report_engine.SQL_CARGOS}
+        FROM Alquiler a JOIN Vehiculo v ON a.patente = v.patente {report_engine.SQL_JOIN_CARGOS}
+        ORDER BY a.id_alquiler""")
+    grupos = report_engine.cargar(conn, f"""
+        SELECT a.id_cliente, COUNT(*) AS cantidad, SUM(a.dias) AS dias,
+            {report_engine.SQL_TOTAL_ALQUILER} AS total_alquiler
+        FROM Alquiler a JOIN Vehiculo v ON a.patente = v.patente
+        GROUP BY a.id_cliente ORDER BY a.id_cliente""")
+    return redondear([
+        alquileres.filas(),
+        alquileres.agrupar(alquileres.periodos('fecha_inicio', 'trimestral')),
+        grupos.agrupar(grupos.columna('id_cliente')),
+    ])
+
+
+def test_numpy_and_pure_python_engines_agree(tmp_path, monkeypatch):
+    pytest.importorskip('numpy')
+    dbpath, _ = preparar(tmp_path)
+    conn = sqlite3.connect(dbpath)
+
+    con_numpy = calcular(conn)
+    monkeypatch.setattr(report_engine, 'np', None)
+    sin_numpy = calcular(conn)
+    conn.close()
+
+    assert all(con_numpy)
+    assert con_numpy == sin_numpy
@@ -0,0 +1,170 @@
+import random
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+import pytest
+from backend.app import db_manager
+from backend.app.db_manager import DBManager
+from backend.app.migrations import ERROR_ALQUILER_SUPERPUESTO
+from backend.tests.test_facturacion import setup_db
+
+PATENTES = ('AA001AA', 'AA002AA', 'AA003AA')
+FLOTA = [f'BB{i:03d}BB' for i in range(40)]
+INSERT = ("INSERT INTO Alquiler (patente, id_cliente, id_empleado, fecha_inicio, fecha_fin, id_estado) "
+          "VALUES (?, 1, 1, ?, ?, ?)")
+
+
+def preparar(dbpath):
+    setup_db(dbpath)
+    conn = sqlite3.connect(dbpath)
+    conn.execute("INSERT INTO Empleado (fecha_alta, sueldo, horario, id_persona) VALUES ('2024-01-01', 1, '9-18', 1)")
+    conn.executemany("INSERT INTO Vehiculo VALUES (?, 'M', 1, 2020, 100, 5, 4, 0, 1, 1)", [(p,) for p in FLOTA])
+    conn.commit()
+    conn.close()
+    DBManager._instance = None
+    DBManager(db_path=dbpath)
+
+
+def otro_proceso(dbpath):
+    """Un DBManager con sus propios pools: para SQLite es lo mismo que otro proceso."""
+    dbm = object.__new__(DBManager)
+    DBManager.__init__(dbm, db_path=dbpath)
+    return dbm
+
+
+def ventana(rnd):
+    inicio = date.today() + timedelta(days=rnd.randint(10, 20))
+    return f"{inicio}T10:00:00", f"{inicio + timedelta(days=rnd.randint(1, 5))}T10:00:00"
+
+
+def superpuestos(dbpath):
+    conn = sqlite3.connect(dbpath)
+    total = conn.execute("""
+        SELECT COUNT(*) FROM Alquiler a JOIN Alquiler b
+        ON a.patente = b.patente AND a.id_alquiler < b.id_alquiler
+        AND a.fecha_inicio < b.fecha_fin AND a.fecha_fin > b.fecha_inicio
+        WHERE a.id_estado IN (1, 2, 3) AND b.id_estado IN (1, 2, 3) AND a.fecha_inicio > '2025'
+    """).fetchone()[0]
+    conn.close()
+    return total
+
+
+def test_trigger_rejects_overlapping_active_rentals(tmp_path):
+    dbpath = str(tmp_path / 'exclusion.sqlite')
+    preparar(dbpath)
+
+    conn = sqlite3.connect(dbpath)
+    conn.execute(INSERT, ('AA001AA', '2030-01-10T10:00:00', '2030-01-15T10:00:00', 1))
+    with pytest.raises(sqlite3.IntegrityError, match=ERROR_ALQUILER_SUPERPUESTO):
+        conn.execute(INSERT, ('AA001AA', '2030-01-14T10:00:00', '2030-01-20T10:00:00', 1))
+    # Pegado al anterior, en otro auto o cancelado: se acepta
+    conn.execute(INSERT, ('AA001AA', '2030-01-15T10:00:00', '2030-01-18T10:00:00', 1))
+    conn.execute(INSERT, ('AA002AA', '2030-01-14T10:00:00', '2030-01-20T10:00:00', 1))
+    id_cancelado = conn.execute(INSERT, ('AA001AA', '2030-01-11T10:00:00', '2030-01-12T10:00:00', 5)).lastrowid
+    # ...pero no se puede reactivar mientras choque con otro vigente
+    with pytest.raises(sqlite3.IntegrityError, match=ERROR_ALQUILER_SUPERPUESTO):
+        conn.execute("UPDATE Alquiler SET id_estado = 1 WHERE id_alquiler = ?", (id_cancelado,))
+    conn.close()
+
+
+def test_concurrent_bookings_never_double_book(tmp_path, monkeypatch):
+    dbpath = str(tmp_path / 'concurrencia.sqlite')
+    preparar(dbpath)
+    # Ensancha la ventana entre el chequeo y el INSERT para que las carreras ocurran
+    parsear = db_manager.parsear_fecha
+    monkeypatch.setattr(db_manager, 'parsear_fecha', lambda valor: time.sleep(0.001) or parsear(valor))
+    procesos = [otro_proceso(dbpath) for _ in range(6)]
+
+    resultados, lock = [], threading.Lock()
+    largada = threading.Barrier(12)
+
+    def reservar(indice):
+        dbm = procesos[indice % len(procesos)]
+        rnd = random.Random(indice)
+        propios = []
+        largada.wait()
+        for _ in range(25):
+            inicio, fin = ventana(rnd)
+            try:
+                ok = dbm.create_alquiler_transactional({
+                    'patente': rnd.choice(FLOTA), 'id_cliente': 1, 'id_empleado': 1,
+                    'fecha_inicio': inicio, 'fecha_fin': fin,
+                })
+                propios.append('ok' if ok else 'error')
+            except ValueError:
+                propios.append('rechazado')
+        with lock:
+            resultados.extend(propios)
+
+    hilos = [threading.Thread(target=reservar, args=(i,)) for i in range(12)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    # Ningún pedido falla por "database is locked": se espera o se reintenta
+    assert len(resultados) == 300 and 'error' not in resultados
+    # El primero gana cada auto; los demás se rechazan por validación
+    conn = sqlite3.connect(dbpath)
+    reservados = conn.execute("SELECT COUNT(DISTINCT patente) FROM Alquiler WHERE patente LIKE 'BB%'").fetchone()[0]
+    conn.close()
+    assert resultados.count('ok') == reservados
+    assert superpuestos(dbpath) == 0
+
+
+def test_naive_writers_are_stopped_by_the_database(tmp_path):
+    # Escritores que chequean y recién después insertan (sin lock previo):
+    # aunque dos pasen el chequeo a la vez, el trigger rechaza al segundo
+    dbpath = str(tmp_path / 'ingenuos.sqlite')
+    preparar(dbpath)
+
+    largada = threading.Barrier(8)
+
+    def escribir(indice):
+        conn = sqlite3.connect(dbpath, timeout=30, isolation_level=None)
+        rnd = random.Random(100 + indice)
+        largada.wait()
+        for _ in range(40):
+            patente = rnd.choice(PATENTES)
+            inicio, fin = ventana(rnd)
+            conn.execute("BEGIN")
+            try:
+                choca = conn.execute(
+                    "SELECT 1 FROM Alquiler WHERE patente = ? AND id_estado IN (1, 2, 3) "
+                    "AND fecha_inicio < ? AND fecha_fin > ?", (patente, fin, inicio)
+                ).fetchone()
+                if not choca:
+                    conn.execute(INSERT, (patente, inicio, fin, 1))
+                conn.execute("COMMIT")
+            except (sqlite3.IntegrityError, sqlite3.OperationalError):
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+        conn.close()
+
+    hilos = [threading.Thread(target=escribir, args=(i,)) for i in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert superpuestos(dbpath) == 0
+
+
+def test_failure_after_commit_is_not_retried(tmp_path, monkeypatch):
+    dbpath = str(tmp_path / 'post_commit.sqlite')
+    preparar(dbpath)
+    dbm = DBManager()
+
+    def ocupada():
+        raise sqlite3.OperationalError('database is locked')
+    # Lo que corre después del commit choca con la base ocupada: la reserva ya está hecha
+    monkeypatch.setattr(dbm.reportes, 'invalidar', ocupada)
+    inicio, fin = ventana(random.Random(3))
+    assert dbm.create_alquiler_transactional({
+        'patente': 'BB000BB', 'id_cliente': 1, 'id_empleado': 1, 'fecha_inicio': inicio, 'fecha_fin': fin,
+    })
+
+    conn = sqlite3.connect(dbpath)
+    assert conn.execute("SELECT COUNT(*) FROM Alquiler WHERE patente = 'BB000BB'").fetchone()[0] == 1
+    conn.close()
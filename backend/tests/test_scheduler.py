@@ -0,0 +1,116 @@
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from backend.app.db_manager import DBManager
+from backend.app.scheduler import PlanificadorEstados
+from backend.tests.test_reservas_concurrentes import preparar
+
+AHORA = datetime.now().replace(microsecond=0)
+
+
+def hace(**delta):
+    return (AHORA - timedelta(**delta)).isoformat()
+
+
+def en(**delta):
+    return (AHORA + timedelta(**delta)).isoformat()
+
+
+def estados(dbpath, tabla, clave, ids):
+    conn = sqlite3.connect(dbpath)
+    filas = dict(conn.execute(
+        f"SELECT {clave}, id_estado FROM {tabla} WHERE {clave} IN ({', '.join('?' * len(ids))})", ids
+    ).fetchall())
+    conn.close()
+    return [filas[i] for i in ids]
+
+
+def test_sweeps_catch_up_once_and_move_vehicles(tmp_path):
+    dbpath = str(tmp_path / 'planificador.sqlite')
+    preparar(dbpath)
+    dbm = DBManager()
+
+    conn = sqlite3.connect(dbpath)
+    # Un par superpuesto de antes de la migración 007 no debe frenar el barrido
+    conn.execute("DROP TRIGGER trg_alquiler_superpuesto_ins")
+    alquiler = ("INSERT INTO Alquiler (patente, id_cliente, id_empleado, fecha_inicio, fecha_fin, id_estado) "
+                "VALUES (?, 1, 1, ?, ?, ?)")
+    ids = [conn.execute(alquiler, fila).lastrowid for fila in (
+        ('BB000BB', hace(hours=2), en(days=3), 1),      # empezó hace un rato -> Activo
+        ('BB001BB', hace(days=10), hace(days=5), 1),    # nadie lo tocó y ya terminó -> Activo y Atrasado
+        ('BB002BB', hace(days=6), hace(days=2), 2),     # activo vencido -> Atrasado
+        ('BB003BB', hace(days=1), en(hours=1), 2),      # termina hoy: todavía no está atrasado
+        ('BB004BB', en(days=2), en(days=4), 1),         # reserva futura: sigue igual
+        ('BB005BB', hace(days=3), hace(days=1), 2),     # legado: superpuesto con el siguiente
+        ('BB005BB', hace(days=2), en(days=1), 1),
+    )]
+    mantenimiento = ("INSERT INTO Mantenimiento (patente, id_empleado, fecha_inicio, fecha_fin, detalle, id_estado) "
+                     "VALUES (?, 1, ?, ?, 'service', 3)")
+    mants = [conn.execute(mantenimiento, fila).lastrowid for fila in (
+        ('BB006BB', hace(hours=1), en(days=1)),
+        ('BB007BB', en(days=1), en(days=2)),
+    )]
+    conn.commit()
+    conn.close()
+
+    planificador = PlanificadorEstados(dbm)
+    dbm.metricas.reiniciar()
+    primera = planificador.pasada(AHORA)
+
+    assert estados(dbpath, 'Alquiler', 'id_alquiler', ids) == [2, 3, 3, 2, 1, 3, 2]
+    assert estados(dbpath, 'Mantenimiento', 'id_mantenimiento', mants) == [1, 3]
+    assert estados(dbpath, 'Vehiculo', 'patente', ['BB000BB', 'BB001BB', 'BB004BB', 'BB006BB', 'BB007BB']) == \
+        [2, 2, 1, 3, 1]
+    assert all(filas >= 1 for filas in primera.values())
+
+    # Idempotente: la segunda pasada no encuentra nada
+    assert planificador.pasada(AHORA) == {nombre: 0 for nombre in primera}
+    texto = dbm.metricas.exportar()
+    assert f'alquileres_scheduler_transitions_total{{barrido="alquileres_atrasados"}} {primera["alquileres_atrasados"]}' in texto
+    assert 'alquileres_scheduler_sweep_duration_seconds_count{barrido="mantenimientos_iniciados"} 2' in texto
+    assert 'alquileres_scheduler_errors_total{' not in texto
+    assert 'alquileres_scheduler_last_run_timestamp_seconds ' in texto
+
+
+def test_thread_runs_a_pass_on_start_and_stops(tmp_path):
+    dbpath = str(tmp_path / 'hilo.sqlite')
+    preparar(dbpath)
+    planificador = PlanificadorEstados(DBManager(), intervalo=60)
+
+    planificador.iniciar()
+    limite = time.time() + 5
+    while planificador.ultima_pasada is None and time.time() < limite:
+        time.sleep(0.01)
+    planificador.detener()
+
+    assert planificador.ultima_pasada is not None
+    assert planificador._hilo is None
+
+
+def test_sweeps_do_not_take_a_vehicle_busy_with_the_other_kind(tmp_path, caplog):
+    dbpath = str(tmp_path / 'conflictos.sqlite')
+    preparar(dbpath)
+    dbm = DBManager()
+
+    conn = sqlite3.connect(dbpath)
+    # BB010BB está alquilado (activo) y le toca un service; BB011BB está en el taller y le empieza una reserva
+    conn.execute("UPDATE Vehiculo SET id_estado = 2 WHERE patente = 'BB010BB'")
+    conn.execute("UPDATE Vehiculo SET id_estado = 3 WHERE patente = 'BB011BB'")
+    conn.execute("INSERT INTO Alquiler (patente, id_cliente, id_empleado, fecha_inicio, fecha_fin, id_estado) "
+                 "VALUES ('BB010BB', 1, 1, ?, ?, 2)", (hace(days=1), en(days=2)))
+    alquiler = conn.execute("INSERT INTO Alquiler (patente, id_cliente, id_empleado, fecha_inicio, fecha_fin, id_estado) "
+                            "VALUES ('BB011BB', 1, 1, ?, ?, 1)", (hace(hours=1), en(days=2))).lastrowid
+    service = conn.execute("INSERT INTO Mantenimiento (patente, id_empleado, fecha_inicio, fecha_fin, detalle, id_estado) "
+                           "VALUES ('BB010BB', 1, ?, ?, 'service', 3)", (hace(hours=1), en(days=1))).lastrowid
+    conn.commit()
+    conn.close()
+
+    with caplog.at_level('WARNING'):
+        PlanificadorEstados(dbm).pasada(AHORA)
+
+    # Las filas siguen su calendario, pero el vehículo conserva el estado que lo ocupa
+    assert estados(dbpath, 'Alquiler', 'id_alquiler', [alquiler]) == [2]
+    assert estados(dbpath, 'Mantenimiento', 'id_mantenimiento', [service]) == [1]
+    assert estados(dbpath, 'Vehiculo', 'patente', ['BB010BB', 'BB011BB']) == [2, 3]
+    avisos = [r.getMessage() for r in caplog.records if r.levelname == 'WARNING']
+    assert any('BB010BB' in aviso for aviso in avisos) and any('BB011BB' in aviso for aviso in avisos)
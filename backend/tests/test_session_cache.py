@@ -0,0 +1,91 @@
+import sqlite3
+import time
+from backend.app.db_manager import DBManager
+from backend.app.session_cache import SessionStore, UserCache
+
+
+def setup_db(path):
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+    CREATE TABLE Documento (id_tipo INTEGER PRIMARY KEY, descripcion TEXT);
+    CREATE TABLE Permiso (id_permiso INTEGER PRIMARY KEY, descripcion TEXT);
+    CREATE TABLE Persona (
+        id_persona INTEGER PRIMARY KEY AUTOINCREMENT, nombre TEXT, apellido TEXT, telefono TEXT,
+        mail TEXT, fecha_nac TEXT, tipo_documento INTEGER, nro_documento INTEGER
+    );
+    CREATE TABLE Usuario (
+        id_usuario INTEGER PRIMARY KEY AUTOINCREMENT, id_persona INTEGER,
+        user_name TEXT, password TEXT, id_permiso INTEGER
+    );
+    INSERT INTO Documento VALUES (1, 'DNI');
+    INSERT INTO Permiso VALUES (1, 'Cliente'), (3, 'Admin');
+    INSERT INTO Persona VALUES (1, 'Ana', 'Lopez', '1', 'ana@mail.com', '1990-01-01', 1, 30111222);
+    INSERT INTO Usuario VALUES (1, 1, 'ana', 'x', 1);
+    ''')
+    conn.commit()
+    conn.close()
+
+
+def test_user_lookup_is_cached_and_invalidated(tmp_path):
+    dbpath = str(tmp_path / 'sesion.sqlite')
+    setup_db(dbpath)
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath)
+
+    assert dbm.get_usuario_cacheado('1').user_name == 'ana'
+    lecturas = dbm.get_pool_stats()['lectura']['checkouts']
+    for _ in range(10):
+        assert dbm.get_usuario_cacheado(1).permiso.descripcion == 'Cliente'
+    # Resuelto desde memoria: ninguna conexión nueva
+    assert dbm.get_pool_stats()['lectura']['checkouts'] == lecturas
+
+    assert dbm.actualizar_usuario(1, {'id_permiso': 3})
+    assert dbm.get_usuario_cacheado(1).permiso.descripcion == 'Admin'
+
+    assert dbm.update_persona_por_id(1, {
+        'nombre': 'Ana', 'apellido': 'Lopez', 'mail': 'ana@mail.com', 'telefono': '1',
+        'fecha_nacimiento': '1990-01-01', 'tipo_documento_id': 1, 'nro_documento': 30111222,
+    })
+    assert dbm.user_cache.get(1) is None
+
+
+def test_user_cache_lru_and_ttl():
+    cache = UserCache(max_size=2, ttl=60)
+    cache.put(1, 'a')
+    cache.put(2, 'b')
+    cache.get(1)
+    cache.put(3, 'c')
+    # El 2 era el menos usado
+    assert cache.get(2) is None
+    assert cache.get(1) == 'a' and cache.get(3) == 'c'
+
+    cache = UserCache(ttl=0.01)
+    cache.put(1, 'a')
+    time.sleep(0.02)
+    assert cache.get(1) is None
+
+
+def test_session_tokens():
+    sesiones = SessionStore()
+    token = sesiones.crear(7)
+    assert sesiones.resolver(token) == 7
+    assert sesiones.resolver('otro') is None
+
+    sesiones.revocar_usuario(7)
+    assert sesiones.resolver(token) is None
+
+
+def test_session_store_prunes_expired_tokens_and_caps_size():
+    sesiones = SessionStore(ttl=0.05, max_size=3)
+    viejos = [sesiones.crear(i) for i in range(3)]
+    time.sleep(0.06)
+    # El próximo login se lleva los vencidos aunque nadie los vuelva a usar
+    nuevo = sesiones.crear(9)
+    assert len(sesiones) == 1 and sesiones.resolver(nuevo) == 9
+
+    sesiones.ttl = 60
+    tokens = [sesiones.crear(i) for i in range(4)]
+    assert len(sesiones) == 3
+    assert sesiones.resolver(nuevo) is None and sesiones.resolver(tokens[0]) is None
+    assert [sesiones.resolver(t) for t in tokens[1:]] == [1, 2, 3]
+    assert all(sesiones.resolver(t) is None for t in viejos)
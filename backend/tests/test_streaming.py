@@ -0,0 +1,40 @@
+import sqlite3
+from backend.app import db_manager
+from backend.app.db_manager import DBManager
+from backend.tests.test_pagination import setup_db
+
+
+def test_iterators_stream_everything_and_release_connection(tmp_path, monkeypatch):
+    dbpath = str(tmp_path / 'stream.sqlite')
+    setup_db(dbpath)
+    conn = sqlite3.connect(dbpath)
+    conn.execute("UPDATE Alquiler SET id_estado = 4 WHERE id_alquiler % 2 = 0")
+    conn.commit()
+    conn.close()
+    DBManager._instance = None
+    dbm = DBManager(db_path=dbpath)
+    # Lotes chicos para recorrer varios fetchmany
+    monkeypatch.setattr(db_manager, 'TAMANIO_LOTE', 7)
+
+    filas = dbm.iter_alquileres(id_estado=4)
+    # Nada se lee (ni se toma conexión) hasta iterar
+    assert dbm.get_pool_stats()['lectura']['in_use'] == 0
+    ids = [a['id_alquiler'] for a in filas]
+    assert ids == [a['id_alquiler'] for a in
+                   sorted(dbm.get_all_alquileres(), key=lambda a: (a['fecha_inicio'], a['id_alquiler']), reverse=True)
+                   if a['id_estado'] == 4]
+    assert dbm.get_pool_stats()['lectura']['in_use'] == 0
+
+    # Cortar la descarga a mitad de camino devuelve la conexión al pool
+    filas = dbm.iter_alquileres()
+    next(filas)
+    assert dbm.get_pool_stats()['lectura']['in_use'] == 1
+    filas.close()
+    assert dbm.get_pool_stats()['lectura']['in_use'] == 0
+
+    desde, hasta = '2024-01-01T00:00:00', '2024-12-31T00:00:00'
+    agrupado = list(dbm.iter_detailed_client_rentals_report(desde, hasta))
+    esperado = dbm.get_detailed_client_rentals_report(desde, hasta)
+    clave = lambda c: (c['cliente'], c['nro_documento'])
+    assert sorted(agrupado, key=clave) == sorted(esperado, key=clave)
+    assert dbm.get_pool_stats()['lectura']['in_use'] == 0
@@ -92,13 +92,14 @@ const Login = () => {
         try {
             const response = await authService.login(loginData.email, loginData.password);
 
-            const { user_id, nombre, rol } = response;
+            const { user_id, nombre, rol, token } = response;
             
             // Usar el contexto de autenticación para hacer login
             await login({
                 userId: user_id,
                 userName: nombre,
-                userRole: rol
+                userRole: rol,
+                token: token
             });
             
             setMessage({ type: 'success', text: `¡Bienvenido ${nombre}! Redireccionando...` });
@@ -31,14 +31,16 @@ export const AuthProvider = ({ children }) => {
       const userId = localStorage.getItem('userId');
       const userName = localStorage.getItem('userName');
       const userRole = localStorage.getItem('userRole');
+      const token = localStorage.getItem('authToken');
 
-      if (userId && userName && userRole) {
+      if (userId && userName && userRole && token) {
+        axios.defaults.headers.common['Authorization'] = `Bearer ${token}`;
         // Verificar con el backend si el usuario sigue siendo válido
         try {
           // Esta llamada verifica que el usuario exista y tenga permisos
           const response = await axios.get(`${API_BASE_URL}/usuarios/${userId}`, {
             headers: {
-              'user-id': userId
+              'Authorization': `Bearer ${token}`
             }
           });
 
@@ -77,9 +79,14 @@ export const AuthProvider = ({ children }) => {
       localStorage.setItem('userId', userData.userId);
       localStorage.setItem('userName', userData.userName);
       localStorage.setItem('userRole', userData.userRole);
+      if (userData.token) {
+        localStorage.setItem('authToken', userData.token);
+      }
 
-      // Configurar axios para enviar el user-id en todas las requests
-      axios.defaults.headers.common['user-id'] = userData.userId;
+      // Configurar axios para enviar el token de sesión en todas las requests
+      if (userData.token) {
+        axios.defaults.headers.common['Authorization'] = `Bearer ${userData.token}`;
+      }
 
       setUser(userData);
       return { success: true };
@@ -104,9 +111,10 @@ export const AuthProvider = ({ children }) => {
       localStorage.removeItem('userId');
       localStorage.removeItem('userName');
       localStorage.removeItem('userRole');
+      localStorage.removeItem('authToken');
 
       // Remover header de axios
-      delete axios.defaults.headers.common['user-id'];
+      delete axios.defaults.headers.common['Authorization'];
 
       // Limpiar estado
       setUser(null);
@@ -17,12 +17,12 @@ const apiClient = axios.create({
   timeout: 10000,
 });
 
-// Interceptor para agregar el user-id automáticamente
+// Interceptor para agregar el token de sesión
 apiClient.interceptors.request.use(
   (config) => {
-    const userId = localStorage.getItem('userId');
-    if (userId) {
-      config.headers['user-id'] = userId;
+    const token = localStorage.getItem('authToken');
+    if (token) {
+      config.headers['Authorization'] = `Bearer ${token}`;
     }
     return config;
   },
@@ -40,6 +40,7 @@ apiClient.interceptors.response.use(
       localStorage.removeItem('userId');
       localStorage.removeItem('userName');
       localStorage.removeItem('userRole');
+      localStorage.removeItem('authToken');
       window.location.href = '/login';
     }
     return Promise.reject(error);
@@ -8,12 +8,12 @@ const apiEmployee = axios.create({
   timeout: 10000,
 });
 
-// Interceptor para agregar el user-id automáticamente
+// Interceptor para agregar el token de sesión automáticamente
 apiEmployee.interceptors.request.use(
   (config) => {
-    const userId = localStorage.getItem('userId');
-    if (userId) {
-      config.headers['user-id'] = userId;
+    const token = localStorage.getItem('authToken');
+    if (token) {
+      config.headers['Authorization'] = `Bearer ${token}`;
     }
     return config;
   },
@@ -31,6 +31,7 @@ apiEmployee.interceptors.response.use(
       localStorage.removeItem('userId');
       localStorage.removeItem('userName');
       localStorage.removeItem('userRole');
+      localStorage.removeItem('authToken');
       window.location.href = '/login';
     }
     return Promise.reject(error);